@@ -14,10 +14,20 @@ def main():
         # Project-local mode: hooks/ is at .claude-plugin/hooks/
         plugin_dir = Path(__file__).resolve().parent.parent
         sys.path.insert(0, str(plugin_dir))
+    stdin_data = sys.stdin.read()
+    try:
+        from lib.permission_daemon import request_decision
+        result = request_decision(stdin_data, caller='PermissionRequest')
+    except Exception:
+        result = None
+    if result is not None:
+        print(json.dumps(result))
+        return
+
     from lib.logger import logger
     logger('SYSTEM', f'PermissionRequest hook started')
     from lib.permission import determine
-    result = determine(sys.stdin.read(), caller='PermissionRequest')
+    result = determine(stdin_data, caller='PermissionRequest')
     # TODO: It is a bad hack, pass this too determine as an argument later!
     print(json.dumps(result))
     logger('SYSTEM', f'PermissionRequest hook finished: {result}')
@@ -87,7 +87,8 @@ def main():
 
     logger(session_id, f"Captured issue number {issue_no} from gh issue create")
 
-    # Check if we're in an Ultra Planner workflow
+    # The exported session file exists for every stored session: checking it
+    # first keeps sessions without handsoff state away from the store
     sess_dir = session_dir()
     session_file = os.path.join(sess_dir, f'{session_id}.json')
 
@@ -95,27 +96,34 @@ def main():
         logger(session_id, f"No session state file found at {session_file}")
         sys.exit(0)
 
-    with open(session_file, 'r') as f:
-        state = json.load(f)
-
-    workflow = state.get('workflow', '')
-
-    # Only update for Ultra Planner workflow
-    if workflow != ULTRA_PLANNER:
-        logger(session_id, f"Not in Ultra Planner workflow (current: {workflow}), skipping issue capture")
+    # Check if we're in an Ultra Planner workflow and record the issue number
+    # in one atomic read-modify-write
+    from lib.session_store import update_session
+
+    skip_reason = []
+
+    def capture_issue(state):
+        if state is None:
+            skip_reason.append(f"No session state found for {session_id}")
+            return None
+        workflow = state.get('workflow', '')
+        # Only update for Ultra Planner workflow
+        if workflow != ULTRA_PLANNER:
+            skip_reason.append(f"Not in Ultra Planner workflow (current: {workflow}), skipping issue capture")
+            return None
+        # Check if issue_no is already set (don't overwrite)
+        if state.get('issue_no') is not None:
+            skip_reason.append(f"Issue number already set to {state['issue_no']}, not overwriting")
+            return None
+        return {**state, 'issue_no': issue_no}
+
+    state = update_session(session_id, capture_issue, sess_dir=sess_dir)
+    if state is None:
+        logger(session_id, skip_reason[0] if skip_reason else "Session state not updated")
         sys.exit(0)
 
-    # Check if issue_no is already set (don't overwrite)
-    if state.get('issue_no') is not None:
-        logger(session_id, f"Issue number already set to {state['issue_no']}, not overwriting")
-        sys.exit(0)
-
-    # Update session state with captured issue number
-    state['issue_no'] = issue_no
-
-    with open(session_file, 'w') as f:
-        logger(session_id, f"Updating session state with issue_no={issue_no}")
-        json.dump(state, f)
+    logger(session_id, f"Updated session state with issue_no={issue_no}")
+    workflow = state['workflow']
 
     # Create issue index file for reverse lookup
     write_issue_index(session_id, issue_no, workflow, sess_dir=sess_dir)
@@ -4,6 +4,9 @@
 This hook imports and invokes lib.permission.determine() for all permission
 decisions. Rules are defined in .claude-plugin/lib/permission/rules.py.
 
+When the optional permission daemon is running, the decision is requested over
+its Unix socket first and evaluated in-process only if the daemon cannot answer.
+
 Falls back to 'ask' on any import/execution errors.
 """
 
@@ -17,13 +20,22 @@ _plugin_dir = Path(__file__).resolve().parent.parent
 if str(_plugin_dir) not in sys.path:
     sys.path.insert(0, str(_plugin_dir))
 
-from lib.logger import logger
-
 def main():
+    stdin_data = sys.stdin.read()
+    try:
+        from lib.permission_daemon import request_decision
+        result = request_decision(stdin_data, caller='PreToolUse')
+    except Exception:
+        result = None
+    if result is not None:
+        print(json.dumps(result))
+        return
+
+    from lib.logger import logger
     logger('SYSTEM', f'PreToolUse hook started')
     try:
         from lib.permission import determine
-        result = determine(sys.stdin.read(), caller='PreToolUse')
+        result = determine(stdin_data, caller='PreToolUse')
     except Exception as e:
         import traceback
         logger('SYSTEM', f'PreToolUse hook error: {e}')
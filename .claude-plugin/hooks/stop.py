@@ -11,6 +11,7 @@ if str(_plugin_dir) not in sys.path:
 
 from lib.logger import logger
 from lib.session_utils import session_dir, is_handsoff_enabled
+from lib.transcript import tail_lines
 from lib.workflow import get_continuation_prompt, ISSUE_TO_IMPL
 
 
@@ -22,11 +23,10 @@ def main():
     hook_input = json.load(sys.stdin)
     session_id = hook_input.get("session_id", "")
     transcript_path = hook_input.get("transcript_path", "")
-    transript = open(transcript_path, 'r').readlines()[-1]
 
     # Check for Insufficient Credit error
     try:
-        last_entry = json.loads(transript)
+        last_entry = json.loads(tail_lines(transcript_path, 1, session_id)[-1])
         if last_entry.get('isApiErrorMessage') and 'Insufficient credit' in str(last_entry.get('message', {}).get('content', [])):
             logger(session_id, "Insufficient credits detected, stopping auto-continuation")
             sys.exit(0)
@@ -35,30 +35,35 @@ def main():
         logger(session_id, f"Could not parse last transcript entry: {e}")
 
 
-    # Check the file existence using AGENTIZE_HOME fallback
+    # Check the file existence using AGENTIZE_HOME fallback (the session
+    # store exports <session_id>.json for every session)
     sess_dir = session_dir()
     fname = os.path.join(sess_dir, f'{session_id}.json')
     if os.path.exists(fname):
         logger(session_id, f"Found existing state file: {fname}")
-        with open(fname, 'r') as f:
-            state = json.load(f)
+        from lib.session_store import get_session, update_session
 
-            # Check for done state first (takes priority over continuation_count)
-            workflow_state = state.get('state', 'initial')
-            if workflow_state == 'done':
-                logger(session_id, "State is 'done', stopping continuation")
-                sys.exit(0)
-
-            # Get max_continuations from YAML config only
-            from lib.local_config import get_local_value, coerce_int
-            max_continuations = get_local_value('handsoff.max_continuations', 10, coerce_int)
+        # Get max_continuations from YAML config only
+        from lib.local_config import get_local_value, coerce_int
+        max_continuations = get_local_value('handsoff.max_continuations', 10, coerce_int)
 
-            continuation_count = state.get('continuation_count', 0)
-            if continuation_count >= max_continuations:
-                sys.exit(0)  # Do nothing if max continuations reached
-            else:
-                state['continuation_count'] = continuation_count + 1
-                workflow = state.get('workflow', '')
+        def stop_reason(current):
+            if current is None:
+                return "State file vanished, stopping continuation"
+            # Check for done state first (takes priority over continuation_count)
+            if current.get('state', 'initial') == 'done':
+                return "State is 'done', stopping continuation"
+            if current.get('continuation_count', 0) >= max_continuations:
+                return "Max continuations reached"
+            return None
+
+        state = get_session(session_id, sess_dir=sess_dir)
+        reason = stop_reason(state)
+        if reason:
+            logger(session_id, reason)
+            sys.exit(0)
+        continuation_count = state.get('continuation_count', 0)
+        workflow = state.get('workflow', '')
 
         # Get continuation prompt from centralized workflow module
         pr_no = state.get('pr_no', 'unknown')
@@ -101,9 +106,23 @@ def main():
         )
 
         if prompt:
-            with open(fname, 'w') as f:
-                logger(session_id, f"Updating state for continuation: {state}")
-                json.dump(state, f)
+            claim_failure = []
+
+            def claim_continuation(current):
+                reason = stop_reason(current)
+                if reason:
+                    claim_failure.append(reason)
+                    return None
+                return {**current, 'continuation_count': current.get('continuation_count', 0) + 1}
+
+            # Spend a continuation only once a prompt will block the stop. The
+            # check and increment are one atomic read-modify-write, so a concurrent
+            # update (server pr_number, agent marking done) is not lost.
+            claimed = update_session(session_id, claim_continuation, sess_dir=sess_dir)
+            if claimed is None:
+                logger(session_id, claim_failure[0] if claim_failure else "Session not updated, stopping continuation")
+                sys.exit(0)
+            logger(session_id, f"Updated state for continuation: {claimed}")
             # NOTE: `dumps` is REQUIRED ow Claude Code will just ignore your output!
             print(json.dumps({
                 'decision': 'block',
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-import os
 import sys
 import json
 from pathlib import Path
@@ -67,10 +66,10 @@ def main():
         # Create session directory using AGENTIZE_HOME fallback
         sess_dir = session_dir(makedirs=True)
 
-        session_file = os.path.join(sess_dir, f'{session_id}.json')
-        with open(session_file, 'w') as f:
-            logger(session_id, f"Writing state: {state}")
-            json.dump(state, f)
+        # Imported here: only workflow prompts touch the session store
+        from lib.session_store import put_session
+        logger(session_id, f"Writing state: {state}")
+        put_session(session_id, state, sess_dir=sess_dir)
 
         # Create issue index file if issue_no is present
         if issue_no is not None:
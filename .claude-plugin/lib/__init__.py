@@ -2,6 +2,7 @@
 
 This package contains shared utilities used by hooks and server components:
 - permission: Tool permission evaluation logic
+- permission_daemon: Optional warm permission decision server
 - workflow: Handsoff workflow definitions and utilities
 - logger: Debug logging for hooks
 - telegram_utils: Telegram Bot API helpers
@@ -4,21 +4,30 @@ This module provides a single source of truth for YAML file search order and
 parsing logic. Both local_config.py (hooks) and runtime_config.py (server)
 use these helpers to ensure consistent behavior.
 
-Note: This module does NOT cache results. Caching is handled by callers:
+Note: This module does NOT cache results in memory. Caching is handled by callers:
 - local_config.py caches for hooks (avoid repeated I/O during permission checks)
 - runtime_config.py does not cache (server needs fresh config each poll cycle)
+
+Parsed files are snapshotted on disk (marshal, keyed by path, mtime, size and
+inode) so cold hook processes skip importing PyYAML and parsing entirely. A
+snapshot is only used when the file is unchanged, so callers still always see
+the current file contents.
 """
 
 from __future__ import annotations
 
+import marshal
 import os
+import sys
+import zlib
 from pathlib import Path
 from typing import Optional
 
-try:
-    import yaml
-except ModuleNotFoundError:  # Optional dependency for full YAML support
-    yaml = None
+SNAPSHOT_DIRNAME = 'config-snapshots'
+
+# PyYAML is imported on first parse; snapshot hits never pay for it
+_yaml = None
+_yaml_loaded = False
 
 
 def find_local_config_file(start_dir: Optional[Path] = None) -> Optional[Path]:
@@ -252,19 +261,96 @@ def _parse_yaml_fallback(content: str) -> dict:
     return value
 
 
-def parse_yaml_file(path: Path) -> dict:
-    """Parse a YAML file using yaml.safe_load() when available.
+def _get_yaml():
+    """Import PyYAML on first use (optional dependency for full YAML support)."""
+    global _yaml, _yaml_loaded
+    if not _yaml_loaded:
+        try:
+            import yaml
+        except ModuleNotFoundError:
+            yaml = None
+        _yaml = yaml
+        _yaml_loaded = True
+    return _yaml
+
+
+def _parse_yaml_content(content: str) -> dict:
+    """Parse YAML text, preferring the libyaml-backed CSafeLoader."""
+    yaml = _get_yaml()
+    if yaml is not None:
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        return yaml.load(content, Loader=loader) or {}
+
+    return _parse_yaml_fallback(content)
+
+
+def _snapshot_dir() -> str:
+    """Get the snapshot directory, $AGENTIZE_HOME/.tmp/config-snapshots."""
+    from lib.session_utils import get_agentize_home
+
+    return os.path.join(get_agentize_home(), '.tmp', SNAPSHOT_DIRNAME)
+
+
+def _snapshot_path(path: Path) -> str:
+    digest = f"{zlib.crc32(str(path).encode('utf-8')):08x}"
+    return os.path.join(_snapshot_dir(), f'{digest}.marshal')
+
+
+def _snapshot_key(path: Path, st: os.stat_result) -> tuple:
+    # marshal's format may change between interpreter versions
+    return (str(path), st.st_mtime_ns, st.st_size, st.st_ino, sys.version_info[:2])
+
+
+def _load_snapshot(snapshot: str, key: tuple):
+    try:
+        with open(snapshot, 'rb') as f:
+            stored_key, data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return data if stored_key == key and isinstance(data, dict) else None
+
+
+def _save_snapshot(snapshot: str, key: tuple, data: dict) -> None:
+    # Write-then-rename so concurrent hooks never read a torn snapshot
+    tmp_path = f'{snapshot}.{os.getpid()}.tmp'
+    try:
+        payload = marshal.dumps((key, data))
+        # Snapshots hold config values such as the Telegram token: owner-only
+        os.makedirs(os.path.dirname(snapshot), mode=0o700, exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, snapshot)
+    except (OSError, ValueError):
+        # ValueError: values marshal cannot encode (e.g. YAML timestamps)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def parse_yaml_file(path: Path, use_snapshot: bool = True) -> dict:
+    """Parse a YAML file using PyYAML's safe loader when available.
 
     Args:
         path: Path to the YAML file
+        use_snapshot: Reuse/refresh the on-disk parse snapshot (default: True)
 
     Returns:
         Parsed configuration as nested dict. Returns {} on empty content.
     """
-    with open(path, "r") as f:
-        content = f.read()
+    if not use_snapshot:
+        with open(path, "r") as f:
+            return _parse_yaml_content(f.read())
 
-    if yaml is not None:
-        return yaml.safe_load(content) or {}
-
-    return _parse_yaml_fallback(content)
+    path = Path(path).resolve()
+    with open(path, "r") as f:
+        key = _snapshot_key(path, os.fstat(f.fileno()))
+        snapshot = _snapshot_path(path)
+        data = _load_snapshot(snapshot, key)
+        if data is not None:
+            return data
+        data = _parse_yaml_content(f.read())
+
+    _save_snapshot(snapshot, key, data)
+    return data
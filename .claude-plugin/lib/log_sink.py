@@ -0,0 +1,194 @@
+"""Append-only log sinks shared by hooks and the server.
+
+Callers used to open, append to and close their log file for every message.
+A LogSink keeps one line-buffered handle per file for the life of the
+process, rotates the file by size, and can hand writes to a background
+thread so the caller never waits on disk I/O. Records may be plain text lines
+or dicts written as JSON lines.
+
+Sinks are shared per path through get_sink() and flushed at interpreter exit.
+Write errors are swallowed: logging must never break a hook or a poll cycle.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+from typing import Any, Optional, Union
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+# Writer-thread batch cap: one write() call per batch
+_MAX_BATCH = 512
+
+_STOP = object()
+
+_sinks: dict[str, 'LogSink'] = {}
+_sinks_lock = threading.Lock()
+
+
+class LogSink:
+    """Line-oriented append log with size-based rotation.
+
+    Args:
+        path: Log file path; parent directories are created on first write
+        max_bytes: Rotate before the file would exceed this size (0 disables rotation)
+        backup_count: Rotated files kept as `path.1` (newest) ... `path.N`
+        threaded: Queue records for a daemon writer thread instead of writing inline
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], max_bytes: int = DEFAULT_MAX_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT, threaded: bool = False):
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._thread: Optional[threading.Thread] = None
+        if threaded:
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._drain, name='log-sink', daemon=True)
+            self._thread.start()
+
+    def write(self, line: str) -> None:
+        """Append one text line (without trailing newline)."""
+        self._submit(line)
+
+    def write_record(self, record: dict[str, Any]) -> None:
+        """Append one record as a JSON line.
+
+        In threaded mode the record is serialized on the writer thread, so it
+        must not be mutated after this call.
+        """
+        self._submit(record)
+
+    def flush(self) -> None:
+        """Block until every record submitted so far is written."""
+        if self._queue is not None and self._thread.is_alive():
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait()
+            return
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.flush()
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        """Flush pending records, stop the writer thread and close the file."""
+        if self._queue is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+    def _submit(self, item: Union[str, dict]) -> None:
+        if self._queue is not None:
+            self._queue.put(item)
+            return
+        with self._lock:
+            self._write_lines([_format(item)])
+
+    def _drain(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            try:
+                while len(items) < _MAX_BATCH:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            lines = []
+            for item in items:
+                if isinstance(item, (str, dict)):
+                    lines.append(_format(item))
+                    continue
+                # Flush marker or stop: write what precedes it first
+                with self._lock:
+                    self._write_lines(lines)
+                lines = []
+                if item is _STOP:
+                    return
+                item.set()
+            with self._lock:
+                self._write_lines(lines)
+
+    def _write_lines(self, lines: list[str]) -> None:
+        if not lines:
+            return
+        data = ''.join(line + '\n' for line in lines)
+        try:
+            if self._file is None:
+                self._open()
+            if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._size += len(data)
+        except OSError:
+            pass
+
+    def _open(self) -> None:
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+        self._size = os.fstat(self._file.fileno()).st_size
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f'{self.path}.{index}'
+                if os.path.exists(source):
+                    os.replace(source, f'{self.path}.{index + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._open()
+
+
+def _format(item: Union[str, dict]) -> str:
+    if isinstance(item, dict):
+        return json.dumps(item, ensure_ascii=False, default=str)
+    return item
+
+
+def get_sink(path: Union[str, os.PathLike], **kwargs: Any) -> LogSink:
+    """Return the process-wide sink for path, creating it on first use.
+
+    Keyword arguments are passed to LogSink() and only apply on creation.
+    """
+    key = os.path.abspath(os.fspath(path))
+    sink = _sinks.get(key)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(key)
+            if sink is None:
+                sink = _sinks[key] = LogSink(key, **kwargs)
+    return sink
+
+
+def close_sinks() -> None:
+    """Flush and close every shared sink. Registered to run at exit."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        sink.close()
+
+
+atexit.register(close_sinks)
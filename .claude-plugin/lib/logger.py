@@ -1,8 +1,11 @@
 import os
-import datetime
+from typing import Optional
 
 from lib.session_utils import session_dir, get_agentize_home
 
+# handsoff.debug, resolved once per process (see clear_debug_cache())
+_debug_enabled: Optional[bool] = None
+
 
 def _tmp_dir():
     """Get tmp directory path using get_agentize_home()."""
@@ -13,29 +16,38 @@ def _tmp_dir():
 def _is_debug_enabled() -> bool:
     """Check if debug logging is enabled via YAML config.
 
-    Returns True if handsoff.debug is set to true in YAML.
+    Returns True if handsoff.debug is set to true in YAML. The result is
+    cached for the process; long-lived processes call clear_debug_cache()
+    when the config file changes.
     """
-    from lib.local_config import get_local_value, coerce_bool
-    return get_local_value('handsoff.debug', False, coerce_bool)
+    global _debug_enabled
+    if _debug_enabled is None:
+        from lib.local_config import get_local_value, coerce_bool
+        _debug_enabled = get_local_value('handsoff.debug', False, coerce_bool)
+    return _debug_enabled
+
+
+def clear_debug_cache() -> None:
+    """Drop the cached handsoff.debug flag so the next log call re-reads it."""
+    global _debug_enabled
+    _debug_enabled = None
 
 
 def logger(sid, msg):
     if not _is_debug_enabled():
         return
-    tmp_dir = _tmp_dir()
-    os.makedirs(tmp_dir, exist_ok=True)
-    log_path = os.path.join(tmp_dir, 'hook-debug.log')
-    with open(log_path, 'a') as log_file:
-        time = datetime.datetime.now().isoformat()
-        log_file.write(f"[{time}] [{sid}] {msg}\n")
+    import datetime
+    from lib.log_sink import get_sink
+    time = datetime.datetime.now().isoformat()
+    get_sink(os.path.join(_tmp_dir(), 'hook-debug.log')).write(f"[{time}] [{sid}] {msg}")
 
 
 def log_tool_decision(session, context, tool, target, decision, workflow='unknown', source='error'):
     # Log permission decisions to unified permission.txt file
     if not _is_debug_enabled():
         return
-    sess_dir = session_dir(makedirs=True)
+    import datetime
+    from lib.log_sink import get_sink
     time = datetime.datetime.now().isoformat()
-    log_path = os.path.join(sess_dir, 'permission.txt')
-    with open(log_path, 'a') as f:
-        f.write(f'[{time}] [{session}] [{workflow}] [{source}] [{decision}] {tool} | {target}\n')
+    log_path = os.path.join(session_dir(), 'permission.txt')
+    get_sink(log_path).write(f'[{time}] [{session}] [{workflow}] [{source}] [{decision}] {tool} | {target}')
@@ -8,10 +8,6 @@ import os
 import json
 import re
 import time
-import datetime
-import subprocess
-import urllib.request
-import urllib.error
 from typing import Optional, Dict, Any, Tuple, List
 
 from .rules import match_rule
@@ -28,6 +24,10 @@ from lib.telegram_utils import escape_html as _shared_escape_html, telegram_requ
 from lib.session_utils import session_dir
 from lib.logger import log_tool_decision, logger
 
+# The Haiku path (subprocess, verdict_cache, lib.transcript) and the Telegram
+# broker are imported inside the functions that use them: most calls are
+# decided by rules, and every hook invocation pays for module-level imports.
+
 # Constants
 TELEGRAM_API_TIMEOUT_SEC = 10
 HAIKU_SUBPROCESS_TIMEOUT_SEC = 30
@@ -42,6 +42,9 @@ _hook_input: Dict[str, Any] = {}
 def _ask_haiku_first(tool: str, target: str, workflow: str = 'unknown', session_id: str = 'unknown') -> str:
     """Ask Haiku LLM for permission decision.
 
+    Verdicts are cached by command shape (see verdict_cache), so a repeated
+    shape is answered without spawning `claude`.
+
     Args:
         tool: Tool name
         target: Raw target string for context
@@ -52,21 +55,24 @@ def _ask_haiku_first(tool: str, target: str, workflow: str = 'unknown', session_
         'allow', 'deny', or 'ask'
     """
     global _hook_input
+    import subprocess
+    from . import verdict_cache
+    from lib.transcript import tail_lines
 
-    # Import local_config for YAML-only configuration
-    from lib.local_config import get_local_value, coerce_bool
-    auto_permission = get_local_value('handsoff.auto_permission', True, coerce_bool)
-
-    if not auto_permission:
+    if not _is_auto_permission_enabled():
         log_tool_decision(session_id, '', tool, target, 'SKIP', workflow, 'haiku')
         return 'ask'
 
+    cached = verdict_cache.lookup(tool, target, session_id)
+    if cached:
+        log_tool_decision(session_id, '', tool, target, cached, workflow, 'haiku-cache')
+        return cached
+
     transcript_path = _hook_input.get("transcript_path", "")
 
     # Read last line from JSONL transcript
     try:
-        with open(transcript_path, 'r') as f:
-            transcript = f.readlines()[-1]
+        transcript = tail_lines(transcript_path, 1, session_id)[-1]
     except Exception as e:
         log_tool_decision(session_id, '', tool, target, f'ERROR:{str(e)}', workflow, 'error')
         return 'ask'
@@ -104,12 +110,15 @@ Reply with allow, deny, or ask as the first word. Brief reasoning is optional.''
         # Check first word using startswith (handles "allow.", "allow because...", etc.)
         if full_response.startswith('allow') or full_response.startswith('**allow**'):
             log_tool_decision(session_id, transcript, tool, target, 'allow', workflow, 'haiku')
+            verdict_cache.store(tool, target, 'allow')
             return 'allow'
         elif full_response.startswith('deny'):
             log_tool_decision(session_id, transcript, tool, target, 'deny', workflow, 'haiku')
+            verdict_cache.store(tool, target, 'deny')
             return 'deny'
         elif full_response.startswith('ask'):
             log_tool_decision(session_id, transcript, tool, target, 'ask', workflow, 'haiku')
+            verdict_cache.store(tool, target, 'ask')
             return 'ask'
         else:
             log_tool_decision(session_id, transcript, tool, target, f'ERROR:invalid_output:{full_response[:50]}', workflow, 'haiku')
@@ -125,6 +134,16 @@ Reply with allow, deny, or ask as the first word. Brief reasoning is optional.''
         return 'ask'
 
 
+def _is_auto_permission_enabled() -> bool:
+    """Check if Haiku auto-permission is enabled.
+
+    Reads from YAML config only.
+    Precedence: handsoff.auto_permission YAML > True (default)
+    """
+    from lib.local_config import get_local_value, coerce_bool
+    return get_local_value('handsoff.auto_permission', True, coerce_bool)
+
+
 def _is_telegram_enabled() -> bool:
     """Check if Telegram approval is enabled and configured.
 
@@ -338,6 +357,18 @@ def _telegram_approval_decision(tool: str, target: str, session_id: str, raw_tar
     poll_interval: int = config['poll_interval']
     allowed_user_ids: List[int] = config['allowed_user_ids']
 
+    # A running broker owns getUpdates for all sessions; poll here only without one
+    from lib import telegram_broker
+    brokered = telegram_broker.request_approval(tool, raw_target, session_id, timeout)
+    if brokered is not None:
+        decision = brokered.get('decision')
+        if decision in ('allow', 'deny'):
+            log_tool_decision(session_id, '', tool, raw_target, decision, workflow, 'telegram')
+            return decision
+        error = 'send_failed' if decision == 'error' else 'timeout'
+        log_tool_decision(session_id, '', tool, raw_target, f'ERROR:{error}', workflow, 'telegram')
+        return None
+
     # Get current update_id offset to ignore old messages
     updates_resp = _tg_api_request(token, 'getUpdates', {'limit': 1, 'offset': -1}, session_id, workflow)
     if updates_resp and updates_resp.get('ok') and updates_resp.get('result'):
@@ -452,11 +483,14 @@ def _telegram_approval_decision(tool: str, target: str, session_id: str, raw_tar
     return None
 
 
-def _check_permission(tool: str, target: str, raw_target: str, workflow: str = 'unknown') -> Tuple[str, str]:
+def _check_permission(tool: str, target: str, raw_target: str, workflow: str = 'unknown',
+                      fast_only: bool = False) -> Optional[Tuple[str, str]]:
     """Check permission for tool usage.
 
     Returns: (decision, source) where decision is 'allow'/'deny'/'ask'
-    and source is 'rules', 'haiku', 'telegram', 'workflow', or 'error'
+    and source is 'rules', 'haiku', 'telegram', 'workflow', or 'error'.
+    With fast_only=True, returns None instead of entering the Haiku or
+    Telegram stages when either of them is enabled.
 
     Priority:
     1. Global rules (deny/allow return, ask falls through)
@@ -481,6 +515,11 @@ def _check_permission(tool: str, target: str, raw_target: str, workflow: str = '
         if workflow_decision in ('deny', 'allow'):
             return (workflow_decision, 'workflow')
 
+        # Haiku and Telegram can block for tens of seconds; fast-only callers
+        # (the permission daemon) defer those requests to the hook process
+        if fast_only and (_is_auto_permission_enabled() or _is_telegram_enabled()):
+            return None
+
         # Stage 3: Haiku LLM evaluation (use raw_target for context)
         haiku_decision = _ask_haiku_first(tool, raw_target, workflow, session_id)
         if haiku_decision in ('deny', 'allow'):
@@ -507,6 +546,8 @@ def _log_debug_info(session: str, workflow: str, tool: str, raw_target: str,
 
 def _detect_workflow(session: str) -> str:
     """Detect workflow state from session state file."""
+    # Read the session store's JSON export directly: importing sqlite3 would
+    # add to every PreToolUse call, and the export is always current
     state_file = os.path.join(session_dir(), f'{session}.json')
     if not os.path.exists(state_file):
         return 'unknown'
@@ -608,16 +649,20 @@ def _check_workflow_auto_allow(session: str, tool: str, target: str) -> Optional
     return None
 
 
-def determine(stdin_data: str, caller: str) -> dict:
+def determine(stdin_data: str, caller: str, fast_only: bool = False) -> Optional[dict]:
     """Determine permission for a tool use request.
 
     This is the main entry point for the permission module.
 
     Args:
         stdin_data: Raw JSON string from Claude Code PreToolUse hook
+        caller: Hook event name ('PreToolUse' or 'PermissionRequest')
+        fast_only: Only evaluate rules and workflow auto-allow; return None
+            when the request would need Haiku or Telegram
 
     Returns:
-        dict with hookSpecificOutput containing permissionDecision
+        dict with hookSpecificOutput containing permissionDecision, or None
+        when fast_only is set and no fast stage decided
     """
     global _hook_input
 
@@ -644,7 +689,10 @@ def determine(stdin_data: str, caller: str) -> dict:
     workflow = _detect_workflow(session)
 
     # Check permission
-    permission_decision, decision_source = _check_permission(tool, target, raw_target, workflow)
+    permission_result = _check_permission(tool, target, raw_target, workflow, fast_only)
+    if permission_result is None:
+        return None
+    permission_decision, decision_source = permission_result
 
     # Debug logging
     _log_debug_info(session, workflow, tool, raw_target, permission_decision, decision_source)
@@ -13,7 +13,6 @@ Hardcoded deny rules always take precedence over YAML allows.
 
 import os
 import re
-import subprocess
 from pathlib import Path
 from typing import Any, Optional
 
@@ -165,6 +164,7 @@ def verify_force_push_to_own_branch(command: str) -> Optional[str]:
 
     target_branch = match.group(3)
 
+    import subprocess
     try:
         current_branch = subprocess.check_output(
             ['git', 'branch', '--show-current'],
@@ -342,13 +342,217 @@ def _get_merged_rules(start_dir: Optional[Path] = None) -> dict[str, list[tuple[
 
 
 def clear_yaml_cache() -> None:
-    """Clear the YAML rules cache.
+    """Clear the YAML rules cache and the compiled rule set.
 
     Used for testing to ensure fresh config loading.
     """
-    global _yaml_rules_cache, _yaml_mtimes
+    global _yaml_rules_cache, _yaml_mtimes, _compiled_rules_cache, _compiled_rules_source
     _yaml_rules_cache = None
     _yaml_mtimes.clear()
+    _compiled_rules_cache = None
+    _compiled_rules_source = None
+
+
+# Priority tiers for compiled buckets, evaluated in order (first match wins).
+# Each tier is (decision, rule origin) where origin 'hardcoded' reads
+# PERMISSION_RULES and 'yaml' reads the merged project/local rules.
+_RULE_TIERS = (
+    ('deny', 'hardcoded'),
+    ('deny', 'yaml'),
+    ('ask', 'hardcoded'),
+    ('allow', 'hardcoded'),
+    ('allow', 'yaml'),
+)
+
+# Numbered or named backreferences cannot be wrapped in a combined alternation
+# without changing group numbering, so such patterns are compiled standalone.
+_BACKREF_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+# Module-level cache for the compiled rule set, keyed by the identity of the
+# merged YAML rules dict so it is rebuilt whenever _get_merged_rules() reloads.
+_compiled_rules_cache: Optional[dict[str, list[tuple]]] = None
+_compiled_rules_source: Optional[dict] = None
+
+
+def _is_start_anchored(pattern: str) -> bool:
+    """Check whether a pattern can only match at position 0.
+
+    True when the pattern starts with '^' and has no top-level '|'. Such
+    patterns are combined into a bucket evaluated with re.match(), which avoids
+    scanning every position of the target with the whole alternation.
+    """
+    if not pattern.startswith('^'):
+        return False
+
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 1
+        elif char == '[':
+            # Skip the character class; a leading ']' (or '^]') is literal
+            index += 1
+            if index < len(pattern) and pattern[index] == '^':
+                index += 1
+            if index < len(pattern) and pattern[index] == ']':
+                index += 1
+            while index < len(pattern) and pattern[index] != ']':
+                if pattern[index] == '\\':
+                    index += 1
+                index += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return False
+        index += 1
+    return True
+
+
+def _combine_patterns(patterns: list[str], anchored: bool) -> list[tuple]:
+    """Compile patterns into one alternation regex with a named group per rule.
+
+    Falls back to one regex per pattern when the combined form fails to
+    compile (e.g. duplicate named groups or inline global flags).
+
+    Returns:
+        List of (find, group_name -> pattern) tuples, where find is the bound
+        match() or search() method of the compiled regex
+    """
+    if len(patterns) > 1:
+        names = {f'r{i}': pattern for i, pattern in enumerate(patterns)}
+        combined = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in names.items())
+        try:
+            regex = re.compile(combined)
+            return [(regex.match if anchored else regex.search, names)]
+        except re.error:
+            pass
+
+    matchers = []
+    for pattern in patterns:
+        regex = re.compile(pattern)
+        matchers.append((regex.match if anchored else regex.search, {'': pattern}))
+    return matchers
+
+
+def _compile_bucket(patterns: list[str]) -> list[tuple]:
+    """Compile a bucket of patterns sharing one (tool, decision, source).
+
+    Start-anchored patterns and the remaining patterns each become a single
+    alternation regex, so one or two regex calls replace a loop of re.search()
+    calls. Patterns using backreferences are compiled standalone. Invalid
+    patterns are skipped, matching the linear matcher behavior.
+
+    Args:
+        patterns: Regex pattern strings in rule order
+
+    Returns:
+        List of (find, group_name -> pattern) tuples
+    """
+    anchored: list[str] = []
+    unanchored: list[str] = []
+    standalone: list[str] = []
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except (re.error, TypeError):
+            continue
+        if _BACKREF_RE.search(pattern):
+            standalone.append(pattern)
+        elif _is_start_anchored(pattern):
+            anchored.append(pattern)
+        else:
+            unanchored.append(pattern)
+
+    matchers = _combine_patterns(anchored, anchored=True) + _combine_patterns(unanchored, anchored=False)
+    for pattern in standalone:
+        matchers.append((re.compile(pattern).search, {'': pattern}))
+    return matchers
+
+
+def _build_compiled_rules(yaml_rules: dict[str, list[tuple[str, str, str]]]) -> dict[str, list[tuple]]:
+    """Bucket hardcoded and YAML rules by tool and precompile their patterns.
+
+    Within each tier, consecutive rules with the same source share a bucket so
+    the reported source ('rules:project' before 'rules:local') keeps the
+    first-match order of the linear matcher.
+
+    Args:
+        yaml_rules: Merged YAML rules from _get_merged_rules()
+
+    Returns:
+        Dict of tool -> ordered list of (decision, source, matchers) buckets
+    """
+    compiled: dict[str, list[tuple]] = {}
+
+    for decision, origin in _RULE_TIERS:
+        if origin == 'hardcoded':
+            entries = [(tool, pattern, 'hardcoded') for tool, pattern in PERMISSION_RULES.get(decision, [])]
+        else:
+            entries = yaml_rules.get(decision, [])
+
+        # Group per tool, preserving order and splitting on source changes
+        per_tool: dict[str, list[tuple[str, list[str]]]] = {}
+        for tool, pattern, source in entries:
+            runs = per_tool.setdefault(tool, [])
+            if not runs or runs[-1][0] != source:
+                runs.append((source, []))
+            runs[-1][1].append(pattern)
+
+        for tool, runs in per_tool.items():
+            for source, patterns in runs:
+                matchers = _compile_bucket(patterns)
+                if matchers:
+                    compiled.setdefault(tool, []).append((decision, f'rules:{source}', matchers))
+
+    return compiled
+
+
+def _get_compiled_rules() -> dict[str, list[tuple]]:
+    """Get the compiled rule set, rebuilding it when the YAML config changes.
+
+    Relies on _get_merged_rules() for mtime-based invalidation: a reload
+    returns a new dict, which triggers recompilation here.
+
+    Returns:
+        Dict of tool -> ordered list of (decision, source, matchers) buckets
+    """
+    global _compiled_rules_cache, _compiled_rules_source
+
+    yaml_rules = _get_merged_rules()
+    if _compiled_rules_cache is None or yaml_rules is not _compiled_rules_source:
+        _compiled_rules_cache = _build_compiled_rules(yaml_rules)
+        _compiled_rules_source = yaml_rules
+    return _compiled_rules_cache
+
+
+def match_rule_detail(tool: str, target: str) -> Optional[tuple[str, str, str]]:
+    """Match tool and target against the compiled rule set.
+
+    Same priority semantics as match_rule(), but also reports the pattern
+    that matched (recovered from the named group of the combined regex).
+
+    Args:
+        tool: Tool name (e.g., 'Bash', 'Read')
+        target: Normalized target string
+
+    Returns:
+        (decision, source, pattern) if matched, None if no match.
+    """
+    for decision, source, matchers in _get_compiled_rules().get(tool, ()):
+        for find, names in matchers:
+            match = find(target)
+            if match is None:
+                continue
+            if len(names) == 1:
+                return (decision, source, next(iter(names.values())))
+            name = match.lastgroup
+            if name not in names:
+                name = next(n for n in names if match.group(n) is not None)
+            return (decision, source, names[name])
+    return None
 
 
 def match_rule(tool: str, target: str) -> Optional[tuple]:
@@ -371,53 +575,9 @@ def match_rule(tool: str, target: str) -> Optional[tuple]:
         if force_push_result is not None:
             return (force_push_result, 'force-push-verify')
 
-    # Load YAML rules
-    yaml_rules = _get_merged_rules()
-
-    # Check rules in priority order: deny -> ask -> allow
-    # 1. Hardcoded deny rules (always win)
-    for rule_tool, pattern in PERMISSION_RULES.get('deny', []):
-        if rule_tool == tool:
-            try:
-                if re.search(pattern, target):
-                    return ('deny', 'rules:hardcoded')
-            except re.error:
-                continue
-
-    # 2. YAML deny rules
-    for rule_tool, pattern, source in yaml_rules.get('deny', []):
-        if rule_tool == tool:
-            try:
-                if re.search(pattern, target):
-                    return ('deny', f'rules:{source}')
-            except re.error:
-                continue
-
-    # 3. Hardcoded ask rules
-    for rule_tool, pattern in PERMISSION_RULES.get('ask', []):
-        if rule_tool == tool:
-            try:
-                if re.search(pattern, target):
-                    return ('ask', 'rules:hardcoded')
-            except re.error:
-                continue
-
-    # 4. Hardcoded allow rules
-    for rule_tool, pattern in PERMISSION_RULES.get('allow', []):
-        if rule_tool == tool:
-            try:
-                if re.search(pattern, target):
-                    return ('allow', 'rules:hardcoded')
-            except re.error:
-                continue
-
-    # 5. YAML allow rules
-    for rule_tool, pattern, source in yaml_rules.get('allow', []):
-        if rule_tool == tool:
-            try:
-                if re.search(pattern, target):
-                    return ('allow', f'rules:{source}')
-            except re.error:
-                continue
-
-    return None
+    # Check compiled rules in priority order: deny -> ask -> allow
+    result = match_rule_detail(tool, target)
+    if result is None:
+        return None
+    decision, source, _ = result
+    return (decision, source)
@@ -30,3 +30,47 @@ def normalize_bash_command(command: str) -> str:
     command = strip_env_vars(command)
     command = strip_shell_prefixes(command)
     return command
+
+
+# Quoted literals: double quotes with escapes, or single quotes (no escapes in sh)
+_QUOTED_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\'[^\']*\'')
+# Standalone numbers, including negative counts like `git log -20` and `HEAD~1`
+_NUMBER_RE = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])')
+# Bare file names such as README.md or test_x.py (an extension after a non-numeric stem)
+_FILENAME_RE = re.compile(r'^[\w.-]*[A-Za-z_][\w-]*\.[A-Za-z0-9]{1,5}$')
+
+
+def _template_token(token: str) -> str:
+    """Replace a path-like token (or an option's path value) with a placeholder."""
+    option, sep, value = token.partition('=')
+    if sep and option.startswith('-'):
+        return f'{option}={_template_token(value)}'
+    if token.startswith(('/', '~')) or token == '..' or '../' in token or token.endswith('/..'):
+        return '<abspath>'
+    if '/' in token or _FILENAME_RE.match(token):
+        return '<path>'
+    return token
+
+
+def command_template(command: str) -> str:
+    """Reduce a bash command to its shape for verdict caching.
+
+    The command is normalized with normalize_bash_command(), then quoted
+    literals become <str>, numbers become <n>, relative paths become <path>
+    and paths that leave the working tree (absolute, ~, ..) become <abspath>.
+
+    Example: `pytest tests/test_x.py -k "slow and db" -n 4`
+    → `pytest <path> -k <str> -n <n>`
+
+    The template alone is not a safe cache key: `python3 -c <str>` covers any
+    program and `python3 <path>` any script. verdict_cache.cache_key() adds a
+    hash of the quoted text for interpreters, and refuses scripts run by path
+    and shapes where quotes hide shell syntax.
+    """
+    command = normalize_bash_command(command.strip())
+    command = _QUOTED_RE.sub('<str>', command)
+    tokens = []
+    for token in command.split():
+        token = _NUMBER_RE.sub('<n>', token)
+        tokens.append(_template_token(token))
+    return ' '.join(tokens)
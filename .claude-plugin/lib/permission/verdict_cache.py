@@ -0,0 +1,251 @@
+"""Persistent cache for Haiku permission verdicts.
+
+Haiku is asked only when no rule matches, and each call is a `claude` subprocess
+plus an LLM round trip. Handsoff sessions repeat the same command shapes
+(`pytest <path> -k <str>`, `git log <n>`), so verdicts are cached per tool and
+command template (see strips.command_template()) in
+`$AGENTIZE_HOME/.tmp/haiku-verdicts.json`.
+
+Entries expire after a TTL and the file is bounded with LRU eviction. Shapes
+whose verdict depends on the exact arguments are never cached: compound shell
+commands, paths outside the working tree, commands sharing a head with a deny
+rule, a fixed list of risky command heads, scripts run by path and
+interpreters or runners given a script path: the template would reduce every
+script to one `<path>`. Quoted arguments to an interpreter may be a program, so
+their content is hashed into the key and only the exact same program shares a
+verdict.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .rules import PERMISSION_RULES, _get_merged_rules
+from .strips import _QUOTED_RE, command_template, normalize_bash_command
+from ..session_utils import get_agentize_home
+from ..logger import logger
+
+CACHE_FILENAME = 'haiku-verdicts.json'
+DEFAULT_TTL_SEC = 3600
+DEFAULT_MAX_ENTRIES = 500
+CACHEABLE_VERDICTS = ('allow', 'deny', 'ask')
+
+# Command heads whose safety depends on the exact arguments
+_NEVER_CACHE_HEADS = frozenset({
+    'rm', 'rmdir', 'mv', 'cp', 'dd', 'ln', 'chmod', 'chown', 'truncate', 'shred',
+    'sudo', 'su', 'doas', 'kill', 'pkill', 'killall',
+    'curl', 'wget', 'ssh', 'scp', 'rsync', 'nc',
+    'eval', 'exec', 'source', '.', 'env', 'xargs', 'bash', 'sh', 'zsh',
+    'find', 'sed', 'awk', 'gawk', 'mawk',
+    'docker', 'kubectl', 'terraform',
+})
+# Git/gh subcommands that rewrite history or remote state
+_NEVER_CACHE_SUBCOMMANDS = frozenset({
+    ('git', 'push'), ('git', 'reset'), ('git', 'restore'), ('git', 'clean'),
+    ('git', 'checkout'), ('git', 'branch'), ('git', 'rebase'), ('git', 'stash'),
+    ('gh', 'api'), ('gh', 'repo'), ('gh', 'release'), ('gh', 'secret'),
+})
+# Interpreters and runners: a script path or quoted argument is the program
+# (python a.py, node -e '...', npx tool, uv run a.py)
+_RUNNER_HEAD_RE = re.compile(
+    r'^(?:python[\d.]*|node|deno|perl|ruby|php|lua|Rscript|bun|bunx|npx|uvx|tsx|ts-node)$'
+)
+_RUNNER_SUBCOMMANDS = frozenset({
+    ('uv', 'run'), ('poetry', 'run'), ('pipx', 'run'), ('pdm', 'run'), ('hatch', 'run'),
+    ('conda', 'run'), ('npm', 'exec'), ('pnpm', 'exec'), ('pnpm', 'dlx'), ('yarn', 'dlx'),
+})
+# Pipes, lists, redirections and substitutions make the shape open-ended.
+# Checked on the command with its quotes intact: "$(...)" still runs.
+_SHELL_META_RE = re.compile(r'[|;&<>`]|\$\(')
+# Literal command head of a deny pattern, e.g. '^git reset' -> 'git reset'
+_PATTERN_HEAD_RE = re.compile(r'^\^?([\w./-]+(?: [\w./-]+)?)')
+
+
+def _cache_path() -> str:
+    """Get the verdict cache file path."""
+    return os.path.join(get_agentize_home(), '.tmp', CACHE_FILENAME)
+
+
+def _get_cache_settings() -> tuple[bool, int, int]:
+    """Get (enabled, ttl_sec, max_entries) from handsoff.haiku_cache YAML."""
+    from lib.local_config import get_local_value, coerce_bool, coerce_int
+    enabled = get_local_value('handsoff.haiku_cache.enabled', True, coerce_bool)
+    ttl = get_local_value('handsoff.haiku_cache.ttl_sec', DEFAULT_TTL_SEC, coerce_int)
+    max_entries = get_local_value('handsoff.haiku_cache.max_entries', DEFAULT_MAX_ENTRIES, coerce_int)
+    return enabled, ttl, max_entries
+
+
+def _deny_heads() -> set[tuple[str, ...]]:
+    """Collect literal command heads of hardcoded and YAML Bash deny rules."""
+    patterns = [p for tool, p in PERMISSION_RULES.get('deny', []) if tool == 'Bash']
+    patterns += [p for tool, p, _ in _get_merged_rules().get('deny', []) if tool == 'Bash']
+    heads = set()
+    for pattern in patterns:
+        match = _PATTERN_HEAD_RE.match(pattern)
+        if match:
+            heads.add(tuple(match.group(1).split()))
+    return heads
+
+
+def cache_key(tool: str, target: str) -> Optional[str]:
+    """Build the cache key for a tool call.
+
+    Args:
+        tool: Tool name
+        target: Raw target string
+
+    Returns:
+        '<tool>\\t<template>', or None if the call must never be cached
+    """
+    if tool != 'Bash':
+        return None
+
+    command = normalize_bash_command(target.strip())
+    template = command_template(target)
+    words = template.split()
+    if not words or '<abspath>' in template or _SHELL_META_RE.search(command):
+        return None
+    # `./run_tests.sh` and `bin/tool` would share the key `<path>`
+    if words[0].startswith('<'):
+        return None
+    if words[0] in _NEVER_CACHE_HEADS or tuple(words[:2]) in _NEVER_CACHE_SUBCOMMANDS:
+        return None
+    for head in _deny_heads():
+        if tuple(words[:len(head)]) == head:
+            return None
+
+    runner = bool(_RUNNER_HEAD_RE.match(words[0])) or tuple(words[:2]) in _RUNNER_SUBCOMMANDS
+    if runner and '<path>' in template:
+        return None
+    if runner and '<str>' in template:
+        literals = '\0'.join(_QUOTED_RE.findall(command))
+        return f'{tool}\t{template}\t#{hashlib.sha256(literals.encode()).hexdigest()[:16]}'
+    return f'{tool}\t{template}'
+
+
+@contextmanager
+def _locked() -> Iterator[None]:
+    """Serialize read-modify-write of the cache file across concurrent hooks."""
+    path = _cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _load() -> dict:
+    try:
+        with open(_cache_path(), 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict) or not isinstance(data.get('entries'), dict):
+        data = {'entries': {}, 'hits': 0, 'misses': 0}
+    return data
+
+
+def _save(data: dict) -> None:
+    # Write-then-rename so concurrent hooks never read a torn file
+    path = _cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _hit_rate(data: dict) -> str:
+    hits, misses = data.get('hits', 0), data.get('misses', 0)
+    total = hits + misses
+    percent = 100.0 * hits / total if total else 0.0
+    return f'{hits}/{total} ({percent:.0f}%)'
+
+
+def lookup(tool: str, target: str, session_id: str = 'unknown') -> Optional[str]:
+    """Return a cached Haiku verdict for this command shape, if fresh.
+
+    Args:
+        tool: Tool name
+        target: Raw target string
+        session_id: Session ID for logging
+
+    Returns:
+        'allow', 'deny', 'ask', or None on miss/disabled/uncacheable
+    """
+    enabled, ttl, _ = _get_cache_settings()
+    key = cache_key(tool, target) if enabled else None
+    if key is None:
+        return None
+
+    with _locked():
+        data = _load()
+        now = time.time()
+        entry = data['entries'].get(key)
+        if entry and now - entry.get('stored', 0) <= ttl and entry.get('verdict') in CACHEABLE_VERDICTS:
+            entry['used'] = now
+            data['hits'] = data.get('hits', 0) + 1
+            _save(data)
+            verdict = entry['verdict']
+        else:
+            if entry:
+                del data['entries'][key]
+            data['misses'] = data.get('misses', 0) + 1
+            _save(data)
+            verdict = None
+
+    if verdict is not None:
+        logger(session_id, f'Haiku verdict cache hit: {key!r} -> {verdict}, hit rate {_hit_rate(data)}')
+    else:
+        logger(session_id, f'Haiku verdict cache miss: {key!r}, hit rate {_hit_rate(data)}')
+    return verdict
+
+
+def store(tool: str, target: str, verdict: str) -> None:
+    """Cache a Haiku verdict for this command shape.
+
+    Expired entries are dropped, then least recently used entries are evicted
+    until the cache fits handsoff.haiku_cache.max_entries.
+    """
+    if verdict not in CACHEABLE_VERDICTS:
+        return
+    enabled, ttl, max_entries = _get_cache_settings()
+    key = cache_key(tool, target) if enabled else None
+    if key is None:
+        return
+
+    with _locked():
+        data = _load()
+        now = time.time()
+        entries = {
+            k: e for k, e in data['entries'].items()
+            if now - e.get('stored', 0) <= ttl
+        }
+        entries[key] = {'verdict': verdict, 'stored': now, 'used': now}
+        if len(entries) > max_entries:
+            by_use = sorted(entries, key=lambda k: entries[k].get('used', 0))
+            for stale_key in by_use[:len(entries) - max_entries]:
+                del entries[stale_key]
+        data['entries'] = entries
+        _save(data)
+
+
+def clear() -> None:
+    """Delete the verdict cache file."""
+    try:
+        os.unlink(_cache_path())
+    except OSError:
+        pass
@@ -0,0 +1,330 @@
+"""Optional long-running permission decision daemon.
+
+Every hook invocation otherwise pays for a fresh interpreter, the lib imports,
+YAML config parsing and rule compilation before it can answer a single
+permission request. The daemon keeps all of that warm in one process and
+answers requests over a Unix socket; hooks call request_decision() and fall
+back to in-process determine() whenever it returns None (daemon not running,
+stale, slow, or the request needs a slow stage).
+
+Only the fast stages (rules and workflow auto-allow) are answered by the
+daemon. Requests that would reach Haiku or Telegram are deferred to the hook
+process so one long approval wait never blocks other sessions.
+
+Usage:
+    python3 .claude-plugin/lib/permission_daemon.py [serve|stop|status] [--socket PATH]
+
+The client half of this module only imports the standard library (plus
+lib.session_utils for path resolution) so the hook fast path stays cheap.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Optional
+
+SOCKET_NAME = 'permission-daemon.sock'
+CLIENT_TIMEOUT_SEC = 2.0
+MAX_REQUEST_BYTES = 4 * 1024 * 1024
+# AF_UNIX paths are limited to ~108 bytes; longer paths move to the temp dir
+_MAX_SOCKET_PATH_LEN = 100
+# Environment variables the hook forwards so the daemon evaluates as the hook would
+_FORWARDED_ENV = ('HANDSOFF_MODE',)
+
+
+def socket_path(name: str = SOCKET_NAME) -> str:
+    """Get the daemon socket path for the current AGENTIZE_HOME.
+
+    Args:
+        name: Socket file name (other lib daemons pass their own)
+
+    Returns:
+        `$AGENTIZE_HOME/.tmp/<name>`, or a hashed name under the system temp
+        directory when that path is too long for AF_UNIX.
+    """
+    from lib.session_utils import get_agentize_home
+
+    path = os.path.join(get_agentize_home(), '.tmp', name)
+    if len(path) > _MAX_SOCKET_PATH_LEN:
+        import hashlib
+        import tempfile
+        digest = hashlib.sha1(path.encode()).hexdigest()[:12]
+        path = os.path.join(tempfile.gettempdir(), f'agentize-{digest}.sock')
+    return path
+
+
+def _send(request: dict, path: str, timeout: float) -> Optional[dict]:
+    """Send one JSON request to the daemon and read its JSON response.
+
+    Returns:
+        Parsed response dict, or None on any connection or protocol error.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        response = json.loads(b''.join(chunks))
+    except (OSError, ValueError):
+        return None
+    return response if isinstance(response, dict) else None
+
+
+def request_decision(
+    stdin_data: str,
+    caller: str,
+    path: Optional[str] = None,
+    timeout: float = CLIENT_TIMEOUT_SEC
+) -> Optional[dict]:
+    """Ask the daemon for a permission decision.
+
+    Args:
+        stdin_data: Raw JSON hook input
+        caller: Hook event name ('PreToolUse' or 'PermissionRequest')
+        path: Socket path (default: socket_path())
+        timeout: Connect/read timeout in seconds
+
+    Returns:
+        The hook output dict as determine() would return it, or None when the
+        caller must evaluate in-process.
+    """
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+
+    response = _send({
+        'op': 'determine',
+        'caller': caller,
+        'stdin': stdin_data,
+        'cwd': os.getcwd(),
+        'env': {name: os.environ[name] for name in _FORWARDED_ENV if name in os.environ},
+    }, path, timeout)
+    if response is None:
+        return None
+
+    result = response.get('result')
+    return result if isinstance(result, dict) else None
+
+
+def ping(path: Optional[str] = None, timeout: float = CLIENT_TIMEOUT_SEC) -> Optional[dict]:
+    """Check whether a daemon is serving on the socket.
+
+    Returns:
+        Status dict (pid, requests served) or None if no daemon answers.
+    """
+    return _send({'op': 'ping'}, path or socket_path(), timeout)
+
+
+def _code_fingerprint(lib_dir: str) -> tuple:
+    """Collect mtimes of the lib sources the daemon has loaded.
+
+    A changed fingerprint means the plugin was updated underneath the daemon.
+    """
+    stamps = []
+    for directory in (lib_dir, os.path.join(lib_dir, 'permission')):
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.endswith('.py'):
+                try:
+                    stamps.append((entry.path, entry.stat().st_mtime_ns))
+                except OSError:
+                    continue
+    return tuple(stamps)
+
+
+def _make_server(path: str, idle_timeout: float = 0):
+    """Create the daemon server bound to path.
+
+    Imported lazily so the client half never pays for socketserver or the
+    permission module.
+    """
+    import socketserver
+    import time
+
+    from lib.local_config import clear_cache, load_local_config
+    from lib.local_config_io import find_local_config_file
+    from lib.logger import clear_debug_cache, logger
+    from lib.permission.determine import determine
+    from lib.permission.rules import _get_compiled_rules
+
+    lib_dir = os.path.dirname(os.path.abspath(__file__))
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('request must be an object')
+            except ValueError:
+                response: dict[str, Any] = {'error': 'bad_request'}
+            else:
+                response = self.server.dispatch(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+    class PermissionDaemon(socketserver.UnixStreamServer):
+        # Wake up periodically to honour stop requests and the idle timeout
+        timeout = 1.0
+
+        def __init__(self):
+            super().__init__(path, _Handler)
+            os.chmod(path, 0o600)
+            self.stopping = False
+            self.served = 0
+            self._last_request = time.monotonic()
+            self._fingerprint = _code_fingerprint(lib_dir)
+            self._config_key: Optional[tuple] = None
+            self._refresh_config()
+            _get_compiled_rules()
+
+        def handle_timeout(self):
+            if idle_timeout and time.monotonic() - self._last_request > idle_timeout:
+                logger('SYSTEM', f'Permission daemon idle for {idle_timeout}s, exiting')
+                self.stopping = True
+
+        def serve(self):
+            while not self.stopping:
+                self.handle_request()
+
+        def _refresh_config(self):
+            # lib.local_config caches for the lifetime of the process, which is
+            # only correct for one-shot hooks; drop it when the file changes
+            config_path = find_local_config_file()
+            try:
+                mtime = config_path.stat().st_mtime_ns if config_path else None
+            except OSError:
+                mtime = None
+            key = (str(config_path), mtime)
+            if key != self._config_key:
+                clear_cache()
+                clear_debug_cache()
+                load_local_config()
+                self._config_key = key
+
+        def dispatch(self, request: dict) -> dict:
+            self._last_request = time.monotonic()
+            op = request.get('op')
+            if op == 'ping':
+                return {'ok': True, 'pid': os.getpid(), 'served': self.served}
+            if op == 'shutdown':
+                self.stopping = True
+                return {'ok': True}
+            if op != 'determine':
+                return {'error': f'unknown op: {op}'}
+
+            if _code_fingerprint(lib_dir) != self._fingerprint:
+                logger('SYSTEM', 'Permission daemon sources changed, exiting')
+                self.stopping = True
+                return {'defer': True}
+
+            try:
+                os.chdir(request.get('cwd') or lib_dir)
+            except OSError:
+                return {'defer': True}
+
+            saved_env = {name: os.environ.get(name) for name in _FORWARDED_ENV}
+            forwarded = request.get('env') or {}
+            try:
+                for name in _FORWARDED_ENV:
+                    if name in forwarded:
+                        os.environ[name] = str(forwarded[name])
+                    else:
+                        os.environ.pop(name, None)
+                self._refresh_config()
+                result = determine(request.get('stdin', ''), request.get('caller', ''), fast_only=True)
+            except Exception as e:
+                logger('SYSTEM', f'Permission daemon error: {e}')
+                return {'defer': True}
+            finally:
+                for name, value in saved_env.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+
+            if result is None:
+                return {'defer': True}
+            self.served += 1
+            return {'result': result}
+
+    return PermissionDaemon()
+
+
+def serve(path: Optional[str] = None, idle_timeout: float = 0) -> int:
+    """Run the daemon in the foreground until stopped.
+
+    Args:
+        path: Socket path (default: socket_path())
+        idle_timeout: Exit after this many seconds without requests (0 = never)
+
+    Returns:
+        Process exit code (1 if another daemon already owns the socket).
+    """
+    import signal
+
+    path = path or socket_path()
+    if os.path.exists(path):
+        if ping(path) is not None:
+            print(f'permission daemon already running on {path}', file=sys.stderr)
+            return 1
+        # Stale socket left by a crashed daemon
+        os.unlink(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    server = _make_server(path, idle_timeout)
+
+    def _request_stop(signum, frame):
+        server.stopping = True
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    try:
+        server.serve()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Agentize permission decision daemon')
+    parser.add_argument('command', nargs='?', default='serve', choices=['serve', 'stop', 'status'])
+    parser.add_argument('--socket', default=None, help='Socket path (default: $AGENTIZE_HOME/.tmp/permission-daemon.sock)')
+    parser.add_argument('--idle-timeout', type=float, default=0, help='Exit after N idle seconds (default: never)')
+    args = parser.parse_args(argv)
+
+    path = args.socket or socket_path()
+    if args.command == 'serve':
+        return serve(path, args.idle_timeout)
+    if args.command == 'stop':
+        return 0 if _send({'op': 'shutdown'}, path, CLIENT_TIMEOUT_SEC) is not None else 1
+
+    status = ping(path)
+    if status is None:
+        print(f'permission daemon not running ({path})')
+        return 1
+    print(f"permission daemon running on {path} (pid {status['pid']}, {status['served']} decisions served)")
+    return 0
+
+
+if __name__ == '__main__':
+    # Run as a script: make `lib` importable and drop lib/ itself from sys.path
+    _plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[0] = _plugin_dir
+    sys.exit(main())
@@ -0,0 +1,471 @@
+"""SQLite-backed handsoff session store shared by hooks and the server.
+
+Session state used to live only in `.tmp/hooked-sessions/<session_id>.json`
+plus a `by-issue/<N>.json` index. Those files were rewritten non-atomically by
+the Stop hook and looked up with two file opens per issue by the server.
+
+The store keeps every session in one SQLite database (WAL mode) next to those
+files, `.tmp/hooked-sessions/sessions.db`, with indexed lookup by issue, PR and
+workflow, atomic read-modify-write via update_session(), and TTL cleanup of
+finished sessions.
+
+The legacy JSON layout stays available: every write also exports the session
+(and its issue index) to the old paths, atomically. Those files are still the
+interface for agents and humans (the `jq '.state = "done"'` completion
+command, `cat` for debugging), so a direct edit to an exported file is picked
+up by mtime on the next read, and deleting an exported file deletes the
+session. Existing JSON-only sessions are imported when the database is
+created, and on lookup if they appear later.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Optional
+
+DB_FILENAME = 'sessions.db'
+BUSY_TIMEOUT_SEC = 5.0
+
+# Sessions in these states are eligible for TTL cleanup
+FINISHED_STATES = ('done', 'completed', 'error', 'failed')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    workflow TEXT,
+    state TEXT,
+    issue_no INTEGER,
+    pr_no INTEGER,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    export_mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_issue_no ON sessions(issue_no);
+CREATE INDEX IF NOT EXISTS sessions_pr_no ON sessions(pr_no);
+CREATE INDEX IF NOT EXISTS sessions_workflow ON sessions(workflow);
+CREATE INDEX IF NOT EXISTS sessions_state_updated ON sessions(state, updated_at);
+CREATE TABLE IF NOT EXISTS issue_index (
+    issue_no INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    workflow TEXT
+);
+'''
+
+# One connection per database path per process
+_connections: dict[str, sqlite3.Connection] = {}
+
+
+def _resolve_dir(sess_dir: Optional[str]) -> str:
+    if sess_dir is not None:
+        return os.fspath(sess_dir)
+    from lib.session_utils import session_dir
+    return session_dir()
+
+
+def _session_file(sess_dir: str, session_id: str) -> str:
+    return os.path.join(sess_dir, f'{session_id}.json')
+
+
+def _index_file(sess_dir: str, issue_no: int) -> str:
+    return os.path.join(sess_dir, 'by-issue', f'{issue_no}.json')
+
+
+def _connect(sess_dir: str) -> sqlite3.Connection:
+    path = os.path.join(sess_dir, DB_FILENAME)
+    conn = _connections.get(path)
+    if conn is not None:
+        return conn
+
+    os.makedirs(sess_dir, exist_ok=True)
+    created = not os.path.exists(path)
+    # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(_SCHEMA)
+    _connections[path] = conn
+    if created:
+        _import_legacy(conn, sess_dir)
+    return conn
+
+
+def clear_connections() -> None:
+    """Close cached connections (tests, or before deleting a session directory)."""
+    for conn in _connections.values():
+        conn.close()
+    _connections.clear()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK: one writer at a time across processes."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_json(path: str, data: dict) -> int:
+    """Atomically write data to path and return the new file's mtime_ns."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+    return os.stat(path).st_mtime_ns
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _store_row(conn: sqlite3.Connection, session_id: str, state: dict, export_mtime_ns: Optional[int]) -> None:
+    conn.execute(
+        'INSERT OR REPLACE INTO sessions '
+        '(session_id, workflow, state, issue_no, pr_no, data, updated_at, export_mtime_ns) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        (
+            session_id,
+            state.get('workflow'),
+            state.get('state'),
+            _as_int(state.get('issue_no')),
+            _as_int(state.get('pr_number', state.get('pr_no'))),
+            json.dumps(state),
+            time.time(),
+            export_mtime_ns,
+        ),
+    )
+
+
+def _import_legacy(conn: sqlite3.Connection, sess_dir: str) -> None:
+    """Import JSON-only sessions and issue index files into a new database."""
+    try:
+        names = os.listdir(sess_dir)
+    except OSError:
+        return
+    with _Transaction(conn):
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(sess_dir, name)
+            state = _read_json(path)
+            if state is not None:
+                _store_row(conn, name[:-len('.json')], state, os.stat(path).st_mtime_ns)
+        try:
+            index_names = os.listdir(os.path.join(sess_dir, 'by-issue'))
+        except OSError:
+            index_names = []
+        for name in index_names:
+            issue_no = _as_int(name[:-len('.json')]) if name.endswith('.json') else None
+            entry = _read_json(os.path.join(sess_dir, 'by-issue', name)) if issue_no is not None else None
+            if entry and entry.get('session_id'):
+                conn.execute('INSERT OR REPLACE INTO issue_index VALUES (?, ?, ?)',
+                             (issue_no, entry['session_id'], entry.get('workflow')))
+
+
+def _reconcile(conn: sqlite3.Connection, sess_dir: str, session_id: str,
+               row: Optional[tuple]) -> Optional[dict]:
+    """Return the current state, folding in direct edits to the exported file.
+
+    Args:
+        row: (data, export_mtime_ns) from the sessions table, or None
+    """
+    path = _session_file(sess_dir, session_id)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+
+    if row is None:
+        if mtime_ns is None:
+            return None
+        state = _read_json(path)
+        if state is not None:
+            _store_row(conn, session_id, state, mtime_ns)
+        return state
+
+    data, export_mtime_ns = row
+    if mtime_ns is None:
+        if export_mtime_ns is not None:
+            # The exported file was deleted: the session was reset
+            conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            return None
+        return json.loads(data)
+    if mtime_ns != export_mtime_ns:
+        state = _read_json(path)
+        if state is not None:
+            _store_row(conn, session_id, state, mtime_ns)
+            return state
+    return json.loads(data)
+
+
+def _load(conn: sqlite3.Connection, sess_dir: str, session_id: str) -> Optional[dict]:
+    row = conn.execute('SELECT data, export_mtime_ns FROM sessions WHERE session_id = ?',
+                       (session_id,)).fetchone()
+    return _reconcile(conn, sess_dir, session_id, row)
+
+
+def _save(conn: sqlite3.Connection, sess_dir: str, session_id: str, state: dict) -> None:
+    mtime_ns = _write_json(_session_file(sess_dir, session_id), state)
+    _store_row(conn, session_id, state, mtime_ns)
+
+
+def get_session(session_id: str, sess_dir: Optional[str] = None) -> Optional[dict]:
+    """Load session state.
+
+    Args:
+        session_id: Session identifier
+        sess_dir: Session directory (default: session_dir())
+
+    Returns:
+        State dict, or None if the session does not exist
+    """
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        return _load(conn, sess_dir, session_id)
+
+
+def put_session(session_id: str, state: dict, sess_dir: Optional[str] = None) -> None:
+    """Create or replace session state (and its JSON export)."""
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        _save(conn, sess_dir, session_id, state)
+
+
+def update_session(
+    session_id: str,
+    fn: Callable[[Optional[dict]], Optional[dict]],
+    sess_dir: Optional[str] = None,
+) -> Optional[dict]:
+    """Atomically read-modify-write a session.
+
+    fn receives the current state (None if missing) and returns the new state,
+    or None to leave the session unchanged. No other writer can interleave
+    between the read and the write, in this or another process.
+
+    Returns:
+        The written state, or None if fn declined to write
+    """
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        new_state = fn(_load(conn, sess_dir, session_id))
+        if new_state is not None:
+            _save(conn, sess_dir, session_id, new_state)
+        return new_state
+
+
+def delete_session(session_id: str, sess_dir: Optional[str] = None) -> None:
+    """Delete a session, its JSON export and issue index entries pointing at it."""
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        _delete(conn, sess_dir, [session_id])
+
+
+def _delete(conn: sqlite3.Connection, sess_dir: str, session_ids: list[str]) -> None:
+    for session_id in session_ids:
+        for (issue_no,) in conn.execute('SELECT issue_no FROM issue_index WHERE session_id = ?',
+                                        (session_id,)).fetchall():
+            _unlink(_index_file(sess_dir, issue_no))
+        conn.execute('DELETE FROM issue_index WHERE session_id = ?', (session_id,))
+        conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+        _unlink(_session_file(sess_dir, session_id))
+
+
+def set_issue_index(session_id: str, issue_no, workflow: str, sess_dir: Optional[str] = None) -> str:
+    """Map an issue number to a session (and export `by-issue/<N>.json`).
+
+    Returns:
+        Path of the exported index file
+    """
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    path = _index_file(sess_dir, issue_no)
+    with _Transaction(conn):
+        conn.execute('INSERT OR REPLACE INTO issue_index VALUES (?, ?, ?)',
+                     (int(issue_no), session_id, workflow))
+        _write_json(path, {'session_id': session_id, 'workflow': workflow})
+    return path
+
+
+def remove_issue_index(issue_no: int, sess_dir: Optional[str] = None) -> None:
+    """Drop an issue's index entry and its exported file. Missing entries are ignored."""
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        conn.execute('DELETE FROM issue_index WHERE issue_no = ?', (int(issue_no),))
+        _unlink(_index_file(sess_dir, issue_no))
+
+
+def get_issue_session_id(issue_no: int, sess_dir: Optional[str] = None) -> Optional[str]:
+    """Return the session ID indexed for an issue, or None."""
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        return _issue_session_id(conn, sess_dir, int(issue_no))
+
+
+def _issue_session_id(conn: sqlite3.Connection, sess_dir: str, issue_no: int) -> Optional[str]:
+    path = _index_file(sess_dir, issue_no)
+    row = conn.execute('SELECT session_id FROM issue_index WHERE issue_no = ?', (issue_no,)).fetchone()
+    if row is not None:
+        if os.path.exists(path):
+            return row[0]
+        # The exported index file was deleted: the entry was dropped
+        conn.execute('DELETE FROM issue_index WHERE issue_no = ?', (issue_no,))
+        return None
+    # An index file written without the store (older hook versions)
+    entry = _read_json(path)
+    if not entry or not entry.get('session_id'):
+        return None
+    conn.execute('INSERT OR REPLACE INTO issue_index VALUES (?, ?, ?)',
+                 (issue_no, entry['session_id'], entry.get('workflow')))
+    return entry['session_id']
+
+
+def find_by_issue(issue_no: int, sess_dir: Optional[str] = None) -> Optional[dict]:
+    """Return the state of the session indexed for an issue, or None."""
+    return find_by_issues([issue_no], sess_dir).get(int(issue_no))
+
+
+def find_by_issues(issue_nos: list[int], sess_dir: Optional[str] = None) -> dict[int, dict]:
+    """Batch form of find_by_issue(): one transaction for many issues.
+
+    Returns:
+        {issue_no: state} for issues that have an indexed session
+    """
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    result = {}
+    with _Transaction(conn):
+        for issue_no in {int(n) for n in issue_nos}:
+            session_id = _issue_session_id(conn, sess_dir, issue_no)
+            state = _load(conn, sess_dir, session_id) if session_id else None
+            if state is not None:
+                result[issue_no] = state
+    return result
+
+
+def find_sessions(
+    workflow: Optional[str] = None,
+    issue_no: Optional[int] = None,
+    pr_no: Optional[int] = None,
+    state: Optional[str] = None,
+    sess_dir: Optional[str] = None,
+) -> list[tuple[str, dict]]:
+    """Query sessions by indexed fields (all given filters must match).
+
+    Returns:
+        (session_id, state) pairs, most recently updated first
+    """
+    clauses, params = [], []
+    for column, value in (('workflow', workflow), ('issue_no', issue_no), ('pr_no', pr_no), ('state', state)):
+        if value is not None:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        rows = conn.execute(
+            f'SELECT session_id, data, export_mtime_ns FROM sessions{where} ORDER BY updated_at DESC', params
+        ).fetchall()
+        result = []
+        for session_id, data, export_mtime_ns in rows:
+            current = _reconcile(conn, sess_dir, session_id, (data, export_mtime_ns))
+            if current is not None:
+                result.append((session_id, current))
+    return result
+
+
+def cleanup_sessions(ttl_sec: float, states: tuple = FINISHED_STATES, sess_dir: Optional[str] = None) -> int:
+    """Delete finished sessions not updated for ttl_sec, with their exports.
+
+    Returns:
+        Number of sessions removed
+    """
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    cutoff = time.time() - ttl_sec
+    placeholders = ', '.join('?' for _ in states)
+    with _Transaction(conn):
+        expired = [row[0] for row in conn.execute(
+            f'SELECT session_id FROM sessions WHERE state IN ({placeholders}) AND updated_at < ?',
+            (*states, cutoff),
+        ).fetchall()]
+        _delete(conn, sess_dir, expired)
+    return len(expired)
+
+
+def export_json(dest_dir: str, sess_dir: Optional[str] = None) -> int:
+    """Write every session and issue index in the legacy JSON layout under dest_dir.
+
+    Returns:
+        Number of sessions exported
+    """
+    sess_dir = _resolve_dir(sess_dir)
+    conn = _connect(sess_dir)
+    with _Transaction(conn):
+        sessions = conn.execute('SELECT session_id, data FROM sessions').fetchall()
+        index = conn.execute('SELECT issue_no, session_id, workflow FROM issue_index').fetchall()
+    for session_id, data in sessions:
+        _write_json(_session_file(dest_dir, session_id), json.loads(data))
+    for issue_no, session_id, workflow in index:
+        _write_json(_index_file(dest_dir, issue_no), {'session_id': session_id, 'workflow': workflow})
+    return len(sessions)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Handsoff session store maintenance')
+    sub = parser.add_subparsers(dest='command', required=True)
+    export_cmd = sub.add_parser('export', help='Export sessions in the legacy JSON layout')
+    export_cmd.add_argument('dest', help='Destination directory')
+    cleanup_cmd = sub.add_parser('cleanup', help='Delete finished sessions older than --days')
+    cleanup_cmd.add_argument('--days', type=float, default=7.0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        print(f'Exported {export_json(args.dest)} sessions to {args.dest}')
+    else:
+        print(f'Removed {cleanup_sessions(args.days * 86400)} finished sessions')
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    # Run as a script: make `lib` importable and drop lib/ itself from sys.path
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())
@@ -5,7 +5,6 @@ AGENTIZE_HOME resolution, and issue index file management used across
 multiple hook and library files.
 """
 
-import json
 import os
 
 
@@ -52,7 +51,10 @@ def write_issue_index(
     workflow: str,
     sess_dir = None
 ) -> str:
-    """Write an issue index file for reverse lookup from issue number to session.
+    """Write an issue index entry for reverse lookup from issue number to session.
+
+    Stored in the session store (lib.session_store), which also exports the
+    legacy `by-issue/<issue_no>.json` file.
 
     Args:
         session_id: The session ID to index.
@@ -61,20 +63,13 @@ def write_issue_index(
         sess_dir: Optional session directory path. If None, uses session_dir(makedirs=True).
 
     Returns:
-        The path to the created index file.
+        The path to the exported index file.
     """
+    from lib.session_store import set_issue_index
+
     if sess_dir is None:
         sess_dir = session_dir(makedirs=True)
-
-    by_issue_dir = os.path.join(sess_dir, 'by-issue')
-    os.makedirs(by_issue_dir, exist_ok=True)
-
-    issue_index_file = os.path.join(by_issue_dir, f'{issue_no}.json')
-    with open(issue_index_file, 'w') as f:
-        index_data = {'session_id': session_id, 'workflow': workflow}
-        json.dump(index_data, f)
-
-    return issue_index_file
+    return set_issue_index(session_id, issue_no, workflow, sess_dir=sess_dir)
 
 
 def session_dir(makedirs: bool = False) -> str:
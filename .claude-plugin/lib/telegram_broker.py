@@ -0,0 +1,543 @@
+"""Optional Telegram approval broker shared by concurrent sessions.
+
+Without the broker, every hook process waiting for a Telegram approval
+long-polls `getUpdates` on its own. With several handsoff sessions running,
+those processes compete for one update stream: whichever polls first confirms
+the offset and the others never see the callback meant for them.
+
+The broker is a single local process that owns the `getUpdates` loop. Hook
+processes hand it approval requests over a Unix socket and block until their
+decision arrives. Callbacks are routed to the waiting request by message_id
+(and slot, for batched messages), so no update is consumed by the wrong
+session. Prompts submitted within a short window are batched into one message
+with a row of buttons per request.
+
+Usage:
+    python3 .claude-plugin/lib/telegram_broker.py [serve|stop|status] [--socket PATH]
+
+The client half only imports the standard library and lib.permission_daemon
+helpers; hooks fall back to in-process polling when no broker is running.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional
+
+SOCKET_NAME = 'telegram-broker.sock'
+BATCH_WINDOW_SEC = 0.5
+MAX_BATCH = 8
+LONG_POLL_SEC = 30
+API_TIMEOUT_SEC = 10
+TARGET_DISPLAY_MAX_LEN = 200
+SESSION_ID_DISPLAY_LEN = 8
+MAX_REQUEST_BYTES = 1024 * 1024
+# Client socket time beyond the approval timeout (batch window, send, long-poll)
+_CLIENT_SLACK_SEC = 15.0
+
+_STATUS = {
+    'allow': ('✅', 'Allowed'),
+    'deny': ('❌', 'Denied'),
+    'timeout': ('⏰', 'Timed Out'),
+}
+
+# api(method, payload, timeout_sec) -> parsed response or None
+ApiFn = Callable[[str, dict, float], Optional[dict]]
+
+
+def socket_path() -> str:
+    """Get the broker socket path for the current AGENTIZE_HOME."""
+    from lib.permission_daemon import socket_path as _socket_path
+    return _socket_path(SOCKET_NAME)
+
+
+def request_approval(
+    tool: str,
+    target: str,
+    session_id: str,
+    timeout: float,
+    path: Optional[str] = None
+) -> Optional[dict]:
+    """Ask the broker to get a Telegram approval and wait for it.
+
+    Args:
+        tool: Tool name
+        target: Target shown in the prompt
+        session_id: Session ID shown in the prompt
+        timeout: Seconds to wait for a decision
+        path: Socket path (default: socket_path())
+
+    Returns:
+        `{'decision': 'allow'|'deny'|'timeout'|'error', 'message_id': int}`,
+        or None when no broker answers and the caller must poll itself.
+    """
+    from lib.permission_daemon import _send
+
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+    response = _send({
+        'op': 'approve',
+        'tool': tool,
+        'target': target,
+        'session_id': session_id,
+        'timeout': timeout,
+    }, path, timeout + _CLIENT_SLACK_SEC)
+    if response is None or 'decision' not in response:
+        return None
+    return response
+
+
+def ping(path: Optional[str] = None, timeout: float = 2.0) -> Optional[dict]:
+    """Check whether a broker is serving on the socket.
+
+    Returns:
+        Status dict (pid, pending requests, decisions served) or None.
+    """
+    from lib.permission_daemon import _send
+    return _send({'op': 'ping'}, path or socket_path(), timeout)
+
+
+def parse_callback_data(callback_data: str) -> tuple[str, int, int]:
+    """Parse `action:message_id[:slot]` callback data.
+
+    Returns:
+        (action, message_id, slot); ids are 0 on parse errors, slot is 0 for
+        single-request messages.
+    """
+    parts = callback_data.split(':')
+    action = parts[0]
+    try:
+        message_id = int(parts[1]) if len(parts) > 1 else 0
+        slot = int(parts[2]) if len(parts) > 2 else 0
+    except ValueError:
+        return action, 0, 0
+    return action, message_id, slot
+
+
+def _escape_html(text: str) -> str:
+    from lib.telegram_utils import escape_html
+    return escape_html(text)
+
+
+class _Request:
+    """One approval request waiting for a decision."""
+
+    def __init__(self, tool: str, target: str, session_id: str):
+        self.tool = tool
+        self.target = target[:TARGET_DISPLAY_MAX_LEN]
+        self.session_id = session_id
+        self.message_id = 0
+        self.slot = 0
+        self.decision: Optional[str] = None
+        self.done = threading.Event()
+
+    def describe(self) -> str:
+        return (
+            f"Tool: <code>{_escape_html(self.tool)}</code>\n"
+            f"Target: <code>{_escape_html(self.target)}</code>\n"
+            f"Session: {self.session_id[:SESSION_ID_DISPLAY_LEN]}"
+        )
+
+
+def _format_message(batch: list[_Request]) -> str:
+    """Format the prompt text, including decisions made so far."""
+    if len(batch) == 1:
+        request = batch[0]
+        if request.decision in _STATUS:
+            emoji, status = _STATUS[request.decision]
+            return f"{emoji} {status}\n\n{request.describe()}"
+        return f"🔧 Tool Approval Request\n\n{request.describe()}"
+
+    items = []
+    for request in batch:
+        prefix = ''
+        if request.decision in _STATUS:
+            emoji, status = _STATUS[request.decision]
+            prefix = f"{emoji} {status}\n"
+        items.append(f"{request.slot}. {prefix}{request.describe()}")
+    return f"🔧 Tool Approval Requests ({len(batch)})\n\n" + "\n\n".join(items)
+
+
+def _format_keyboard(message_id: int, batch: list[_Request]) -> Optional[dict]:
+    """Build Allow/Deny buttons for the undecided requests of a message."""
+    if len(batch) == 1:
+        rows = [[
+            {'text': '✅ Allow', 'callback_data': f'allow:{message_id}'},
+            {'text': '❌ Deny', 'callback_data': f'deny:{message_id}'},
+        ]] if batch[0].decision is None else []
+    else:
+        rows = [[
+            {'text': f'✅ Allow {r.slot}', 'callback_data': f'allow:{message_id}:{r.slot}'},
+            {'text': f'❌ Deny {r.slot}', 'callback_data': f'deny:{message_id}:{r.slot}'},
+        ] for r in batch if r.decision is None]
+    return {'inline_keyboard': rows} if rows else None
+
+
+class TelegramBroker:
+    """Owns the getUpdates loop and routes decisions to waiting requests.
+
+    submit() is called from one thread per waiting client. A sender thread
+    batches queued prompts into messages and a poller thread long-polls
+    updates while any message awaits a decision.
+    """
+
+    def __init__(
+        self,
+        api: ApiFn,
+        chat_id: str,
+        allowed_user_ids: Optional[list[int]] = None,
+        batch_window: float = BATCH_WINDOW_SEC,
+        max_batch: int = MAX_BATCH,
+        long_poll: int = LONG_POLL_SEC
+    ):
+        self._api = api
+        self._chat_id = chat_id
+        self._allowed_user_ids = allowed_user_ids or []
+        self._batch_window = batch_window
+        self._max_batch = max_batch
+        self._long_poll = long_poll
+        self._cond = threading.Condition()
+        self._outbox: list[_Request] = []
+        self._messages: dict[int, list[_Request]] = {}
+        self._offset: Optional[int] = None
+        self.stopping = False
+        self.served = 0
+
+    def start(self) -> None:
+        for target in (self._send_loop, self._poll_loop):
+            threading.Thread(target=target, daemon=True).start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self.stopping = True
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(1 for r in self._outbox if r.decision is None) + sum(
+                1 for batch in self._messages.values() for r in batch if r.decision is None
+            )
+
+    def submit(self, tool: str, target: str, session_id: str, timeout: float) -> dict:
+        """Queue an approval prompt and block until it is decided or times out."""
+        request = _Request(tool, target, session_id)
+        with self._cond:
+            self._outbox.append(request)
+            self._cond.notify_all()
+        if not request.done.wait(timeout):
+            self._resolve(request, 'timeout')
+        return {'decision': request.decision, 'message_id': request.message_id}
+
+    # ---- sending ----
+
+    def _send_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._outbox and not self.stopping:
+                    self._cond.wait()
+                if self.stopping:
+                    return
+            # Let prompts from concurrent sessions accumulate into one message
+            time.sleep(self._batch_window)
+            with self._cond:
+                batch = [r for r in self._outbox[:self._max_batch] if r.decision is None]
+                del self._outbox[:self._max_batch]
+            if batch:
+                self._send_batch(batch)
+
+    def _sync_offset(self) -> None:
+        """Skip updates that arrived while no prompt was outstanding."""
+        resp = self._api('getUpdates', {'limit': 1, 'offset': -1}, API_TIMEOUT_SEC)
+        offset = 0
+        if resp and resp.get('ok') and resp.get('result'):
+            offset = resp['result'][-1].get('update_id', 0) + 1
+        with self._cond:
+            if self._offset is None:
+                self._offset = offset
+
+    def _send_batch(self, batch: list[_Request]) -> None:
+        if self._offset is None:
+            self._sync_offset()
+        if len(batch) > 1:
+            for slot, request in enumerate(batch, 1):
+                request.slot = slot
+
+        resp = self._api('sendMessage', {
+            'chat_id': self._chat_id,
+            'text': _format_message(batch),
+            'parse_mode': 'HTML',
+            'reply_markup': _format_keyboard(0, batch),  # Placeholder until message_id is known
+        }, API_TIMEOUT_SEC)
+        if not resp or not resp.get('ok'):
+            for request in batch:
+                self._resolve(request, 'error')
+            return
+
+        message_id = resp.get('result', {}).get('message_id', 0)
+        with self._cond:
+            for request in batch:
+                request.message_id = message_id
+            self._messages[message_id] = batch
+            self._cond.notify_all()
+        self._api('editMessageReplyMarkup', {
+            'chat_id': self._chat_id,
+            'message_id': message_id,
+            'reply_markup': _format_keyboard(message_id, batch),
+        }, API_TIMEOUT_SEC)
+
+    # ---- polling and routing ----
+
+    def _poll_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._messages and not self.stopping:
+                    # Idle: updates arriving now are not answers to any prompt
+                    self._offset = None
+                    self._cond.wait()
+                if self.stopping:
+                    return
+            if self._offset is None:
+                self._sync_offset()
+
+            resp = self._api('getUpdates', {
+                'offset': self._offset,
+                'timeout': self._long_poll,
+            }, self._long_poll + API_TIMEOUT_SEC)
+            if not resp or not resp.get('ok'):
+                time.sleep(1)
+                continue
+            for update in resp.get('result', []):
+                self._offset = update.get('update_id', 0) + 1
+                self._route(update)
+
+    def _allowed(self, user_id: Any) -> bool:
+        return not self._allowed_user_ids or user_id in self._allowed_user_ids
+
+    def _route(self, update: dict) -> None:
+        callback = update.get('callback_query')
+        if callback:
+            if not self._allowed(callback.get('from', {}).get('id')):
+                return
+            action, message_id, slot = parse_callback_data(callback.get('data', ''))
+            if action not in ('allow', 'deny'):
+                return
+            with self._cond:
+                request = next(
+                    (r for r in self._messages.get(message_id, []) if r.slot == slot and r.decision is None),
+                    None
+                )
+            if request is None:
+                return  # Stale button or a message from another broker
+            self._api('answerCallbackQuery', {
+                'callback_query_id': callback.get('id', ''),
+                'text': '✅ Allowed' if action == 'allow' else '❌ Denied',
+            }, API_TIMEOUT_SEC)
+            self._resolve(request, action)
+            return
+
+        # Text commands: /allow or /deny, as a reply to a prompt or for the oldest one
+        msg = update.get('message') or {}
+        if not self._allowed(msg.get('from', {}).get('id')):
+            return
+        text = msg.get('text', '').strip().lower()
+        if text == '/allow' or text.startswith('/allow '):
+            action = 'allow'
+        elif text == '/deny' or text.startswith('/deny '):
+            action = 'deny'
+        else:
+            return
+
+        reply_to = (msg.get('reply_to_message') or {}).get('message_id')
+        with self._cond:
+            if reply_to in self._messages:
+                targets = [r for r in self._messages[reply_to] if r.decision is None]
+            else:
+                undecided = [r for mid in sorted(self._messages) for r in self._messages[mid] if r.decision is None]
+                targets = undecided[:1]
+        if not targets:
+            return
+        for request in targets:
+            self._resolve(request, action)
+        emoji, status = _STATUS[action]
+        tools = ', '.join(sorted({r.tool for r in targets}))
+        self._api('sendMessage', {
+            'chat_id': self._chat_id,
+            'text': f"{emoji} {status}: <code>{_escape_html(tools)}</code>",
+            'parse_mode': 'HTML',
+            'reply_to_message_id': msg.get('message_id'),
+        }, API_TIMEOUT_SEC)
+
+    def _resolve(self, request: _Request, decision: str) -> None:
+        """Record the first decision for a request and update its message."""
+        with self._cond:
+            if request.decision is not None:
+                return
+            request.decision = decision
+            if decision in ('allow', 'deny'):
+                self.served += 1
+            batch = self._messages.get(request.message_id, [])
+            if batch and all(r.decision is not None for r in batch):
+                del self._messages[request.message_id]
+            text = _format_message(batch) if batch else ''
+            keyboard = _format_keyboard(request.message_id, batch) if batch else None
+        request.done.set()
+
+        if batch:
+            payload = {
+                'chat_id': self._chat_id,
+                'message_id': request.message_id,
+                'text': text,
+                'parse_mode': 'HTML',
+            }
+            if keyboard:
+                payload['reply_markup'] = keyboard
+            self._api('editMessageText', payload, API_TIMEOUT_SEC)
+
+
+def _make_server(path: str, broker: TelegramBroker):
+    """Create the broker's socket server; one thread per waiting client."""
+    import socketserver
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('request must be an object')
+            except ValueError:
+                response: dict[str, Any] = {'error': 'bad_request'}
+            else:
+                response = self.server.dispatch(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+    class BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        # Wake up periodically to honour stop requests
+        timeout = 1.0
+
+        def __init__(self):
+            super().__init__(path, _Handler)
+            os.chmod(path, 0o600)
+
+        def serve(self):
+            while not broker.stopping:
+                self.handle_request()
+
+        def dispatch(self, request: dict) -> dict:
+            op = request.get('op')
+            if op == 'ping':
+                return {'ok': True, 'pid': os.getpid(), 'pending': broker.pending(), 'served': broker.served}
+            if op == 'shutdown':
+                broker.stop()
+                return {'ok': True}
+            if op != 'approve':
+                return {'error': f'unknown op: {op}'}
+            try:
+                timeout = float(request.get('timeout', 60))
+            except (TypeError, ValueError):
+                return {'error': 'bad_request'}
+            return broker.submit(
+                str(request.get('tool', '')),
+                str(request.get('target', '')),
+                str(request.get('session_id', 'unknown')),
+                timeout,
+            )
+
+    return BrokerServer()
+
+
+def serve(path: Optional[str] = None, batch_window: float = BATCH_WINDOW_SEC) -> int:
+    """Run the broker in the foreground until stopped.
+
+    Telegram settings are read once from `.agentize.local.yaml` at start;
+    restart the broker after changing them.
+
+    Returns:
+        Process exit code (1 if Telegram is not configured or a broker already runs).
+    """
+    import signal
+
+    from lib.logger import logger
+    from lib.permission.determine import _get_telegram_config, _is_telegram_enabled
+    from lib.telegram_utils import telegram_request
+
+    config = _get_telegram_config() if _is_telegram_enabled() else None
+    if not config:
+        print('telegram broker: telegram.enabled, telegram.token and telegram.chat_id are required', file=sys.stderr)
+        return 1
+
+    path = path or socket_path()
+    if os.path.exists(path):
+        if ping(path) is not None:
+            print(f'telegram broker already running on {path}', file=sys.stderr)
+            return 1
+        # Stale socket left by a crashed broker
+        os.unlink(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    token = config['token']
+
+    def api(method: str, payload: dict, timeout: float) -> Optional[dict]:
+        return telegram_request(
+            token, method, payload, timeout_sec=int(timeout),
+            on_error=lambda e: logger('SYSTEM', f'Telegram broker {method} failed: {e}')
+        )
+
+    broker = TelegramBroker(api, config['chat_id'], config['allowed_user_ids'], batch_window=batch_window)
+    server = _make_server(path, broker)
+    broker.start()
+
+    def _request_stop(signum, frame):
+        broker.stop()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+    try:
+        server.serve()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    import argparse
+
+    from lib.permission_daemon import _send
+
+    parser = argparse.ArgumentParser(description='Agentize Telegram approval broker')
+    parser.add_argument('command', nargs='?', default='serve', choices=['serve', 'stop', 'status'])
+    parser.add_argument('--socket', default=None, help='Socket path (default: $AGENTIZE_HOME/.tmp/telegram-broker.sock)')
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW_SEC,
+                        help=f'Seconds to collect prompts into one message (default: {BATCH_WINDOW_SEC})')
+    args = parser.parse_args(argv)
+
+    path = args.socket or socket_path()
+    if args.command == 'serve':
+        return serve(path, args.batch_window)
+    if args.command == 'stop':
+        return 0 if _send({'op': 'shutdown'}, path, 2.0) is not None else 1
+
+    status = ping(path)
+    if status is None:
+        print(f'telegram broker not running ({path})')
+        return 1
+    print(
+        f"telegram broker running on {path} (pid {status['pid']}, "
+        f"{status['pending']} pending, {status['served']} decisions served)"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    # Run as a script: make `lib` importable and drop lib/ itself from sys.path
+    _plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[0] = _plugin_dir
+    sys.exit(main())
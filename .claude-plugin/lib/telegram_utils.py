@@ -1,13 +1,14 @@
 """Shared Telegram utilities.
 
 Provides common helpers for Telegram API integration.
+
+urllib is imported inside telegram_request() so hooks that only need
+escape_html() (or never reach Telegram) do not pay for http.client and ssl.
 """
 
 from __future__ import annotations
 
 import json
-import urllib.request
-import urllib.error
 from typing import Any, Callable, Optional
 
 
@@ -46,6 +47,9 @@ def telegram_request(
     Returns:
         Parsed JSON response dict on success, None on error
     """
+    import urllib.error
+    import urllib.request
+
     if urlopen_fn is None:
         urlopen_fn = urllib.request.urlopen
 
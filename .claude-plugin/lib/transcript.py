@@ -0,0 +1,132 @@
+"""Tail access to Claude Code JSONL transcripts.
+
+Hooks only need the last few transcript entries, but transcripts grow to tens
+of megabytes over a long session. Reading them with readlines() costs time and
+memory proportional to the whole file on every hook call. This module seeks
+from the end instead, so reading the last N entries costs roughly the bytes of
+those N entries.
+
+Files above MMAP_THRESHOLD are memory-mapped and scanned backwards with
+rfind(); smaller files are read in doubling windows from the end. Transcripts
+are append-only, so the start offset of the last tail read is cached per
+session and bounds the next backward scan (useful in long-running processes
+such as the permission daemon).
+"""
+
+import json
+import mmap
+import os
+from typing import Optional
+
+# Files larger than this are memory-mapped instead of read into a buffer
+MMAP_THRESHOLD = 1024 * 1024
+# First window read from the end of small files; doubled until N lines fit
+_INITIAL_WINDOW = 64 * 1024
+
+# session_id -> (path, size, start offset of the earliest line returned, line count)
+_offset_cache: dict[str, tuple[str, int, int, int]] = {}
+
+
+def _scan_lines(buf, start: int, end: int, n: int) -> list[tuple[int, int]]:
+    """Find spans of the last n non-blank lines in buf[start:end].
+
+    Returns (line_start, line_end) pairs in file order, newline excluded.
+    """
+    spans = []
+    while end > start and len(spans) < n:
+        nl = buf.rfind(b'\n', start, end)
+        line_start = nl + 1 if nl >= 0 else start
+        if buf[line_start:end].strip():
+            spans.append((line_start, end))
+        end = nl if nl >= 0 else start
+    spans.reverse()
+    return spans
+
+
+def _read_tail(f, size: int, n: int, floor: int) -> list[tuple[int, bytes]]:
+    """Return (offset, raw line) for the last n lines at or after floor."""
+    if size - floor > MMAP_THRESHOLD:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [(s, mm[s:e]) for s, e in _scan_lines(mm, floor, size, n)]
+
+    window = _INITIAL_WINDOW
+    while True:
+        start = max(floor, size - window)
+        f.seek(start)
+        buf = f.read(size - start)
+        spans = _scan_lines(buf, 0, len(buf), n)
+        # Lines are complete once the earliest one starts after a newline in the buffer
+        if start == floor or (len(spans) == n and spans[0][0] > 0):
+            return [(start + s, buf[s:e]) for s, e in spans]
+        window *= 2
+
+
+def _cached_floor(f, path: str, size: int, n: int, session_id: Optional[str]) -> int:
+    """Get the offset the backward scan may stop at for this session."""
+    if not session_id or session_id not in _offset_cache:
+        return 0
+    cached_path, cached_size, cached_start, cached_n = _offset_cache[session_id]
+    if cached_path != path or size < cached_size or n > cached_n:
+        return 0
+    if cached_start > 0:
+        # The file must still have a line boundary there (not rewritten in place)
+        f.seek(cached_start - 1)
+        if f.read(1) != b'\n':
+            return 0
+    return cached_start
+
+
+def tail_lines(path: str, n: int = 1, session_id: Optional[str] = None) -> list[str]:
+    """Read the last n non-blank lines of a file.
+
+    Args:
+        path: Path to the transcript (or any newline-delimited file)
+        n: Number of lines to return
+        session_id: Optional session ID keying the offset cache
+
+    Returns:
+        Up to n lines in file order, without trailing newlines
+
+    Raises:
+        OSError: If the file cannot be opened
+    """
+    if n <= 0:
+        return []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        floor = _cached_floor(f, path, size, n, session_id)
+        tail = _read_tail(f, size, n, floor)
+        if floor and len(tail) < n:
+            # Fewer lines after the cached offset than requested: rescan everything
+            tail = _read_tail(f, size, n, 0)
+
+    if session_id and tail:
+        _offset_cache[session_id] = (path, size, tail[0][0], n)
+    return [line.decode('utf-8', errors='replace').rstrip('\r') for _, line in tail]
+
+
+def tail_entries(path: str, n: int = 1, session_id: Optional[str] = None) -> list[dict]:
+    """Read and parse the last n JSONL entries of a transcript.
+
+    Lines that are not JSON objects (e.g. a partially written last line) are
+    skipped, so fewer than n entries may be returned.
+
+    Raises:
+        OSError: If the file cannot be opened
+    """
+    entries = []
+    for line in tail_lines(path, n, session_id):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict):
+            entries.append(entry)
+    return entries
+
+
+def clear_offset_cache() -> None:
+    """Clear the per-session offset cache (for testing)."""
+    _offset_cache.clear()
@@ -0,0 +1,244 @@
+"""Incremental, bounded transcript digest for the handsoff supervisor.
+
+The supervisor is consulted on every Stop-hook continuation. Re-parsing the
+whole JSONL transcript and sending every message makes its prompt (and its
+latency) grow without bound over a long session. Instead, a digest is kept per
+session in `$AGENTIZE_HOME/.tmp/transcript-digests/<session_id>.json`:
+
+- `offset`: bytes of the transcript already processed; updates only parse new lines
+- `first_request`: the first user message (the workflow's original purpose)
+- `recent`: the last K conversation turns, verbatim (capped per turn)
+- `summary`: one condensed line per older turn, oldest dropped past a cap
+
+render_digest() then fits the digest into a token budget, giving recent turns
+priority over the original request and the condensed history.
+"""
+
+import json
+import os
+from typing import Optional
+
+from lib.session_utils import get_agentize_home
+
+DIGEST_DIRNAME = 'transcript-digests'
+DEFAULT_RECENT_TURNS = 8
+DEFAULT_CONTEXT_TOKENS = 6000
+# Rough chars-per-token ratio for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+# Stored size caps, independent of the render budget
+RECENT_TURN_MAX_CHARS = 8000
+SUMMARY_LINE_CHARS = 160
+SUMMARY_MAX_LINES = 200
+# Share of the budget reserved for recent turns and for the original request
+_RECENT_SHARE = 0.6
+_FIRST_REQUEST_SHARE = 0.15
+
+
+def _digest_path(session_id: str) -> str:
+    return os.path.join(get_agentize_home(), '.tmp', DIGEST_DIRNAME, f'{session_id}.json')
+
+
+def _empty_digest(transcript_path: str) -> dict:
+    return {
+        'path': transcript_path,
+        'offset': 0,
+        'entries': 0,
+        'first_request': None,
+        'summary': [],
+        'omitted': 0,
+        'recent': [],
+    }
+
+
+def entry_text(entry: dict) -> Optional[tuple[str, str]]:
+    """Extract (role, text) from a transcript entry.
+
+    Handles the Claude Code format (`message.role` and `message.content`, where
+    content is a string or a list of blocks of which only text blocks count)
+    and plain `role`/`content` entries.
+
+    Returns:
+        (role, text), or None if the entry carries no conversation text
+    """
+    if 'message' in entry and isinstance(entry['message'], dict):
+        msg = entry['message']
+        role = msg.get('role', 'unknown')
+        content = msg.get('content', '')
+        if isinstance(content, list):
+            text_parts = []
+            for block in content:
+                if isinstance(block, dict) and block.get('type') == 'text':
+                    text_parts.append(block.get('text', ''))
+                elif isinstance(block, str):
+                    text_parts.append(block)
+            content = ' '.join(text_parts)
+        if content:
+            return role, str(content)
+    elif 'role' in entry and 'content' in entry:
+        return entry['role'], str(entry['content'])
+    return None
+
+
+def _condense(turn: str, limit: int) -> str:
+    """Collapse whitespace and truncate a turn to limit chars."""
+    flat = ' '.join(turn.split())
+    return flat if len(flat) <= limit else flat[:limit - 3] + '...'
+
+
+def _load(session_id: str, transcript_path: str) -> dict:
+    try:
+        with open(_digest_path(session_id), 'r') as f:
+            digest = json.load(f)
+    except (OSError, ValueError):
+        return _empty_digest(transcript_path)
+    if not isinstance(digest, dict) or digest.get('path') != transcript_path:
+        return _empty_digest(transcript_path)
+    return digest
+
+
+def _save(session_id: str, digest: dict) -> None:
+    # Write-then-rename so a crashed hook never leaves a torn digest
+    path = _digest_path(session_id)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(digest, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def update_digest(session_id: str, transcript_path: str,
+                  recent_turns: int = DEFAULT_RECENT_TURNS) -> dict:
+    """Fold transcript lines appended since the last call into the digest.
+
+    Only complete (newline-terminated) lines after the stored offset are
+    parsed. A transcript that shrank or changed path starts a fresh digest.
+
+    Args:
+        session_id: Session ID keying the digest file
+        transcript_path: Path to the JSONL transcript
+        recent_turns: Number of turns kept verbatim
+
+    Returns:
+        The updated digest dict
+
+    Raises:
+        OSError: If the transcript cannot be read
+    """
+    digest = _load(session_id, transcript_path)
+    with open(transcript_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < digest['offset']:
+            digest = _empty_digest(transcript_path)
+        f.seek(digest['offset'])
+        data = f.read()
+
+    end = data.rfind(b'\n') + 1
+    for raw in data[:end].splitlines():
+        if not raw.strip():
+            continue
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            continue
+        if not isinstance(entry, dict):
+            continue
+        digest['entries'] += 1
+        extracted = entry_text(entry)
+        if extracted is None:
+            continue
+        role, text = extracted
+        if digest['first_request'] is None and role == 'user':
+            digest['first_request'] = _condense(text, RECENT_TURN_MAX_CHARS)
+        digest['recent'].append(f'{role}: {text[:RECENT_TURN_MAX_CHARS]}')
+
+    # Turns leaving the recent window are condensed into the rolling summary
+    overflow = len(digest['recent']) - max(recent_turns, 0)
+    if overflow > 0:
+        for turn in digest['recent'][:overflow]:
+            digest['summary'].append(_condense(turn, SUMMARY_LINE_CHARS))
+        digest['recent'] = digest['recent'][overflow:]
+    if len(digest['summary']) > SUMMARY_MAX_LINES:
+        dropped = len(digest['summary']) - SUMMARY_MAX_LINES
+        digest['omitted'] += dropped
+        digest['summary'] = digest['summary'][dropped:]
+
+    digest['offset'] += end
+    _save(session_id, digest)
+    return digest
+
+
+def _fit(text: str, limit: int) -> str:
+    if limit <= 0:
+        return ''
+    return text if len(text) <= limit else text[:max(limit - 3, 0)] + '...'
+
+
+def render_digest(digest: dict, token_budget: int = DEFAULT_CONTEXT_TOKENS) -> str:
+    """Render a digest as supervisor context within a token budget.
+
+    Recent turns are filled newest first with up to 60% of the budget, then the
+    original request (up to 15%), then condensed history newest first with
+    whatever remains.
+
+    Returns:
+        Context text, or '' if the digest has no conversation turns
+    """
+    if not digest.get('recent') and not digest.get('summary'):
+        return ''
+
+    budget = max(token_budget, 0) * CHARS_PER_TOKEN
+    recent = []
+    remaining = int(budget * _RECENT_SHARE)
+    for turn in reversed(digest['recent']):
+        # Always show the newest turn; skip fragments too short to be useful
+        if remaining <= 0 or (recent and remaining < 80):
+            break
+        fitted = _fit(turn, remaining)
+        recent.append(fitted)
+        remaining -= len(fitted) + 1
+    recent.reverse()
+    used = sum(len(turn) + 1 for turn in recent)
+
+    # While the first turn is still in the recent window it needs no separate section
+    first_request = ''
+    if digest['summary'] or digest.get('omitted'):
+        first_request = _fit(
+            digest.get('first_request') or '',
+            min(int(budget * _FIRST_REQUEST_SHARE), budget - used)
+        )
+    used += len(first_request)
+
+    summary = []
+    remaining = budget - used
+    for line in reversed(digest['summary']):
+        if len(line) + 3 > remaining:
+            break
+        summary.append(line)
+        remaining -= len(line) + 3
+    summary.reverse()
+    omitted = digest.get('omitted', 0) + len(digest['summary']) - len(summary)
+
+    sections = []
+    if first_request:
+        sections.append(f'ORIGINAL REQUEST:\n{first_request}')
+    if summary or omitted:
+        header = 'EARLIER CONVERSATION (condensed'
+        header += f', {omitted} older turns omitted):' if omitted else '):'
+        sections.append('\n'.join([header] + [f'- {line}' for line in summary]))
+    if recent:
+        sections.append('RECENT TURNS:\n' + '\n'.join(recent))
+    return '\n\n'.join(sections)
+
+
+def clear_digest(session_id: str) -> None:
+    """Delete the stored digest for a session."""
+    try:
+        os.unlink(_digest_path(session_id))
+    except OSError:
+        pass
@@ -17,18 +17,21 @@ Self-contained design:
 - Provides `_run_acw()` helper that invokes `acw` by sourcing `src/cli/acw.sh`
 - No imports from `agentize.shell` or dependency on `setup.sh`
 - Maintains plugin standalone capability for handsoff supervisor workflows
+- Supervisor-only dependencies (subprocess, tempfile, transcript_digest) are
+  imported inside the supervisor functions, keeping hook startup cheap
 """
 
+from __future__ import annotations
+
 import re
 import os
-import subprocess
-import json
-import tempfile
-from typing import Optional
-from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
 from lib.session_utils import get_agentize_home
 
+if TYPE_CHECKING:
+    import subprocess
+
 # ============================================================
 # Workflow name constants
 # ============================================================
@@ -149,6 +152,21 @@ def _get_supervisor_flags() -> str:
     return get_local_value('handsoff.supervisor.flags', '')
 
 
+def _get_supervisor_context_limits() -> tuple[int, int]:
+    """Get transcript digest limits for the supervisor prompt from YAML config.
+
+    Returns:
+        (recent_turns, context_tokens): turns kept verbatim and the token
+        budget for the rendered conversation context
+    """
+    from lib.local_config import get_local_value, coerce_int
+    from lib.transcript_digest import DEFAULT_RECENT_TURNS, DEFAULT_CONTEXT_TOKENS
+
+    recent_turns = get_local_value('handsoff.supervisor.recent_turns', DEFAULT_RECENT_TURNS, coerce_int)
+    context_tokens = get_local_value('handsoff.supervisor.context_tokens', DEFAULT_CONTEXT_TOKENS, coerce_int)
+    return recent_turns, context_tokens
+
+
 # ============================================================
 # Self-contained acw invocation helpers
 # ============================================================
@@ -171,6 +189,8 @@ def _run_acw(provider: str, model: str, input_file: str, output_file: str,
     Returns:
         subprocess.CompletedProcess result
     """
+    import subprocess
+
     # Use local symlink (resolved during plugin cache copy) instead of
     # traversing outside the plugin boundary via AGENTIZE_HOME.
     acw_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'acw.sh')
@@ -205,21 +225,20 @@ def _log_supervisor_debug(message: dict):
     Args:
         message: Dictionary with debug information
     """
+    from datetime import datetime
+    from lib.log_sink import get_sink
+
     try:
         agentize_home = os.getenv('AGENTIZE_HOME', os.path.expanduser('~/.agentize'))
         debug_log = os.path.join(agentize_home, '.tmp', 'hook-debug.log')
 
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(debug_log), exist_ok=True)
-
         # Add timestamp
         message['timestamp'] = datetime.now().isoformat()
 
-        # Append to log file
-        with open(debug_log, 'a') as f:
-            log_ver = message.copy()
-            log_ver.pop('prompt', None)  # Remove prompt from main log for brevity
-            f.write(json.dumps(log_ver) + '\n')
+        # Append to log file as a JSON line (shared handle with lib.logger)
+        log_ver = message.copy()
+        log_ver.pop('prompt', None)  # Remove prompt from main log for brevity
+        get_sink(debug_log).write_record(log_ver)
 
         n = message.get('continuation_count', 0)
         m = message.get('max_continuations', 0)
@@ -272,50 +291,29 @@ def _ask_supervisor_for_guidance(
     if provider is None:
         return None  # Supervisor disabled
 
-    # Read transcript if available for conversation context
+    import subprocess
+    import tempfile
+    from lib.transcript_digest import update_digest, render_digest
+
+    # Fold new transcript lines into the per-session digest and render it
+    # within the supervisor token budget
     transcript_context = ""
-    transcript_entries = []
+    transcript_entries_count = 0
     if transcript_path and os.path.isfile(transcript_path):
         try:
-            transcript_lines = []
-            with open(transcript_path, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        entry = json.loads(line)
-                        transcript_entries.append(entry)
-                        # Claude Code transcript format: check for message.role and message.content
-                        # or direct role/content keys
-                        if 'message' in entry:
-                            msg = entry['message']
-                            role = msg.get('role', 'unknown')
-                            content = msg.get('content', '')
-                            # content can be a list of blocks or a string
-                            if isinstance(content, list):
-                                # Extract text from content blocks
-                                text_parts = []
-                                for block in content:
-                                    if isinstance(block, dict) and block.get('type') == 'text':
-                                        text_parts.append(block.get('text', ''))
-                                    elif isinstance(block, str):
-                                        text_parts.append(block)
-                                content = ' '.join(text_parts)
-                            if content:
-                                transcript_lines.append(f"{role}: {content}")
-                        elif 'role' in entry and 'content' in entry:
-                            transcript_lines.append(f"{entry['role']}: {str(entry['content'])}")
-
-            if not transcript_lines:
+            recent_turns, context_tokens = _get_supervisor_context_limits()
+            digest = update_digest(session_id, transcript_path, recent_turns)
+            transcript_entries_count = digest['entries']
+            context = render_digest(digest, context_tokens)
+
+            if not context:
                 _log_supervisor_debug({
                     'event': 'transcript_parse_failed',
                     'transcript_path': transcript_path,
-                    'entries_count': len(transcript_entries),
-                    'sample_keys': list(transcript_entries[0].keys()) if transcript_entries else []
+                    'entries_count': transcript_entries_count,
                 })
-
-            if transcript_lines:
-                # Include full conversation context
-                full_context = "\n".join(transcript_lines)
-                transcript_context = f"\n\nFULL CONVERSATION CONTEXT:\n{full_context}"
+            else:
+                transcript_context = f"\n\nCONVERSATION CONTEXT:\n{context}"
 
         except Exception as e:
             _log_supervisor_debug({
@@ -379,7 +377,7 @@ CONTEXT:
         'continuation_count': continuation_count,
         'max_continuations': max_continuations,
         'transcript_path': transcript_path,
-        'transcript_entries_count': len(transcript_entries),
+        'transcript_entries_count': transcript_entries_count,
         'prompt': prompt
     })
 
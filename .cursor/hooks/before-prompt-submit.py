@@ -70,20 +70,15 @@ def main():
         # Create session directory using AGENTIZE_HOME fallback
         sess_dir = session_dir(makedirs=True)
 
-        session_file = os.path.join(sess_dir, f'{session_id}.json')
-        with open(session_file, 'w') as f:
-            logger(session_id, f"Writing state: {state}")
-            json.dump(state, f)
+        # Imported here: only workflow prompts touch the session store
+        from lib.session_store import put_session, set_issue_index
+        logger(session_id, f"Writing state: {state}")
+        put_session(session_id, state, sess_dir=sess_dir)
 
-        # Create issue index file if issue_no is present
+        # Create issue index entry if issue_no is present
         if issue_no is not None:
-            by_issue_dir = os.path.join(sess_dir, 'by-issue')
-            os.makedirs(by_issue_dir, exist_ok=True)
-            issue_index_file = os.path.join(by_issue_dir, f'{issue_no}.json')
-            with open(issue_index_file, 'w') as f:
-                index_data = {'session_id': session_id, 'workflow': state['workflow']}
-                logger(session_id, f"Writing issue index: {index_data}")
-                json.dump(index_data, f)
+            logger(session_id, f"Writing issue index: session_id={session_id}, issue_no={issue_no}")
+            set_issue_index(session_id, issue_no, state['workflow'], sess_dir=sess_dir)
         
         # Allow prompt to continue after processing workflow state
         print(json.dumps({"continue": True}))
@@ -20,6 +20,7 @@ if str(hooks_dir) not in sys.path:
 
 from lib.logger import logger
 from lib.session_utils import session_dir
+from lib.transcript import tail_lines
 from lib.workflow import get_continuation_prompt
 
 
@@ -48,47 +49,48 @@ def main():
     transcript_path = hook_input.get("transcript_path", "")
     if transcript_path and os.path.exists(transcript_path):
         try:
-            with open(transcript_path, 'r') as f:
-                lines = f.readlines()
-                if lines:
-                    last_line = lines[-1]
-                    last_entry = json.loads(last_line)
-                    if last_entry.get('isApiErrorMessage') and 'Insufficient credit' in str(
-                        last_entry.get('message', {}).get('content', [])
-                    ):
-                        logger(session_id, "Insufficient credits detected, stopping auto-continuation")
-                        print(json.dumps({"decision": "allow"}))
-                        sys.exit(0)
+            lines = tail_lines(transcript_path, 1, session_id)
+            if lines:
+                last_entry = json.loads(lines[-1])
+                if last_entry.get('isApiErrorMessage') and 'Insufficient credit' in str(
+                    last_entry.get('message', {}).get('content', [])
+                ):
+                    logger(session_id, "Insufficient credits detected, stopping auto-continuation")
+                    print(json.dumps({"decision": "allow"}))
+                    sys.exit(0)
         except (json.JSONDecodeError, Exception) as e:
             # If we can't parse the last entry, continue with normal flow
             logger(session_id, f"Could not parse last transcript entry: {e}")
 
-    # Check the file existence using AGENTIZE_HOME fallback
+    # Check the file existence using AGENTIZE_HOME fallback (the session
+    # store exports <session_id>.json for every session)
     sess_dir = session_dir()
     fname = os.path.join(sess_dir, f'{session_id}.json')
     if os.path.exists(fname):
         logger(session_id, f"Found existing state file: {fname}")
-        with open(fname, 'r') as f:
-            state = json.load(f)
-
-        # Check for done state first (takes priority over continuation_count)
-        workflow_state = state.get('state', 'initial')
-        if workflow_state == 'done':
-            logger(session_id, "State is 'done', stopping continuation")
-            print(json.dumps({"decision": "allow"}))
-            sys.exit(0)
+        from lib.session_store import get_session, update_session
 
         max_continuations = os.getenv('HANDSOFF_MAX_CONTINUATIONS', '10')
         max_continuations = int(max_continuations)
 
-        continuation_count = state.get('continuation_count', 0)
-        if continuation_count >= max_continuations:
-            logger(session_id, f"Max continuations ({max_continuations}) reached, stopping continuation")
+        def stop_reason(current):
+            if current is None:
+                return "Session state not found, stopping continuation"
+            # Check for done state first (takes priority over continuation_count)
+            if current.get('state', 'initial') == 'done':
+                return "State is 'done', stopping continuation"
+            if current.get('continuation_count', 0) >= max_continuations:
+                return f"Max continuations ({max_continuations}) reached, stopping continuation"
+            return None
+
+        state = get_session(session_id, sess_dir=sess_dir)
+        reason = stop_reason(state)
+        if reason:
+            logger(session_id, reason)
             print(json.dumps({"decision": "allow"}))
             sys.exit(0)
-        else:
-            state['continuation_count'] = continuation_count + 1
-            workflow = state.get('workflow', '')
+        continuation_count = state.get('continuation_count', 0)
+        workflow = state.get('workflow', '')
 
         # Get continuation prompt from centralized workflow module
         pr_no = state.get('pr_no', 'unknown')
@@ -103,9 +105,24 @@ def main():
         )
 
         if prompt:
-            with open(fname, 'w') as f:
-                logger(session_id, f"Updating state for continuation: {state}")
-                json.dump(state, f)
+            claim_failure = []
+
+            def claim_continuation(current):
+                reason = stop_reason(current)
+                if reason:
+                    claim_failure.append(reason)
+                    return None
+                return {**current, 'continuation_count': current.get('continuation_count', 0) + 1}
+
+            # Spend a continuation only once a prompt will block the stop. The
+            # check and increment are one atomic read-modify-write, so a concurrent
+            # update (server pr_number, agent marking done) is not lost.
+            claimed = update_session(session_id, claim_continuation, sess_dir=sess_dir)
+            if claimed is None:
+                logger(session_id, claim_failure[0] if claim_failure else "Session not updated, stopping continuation")
+                print(json.dumps({"decision": "allow"}))
+                sys.exit(0)
+            logger(session_id, f"Updated state for continuation: {claimed}")
             # NOTE: `dumps` is REQUIRED or Cursor will just ignore your output!
             print(json.dumps({
                 'decision': 'block',
@@ -201,6 +201,22 @@ def handle_usage(args: argparse.Namespace) -> int:
     return 0
 
 
+def handle_suggest_rules(args: argparse.Namespace) -> int:
+    """Handle suggest-rules command."""
+    # Imported here: rule_suggest extends sys.path for the plugin lib, which
+    # no other lol command needs
+    from agentize import rule_suggest
+
+    argv = []
+    if args.min_count is not None:
+        argv += ["--min-count", str(args.min_count)]
+    if args.log:
+        argv += ["--log", args.log]
+    if args.yaml:
+        argv.append("--yaml")
+    return rule_suggest.main(argv)
+
+
 def main() -> int:
     """Main entry point."""
     try:
@@ -336,6 +352,19 @@ def main() -> int:
         help="Issue number to publish the report when approved",
     )
 
+    # suggest-rules command
+    suggest_rules_parser = subparsers.add_parser(
+        "suggest-rules", help="Suggest permission rules from the decision log"
+    )
+    suggest_rules_parser.add_argument("--log", help="Path to permission.txt")
+    suggest_rules_parser.add_argument(
+        "--min-count", type=int,
+        help="Minimum verdicts a rule must cover (default: 3)",
+    )
+    suggest_rules_parser.add_argument(
+        "--yaml", action="store_true", help="Print a permissions: YAML block"
+    )
+
     # version command
     subparsers.add_parser("version", help="Display version information")
 
@@ -357,6 +386,8 @@ def main() -> int:
         return handle_serve(args, agentize_home)
     elif args.command == "usage":
         return handle_usage(args)
+    elif args.command == "suggest-rules":
+        return handle_suggest_rules(args)
     elif args.command == "plan":
         return handle_plan(args, agentize_home)
     elif args.command == "claude-clean":
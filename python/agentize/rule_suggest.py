@@ -0,0 +1,308 @@
+"""
+Permission rule suggestions mined from the permission decision log.
+
+Parses `permission.txt` (written by lib.logger.log_tool_decision when debug
+logging is enabled), clusters slow-path Bash verdicts (Haiku and Telegram) by
+normalized command prefix, and proposes minimal regex allow/deny rules with
+coverage statistics. Suggestions can be emitted as a `permissions:` YAML block
+for `.agentize.local.yaml`, moving common cases onto the fast rule path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Add .claude-plugin to path for lib imports
+_repo_root = Path(__file__).resolve().parents[2]
+_plugin_dir = _repo_root / ".claude-plugin"
+if str(_plugin_dir) not in sys.path:
+    sys.path.insert(0, str(_plugin_dir))
+
+from lib.permission.strips import command_template
+
+
+# Decision sources that reach the slow path and are worth turning into rules
+SLOW_PATH_SOURCES = ("haiku", "haiku-cache", "telegram")
+DEFAULT_MIN_COUNT = 3
+DEFAULT_MAX_DEPTH = 3
+
+# [time] [session] [workflow] [source] [decision] tool | target
+_LOG_LINE_RE = re.compile(
+    r"^\[([^\]]*)\] \[([^\]]*)\] \[([^\]]*)\] \[([^\]]*)\] \[([^\]]*)\] (\S+) \| (.*)$"
+)
+# Prefix words are literal command words or options, not placeholders or shell syntax
+_PREFIX_WORD_RE = re.compile(r"^-{0,2}\w[\w.:@+=-]*$")
+# Regex metacharacters that can appear in prefix words (re.escape also escapes '-')
+_REGEX_SPECIAL_RE = re.compile(r"([.+])")
+# Consecutive identical entries closer than this are one decision logged twice
+_DUPLICATE_WINDOW_SEC = 2.0
+
+# Command heads an allow rule must never cover wholesale: destructive or
+# network commands, and interpreters or tools that run code from their arguments
+_RISKY_ALLOW_HEADS = frozenset({
+    "rm", "mv", "cp", "dd", "chmod", "chown", "sudo", "su", "kill", "pkill",
+    "curl", "wget", "ssh", "scp", "rsync", "eval", "exec", "source", "env",
+    "xargs", "bash", "sh", "zsh",
+    "python", "python2", "python3", "node", "deno", "perl", "ruby", "php", "lua",
+    "awk", "gawk", "sed", "find",
+})
+
+
+@dataclass
+class LogRecord:
+    """One decision from permission.txt."""
+
+    session: str
+    workflow: str
+    source: str
+    decision: str
+    tool: str
+    target: str
+
+
+@dataclass
+class RuleSuggestion:
+    """A proposed permission rule and the log entries it covers."""
+
+    decision: str
+    pattern: str
+    prefix: tuple[str, ...]
+    count: int
+    commands: int
+    sources: dict[str, int] = field(default_factory=dict)
+    examples: list[str] = field(default_factory=list)
+
+
+def default_log_path() -> Path:
+    """Return the unified permission log path under AGENTIZE_HOME."""
+    base = os.getenv("AGENTIZE_HOME", "").strip() or "."
+    return Path(base) / ".tmp" / "hooked-sessions" / "permission.txt"
+
+
+def parse_permission_log(path: Path) -> list[LogRecord]:
+    """Parse permission.txt into records.
+
+    Lines that do not match the log format are skipped. A line repeating the
+    previous one within a couple of seconds is dropped: the Haiku and Telegram
+    stages log their verdict and determine() logs the final decision again.
+    """
+    records: list[LogRecord] = []
+    previous: Optional[tuple] = None
+    previous_time: Optional[datetime] = None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = _LOG_LINE_RE.match(line.rstrip("\n"))
+            if not match:
+                continue
+            key = match.groups()[1:]
+            try:
+                logged_at: Optional[datetime] = datetime.fromisoformat(match.group(1))
+            except ValueError:
+                logged_at = None
+            duplicate = (
+                key == previous
+                and logged_at is not None
+                and previous_time is not None
+                and abs((logged_at - previous_time).total_seconds()) <= _DUPLICATE_WINDOW_SEC
+            )
+            previous, previous_time = key, logged_at
+            if duplicate:
+                continue
+            session, workflow, source, decision, tool, target = key
+            records.append(LogRecord(session, workflow, source, decision, tool, target))
+    return records
+
+
+def command_prefix(command: str, max_depth: int = DEFAULT_MAX_DEPTH) -> tuple[str, ...]:
+    """Return the literal leading words of a command's template.
+
+    Stops at the first placeholder (path, number, quoted literal) or shell
+    metacharacter, so `git log --oneline -20 src/` gives ('git', 'log', '--oneline').
+    """
+    words = []
+    for word in command_template(command).split():
+        if len(words) >= max_depth or not _PREFIX_WORD_RE.match(word):
+            break
+        words.append(word)
+    return tuple(words)
+
+
+def prefix_pattern(prefix: tuple[str, ...]) -> str:
+    """Build the rule regex for a command prefix, e.g. `^make\\s+docs(\\s|$)`."""
+    return "^" + r"\s+".join(_REGEX_SPECIAL_RE.sub(r"\\\1", word) for word in prefix) + r"(\s|$)"
+
+
+def suggest_rules(
+    records: list[LogRecord],
+    min_count: int = DEFAULT_MIN_COUNT,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+) -> list[RuleSuggestion]:
+    """Propose the shortest unanimous command prefixes as allow/deny rules.
+
+    Only Bash allow/deny verdicts from SLOW_PATH_SOURCES are considered. A
+    prefix qualifies when every verdict under it agrees and it covers at least
+    min_count verdicts; once a prefix is chosen its longer prefixes are not
+    proposed. Allow prefixes must also be closed: no command under them had
+    more literal words, so allow rules only widen over paths, numbers and
+    quoted literals (`make docs` never widens to `^make`). Deny prefixes may
+    widen freely. Risky heads such as `rm`, `curl` or `python3` are never
+    allowed, nor is a prefix that some command continued with a quoted
+    literal (`cmd -c <str>`), since the literal may be a program.
+
+    Args:
+        records: Parsed log records
+        min_count: Minimum verdicts a rule must cover
+        max_depth: Maximum prefix length in words
+
+    Returns:
+        Suggestions ordered by coverage (largest first)
+    """
+    decisions: dict[tuple[str, ...], Counter] = defaultdict(Counter)
+    sources: dict[tuple[str, ...], Counter] = defaultdict(Counter)
+    commands: dict[tuple[str, ...], Counter] = defaultdict(Counter)
+    deeper: Counter = Counter()
+    quoted_next: Counter = Counter()
+
+    for record in records:
+        if record.tool != "Bash" or record.source not in SLOW_PATH_SOURCES:
+            continue
+        if record.decision not in ("allow", "deny"):
+            continue
+        prefix = command_prefix(record.target, max_depth)
+        words = command_template(record.target).split()
+        if len(words) > len(prefix) and "<str>" in words[len(prefix)]:
+            quoted_next[prefix] += 1
+        for depth in range(1, len(prefix) + 1):
+            node = prefix[:depth]
+            decisions[node][record.decision] += 1
+            sources[node][record.source] += 1
+            commands[node][record.target] += 1
+            if depth < len(prefix):
+                deeper[node] += 1
+
+    chosen: list[RuleSuggestion] = []
+    chosen_prefixes: set[tuple[str, ...]] = set()
+    for node in sorted(decisions, key=lambda p: (len(p), -sum(decisions[p].values()), p)):
+        if any(node[:depth] in chosen_prefixes for depth in range(1, len(node))):
+            continue
+        counts = decisions[node]
+        if len(counts) != 1:
+            continue
+        decision, count = next(iter(counts.items()))
+        if count < min_count:
+            continue
+        if decision == "allow" and (deeper[node] or quoted_next[node] or node[0] in _RISKY_ALLOW_HEADS):
+            continue
+        chosen_prefixes.add(node)
+        chosen.append(RuleSuggestion(
+            decision=decision,
+            pattern=prefix_pattern(node),
+            prefix=node,
+            count=count,
+            commands=len(commands[node]),
+            sources=dict(sources[node]),
+            examples=[cmd for cmd, _ in commands[node].most_common(3)],
+        ))
+
+    chosen.sort(key=lambda s: (-s.count, s.pattern))
+    return chosen
+
+
+def format_report(suggestions: list[RuleSuggestion], records: list[LogRecord]) -> str:
+    """Format suggestions as a coverage table."""
+    slow = sum(
+        1 for r in records
+        if r.tool == "Bash" and r.source in SLOW_PATH_SOURCES and r.decision in ("allow", "deny")
+    )
+    covered = sum(s.count for s in suggestions)
+    lines = [
+        f"Slow-path Bash verdicts: {slow}",
+        f"Covered by suggestions: {covered} ({100.0 * covered / slow if slow else 0.0:.1f}%)",
+        "",
+    ]
+    if not suggestions:
+        lines.append("No rule suggestions (try a lower --min-count).")
+        return "\n".join(lines)
+
+    lines.append(f"{'Decision':<9}{'Count':>7}{'Cmds':>6}{'Share':>8}  {'Pattern':<36}Sources")
+    for s in suggestions:
+        share = 100.0 * s.count / slow if slow else 0.0
+        source_text = ", ".join(f"{k}={v}" for k, v in sorted(s.sources.items()))
+        lines.append(
+            f"{s.decision:<9}{s.count:>7}{s.commands:>6}{share:>7.1f}%  {s.pattern:<36}{source_text}"
+        )
+        for example in s.examples:
+            lines.append(f"{'':<32}e.g. {example[:100]}")
+    return "\n".join(lines)
+
+
+def format_yaml(suggestions: list[RuleSuggestion]) -> str:
+    """Format suggestions as a `permissions:` block for .agentize.local.yaml."""
+    lines = ["permissions:"]
+    for decision in ("allow", "deny"):
+        group = [s for s in suggestions if s.decision == decision]
+        if not group:
+            continue
+        lines.append(f"  {decision}:")
+        for s in group:
+            # Single-quoted YAML keeps regex backslashes literal
+            quoted = s.pattern.replace("'", "''")
+            lines.append(f"    - '{quoted}'  # {s.count} verdicts, {s.commands} commands")
+    if len(lines) == 1:
+        lines.append("  allow: []")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point for python -m agentize.rule_suggest."""
+    parser = argparse.ArgumentParser(
+        prog="suggest-rules",
+        description="Suggest permission rules from the permission decision log"
+    )
+    parser.add_argument(
+        "--log",
+        type=Path,
+        default=None,
+        help="Path to permission.txt (default: $AGENTIZE_HOME/.tmp/hooked-sessions/permission.txt)"
+    )
+    parser.add_argument(
+        "--min-count",
+        type=int,
+        default=DEFAULT_MIN_COUNT,
+        help=f"Minimum verdicts a rule must cover (default: {DEFAULT_MIN_COUNT})"
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=DEFAULT_MAX_DEPTH,
+        help=f"Maximum command prefix length in words (default: {DEFAULT_MAX_DEPTH})"
+    )
+    parser.add_argument(
+        "--yaml",
+        action="store_true",
+        help="Print a permissions: YAML block instead of the coverage report"
+    )
+
+    args = parser.parse_args(argv)
+    log_path = args.log or default_log_path()
+    if not log_path.is_file():
+        print(f"Permission log not found: {log_path}", file=sys.stderr)
+        print("Enable handsoff.debug in .agentize.local.yaml to record decisions.", file=sys.stderr)
+        return 1
+
+    records = parse_permission_log(log_path)
+    suggestions = suggest_rules(records, min_count=args.min_count, max_depth=args.max_depth)
+    print(format_yaml(suggestions) if args.yaml else format_report(suggestions, records))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
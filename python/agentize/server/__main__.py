@@ -9,10 +9,15 @@ import os
 import signal
 import sys
 import time
+from typing import Callable, Optional
 
 # Re-export all public functions from submodules for backward compatibility
 # (tests import from agentize.server.__main__)
-from agentize.server.log import _log
+from agentize.server.log import _log, configure_log_file, configure_log_source
+from agentize.server.conflicts import ConflictPredictor
+from agentize.server.labels import fetch_issue_labels, clear_label_cache
+from agentize.server.mergeability import MergeabilityResolver, query_mergeable
+from agentize.server.review_threads import fetch_review_thread_states
 from agentize.server.notify import (
     parse_period,
     send_telegram_message,
@@ -27,8 +32,10 @@ from agentize.server.session import (
     _load_issue_index,
     _load_session_state,
     _get_session_state_for_issue,
+    _get_session_states_for_issues,
     _remove_issue_index,
     set_pr_number_for_issue,
+    prune_finished_sessions,
 )
 from agentize.server.github import (
     load_config,
@@ -49,6 +56,7 @@ from agentize.server.github import (
     filter_ready_review_prs,
     ISSUE_STATUS_QUERY,
     _project_id_cache,
+    _coerce_bool,
 )
 from agentize.server.workers import (
     worktree_exists,
@@ -64,6 +72,7 @@ from agentize.server.workers import (
     check_worker_liveness,
     cleanup_dead_workers,
     _check_issue_has_label,
+    _fetch_labels_for_cleanup,
     _cleanup_refinement,
     _cleanup_feat_request,
     _cleanup_review_resolution,
@@ -93,15 +102,83 @@ def _resolve_tg_credentials() -> tuple[str, str]:
     return cfg_token, cfg_chat_id
 
 
+def _dispatch_pr_rebases(
+    conflicting_pr_numbers: list[int],
+    candidate_prs: list[dict],
+    num_workers: int,
+    token: str,
+    chat_id: str,
+    repo_slug: Optional[str],
+) -> None:
+    """Assign rebase workers to conflicting PRs.
+
+    Used by the poll cycle and for PRs the MergeabilityResolver finds
+    CONFLICTING between polls.
+
+    Args:
+        conflicting_pr_numbers: PR numbers from filter_conflicting_prs()
+        candidate_prs: PR metadata dicts the numbers were selected from
+        num_workers: Maximum concurrent workers (0 = unlimited)
+        token: Telegram Bot API token ('' when not configured)
+        chat_id: Telegram chat ID ('' when not configured)
+        repo_slug: owner/repo for PR links (optional)
+    """
+    for pr_no in conflicting_pr_numbers:
+        # Resolve issue number for worker tracking
+        pr_metadata = next((p for p in candidate_prs if p.get('number') == pr_no), None)
+        if not pr_metadata:
+            continue
+
+        issue_no = resolve_issue_from_pr(pr_metadata)
+        if not issue_no:
+            _log(f"PR #{pr_no}: could not resolve issue number, skipping", level="WARNING")
+            continue
+
+        # Check if worktree already exists
+        if not worktree_exists(issue_no):
+            _log(f"PR #{pr_no} (issue #{issue_no}): worktree does not exist, skipping rebase", level="WARNING")
+            continue
+
+        # Worker assignment and rebase (follows existing pattern)
+        if num_workers > 0:
+            worker_id = get_free_worker(num_workers)
+            if worker_id is None:
+                print(f"All {num_workers} workers busy, waiting for next poll")
+                break
+
+            write_worker_status(worker_id, 'BUSY', issue_no, None)
+            success, pid = rebase_worktree(pr_no, issue_no)
+            if success:
+                write_worker_status(worker_id, 'BUSY', issue_no, pid)
+                print(f"PR #{pr_no} (issue #{issue_no}) rebase assigned to worker {worker_id}")
+
+                if token and chat_id:
+                    pr_url = f"https://github.com/{repo_slug}/pull/{pr_no}" if repo_slug else None
+                    msg = f"🔄 PR rebase started: <a href=\"{pr_url}\">#{pr_no}</a> (issue #{issue_no})" if pr_url else f"🔄 PR rebase started: #{pr_no} (issue #{issue_no})"
+                    send_telegram_message(token, chat_id, msg)
+            else:
+                write_worker_status(worker_id, 'FREE', None, None)
+                _log(f"Failed to rebase PR #{pr_no}", level="ERROR")
+        else:
+            # Unlimited workers mode
+            success, _ = rebase_worktree(pr_no, issue_no)
+            if not success:
+                _log(f"Failed to rebase PR #{pr_no}", level="ERROR")
+
+
 def run_server(
     period: int,
-    num_workers: int = 5
+    num_workers: int = 5,
+    session_ttl_days: float = 7,
+    predict_conflicts: bool = False
 ) -> None:
     """Main polling loop.
 
     Args:
         period: Polling interval in seconds
         num_workers: Maximum concurrent workers (0 = unlimited)
+        session_ttl_days: Prune finished handsoff sessions older than this (0 = keep)
+        predict_conflicts: Predict PR conflicts locally with a mirror and git merge-tree
 
     Telegram credentials are loaded from .agentize.local.yaml only.
     """
@@ -134,18 +211,42 @@ def run_server(
     else:
         print("Telegram notification skipped (no credentials configured)")
 
+    # Predicts conflicts from a local mirror as soon as a base branch advances
+    predictor = None
+    if predict_conflicts:
+        if remote_url:
+            predictor = ConflictPredictor(remote_url)
+        else:
+            _log("server.predict_conflicts needs a remote_url; conflict prediction disabled", level="WARNING")
+
+    # Re-queries UNKNOWN-mergeability PRs between polls
+    resolver = MergeabilityResolver()
+
+    def dispatch_resolved(prs: list[dict]) -> None:
+        try:
+            owner, repo = get_repo_owner_name()
+            pr_project_id = lookup_project_graphql_id(org, project_id)
+            conflicting_pr_numbers = filter_conflicting_prs(prs, owner, repo, pr_project_id)
+            _dispatch_pr_rebases(conflicting_pr_numbers, prs, num_workers, token, chat_id, repo_slug)
+        except RuntimeError as e:
+            _log(f"Failed to process resolved PRs: {e}", level="ERROR")
+
     # Setup signal handler for graceful shutdown
     running = [True]
 
     def signal_handler(signum, frame):
         print("\nShutting down...")
         running[0] = False
+        resolver.wake()
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
     while running[0]:
         try:
+            # Labels are cached for one poll cycle
+            clear_label_cache()
+
             # Clean up dead workers before polling
             if num_workers > 0:
                 cleanup_dead_workers(
@@ -156,6 +257,12 @@ def run_server(
                     session_dir=session_dir
                 )
 
+            # Drop finished sessions past their TTL (after completion notifications)
+            if session_ttl_days > 0:
+                pruned = prune_finished_sessions(session_ttl_days * 86400, session_dir)
+                if pruned:
+                    _log(f"Pruned {pruned} finished session(s) older than {session_ttl_days}d")
+
             items = query_project_items(org, project_id)
             ready_issues = filter_ready_issues(items)
 
@@ -269,49 +376,20 @@ def run_server(
                 owner, repo = get_repo_owner_name()
                 pr_project_id = lookup_project_graphql_id(org, project_id)
                 candidate_prs = discover_candidate_prs(owner, repo)
-                conflicting_pr_numbers = filter_conflicting_prs(candidate_prs, owner, repo, pr_project_id)
 
-                for pr_no in conflicting_pr_numbers:
-                    # Resolve issue number for worker tracking
-                    pr_metadata = next((p for p in candidate_prs if p.get('number') == pr_no), None)
-                    if not pr_metadata:
-                        continue
+                # Treat locally predicted conflicts like GitHub-reported ones
+                if predictor is not None:
+                    predicted = {p['number']: p for p in predictor.predict(candidate_prs)}
+                    candidate_prs = [predicted.get(p.get('number'), p) for p in candidate_prs]
 
-                    issue_no = resolve_issue_from_pr(pr_metadata)
-                    if not issue_no:
-                        _log(f"PR #{pr_no}: could not resolve issue number, skipping", level="WARNING")
-                        continue
-
-                    # Check if worktree already exists
-                    if not worktree_exists(issue_no):
-                        _log(f"PR #{pr_no} (issue #{issue_no}): worktree does not exist, skipping rebase", level="WARNING")
-                        continue
-
-                    # Worker assignment and rebase (follows existing pattern)
-                    if num_workers > 0:
-                        worker_id = get_free_worker(num_workers)
-                        if worker_id is None:
-                            print(f"All {num_workers} workers busy, waiting for next poll")
-                            break
+                conflicting_pr_numbers = filter_conflicting_prs(candidate_prs, owner, repo, pr_project_id)
 
-                        write_worker_status(worker_id, 'BUSY', issue_no, None)
-                        success, pid = rebase_worktree(pr_no, issue_no)
-                        if success:
-                            write_worker_status(worker_id, 'BUSY', issue_no, pid)
-                            print(f"PR #{pr_no} (issue #{issue_no}) rebase assigned to worker {worker_id}")
+                _dispatch_pr_rebases(conflicting_pr_numbers, candidate_prs, num_workers, token, chat_id, repo_slug)
 
-                            if token and chat_id:
-                                pr_url = f"https://github.com/{repo_slug}/pull/{pr_no}" if repo_slug else None
-                                msg = f"🔄 PR rebase started: <a href=\"{pr_url}\">#{pr_no}</a> (issue #{issue_no})" if pr_url else f"🔄 PR rebase started: #{pr_no} (issue #{issue_no})"
-                                send_telegram_message(token, chat_id, msg)
-                        else:
-                            write_worker_status(worker_id, 'FREE', None, None)
-                            _log(f"Failed to rebase PR #{pr_no}", level="ERROR")
-                    else:
-                        # Unlimited workers mode
-                        success, _ = rebase_worktree(pr_no, issue_no)
-                        if not success:
-                            _log(f"Failed to rebase PR #{pr_no}", level="ERROR")
+                # Resolve UNKNOWN PRs in the background instead of waiting a full period
+                unknown_prs = [p for p in candidate_prs if p.get('mergeable') == 'UNKNOWN']
+                if unknown_prs:
+                    resolver.submit(owner, repo, unknown_prs)
             except RuntimeError as e:
                 _log(f"Failed to process conflicting PRs: {e}", level="ERROR")
 
@@ -356,20 +434,46 @@ def run_server(
             except RuntimeError as e:
                 _log(f"Failed to process review resolution: {e}", level="ERROR")
 
-            if running[0]:
-                time.sleep(period)
+            _wait_for_next_poll(period, resolver, running, dispatch_resolved)
 
         except Exception as e:
             _log(f"Error during poll: {e}", level="ERROR")
-            if running[0]:
-                time.sleep(period)
+            _wait_for_next_poll(period, resolver, running, dispatch_resolved)
+
+    resolver.stop()
+
+
+def _wait_for_next_poll(
+    period: int,
+    resolver: MergeabilityResolver,
+    running: list[bool],
+    dispatch: Callable[[list[dict]], None],
+) -> None:
+    """Sleep until the next poll, dispatching PRs the resolver finds CONFLICTING meanwhile.
+
+    Args:
+        period: Polling interval in seconds
+        resolver: Mergeability resolver for UNKNOWN PRs
+        running: Shutdown flag set by the signal handler
+        dispatch: Called with the resolved PR dicts
+    """
+    deadline = time.monotonic() + period
+    while running[0]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if resolver.wait(remaining):
+            resolved = resolver.drain()
+            if resolved and running[0]:
+                dispatch(resolved)
 
 
 def main() -> None:
     """Entry point.
 
-    Configuration is YAML-only: server.period and server.num_workers
-    are read from .agentize.local.yaml. CLI flags are no longer accepted.
+    Configuration is YAML-only: server.period, server.num_workers,
+    server.session_ttl_days and server.predict_conflicts are read from
+    .agentize.local.yaml. CLI flags are no longer accepted.
     """
     # Reject any CLI arguments - configuration is YAML-only
     if len(sys.argv) > 1:
@@ -389,6 +493,8 @@ def main() -> None:
     # Apply precedence: YAML > default (no CLI)
     period = resolve_precedence(None, None, server_config.get("period"), "5m")
     num_workers = resolve_precedence(None, None, server_config.get("num_workers"), 5)
+    session_ttl_days = resolve_precedence(None, None, server_config.get("session_ttl_days"), 7)
+    predict_conflicts = _coerce_bool(server_config.get("predict_conflicts"), False)
 
     try:
         period_seconds = parse_period(period)
@@ -396,7 +502,17 @@ def main() -> None:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    run_server(period_seconds, num_workers)
+    # Optional structured log file (JSON lines, written off the poll thread)
+    configure_log_file(server_config.get("log_file"))
+    configure_log_source(_coerce_bool(server_config.get("log_source"), False))
+
+    try:
+        session_ttl_days = float(session_ttl_days)
+    except (TypeError, ValueError):
+        print(f"Error: invalid server.session_ttl_days: {session_ttl_days!r}", file=sys.stderr)
+        sys.exit(1)
+
+    run_server(period_seconds, num_workers, session_ttl_days, predict_conflicts)
 
 
 if __name__ == '__main__':
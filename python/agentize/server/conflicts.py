@@ -0,0 +1,209 @@
+"""Local merge-conflict prediction for agentize PRs.
+
+GitHub only reports a conflict through a PR's `mergeable` field, some time
+after the base branch moves (and the field may sit at UNKNOWN for a while).
+ConflictPredictor keeps a bare mirror of the repository, fetched
+incrementally each poll, and when a base branch tip advances it runs
+`git merge-tree --write-tree` for the open PRs on that base. Only PRs whose
+changed paths overlap the paths changed by the new base commits are checked:
+a PR that touches none of them cannot have gained a conflict.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from agentize.server.log import _log
+
+# Concurrent `git merge-tree` processes per prediction round
+MAX_PARALLEL_CHECKS = 4
+
+
+def _resolve_mirror_dir(base_dir: Optional[str] = None) -> Path:
+    """Returns the mirror directory using AGENTIZE_HOME fallback.
+
+    Args:
+        base_dir: Optional base directory override. If None, uses AGENTIZE_HOME or '.'
+
+    Returns:
+        Path to the bare mirror repository
+    """
+    base = base_dir or os.getenv('AGENTIZE_HOME', '.')
+    return Path(base) / '.tmp' / 'mirror.git'
+
+
+class ConflictPredictor:
+    """Predict which PRs conflict with a base branch that just advanced.
+
+    Usage (one predictor per server):
+
+        predicted = predictor.predict(discover_candidate_prs(owner, repo))
+        # PR dicts with mergeable == "CONFLICTING"
+
+    The first call for a base branch only records its tip; later calls
+    check the PRs affected by the commits since then.
+    """
+
+    def __init__(
+        self,
+        remote_url: str,
+        mirror_dir: Optional[str] = None,
+        max_parallel: int = MAX_PARALLEL_CHECKS,
+    ):
+        self.remote_url = remote_url
+        self.mirror_dir = Path(mirror_dir) if mirror_dir else _resolve_mirror_dir()
+        self.max_parallel = max_parallel
+        # base branch -> tip SHA at the last prediction
+        self._base_tips: dict[str, str] = {}
+        # PR head SHA -> paths the PR changes relative to its merge base
+        self._pr_paths: dict[str, frozenset[str]] = {}
+
+    def _git(self, *args: str, input: Optional[str] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ['git', '--git-dir', str(self.mirror_dir), *args],
+            capture_output=True, text=True, input=input
+        )
+
+    def _ensure_mirror(self) -> bool:
+        if (self.mirror_dir / 'HEAD').exists():
+            return True
+        self.mirror_dir.parent.mkdir(parents=True, exist_ok=True)
+        result = subprocess.run(
+            ['git', 'init', '--bare', '--quiet', str(self.mirror_dir)],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            _log(f"Failed to create mirror {self.mirror_dir}: {result.stderr.strip()}", level="ERROR")
+            return False
+        _log(f"Created repository mirror at {self.mirror_dir}")
+        return True
+
+    def _missing_commits(self, shas: list[str]) -> set[str]:
+        """SHAs not yet in the mirror (one `git cat-file --batch-check`)."""
+        if not shas:
+            return set()
+        result = self._git('cat-file', '--batch-check', input='\n'.join(shas) + '\n')
+        return {line.split()[0] for line in result.stdout.splitlines() if line.endswith(' missing')}
+
+    def fetch(self, bases: list[str], prs: list[dict]) -> bool:
+        """Fetch base branches and the heads of PRs the mirror lacks, in one request.
+
+        Returns:
+            True if the fetch succeeded
+        """
+        if not self._ensure_mirror():
+            return False
+        missing = self._missing_commits([pr['headRefOid'] for pr in prs])
+        refspecs = [f'+refs/heads/{base}:refs/heads/{base}' for base in bases]
+        refspecs += [
+            f"+refs/pull/{pr['number']}/head:refs/pull/{pr['number']}/head"
+            for pr in prs if pr['headRefOid'] in missing
+        ]
+        result = self._git('fetch', '--quiet', '--no-tags', self.remote_url, *refspecs)
+        if result.returncode != 0:
+            _log(f"Mirror fetch failed: {result.stderr.strip()}", level="ERROR")
+            return False
+        return True
+
+    def _rev_parse(self, ref: str) -> Optional[str]:
+        result = self._git('rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}')
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _changed_paths(self, *diff_args: str) -> Optional[frozenset[str]]:
+        result = self._git('diff', '--name-only', '--no-renames', *diff_args)
+        if result.returncode != 0:
+            return None
+        return frozenset(line for line in result.stdout.splitlines() if line)
+
+    def _paths_for_pr(self, base_tip: str, head: str) -> Optional[frozenset[str]]:
+        """Paths the PR changes since its merge base, cached per head SHA.
+
+        The merge base only moves when the PR is rebased, which changes the
+        head SHA, so the cache needs no other key.
+        """
+        if head not in self._pr_paths:
+            paths = self._changed_paths(f'{base_tip}...{head}')
+            if paths is None:
+                return None
+            self._pr_paths[head] = paths
+        return self._pr_paths[head]
+
+    def merge_conflicts(self, base_tip: str, head: str) -> Optional[bool]:
+        """Run `git merge-tree --write-tree` for one PR head.
+
+        Returns:
+            True on conflict, False if the merge is clean, None on error
+            (e.g. git older than 2.38)
+        """
+        result = self._git('merge-tree', '--write-tree', '--name-only', '--no-messages', base_tip, head)
+        if result.returncode == 0:
+            return False
+        if result.returncode == 1:
+            return True
+        _log(f"git merge-tree failed for {head[:12]}: {result.stderr.strip()}", level="ERROR")
+        return None
+
+    def predict(self, prs: list[dict]) -> list[dict]:
+        """Return PRs predicted to conflict with base tips that moved since the last call.
+
+        Args:
+            prs: PR metadata dicts from discover_candidate_prs() (needs
+                number, headRefOid and baseRefName)
+
+        Returns:
+            Copies of the predicted PR dicts with mergeable set to
+            "CONFLICTING". PRs GitHub already reports as CONFLICTING are
+            left to the regular path.
+        """
+        prs = [pr for pr in prs if pr.get('number') is not None and pr.get('headRefOid') and pr.get('baseRefName')]
+        by_base: dict[str, list[dict]] = {}
+        for pr in prs:
+            by_base.setdefault(pr['baseRefName'], []).append(pr)
+        if not by_base or not self.fetch(sorted(by_base), prs):
+            return []
+
+        checks: list[tuple[dict, str]] = []
+        for base, base_prs in by_base.items():
+            tip = self._rev_parse(f'refs/heads/{base}')
+            previous = self._base_tips.get(base)
+            if tip is None or tip == previous:
+                continue
+            self._base_tips[base] = tip
+            if previous is None:
+                continue
+            base_paths = self._changed_paths(previous, tip)
+            if base_paths is None:
+                continue
+
+            # path -> PR numbers touching it, for the PRs on this base
+            index: dict[str, set[int]] = {}
+            for pr in base_prs:
+                if pr.get('mergeable') == 'CONFLICTING':
+                    continue
+                for path in self._paths_for_pr(tip, pr['headRefOid']) or ():
+                    index.setdefault(path, set()).add(pr['number'])
+            affected = set().union(*(index.get(path, set()) for path in base_paths))
+            checks += [(pr, tip) for pr in base_prs if pr['number'] in affected]
+            _log(f"Base {base} advanced to {tip[:12]}: {len(base_paths)} path(s) changed, "
+                 f"checking {len(affected)} of {len(base_prs)} PR(s)")
+
+        # Drop paths of heads that are no longer open
+        live_heads = {pr['headRefOid'] for pr in prs}
+        for head in [h for h in self._pr_paths if h not in live_heads]:
+            del self._pr_paths[head]
+
+        if not checks:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, self.max_parallel)) as pool:
+            results = list(pool.map(lambda check: self.merge_conflicts(check[1], check[0]['headRefOid']), checks))
+
+        predicted = []
+        for (pr, tip), conflicts in zip(checks, results):
+            if conflicts:
+                _log(f"PR #{pr['number']}: predicted conflict with {pr['baseRefName']}@{tip[:12]}")
+                predicted.append({**pr, 'mergeable': 'CONFLICTING'})
+        return predicted
@@ -10,7 +10,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
+from agentize.server.labels import fetch_issue_labels
 from agentize.server.log import _log
+from agentize.server.review_threads import fetch_review_thread_states, scan_review_threads
 from agentize.server.runtime_config import load_runtime_config
 
 
@@ -430,14 +432,16 @@ def discover_candidate_prs(owner: str, repo: str) -> list[dict]:
     """Discover open PRs with agentize:pr label.
 
     Returns:
-        List of PR metadata dicts with number, headRefName, mergeable fields.
+        List of PR metadata dicts with number, headRefName, headRefOid,
+        baseRefName, updatedAt, mergeable, body and closingIssuesReferences
+        fields.
     """
     result = subprocess.run(
         ['gh', 'pr', 'list',
          '-R', f'{owner}/{repo}',
          '--label', 'agentize:pr',
          '--state', 'open',
-         '--json', 'number,headRefName,mergeable,body,closingIssuesReferences'],
+         '--json', 'number,headRefName,headRefOid,baseRefName,updatedAt,mergeable,body,closingIssuesReferences'],
         capture_output=True, text=True
     )
 
@@ -471,7 +475,7 @@ def filter_conflicting_prs(prs: list[dict], owner: str, repo: str, project_id: s
     - Resolved issue does not have Status == "Rebasing"
 
     Skips PRs with:
-    - mergeable == "UNKNOWN" (retry on next poll)
+    - mergeable == "UNKNOWN" (run_server hands these to the MergeabilityResolver)
     - Status == "Rebasing" (already being processed)
     - Cannot resolve issue number (still queued - best effort)
     """
@@ -487,7 +491,7 @@ def filter_conflicting_prs(prs: list[dict], owner: str, repo: str, project_id: s
 
         if mergeable == 'UNKNOWN':
             if debug:
-                print(f"  - PR #{pr_no}: {{ mergeable: {mergeable} }}, decision: SKIP, reason: retry next poll", file=sys.stderr)
+                print(f"  - PR #{pr_no}: {{ mergeable: {mergeable} }}, decision: SKIP, reason: mergeability pending", file=sys.stderr)
             skip_unknown += 1
             continue
 
@@ -585,7 +589,8 @@ def query_feat_request_items(org: str, project_number: int) -> list[dict]:
     """Query GitHub for feat-request items using label-first discovery.
 
     Uses gh issue list to discover candidates with agentize:dev-req label,
-    then performs per-issue lookups for status and full label list.
+    fetches every candidate's full label list in one batched query, then
+    performs per-issue status lookups.
     """
     try:
         owner, repo = get_repo_owner_name()
@@ -609,11 +614,15 @@ def query_feat_request_items(org: str, project_number: int) -> list[dict]:
     if _is_debug_enabled():
         _log(f"Found {len(candidate_issues)} feat-request candidates: {candidate_issues}")
 
-    # Build items list with per-issue status and label lookups
+    issue_labels = fetch_issue_labels(owner, repo, candidate_issues)
+
+    # Build items list with per-issue status lookups
     items = []
     for issue_no in candidate_issues:
         status = query_issue_project_status(owner, repo, issue_no, project_id)
-        labels = _query_issue_labels(owner, repo, issue_no)
+        labels = issue_labels.get(issue_no)
+        if labels is None:
+            labels = _query_issue_labels(owner, repo, issue_no)
 
         item = {
             'content': {
@@ -704,6 +713,10 @@ def filter_ready_feat_requests(items: list[dict]) -> list[int]:
 def has_unresolved_review_threads(owner: str, repo: str, pr_no: int) -> bool:
     """Check if a PR has unresolved, non-outdated review threads.
 
+    Follows the reviewThreads cursor, so PRs with more than 100 threads are
+    fully checked. filter_ready_review_prs() uses the batched, cached
+    fetch_review_thread_states() first and only falls back to this per-PR scan.
+
     Args:
         owner: Repository owner
         repo: Repository name
@@ -712,33 +725,11 @@ def has_unresolved_review_threads(owner: str, repo: str, pr_no: int) -> bool:
     Returns:
         True if any unresolved, non-outdated thread exists, False otherwise.
     """
-    result = subprocess.run(
-        ['scripts/gh-graphql.sh', 'review-threads', owner, repo, str(pr_no)],
-        capture_output=True, text=True
-    )
-
-    if result.returncode != 0:
-        _log(f"Failed to fetch review threads for PR #{pr_no}: {result.stderr}", level="ERROR")
-        return False
-
-    try:
-        data = json.loads(result.stdout)
-        threads = data['data']['repository']['pullRequest']['reviewThreads']['nodes']
-        page_info = data['data']['repository']['pullRequest']['reviewThreads']['pageInfo']
-
-        # Warn about pagination
-        if page_info.get('hasNextPage'):
-            _log(f"PR #{pr_no} has more than 100 review threads, only first page checked", level="WARNING")
-
-        # Check for any unresolved AND non-outdated thread
-        for thread in threads:
-            if not thread.get('isResolved', True) and not thread.get('isOutdated', True):
-                return True
-
-        return False
-    except (KeyError, TypeError, json.JSONDecodeError) as e:
-        _log(f"Failed to parse review threads response: {e}", level="ERROR")
+    result = scan_review_threads(owner, repo, pr_no)
+    if result is None:
+        _log(f"Failed to fetch review threads for PR #{pr_no}", level="ERROR")
         return False
+    return result
 
 
 def filter_ready_review_prs(prs: list[dict], owner: str, repo: str, project_id: str) -> list[tuple[int, int]]:
@@ -764,6 +755,7 @@ def filter_ready_review_prs(prs: list[dict], owner: str, repo: str, project_id:
     skip_wrong_status = 0
     skip_no_threads = 0
 
+    proposed = []
     for pr in prs:
         pr_no = pr.get('number')
 
@@ -782,9 +774,18 @@ def filter_ready_review_prs(prs: list[dict], owner: str, repo: str, project_id:
                 print(f"  - PR #{pr_no}: {{ issue: {issue_no}, status: {status} }}, decision: SKIP, reason: status != Proposed", file=sys.stderr)
             skip_wrong_status += 1
             continue
+        proposed.append((pr, issue_no, status))
+
+    # One batched thread scan for all Proposed PRs; unchanged PRs hit the cache
+    thread_states = fetch_review_thread_states(owner, repo, [pr for pr, _, _ in proposed])
+
+    for pr, issue_no, status in proposed:
+        pr_no = pr.get('number')
 
         # Check for unresolved review threads
-        has_threads = has_unresolved_review_threads(owner, repo, pr_no)
+        has_threads = thread_states.get(pr_no)
+        if has_threads is None:
+            has_threads = has_unresolved_review_threads(owner, repo, pr_no)
         if not has_threads:
             if debug:
                 print(f"  - PR #{pr_no}: {{ issue: {issue_no}, status: {status}, threads: 0 unresolved }}, decision: SKIP, reason: no unresolved threads", file=sys.stderr)
@@ -0,0 +1,91 @@
+"""Batched issue label lookups for the server module.
+
+Label checks used to cost one `gh issue view` subprocess per issue (and per
+label in cleanup_dead_workers). fetch_issue_labels() resolves the labels of
+many issues with one aliased GraphQL query and caches them for the current
+poll cycle; run_server() calls clear_label_cache() at the start of each poll.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from typing import Iterable
+
+from agentize.server.log import _log
+
+# Aliased `issue(number:)` fields per GraphQL request
+LABEL_BATCH_SIZE = 50
+
+# (owner, repo, issue_no) -> label names, valid for one poll cycle
+_label_cache: dict[tuple[str, str, int], list[str]] = {}
+
+
+def clear_label_cache() -> None:
+    """Forget cached labels (start of each poll cycle)."""
+    _label_cache.clear()
+
+
+def _build_labels_query(issue_nos: list[int]) -> str:
+    fields = '\n'.join(
+        f'    i{n}: issue(number: {n}) {{ labels(first: 100) {{ nodes {{ name }} }} }}'
+        for n in issue_nos
+    )
+    return f'query($owner: String!, $repo: String!) {{\n  repository(owner: $owner, name: $repo) {{\n{fields}\n  }}\n}}'
+
+
+def _query_labels_batch(owner: str, repo: str, issue_nos: list[int]) -> dict[int, list[str]]:
+    """One GraphQL request for up to LABEL_BATCH_SIZE issues.
+
+    Returns:
+        {issue_no: labels} for every issue the response covers. An issue that
+        does not exist maps to []; a failed request returns {}.
+    """
+    result = subprocess.run(
+        ['gh', 'api', 'graphql',
+         '-f', f'query={_build_labels_query(issue_nos)}',
+         '-f', f'owner={owner}',
+         '-f', f'repo={repo}'],
+        capture_output=True, text=True
+    )
+
+    # gh exits non-zero when the response has errors (e.g. one missing issue)
+    # but still prints the partial data
+    try:
+        repository = json.loads(result.stdout)['data']['repository']
+    except (KeyError, TypeError, json.JSONDecodeError):
+        _log(f"Failed to query labels for issues {issue_nos}: {result.stderr.strip()}", level="ERROR")
+        return {}
+    if not isinstance(repository, dict):
+        return {}
+
+    labels = {}
+    for issue_no in issue_nos:
+        key = f'i{issue_no}'
+        if key not in repository:
+            continue
+        issue = repository[key] or {}
+        nodes = (issue.get('labels') or {}).get('nodes') or []
+        labels[issue_no] = [node['name'] for node in nodes if node and node.get('name')]
+    return labels
+
+
+def fetch_issue_labels(owner: str, repo: str, issue_nos: Iterable[int]) -> dict[int, list[str]]:
+    """Return labels for many issues, querying only those not cached this poll.
+
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        issue_nos: Issue numbers
+
+    Returns:
+        {issue_no: labels}. Issues whose lookup failed are omitted, so callers
+        can fall back to a per-issue query.
+    """
+    wanted = list(dict.fromkeys(int(n) for n in issue_nos))
+    missing = [n for n in wanted if (owner, repo, n) not in _label_cache]
+    for start in range(0, len(missing), LABEL_BATCH_SIZE):
+        batch = missing[start:start + LABEL_BATCH_SIZE]
+        for issue_no, labels in _query_labels_batch(owner, repo, batch).items():
+            _label_cache[(owner, repo, issue_no)] = labels
+    return {n: _label_cache[(owner, repo, n)] for n in wanted if (owner, repo, n) in _label_cache}
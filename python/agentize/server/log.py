@@ -1,22 +1,97 @@
-"""Shared logging helper for the server module."""
+"""Shared logging helper for the server module.
+
+Console output is `[timestamp] [LEVEL] message`. When server.log_file is
+configured, configure_log_file() also routes every message as a JSON-lines
+record to a size-rotated file, written by a background thread so poll cycles
+never wait on log I/O. The caller's `file:line:func` costs a frame lookup per
+message, so it is added to both only after configure_log_source(True)
+(server.log_source).
+"""
 
 import os
 import sys
+import time
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+# Add .claude-plugin to path for the shared log sink
+_plugin_dir = Path(__file__).resolve().parents[3] / ".claude-plugin"
+if str(_plugin_dir) not in sys.path:
+    sys.path.insert(0, str(_plugin_dir))
+
+from lib.log_sink import LogSink, DEFAULT_MAX_BYTES, DEFAULT_BACKUP_COUNT
+
+_file_sink: Optional[LogSink] = None
+_log_source = False
+
+# Timestamps have one-second resolution: format once per second
+_stamp_second = -1
+_stamp_text = ""
 
 
-def _log(msg: str, level: str = "INFO") -> None:
-    """Log with timestamp and source location.
+def _timestamp() -> str:
+    global _stamp_second, _stamp_text
+    now = int(time.time())
+    if now != _stamp_second:
+        _stamp_text = datetime.fromtimestamp(now).strftime("%y-%m-%d-%H:%M:%S")
+        _stamp_second = now
+    return _stamp_text
+
+
+def configure_log_file(
+    path: Optional[str],
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+) -> None:
+    """Also write log messages as JSON lines to path (None disables).
 
     Args:
-        msg: Message to log
-        level: Log level (INFO or ERROR)
+        path: Log file path, or None to stop file logging
+        max_bytes: Rotate the file before it exceeds this size
+        backup_count: Rotated files to keep
     """
-    frame = sys._getframe(1)
-    filename = os.path.basename(frame.f_code.co_filename)
-    lineno = frame.f_lineno
-    func = frame.f_code.co_name
-    timestamp = datetime.now().strftime("%y-%m-%d-%H:%M:%S")
+    global _file_sink
+    if _file_sink is not None:
+        _file_sink.close()
+        _file_sink = None
+    if path:
+        _file_sink = LogSink(os.path.expanduser(path), max_bytes, backup_count, threaded=True)
+
+
+def configure_log_source(enabled: bool) -> None:
+    """Include the caller's file:line:func in console lines and file records.
 
-    output = f"[{timestamp}] [{level}] [{filename}:{lineno}:{func}] {msg}"
+    Args:
+        enabled: True to look up and print the source location of each message
+    """
+    global _log_source
+    _log_source = enabled
+
+
+def _log(msg: str, level: str = "INFO", **fields: Any) -> None:
+    """Log with timestamp and, if enabled, source location.
+
+    Args:
+        msg: Message to log
+        level: Log level (INFO, WARNING or ERROR)
+        **fields: Extra structured fields for the JSON-lines log file
+    """
+    timestamp = _timestamp()
+    if _log_source:
+        frame = sys._getframe(1)
+        code = frame.f_code
+        src = f"{os.path.basename(code.co_filename)}:{frame.f_lineno}"
+        output = f"[{timestamp}] [{level}] [{src}:{code.co_name}] {msg}"
+    else:
+        output = f"[{timestamp}] [{level}] {msg}"
     print(output, file=sys.stderr if level == "ERROR" else sys.stdout)
+
+    if _file_sink is not None:
+        record = {"ts": time.time(), "level": level, "msg": msg}
+        if _log_source:
+            record["src"] = src
+            record["func"] = code.co_name
+        if fields:
+            record.update(fields)
+        _file_sink.write_record(record)
@@ -0,0 +1,183 @@
+"""Background re-query of PRs whose mergeability GitHub is still computing.
+
+filter_conflicting_prs() skips PRs with mergeable == UNKNOWN. GitHub usually
+settles them within seconds, but the next poll is a full period away. The
+MergeabilityResolver re-queries only those PRs from a short-lived thread, with
+per-PR exponential backoff over a bounded window, and hands the ones that turn
+CONFLICTING back to run_server(), which waits on it between polls and
+dispatches rebases as soon as they arrive.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from agentize.server.log import _log
+
+INITIAL_DELAY_SEC = 2.0
+MAX_DELAY_SEC = 30.0
+# Give up on a PR this long after it was submitted; the next poll sees it again
+WINDOW_SEC = 120.0
+
+
+def _build_mergeable_query(pr_nos: list[int]) -> str:
+    fields = '\n'.join(f'    p{n}: pullRequest(number: {n}) {{ mergeable }}' for n in pr_nos)
+    return f'query($owner: String!, $repo: String!) {{\n  repository(owner: $owner, name: $repo) {{\n{fields}\n  }}\n}}'
+
+
+def query_mergeable(owner: str, repo: str, pr_nos: list[int]) -> dict[int, str]:
+    """Fetch the mergeable state of several PRs in one GraphQL request.
+
+    Returns:
+        {pr_no: "MERGEABLE" | "CONFLICTING" | "UNKNOWN"} for PRs in the response
+        ({} on failure)
+    """
+    result = subprocess.run(
+        ['gh', 'api', 'graphql',
+         '-f', f'query={_build_mergeable_query(pr_nos)}',
+         '-f', f'owner={owner}',
+         '-f', f'repo={repo}'],
+        capture_output=True, text=True
+    )
+    try:
+        repository = json.loads(result.stdout)['data']['repository'] or {}
+    except (KeyError, TypeError, json.JSONDecodeError):
+        _log(f"Failed to query mergeability for PRs {pr_nos}: {result.stderr.strip()}", level="ERROR")
+        return {}
+    states = {}
+    for pr_no in pr_nos:
+        node = repository.get(f'p{pr_no}')
+        if node and node.get('mergeable'):
+            states[pr_no] = node['mergeable']
+    return states
+
+
+class MergeabilityResolver:
+    """Re-query UNKNOWN PRs in the background until they settle or time out.
+
+    Usage (one resolver per server):
+
+        resolver.submit(owner, repo, [pr for pr in prs if pr['mergeable'] == 'UNKNOWN'])
+        if resolver.wait(timeout):
+            conflicting = resolver.drain()  # PR dicts, mergeable now CONFLICTING
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = INITIAL_DELAY_SEC,
+        max_delay: float = MAX_DELAY_SEC,
+        window: float = WINDOW_SEC,
+    ):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.window = window
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._stop = threading.Event()
+        # Set by submit() and stop() so the thread re-plans its next query
+        self._wakeup = threading.Event()
+        # (owner, repo, pr_no) -> (pr metadata, deadline, next query time, current delay)
+        self._pending: dict[tuple[str, str, int], tuple[dict, float, float, float]] = {}
+        self._resolved: list[dict] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, owner: str, repo: str, prs: list[dict]) -> None:
+        """Start (or extend) background resolution for UNKNOWN PRs.
+
+        New PRs are first re-queried after `initial_delay`, even while the
+        thread is backing off on older ones. PRs already pending keep their
+        original deadline and backoff.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for pr in prs:
+                pr_no = pr.get('number')
+                if pr_no is not None and (owner, repo, pr_no) not in self._pending:
+                    self._pending[(owner, repo, pr_no)] = (
+                        pr, now + self.window, now + self.initial_delay, self.initial_delay)
+            self._wakeup.set()
+            if self._pending and self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='mergeability-resolver', daemon=True)
+                self._thread.start()
+
+    def pending(self) -> list[int]:
+        """PR numbers still being re-queried."""
+        with self._lock:
+            return sorted(pr_no for _, _, pr_no in self._pending)
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a PR resolves to CONFLICTING, wake() is called, or timeout."""
+        return self._event.wait(timeout)
+
+    def wake(self) -> None:
+        """Release wait() early (e.g. on shutdown)."""
+        self._event.set()
+
+    def drain(self) -> list[dict]:
+        """Return and forget PRs that became CONFLICTING."""
+        with self._lock:
+            resolved, self._resolved = self._resolved, []
+            self._event.clear()
+        return resolved
+
+    def stop(self) -> None:
+        """Stop the background thread and drop pending PRs."""
+        self._stop.set()
+        with self._lock:
+            self._pending.clear()
+        self._wakeup.set()
+        self.wake()
+
+    def _run(self) -> None:
+        try:
+            self._resolve_loop()
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _resolve_loop(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                for key in [k for k, entry in self._pending.items() if entry[1] <= now]:
+                    del self._pending[key]
+                if not self._pending:
+                    # Cleared under the lock so a concurrent submit() starts a new thread
+                    self._thread = None
+                    return
+                by_repo: dict[tuple[str, str], list[int]] = {}
+                for owner, repo, pr_no in [k for k, entry in self._pending.items() if entry[2] <= now]:
+                    by_repo.setdefault((owner, repo), []).append(pr_no)
+                if not by_repo:
+                    # Cleared under the lock: a submit() from here on sets it again
+                    self._wakeup.clear()
+                    next_query = min(min(entry[1], entry[2]) for entry in self._pending.values())
+            if not by_repo:
+                self._wakeup.wait(next_query - now)
+                continue
+
+            for (owner, repo), pr_nos in by_repo.items():
+                states = query_mergeable(owner, repo, pr_nos)
+                queried = time.monotonic()
+                with self._lock:
+                    for pr_no in pr_nos:
+                        key = (owner, repo, pr_no)
+                        if key not in self._pending:
+                            continue
+                        pr, deadline, _, delay = self._pending[key]
+                        state = states.get(pr_no)
+                        if state is None or state == 'UNKNOWN':
+                            delay = min(delay * 2, self.max_delay)
+                            self._pending[key] = (pr, deadline, queried + delay, delay)
+                            continue
+                        del self._pending[key]
+                        if state == 'CONFLICTING':
+                            self._resolved.append({**pr, 'mergeable': state})
+                            self._event.set()
+                            _log(f"PR #{pr_no}: mergeability resolved to CONFLICTING")
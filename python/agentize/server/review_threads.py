@@ -0,0 +1,166 @@
+"""Batched, paginated review-thread scans for the server module.
+
+filter_ready_review_prs() needs to know whether each Proposed `agentize:pr`
+PR has an unresolved, non-outdated review thread. fetch_review_thread_states()
+answers that for many PRs with one aliased GraphQL query, follows the
+reviewThreads cursor for PRs with more than one page, and caches clean
+results per PR head SHA and updatedAt: a PR without open threads that has not
+changed since the last scan is never queried again.
+
+Only "no unresolved threads" is cached. A new review bumps updatedAt, but
+resolving a thread may not, so a cached positive could outlive the threads it
+saw; positives are rescanned every poll (and are rare: a positive PR is handed
+to a review-resolution worker, which moves its issue off Proposed).
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from typing import Optional
+
+from agentize.server.log import _log
+
+# Aliased pullRequest(number:) fields per GraphQL request
+THREAD_BATCH_SIZE = 25
+THREAD_PAGE_SIZE = 100
+
+# (owner, repo, pr_no) -> (head SHA, updatedAt) of the last clean scan
+_thread_cache: dict[tuple[str, str, int], tuple[str, str]] = {}
+
+_THREADS_FIELDS = '''nodes { isResolved isOutdated }
+      pageInfo { hasNextPage endCursor }'''
+
+REVIEW_THREADS_PAGE_QUERY = f'''
+query($owner: String!, $repo: String!, $number: Int!, $after: String) {{
+  repository(owner: $owner, name: $repo) {{
+    pullRequest(number: $number) {{
+      reviewThreads(first: {THREAD_PAGE_SIZE}, after: $after) {{
+      {_THREADS_FIELDS}
+      }}
+    }}
+  }}
+}}
+'''
+
+
+def clear_thread_cache() -> None:
+    """Forget cached scan results."""
+    _thread_cache.clear()
+
+
+def _build_threads_query(pr_nos: list[int]) -> str:
+    fields = '\n'.join(
+        f'    p{n}: pullRequest(number: {n}) {{ reviewThreads(first: {THREAD_PAGE_SIZE}) {{ {_THREADS_FIELDS} }} }}'
+        for n in pr_nos
+    )
+    return f'query($owner: String!, $repo: String!) {{\n  repository(owner: $owner, name: $repo) {{\n{fields}\n  }}\n}}'
+
+
+def _graphql(query: str, owner: str, repo: str, *extra: str) -> Optional[dict]:
+    """Run `gh api graphql` and return data.repository (None on failure).
+
+    gh exits non-zero when part of the response has errors but still prints
+    the partial data, so stdout is parsed regardless of the exit code.
+    """
+    result = subprocess.run(
+        ['gh', 'api', 'graphql', '-f', f'query={query.strip()}',
+         '-f', f'owner={owner}', '-f', f'repo={repo}', *extra],
+        capture_output=True, text=True
+    )
+    try:
+        repository = json.loads(result.stdout)['data']['repository']
+    except (KeyError, TypeError, json.JSONDecodeError):
+        _log(f"Review thread query failed: {result.stderr.strip()}", level="ERROR")
+        return None
+    return repository if isinstance(repository, dict) else None
+
+
+def _page_has_unresolved(threads: dict) -> bool:
+    return any(
+        not node.get('isResolved', True) and not node.get('isOutdated', True)
+        for node in threads.get('nodes') or [] if node
+    )
+
+
+def scan_review_threads(owner: str, repo: str, pr_no: int, after: Optional[str] = None) -> Optional[bool]:
+    """Scan one PR's review threads page by page, stopping at the first unresolved one.
+
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        pr_no: Pull request number
+        after: Cursor to resume from (None starts at the first page)
+
+    Returns:
+        True/False, or None if a query failed
+    """
+    while True:
+        extra = ['-F', f'number={pr_no}']
+        if after:
+            extra += ['-f', f'after={after}']
+        repository = _graphql(REVIEW_THREADS_PAGE_QUERY, owner, repo, *extra)
+        try:
+            threads = repository['pullRequest']['reviewThreads']
+        except (KeyError, TypeError):
+            return None
+        if _page_has_unresolved(threads):
+            return True
+        page_info = threads.get('pageInfo') or {}
+        if not page_info.get('hasNextPage') or not page_info.get('endCursor'):
+            return False
+        after = page_info['endCursor']
+
+
+def fetch_review_thread_states(owner: str, repo: str, prs: list[dict]) -> dict[int, bool]:
+    """Return {pr_no: has unresolved, non-outdated threads} for many PRs.
+
+    Only PRs carrying `headRefOid` and `updatedAt` (as returned by
+    discover_candidate_prs()) take part: those whose pair matches their last
+    clean scan are answered False from the cache, the rest are scanned
+    THREAD_BATCH_SIZE per request.
+
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        prs: PR metadata dicts
+
+    Returns:
+        Results for the PRs that could be answered; PRs without the version
+        fields or whose query failed are omitted, so callers can fall back
+        to has_unresolved_review_threads().
+    """
+    states = {}
+    stale = {}
+    for pr in prs:
+        pr_no, head, updated = pr.get('number'), pr.get('headRefOid'), pr.get('updatedAt')
+        if pr_no is None or not head or not updated:
+            continue
+        if _thread_cache.get((owner, repo, pr_no)) == (head, updated):
+            states[pr_no] = False
+        else:
+            stale[pr_no] = (head, updated)
+
+    pending = list(stale)
+    for start in range(0, len(pending), THREAD_BATCH_SIZE):
+        batch = pending[start:start + THREAD_BATCH_SIZE]
+        repository = _graphql(_build_threads_query(batch), owner, repo)
+        if repository is None:
+            continue
+        for pr_no in batch:
+            try:
+                threads = repository[f'p{pr_no}']['reviewThreads']
+            except (KeyError, TypeError):
+                continue
+            result = _page_has_unresolved(threads)
+            page_info = threads.get('pageInfo') or {}
+            if not result and page_info.get('hasNextPage') and page_info.get('endCursor'):
+                result = scan_review_threads(owner, repo, pr_no, after=page_info['endCursor'])
+                if result is None:
+                    continue
+            states[pr_no] = result
+            if result:
+                _thread_cache.pop((owner, repo, pr_no), None)
+            else:
+                _thread_cache[(owner, repo, pr_no)] = stale[pr_no]
+    return states
@@ -1,12 +1,24 @@
-"""Session state file lookups for the server module."""
+"""Session state lookups for the server module.
+
+Backed by the shared session store (lib.session_store): issue lookups are one
+indexed SQLite query instead of two JSON file opens, and updates are atomic
+with respect to the hooks writing the same session.
+"""
 
 from __future__ import annotations
 
-import json
 import os
+import sys
 from pathlib import Path
 from typing import Optional
 
+# Add .claude-plugin to path for the shared session store
+_plugin_dir = Path(__file__).resolve().parents[3] / ".claude-plugin"
+if str(_plugin_dir) not in sys.path:
+    sys.path.insert(0, str(_plugin_dir))
+
+from lib import session_store
+
 
 def _resolve_session_dir(base_dir: Optional[str] = None) -> Path:
     """Returns hooked-sessions directory using AGENTIZE_HOME fallback.
@@ -29,22 +41,13 @@ def _load_issue_index(issue_no: int, session_dir: Path) -> Optional[str]:
         session_dir: Path to hooked-sessions directory
 
     Returns:
-        session_id string or None if index file not found
+        session_id string or None if the issue is not indexed
     """
-    index_file = session_dir / 'by-issue' / f'{issue_no}.json'
-    if not index_file.exists():
-        return None
-
-    try:
-        with open(index_file) as f:
-            data = json.load(f)
-            return data.get('session_id')
-    except (json.JSONDecodeError, OSError):
-        return None
+    return session_store.get_issue_session_id(issue_no, str(session_dir))
 
 
 def _load_session_state(session_id: str, session_dir: Path) -> Optional[dict]:
-    """Loads session JSON.
+    """Loads session state.
 
     Args:
         session_id: Session identifier
@@ -53,15 +56,7 @@ def _load_session_state(session_id: str, session_dir: Path) -> Optional[dict]:
     Returns:
         Session state dict or None if not found
     """
-    session_file = session_dir / f'{session_id}.json'
-    if not session_file.exists():
-        return None
-
-    try:
-        with open(session_file) as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return None
+    return session_store.get_session(session_id, str(session_dir))
 
 
 def _get_session_state_for_issue(issue_no: int, session_dir: Path) -> Optional[dict]:
@@ -74,23 +69,34 @@ def _get_session_state_for_issue(issue_no: int, session_dir: Path) -> Optional[d
     Returns:
         Session state dict or None if not found
     """
-    session_id = _load_issue_index(issue_no, session_dir)
-    if session_id is None:
-        return None
-    return _load_session_state(session_id, session_dir)
+    return session_store.find_by_issue(issue_no, str(session_dir))
+
+
+def _get_session_states_for_issues(issue_nos: list[int], session_dir: Path) -> dict[int, dict]:
+    """Batch form of _get_session_state_for_issue() (one store transaction).
+
+    Args:
+        issue_nos: GitHub issue numbers
+        session_dir: Path to hooked-sessions directory
+
+    Returns:
+        {issue_no: session state} for issues with an indexed session
+    """
+    if not issue_nos:
+        return {}
+    return session_store.find_by_issues(issue_nos, str(session_dir))
 
 
 def _remove_issue_index(issue_no: int, session_dir: Path) -> None:
-    """Remove issue index file after notification to prevent duplicates.
+    """Remove issue index entry after notification to prevent duplicates.
 
     Args:
         issue_no: GitHub issue number
         session_dir: Path to hooked-sessions directory
     """
-    index_file = session_dir / 'by-issue' / f'{issue_no}.json'
     try:
-        index_file.unlink(missing_ok=True)
-    except OSError:
+        session_store.remove_issue_index(issue_no, str(session_dir))
+    except Exception:
         pass  # Best effort cleanup
 
 
@@ -103,34 +109,41 @@ def set_pr_number_for_issue(issue_no: int, pr_number: int, session_dir: Optional
         session_dir: Path to hooked-sessions directory (uses AGENTIZE_HOME if None)
 
     Returns:
-        True if successfully written, False otherwise (missing index or session file)
+        True if successfully written, False otherwise (missing index or session)
     """
     if session_dir is None:
         session_dir = _resolve_session_dir()
 
-    # Get session_id from issue index
-    session_id = _load_issue_index(issue_no, session_dir)
-    if session_id is None:
+    try:
+        # Get session_id from issue index
+        session_id = session_store.get_issue_session_id(issue_no, str(session_dir))
+        if session_id is None:
+            return False
+
+        # Add pr_number atomically with respect to concurrent hook updates
+        updated = session_store.update_session(
+            session_id,
+            lambda state: {**state, 'pr_number': pr_number} if state is not None else None,
+            str(session_dir),
+        )
+        return updated is not None
+    except Exception:
         return False
 
-    # Load existing session state
-    session_file = session_dir / f'{session_id}.json'
-    if not session_file.exists():
-        return False
 
-    try:
-        with open(session_file) as f:
-            state = json.load(f)
+def prune_finished_sessions(ttl_sec: float, session_dir: Optional[Path] = None) -> int:
+    """Delete finished sessions (state done/error/...) older than ttl_sec.
 
-        # Add pr_number to state
-        state['pr_number'] = pr_number
-
-        # Write back atomically
-        tmp_file = session_dir / f'{session_id}.json.tmp'
-        with open(tmp_file, 'w') as f:
-            json.dump(state, f)
-        tmp_file.rename(session_file)
+    Args:
+        ttl_sec: Age in seconds since the last update
+        session_dir: Path to hooked-sessions directory (uses AGENTIZE_HOME if None)
 
-        return True
-    except (json.JSONDecodeError, OSError):
-        return False
+    Returns:
+        Number of sessions removed (0 on error)
+    """
+    if session_dir is None:
+        session_dir = _resolve_session_dir()
+    try:
+        return session_store.cleanup_sessions(ttl_sec, sess_dir=str(session_dir))
+    except Exception:
+        return 0
@@ -94,16 +94,19 @@ def rebase_worktree(
     return True, _parse_pid_from_output(result.stdout)
 
 
-def _check_issue_has_label(issue_no: int, label: str) -> bool:
+def _check_issue_has_label(issue_no: int, label: str, labels: Optional[list[str]] = None) -> bool:
     """Check if issue has a specific label.
 
     Args:
         issue_no: GitHub issue number
         label: Label name to check for
+        labels: The issue's labels when already fetched (skips gh issue view)
 
     Returns:
         True if the issue has the label, False otherwise.
     """
+    if labels is not None:
+        return label in labels
     result = subprocess.run(
         ['gh', 'issue', 'view', str(issue_no), '--json', 'labels', '--jq', '.labels[].name'],
         capture_output=True,
@@ -114,6 +117,26 @@ def _check_issue_has_label(issue_no: int, label: str) -> bool:
     return label in result.stdout.strip().split('\n')
 
 
+def _fetch_labels_for_cleanup(issue_nos: list[int], repo_slug: Optional[str]) -> dict[int, list[str]]:
+    """Batch-fetch labels for finished issues (empty dict if the repo is unknown).
+
+    Args:
+        issue_nos: Issue numbers of finished workers
+        repo_slug: owner/repo, resolved from git remote origin when None
+    """
+    from agentize.server.github import get_repo_owner_name
+    from agentize.server.labels import fetch_issue_labels
+
+    if repo_slug and '/' in repo_slug:
+        owner, repo = repo_slug.split('/', 1)
+    else:
+        try:
+            owner, repo = get_repo_owner_name()
+        except RuntimeError:
+            return {}
+    return fetch_issue_labels(owner, repo, issue_nos)
+
+
 def _cleanup_refinement(issue_no: int) -> None:
     """Clean up after refinement: remove agentize:refine label and reset status to Proposed.
 
@@ -485,44 +508,59 @@ def cleanup_dead_workers(
     """
     # Import here to avoid circular imports
     from agentize.server.notify import send_telegram_message, _format_worker_completion_message
-    from agentize.server.session import _get_session_state_for_issue, _remove_issue_index
-
-    for i in range(num_workers):
-        if not check_worker_liveness(i, workers_dir):
-            status = read_worker_status(i, workers_dir)
-            issue_no = status.get('issue')
-            _log(f"Worker {i} PID {status.get('pid')} is dead, marking as FREE")
-
-            # Check for completion notification conditions
-            if tg_token and tg_chat_id and issue_no and session_dir:
-                session_state = _get_session_state_for_issue(issue_no, session_dir)
-                if session_state and session_state.get('state') == 'done':
-                    # Check if this was a refinement (has agentize:refine label)
-                    is_refinement = _check_issue_has_label(issue_no, 'agentize:refine')
-                    if is_refinement:
-                        _cleanup_refinement(issue_no)
-
-                    # Check if this was a dev-req (has agentize:dev-req label)
-                    is_feat_request = _check_issue_has_label(issue_no, 'agentize:dev-req')
-                    if is_feat_request:
-                        _cleanup_feat_request(issue_no)
-
-                    # Always try review resolution cleanup (idempotent, no label to detect)
-                    # This resets "In Progress" to "Proposed" if applicable
-                    _cleanup_review_resolution(issue_no)
-
-                    issue_url = f"https://github.com/{repo_slug}/issues/{issue_no}" if repo_slug else None
-
-                    # Build PR URL if pr_number is available in session state
-                    pr_url = None
-                    pr_number = session_state.get('pr_number')
-                    if pr_number and repo_slug:
-                        pr_url = f"https://github.com/{repo_slug}/pull/{pr_number}"
-
-                    msg = _format_worker_completion_message(issue_no, i, issue_url, pr_url=pr_url)
-                    if send_telegram_message(tg_token, tg_chat_id, msg):
-                        _log(f"Sent completion notification for issue #{issue_no}")
-                        # Remove issue index to prevent duplicate notifications
-                        _remove_issue_index(issue_no, session_dir)
-
-            write_worker_status(i, 'FREE', None, None, workers_dir)
+    from agentize.server.session import _get_session_states_for_issues, _remove_issue_index
+
+    dead = [i for i in range(num_workers) if not check_worker_liveness(i, workers_dir)]
+    statuses = {i: read_worker_status(i, workers_dir) for i in dead}
+
+    # One session store lookup for every dead worker's issue
+    session_states = {}
+    issue_labels = {}
+    if tg_token and tg_chat_id and session_dir:
+        issues = [status['issue'] for status in statuses.values() if status.get('issue')]
+        session_states = _get_session_states_for_issues(issues, session_dir)
+
+        # One label query for every finished issue
+        done = [n for n in issues if (session_states.get(int(n)) or {}).get('state') == 'done']
+        if done:
+            issue_labels = _fetch_labels_for_cleanup(done, repo_slug)
+
+    for i in dead:
+        status = statuses[i]
+        issue_no = status.get('issue')
+        _log(f"Worker {i} PID {status.get('pid')} is dead, marking as FREE")
+
+        # Check for completion notification conditions
+        if tg_token and tg_chat_id and issue_no and session_dir:
+            session_state = session_states.get(int(issue_no))
+            if session_state and session_state.get('state') == 'done':
+                # Check if this was a refinement (has agentize:refine label)
+                labels = issue_labels.get(int(issue_no))
+                is_refinement = _check_issue_has_label(issue_no, 'agentize:refine', labels)
+                if is_refinement:
+                    _cleanup_refinement(issue_no)
+
+                # Check if this was a dev-req (has agentize:dev-req label)
+                is_feat_request = _check_issue_has_label(issue_no, 'agentize:dev-req', labels)
+                if is_feat_request:
+                    _cleanup_feat_request(issue_no)
+
+                # Always try review resolution cleanup (idempotent, no label to detect)
+                # This resets "In Progress" to "Proposed" if applicable
+                _cleanup_review_resolution(issue_no)
+
+                issue_url = f"https://github.com/{repo_slug}/issues/{issue_no}" if repo_slug else None
+
+                # Build PR URL if pr_number is available in session state
+                pr_url = None
+                pr_number = session_state.get('pr_number')
+                if pr_number and repo_slug:
+                    pr_url = f"https://github.com/{repo_slug}/pull/{pr_number}"
+
+                msg = _format_worker_completion_message(issue_no, i, issue_url, pr_url=pr_url)
+                if send_telegram_message(tg_token, tg_chat_id, msg):
+                    _log(f"Sent completion notification for issue #{issue_no}")
+                    # Remove issue index to prevent duplicate notifications
+                    _remove_issue_index(issue_no, session_dir)
+
+        write_worker_status(i, 'FREE', None, None, workers_dir)
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 from agentize.workflow.api.acw import ACW, list_acw_providers, run_acw
+from agentize.workflow.api.retry import RetryPolicy
 from agentize.workflow.api.session import PipelineError, Session, StageCall, StageResult
+from agentize.workflow.api.stage_cache import StageCache
 
 __all__ = [
     "ACW",
@@ -13,4 +15,6 @@ __all__ = [
     "StageCall",
     "StageResult",
     "PipelineError",
+    "StageCache",
+    "RetryPolicy",
 ]
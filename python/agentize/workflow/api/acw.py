@@ -2,19 +2,43 @@
 
 from __future__ import annotations
 
+import codecs
+import json
 import os
 import shlex
+import shutil
+import signal
 import subprocess
 import sys
+import tempfile
 import threading
 import time
+from contextlib import ExitStack
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable
+from typing import IO, Callable
 
 from agentize.shell import get_agentize_home
+from agentize.workflow.api import admission
 
 _ACW_PROVIDERS_CACHE: list[str] | None = None
 _ACW_PROVIDERS_LOCK = threading.Lock()
+_ADMISSION_LOG_MIN_WAIT_SEC = 0.5
+_STREAM_POLL_SEC = 0.2
+_STREAM_TAIL_CHARS = 4096
+_STREAM_CAPTURE_CHARS = 64 * 1024
+_STREAM_TERM_GRACE_SEC = 5.0
+_PROVIDERS_CACHE_VERSION = 1
+
+# Providers whose acw invocation is mirrored by _direct_invocation(); keep in
+# sync with src/cli/acw/providers.sh
+_DIRECT_PROVIDERS = {
+    "claude": ("claude", "--dangerously-skip-permissions"),
+    "codex": ("codex", "--full-auto"),
+}
+
+OutputCallback = Callable[[str, str], None]
+StopPredicate = Callable[[str], bool]
 
 
 # ============================================================
@@ -95,6 +119,257 @@ def _format_acw_command(
     return "acw " + " ".join(shlex.quote(arg) for arg in cmd_parts)
 
 
+@dataclass(frozen=True)
+class _Invocation:
+    """A command plus the files its standard streams are redirected to.
+
+    A stream without a path is captured and returned on the CompletedProcess.
+    """
+
+    argv: list[str]
+    stdin_path: Path | None = None
+    stdout_path: Path | None = None
+    stderr_path: Path | None = None
+
+
+def _bash_invocation(cmd_parts: list[str], env: dict[str, str]) -> _Invocation:
+    acw_script = _resolve_acw_script(env["AGENTIZE_HOME"], env)
+    # Quote paths to handle spaces
+    cmd_args = " ".join(f'"{arg}"' for arg in cmd_parts)
+    overrides_cmd = _resolve_overrides_cmd(env)
+    return _Invocation(["bash", "-c", f'source "{acw_script}"{overrides_cmd} && acw {cmd_args}'])
+
+
+def _direct_invocation(
+    provider: str,
+    model: str,
+    input_file: Path,
+    output_file: Path,
+    options: list[str],
+    env: dict[str, str],
+) -> _Invocation | None:
+    """Resolve the provider CLI call that `acw` would make, or None to go through bash.
+
+    Only claude and codex are mirrored. A custom acw script, a shell overrides
+    file or `AGENTIZE_ACW_DIRECT=0` keeps the bash path, since those may
+    redefine `acw` or the provider functions.
+    """
+    if provider not in _DIRECT_PROVIDERS:
+        return None
+    if env.get("AGENTIZE_ACW_DIRECT", "1") == "0":
+        return None
+    if env.get("PLANNER_ACW_SCRIPT") or _resolve_overrides_cmd(env):
+        return None
+
+    binary, yolo_flag = _DIRECT_PROVIDERS[provider]
+    options = [yolo_flag if option == "--yolo" else option for option in options]
+    stderr_path = Path(f"{output_file}.stderr")
+    if provider == "claude":
+        # claude takes -p @file and writes the response to stdout
+        return _Invocation(
+            [binary, "--model", model, "-p", f"@{input_file}", *options],
+            stdout_path=output_file,
+            stderr_path=stderr_path,
+        )
+    # codex reads the prompt from stdin and writes the response with -o
+    return _Invocation(
+        [binary, "exec", "--model", model, "-o", str(output_file), *options, "-"],
+        stdin_path=input_file,
+        stderr_path=stderr_path,
+    )
+
+
+def _direct_precheck(
+    invocation: _Invocation,
+    input_file: Path,
+    output_file: Path,
+    env: dict[str, str],
+) -> subprocess.CompletedProcess | None:
+    """Apply acw's input, output-directory and binary checks with its exit codes."""
+
+    def _fail(returncode: int, message: str) -> subprocess.CompletedProcess:
+        return subprocess.CompletedProcess(invocation.argv, returncode, stdout="", stderr=f"Error: {message}\n")
+
+    if not input_file.is_file():
+        return _fail(3, f"Input file '{input_file}' not found")
+    if not os.access(input_file, os.R_OK):
+        return _fail(3, f"Input file '{input_file}' is not readable")
+    try:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return _fail(1, f"Cannot create output directory '{output_file.parent}'")
+    if shutil.which(invocation.argv[0], path=env.get("PATH")) is None:
+        return _fail(4, f"CLI binary '{invocation.argv[0]}' not found in PATH")
+    return None
+
+
+def _remove_empty_stderr(invocation: _Invocation) -> None:
+    # Matches acw: an empty stderr sidecar is not left behind
+    path = invocation.stderr_path
+    if path is not None:
+        try:
+            if path.stat().st_size == 0:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def _open_streams(invocation: _Invocation, stack: ExitStack, *, capture) -> tuple:
+    """Open the invocation's redirect targets, using `capture()` for unredirected output."""
+    stdin = stack.enter_context(open(invocation.stdin_path, "rb")) if invocation.stdin_path else None
+    stdout = (
+        stack.enter_context(open(invocation.stdout_path, "wb")) if invocation.stdout_path else capture(stack)
+    )
+    stderr = (
+        stack.enter_context(open(invocation.stderr_path, "wb")) if invocation.stderr_path else capture(stack)
+    )
+    return stdin, stdout, stderr
+
+
+def _run_invocation(
+    invocation: _Invocation,
+    *,
+    env: dict[str, str],
+    cwd: str | Path | None,
+    timeout: float,
+) -> subprocess.CompletedProcess:
+    with ExitStack() as stack:
+        stdin, stdout, stderr = _open_streams(invocation, stack, capture=lambda _stack: subprocess.PIPE)
+        result = subprocess.run(
+            invocation.argv,
+            env=env,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            text=True,
+            timeout=timeout,
+            cwd=str(cwd) if cwd else None,
+        )
+    if result.stdout is None:
+        result.stdout = ""
+    if result.stderr is None:
+        result.stderr = ""
+    return result
+
+
+class _FileTail:
+    """Incrementally read a file another process is writing."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._offset = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def read_new(self) -> str:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return ""
+        if size < self._offset:  # truncated by a new redirect
+            self._offset = 0
+            self._decoder.reset()
+        if size == self._offset:
+            return ""
+        with open(self.path, "rb") as handle:
+            handle.seek(self._offset)
+            data = handle.read(size - self._offset)
+        self._offset += len(data)
+        return self._decoder.decode(data)
+
+
+def _terminate(process: subprocess.Popen) -> None:
+    """Stop the acw process group: SIGTERM, then SIGKILL after a grace period."""
+    for sig, grace in ((signal.SIGTERM, _STREAM_TERM_GRACE_SEC), (signal.SIGKILL, None)):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            process.wait(timeout=grace)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def _read_capture(handle: IO[bytes]) -> str:
+    handle.seek(0, os.SEEK_END)
+    size = handle.tell()
+    handle.seek(max(0, size - _STREAM_CAPTURE_CHARS))
+    return handle.read().decode("utf-8", errors="replace")
+
+
+def _stream_acw(
+    invocation: _Invocation,
+    output_file: Path,
+    *,
+    env: dict[str, str],
+    cwd: str | Path | None,
+    timeout: float,
+    idle_timeout: float | None,
+    on_output: OutputCallback | None,
+    stop_when: StopPredicate | None,
+    cancel: threading.Event | None,
+) -> subprocess.CompletedProcess:
+    tails = {
+        "output": _FileTail(output_file),
+        "stderr": _FileTail(Path(f"{output_file}.stderr")),
+    }
+    tail_text = ""
+    stopped = False
+    command = invocation.argv
+    with ExitStack() as stack:
+        stdin, stdout, stderr = _open_streams(
+            invocation, stack, capture=lambda stack: stack.enter_context(tempfile.TemporaryFile())
+        )
+        process = subprocess.Popen(
+            command,
+            env=env,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            cwd=str(cwd) if cwd else None,
+            start_new_session=True,
+        )
+        start = last_output = time.monotonic()
+        try:
+            while True:
+                exited = process.poll() is not None
+                for stream, tail in tails.items():
+                    chunk = tail.read_new()
+                    if not chunk:
+                        continue
+                    last_output = time.monotonic()
+                    if on_output is not None:
+                        on_output(stream, chunk)
+                    if stream == "output":
+                        tail_text = (tail_text + chunk)[-_STREAM_TAIL_CHARS:]
+                        if stop_when is not None and not stopped and stop_when(tail_text):
+                            stopped = True
+                if exited:
+                    stopped = False
+                    break
+                if stopped or (cancel is not None and cancel.is_set()):
+                    _terminate(process)
+                    break
+                now = time.monotonic()
+                if now - start > timeout:
+                    raise subprocess.TimeoutExpired(command, timeout)
+                if idle_timeout is not None and now - last_output > idle_timeout:
+                    raise subprocess.TimeoutExpired(command, idle_timeout)
+                time.sleep(_STREAM_POLL_SEC)
+        except BaseException:
+            _terminate(process)
+            raise
+        # Stopped on the caller's predicate: the answer is in, so it is a success
+        returncode = 0 if stopped else process.returncode
+        return subprocess.CompletedProcess(
+            command,
+            returncode,
+            stdout="" if invocation.stdout_path else _read_capture(stdout),
+            stderr="" if invocation.stderr_path else _read_capture(stderr),
+        )
+
+
 def run_acw(
     provider: str,
     model: str,
@@ -107,11 +382,24 @@ def run_acw(
     timeout: int = 3600,
     cwd: str | Path | None = None,
     env: dict[str, str] | None = None,
+    on_output: OutputCallback | None = None,
+    stop_when: StopPredicate | None = None,
+    idle_timeout: float | None = None,
+    cancel: threading.Event | None = None,
 ) -> subprocess.CompletedProcess:
-    """Run acw shell function for a single stage."""
+    """Run acw shell function for a single stage.
+
+    Passing `on_output`, `stop_when`, `idle_timeout` or `cancel` switches to
+    streaming mode: the output file and its `.stderr` companion are followed
+    while the provider runs, `on_output(stream, chunk)` sees each new chunk,
+    and the run is stopped early once `stop_when(recent_output)` is true or
+    `cancel` is set.
+
+    claude and codex are executed directly, without sourcing acw.sh in a bash
+    wrapper, unless a custom acw script or shell overrides are configured or
+    `AGENTIZE_ACW_DIRECT=0` is set.
+    """
     merged_env = _merge_env(env)
-    agentize_home = merged_env["AGENTIZE_HOME"]
-    acw_script = _resolve_acw_script(agentize_home, merged_env)
 
     cmd_parts = _build_acw_args(
         provider,
@@ -123,23 +411,97 @@ def run_acw(
         extra_flags=extra_flags,
     )
 
-    # Quote paths to handle spaces
-    cmd_args = " ".join(f'"{arg}"' for arg in cmd_parts)
-    overrides_cmd = _resolve_overrides_cmd(merged_env)
-    bash_cmd = f'source "{acw_script}"{overrides_cmd} && acw {cmd_args}'
-
-    return subprocess.run(
-        ["bash", "-c", bash_cmd],
-        env=merged_env,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-        cwd=str(cwd) if cwd else None,
+    invocation = _direct_invocation(
+        provider, model, Path(input_file), Path(output_file), cmd_parts[4:], merged_env
     )
+    if invocation is not None:
+        failed = _direct_precheck(invocation, Path(input_file), Path(output_file), merged_env)
+        if failed is not None:
+            return failed
+    else:
+        invocation = _bash_invocation(cmd_parts, merged_env)
+
+    with admission.admit(provider, model, env=merged_env) as admitted:
+        if admitted.wait >= _ADMISSION_LOG_MIN_WAIT_SEC:
+            print(
+                f"acw {provider}:{model} waited {admitted.wait:.1f}s for admission ({admitted.key})",
+                file=sys.stderr,
+            )
+        try:
+            if any(option is not None for option in (on_output, stop_when, idle_timeout, cancel)):
+                return _stream_acw(
+                    invocation,
+                    Path(output_file),
+                    env=merged_env,
+                    cwd=cwd,
+                    timeout=timeout,
+                    idle_timeout=idle_timeout,
+                    on_output=on_output,
+                    stop_when=stop_when,
+                    cancel=cancel,
+                )
+            return _run_invocation(invocation, env=merged_env, cwd=cwd, timeout=timeout)
+        finally:
+            _remove_empty_stderr(invocation)
+
+
+def _providers_cache_path(env: dict[str, str]) -> Path:
+    return Path(env["AGENTIZE_HOME"]) / ".tmp" / "acw-providers.json"
+
+
+def _providers_fingerprint(acw_script: str, env: dict[str, str]) -> list[list]:
+    """Path, mtime and size of every script `acw --complete providers` sources."""
+    script = Path(acw_script)
+    paths = [script, *sorted((script.parent / "acw").glob("*.sh"))]
+    overrides_path = env.get("AGENTIZE_SHELL_OVERRIDES")
+    if overrides_path:
+        paths.append(Path(overrides_path).expanduser())
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            fingerprint.append([str(path), None, None])
+            continue
+        fingerprint.append([str(path), stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+
+def _load_cached_providers(path: Path, fingerprint: list[list]) -> list[str] | None:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != _PROVIDERS_CACHE_VERSION:
+        return None
+    if data.get("fingerprint") != fingerprint:
+        return None
+    providers = data.get("providers")
+    if not providers or not all(isinstance(provider, str) for provider in providers):
+        return None
+    return providers
+
+
+def _store_cached_providers(path: Path, fingerprint: list[list], providers: list[str]) -> None:
+    # Best effort: a read-only AGENTIZE_HOME only costs the next process a bash call
+    payload = {"version": _PROVIDERS_CACHE_VERSION, "fingerprint": fingerprint, "providers": providers}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(dir=path.parent, prefix=".acw-providers-")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(payload, handle)
+        os.replace(staging, path)
+    except OSError:
+        pass
 
 
 def list_acw_providers() -> list[str]:
-    """List supported providers from `acw --complete providers`."""
+    """List supported providers from `acw --complete providers`.
+
+    The result is cached in memory and in `$AGENTIZE_HOME/.tmp/acw-providers.json`,
+    keyed by the mtimes and sizes of the acw scripts and the overrides file, so
+    a new process only runs bash after one of them changes.
+    """
     global _ACW_PROVIDERS_CACHE
 
     if _ACW_PROVIDERS_CACHE is not None:
@@ -152,6 +514,13 @@ def list_acw_providers() -> list[str]:
         merged_env = _merge_env(None)
         agentize_home = merged_env["AGENTIZE_HOME"]
         acw_script = _resolve_acw_script(agentize_home, merged_env)
+        cache_path = _providers_cache_path(merged_env)
+        fingerprint = _providers_fingerprint(acw_script, merged_env)
+        cached = _load_cached_providers(cache_path, fingerprint)
+        if cached is not None:
+            _ACW_PROVIDERS_CACHE = cached
+            return list(cached)
+
         overrides_cmd = _resolve_overrides_cmd(merged_env)
         bash_cmd = f'source "{acw_script}"{overrides_cmd} && acw --complete providers'
 
@@ -170,6 +539,7 @@ def list_acw_providers() -> list[str]:
         if not providers:
             raise RuntimeError("acw --complete providers returned no providers")
 
+        _store_cached_providers(cache_path, fingerprint, providers)
         _ACW_PROVIDERS_CACHE = providers
         return list(providers)
 
@@ -191,6 +561,10 @@ class ACW:
         log_writer: Callable[[str], None] | None = None,
         log_command: bool = False,
         runner: Callable[..., subprocess.CompletedProcess] | None = None,
+        on_output: OutputCallback | None = None,
+        stop_when: StopPredicate | None = None,
+        idle_timeout: float | None = None,
+        cancel: threading.Event | None = None,
     ) -> None:
         # Skip provider validation when using custom runner (for tests)
         if runner is None:
@@ -210,6 +584,17 @@ class ACW:
         self._log_writer = log_writer
         self._log_command = log_command
         self._runner = runner if runner is not None else run_acw
+        # Only streaming-aware runners receive these, so plain test runners keep working
+        self._stream_options = {
+            key: value
+            for key, value in (
+                ("on_output", on_output),
+                ("stop_when", stop_when),
+                ("idle_timeout", idle_timeout),
+                ("cancel", cancel),
+            )
+            if value is not None
+        }
 
     def _log(self, message: str) -> None:
         if self._log_writer:
@@ -247,6 +632,7 @@ class ACW:
             extra_flags=self.extra_flags,
             timeout=self.timeout,
             cwd=self.cwd,
+            **self._stream_options,
         )
 
         elapsed = int(time.time() - start_time)
@@ -269,6 +655,9 @@ def run(
     env: dict[str, str] | None = None,
     log_writer: Callable[[str], None] | None = None,
     log_command: bool = False,
+    on_output: OutputCallback | None = None,
+    stop_when: StopPredicate | None = None,
+    idle_timeout: float | None = None,
 ) -> subprocess.CompletedProcess:
     """Run a single ACW stage with timing logs."""
 
@@ -282,6 +671,8 @@ def run(
         permission_mode: str | None = None,
         extra_flags: list[str] | None = None,
         timeout: int = 900,
+        cwd: str | Path | None = None,
+        **stream_options,
     ) -> subprocess.CompletedProcess:
         return run_acw(
             provider,
@@ -294,6 +685,7 @@ def run(
             timeout=timeout,
             cwd=cwd,
             env=env,
+            **stream_options,
         )
 
     runner = ACW(
@@ -304,9 +696,13 @@ def run(
         tools=tools,
         permission_mode=permission_mode,
         extra_flags=extra_flags,
+        cwd=cwd,
         log_writer=log_writer,
         log_command=log_command,
         runner=_runner,
+        on_output=on_output,
+        stop_when=stop_when,
+        idle_timeout=idle_timeout,
     )
     return runner.run(input_file, output_file)
 
@@ -0,0 +1,240 @@
+"""Host-wide admission control for ACW invocations.
+
+Limits come from `AGENTIZE_ACW_MAX_CONCURRENT` and `AGENTIZE_ACW_RPM`, each a
+comma-separated list of `<provider>=<n>` or `<provider>:<model>=<n>` entries.
+State lives in flock-guarded files under `$AGENTIZE_HOME/.tmp/acw-admission/`,
+so every process on the host (planner, impl loops, eval harness) shares the
+same slots, request budget and queue. Locks die with their process, so a
+crashed caller never leaks a slot.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterator
+
+_POLL_SEC = 0.1
+
+
+@dataclass(frozen=True)
+class Admission:
+    """Outcome of one admission: the limit key applied and the time spent queued."""
+
+    key: str | None
+    wait: float
+
+
+def _parse_limits(spec: str | None) -> dict[str, float]:
+    limits: dict[str, float] = {}
+    for entry in (spec or "").split(","):
+        name, sep, value = entry.strip().partition("=")
+        if not sep:
+            continue
+        try:
+            number = float(value)
+        except ValueError:
+            continue
+        if number > 0:
+            limits[name.strip()] = number
+    return limits
+
+
+def _match(limits: dict[str, float], provider: str, model: str) -> tuple[str, float] | None:
+    for key in (f"{provider}:{model}", provider):
+        if key in limits:
+            return key, limits[key]
+    return None
+
+
+def resolve_limits(
+    provider: str,
+    model: str,
+    env: dict[str, str] | None = None,
+) -> tuple[tuple[str, int] | None, tuple[str, float] | None]:
+    """The `(key, max_concurrent)` and `(key, rpm)` limits for a backend.
+
+    The most specific entry wins: `claude:opus=2` gives opus its own two slots,
+    while `claude=4` makes every other claude model share four. Either part is
+    None when no entry applies.
+    """
+    env_vars = env or os.environ
+    concurrency = _match(_parse_limits(env_vars.get("AGENTIZE_ACW_MAX_CONCURRENT")), provider, model)
+    rpm = _match(_parse_limits(env_vars.get("AGENTIZE_ACW_RPM")), provider, model)
+    return (
+        (concurrency[0], max(1, int(concurrency[1]))) if concurrency is not None else None,
+        rpm,
+    )
+
+
+def _root(env: dict[str, str] | None) -> Path:
+    env_vars = env or os.environ
+    configured = env_vars.get("AGENTIZE_ACW_ADMISSION_DIR")
+    if configured:
+        return Path(configured).expanduser()
+    home = env_vars.get("AGENTIZE_HOME")
+    if home:
+        return Path(home) / ".tmp" / "acw-admission"
+    return Path(tempfile.gettempdir()) / "agentize-acw-admission"
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    with open(path, "a+") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _try_lock(path: Path, *, create: bool = True) -> IO | None:
+    try:
+        handle = open(path, "a+" if create else "r")
+    except FileNotFoundError:
+        return None
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+class _Limiter:
+    """One limit key's directory: state.json, queue/ tickets and slot locks."""
+
+    def __init__(self, root: Path, key: str) -> None:
+        self.key = key
+        self.directory = root / re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+        self.queue = self.directory / "queue"
+        self.queue.mkdir(parents=True, exist_ok=True)
+
+    def _update_state(self, update) -> object:
+        with _locked(self.directory / "state.lock"):
+            path = self.directory / "state.json"
+            try:
+                state = json.loads(path.read_text())
+            except (OSError, ValueError):
+                state = {}
+            result = update(state)
+            path.write_text(json.dumps(state))
+        return result
+
+    def enqueue(self) -> tuple[Path, IO]:
+        """Take the next ticket; the held lock on its file marks the caller alive."""
+
+        def take(state: dict) -> int:
+            ticket = int(state.get("next_ticket", 0))
+            state["next_ticket"] = ticket + 1
+            return ticket
+
+        ticket = self._update_state(take)
+        # Lock before the ticket becomes visible, so no one mistakes it for dead
+        fd, staging = tempfile.mkstemp(dir=self.directory, prefix=".ticket-")
+        handle = os.fdopen(fd, "a+")
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        path = self.queue / f"{ticket:012d}-{os.getpid()}"
+        os.replace(staging, path)
+        return path, handle
+
+    def is_head(self, ticket: Path) -> bool:
+        for entry in sorted(self.queue.iterdir()):
+            if entry.name >= ticket.name:
+                return True
+            if not entry.exists():
+                continue
+            probe = _try_lock(entry, create=False)
+            if probe is None:
+                if entry.exists():
+                    return False
+                continue
+            # Nobody holds the ticket: its owner died while queued
+            entry.unlink(missing_ok=True)
+            probe.close()
+        return True
+
+    def take_slot(self, max_concurrent: int) -> IO | None:
+        for index in range(max_concurrent):
+            handle = _try_lock(self.directory / f"slot-{index}.lock")
+            if handle is not None:
+                return handle
+        return None
+
+    def take_token(self, rpm: float) -> float:
+        """Consume a request token; return 0, or the seconds until one is available."""
+        rate = rpm / 60.0
+
+        def consume(state: dict) -> float:
+            now = time.time()
+            tokens = float(state.get("tokens", rpm))
+            updated = float(state.get("updated", now))
+            tokens = min(rpm, tokens + (now - updated) * rate)
+            state["updated"] = now
+            if tokens >= 1:
+                state["tokens"] = tokens - 1
+                return 0.0
+            state["tokens"] = tokens
+            return (1 - tokens) / rate
+
+        return float(self._update_state(consume))
+
+
+@contextmanager
+def admit(
+    provider: str,
+    model: str,
+    *,
+    env: dict[str, str] | None = None,
+) -> Iterator[Admission]:
+    """Wait for a concurrency slot and a request token for `provider:model`.
+
+    Callers are served in arrival order across all processes. Without a
+    configured limit this returns at once with `Admission(None, 0.0)`.
+    """
+    concurrency, rpm = resolve_limits(provider, model, env)
+    if concurrency is None and rpm is None:
+        yield Admission(None, 0.0)
+        return
+
+    root = _root(env)
+    slots = _Limiter(root, concurrency[0]) if concurrency is not None else None
+    bucket = _Limiter(root, rpm[0]) if rpm is not None else None
+    # Callers queue on the concurrency key, so sharing slots means sharing a queue
+    queue = slots or bucket
+    assert queue is not None
+    start = time.monotonic()
+    ticket, ticket_handle = queue.enqueue()
+    slot: IO | None = None
+    try:
+        while not queue.is_head(ticket):
+            time.sleep(_POLL_SEC)
+        if slots is not None:
+            while (slot := slots.take_slot(concurrency[1])) is None:
+                time.sleep(_POLL_SEC)
+        if bucket is not None:
+            while (delay := bucket.take_token(rpm[1])) > 0:
+                time.sleep(min(delay, 5.0))
+    except BaseException:
+        if slot is not None:
+            slot.close()
+        raise
+    finally:
+        ticket.unlink(missing_ok=True)
+        ticket_handle.close()
+
+    try:
+        yield Admission(queue.key, time.monotonic() - start)
+    finally:
+        if slot is not None:
+            slot.close()
+
+
+__all__ = ["Admission", "admit", "resolve_limits"]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import atexit
 import json
 import os
 import re
@@ -9,8 +10,13 @@ import shlex
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
+
+from agentize.workflow.api import gh_api
+from agentize.workflow.api.gh_api import check_bucket
 
 
 def _resolve_overrides() -> Path | None:
@@ -36,50 +42,193 @@ def _body_args(body: str) -> tuple[list[str], str | None]:
     return ["--body", body], None
 
 
-def _gh_available() -> bool:
-    overrides = _resolve_overrides()
-    if overrides is None and shutil.which("gh") is None:
-        return False
-    if overrides is not None:
-        cmd = _shell_command(["gh", "auth", "status"])
-        result = subprocess.run(
-            ["bash", "-c", f"source {shlex.quote(str(overrides))} && {cmd}"],
-            stdout=subprocess.DEVNULL,
+# `gh auth status` is a network round trip; its result is shared by every
+# helper call in the process until the TTL expires or gh reports an auth failure.
+_GH_AUTH_TTL_SEC = 300.0
+# gh exit code for "authentication required"
+_GH_AUTH_EXIT_CODE = 4
+_GH_AUTH_CACHE: dict[str | None, float] = {}
+_GH_AUTH_LOCK = threading.Lock()
+
+
+def _clear_gh_auth_cache() -> None:
+    with _GH_AUTH_LOCK:
+        _GH_AUTH_CACHE.clear()
+
+
+class _OverridesShell:
+    """A bash process that sources the overrides file once and runs gh calls.
+
+    Each command runs in a subshell, so every call starts from the state left
+    by sourcing the overrides, as a fresh `bash -c` would. The shell is
+    respawned when the environment changes.
+    """
+
+    _MARKER = "__AGENTIZE_GH_RC__"
+
+    def __init__(self, overrides: Path) -> None:
+        self.overrides = overrides
+        self.env_key = frozenset(os.environ.items())
+        self._tmpdir = tempfile.mkdtemp(prefix="agentize-gh-")
+        self._proc = subprocess.Popen(
+            ["bash"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL,
+            text=True,
         )
-        return result.returncode == 0
-
-    result = subprocess.run(
-        ["gh", "auth", "status"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
+        self._send(f"source {shlex.quote(str(overrides))} </dev/null >/dev/null 2>&1\n")
+
+    def _send(self, text: str) -> None:
+        assert self._proc.stdin is not None
+        self._proc.stdin.write(text)
+        self._proc.stdin.flush()
+
+    def run(self, parts: list[str], cwd: str | Path | None) -> subprocess.CompletedProcess | None:
+        """Run `gh` in the shell; None if the shell is gone."""
+        out_path = os.path.join(self._tmpdir, "stdout")
+        err_path = os.path.join(self._tmpdir, "stderr")
+        # The shell's own directory is fixed at spawn; follow the caller's
+        workdir = str(cwd) if cwd else os.getcwd()
+        script = (
+            f"(cd {shlex.quote(workdir)} && {_shell_command(parts)}) </dev/null "
+            f">{shlex.quote(out_path)} 2>{shlex.quote(err_path)}; "
+            f"echo \"{self._MARKER} $?\"\n"
+        )
+        try:
+            self._send(script)
+            assert self._proc.stdout is not None
+            line = self._proc.stdout.readline()
+            while line and not line.startswith(self._MARKER):
+                line = self._proc.stdout.readline()
+        except (BrokenPipeError, OSError):
+            return None
+        if not line:
+            return None
+        returncode = int(line.split()[1])
+        with open(out_path, encoding="utf-8", errors="replace") as f:
+            stdout = f.read()
+        with open(err_path, encoding="utf-8", errors="replace") as f:
+            stderr = f.read()
+        return subprocess.CompletedProcess(parts, returncode, stdout, stderr)
+
+    def close(self) -> None:
+        try:
+            if self._proc.stdin is not None:
+                self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+_OVERRIDES_SHELL: _OverridesShell | None = None
+_OVERRIDES_SHELL_LOCK = threading.Lock()
+
+
+def _close_overrides_shell() -> None:
+    global _OVERRIDES_SHELL
+    with _OVERRIDES_SHELL_LOCK:
+        if _OVERRIDES_SHELL is not None:
+            _OVERRIDES_SHELL.close()
+            _OVERRIDES_SHELL = None
+
+
+atexit.register(_close_overrides_shell)
+
+
+def _run_in_overrides_shell(
+    overrides: Path,
+    parts: list[str],
+    cwd: str | Path | None,
+) -> subprocess.CompletedProcess:
+    global _OVERRIDES_SHELL
+    with _OVERRIDES_SHELL_LOCK:
+        shell = _OVERRIDES_SHELL
+        if shell is not None and (
+            shell.overrides != overrides or shell.env_key != frozenset(os.environ.items())
+        ):
+            shell.close()
+            shell = None
+        if shell is None:
+            shell = _OverridesShell(overrides)
+            _OVERRIDES_SHELL = shell
+        result = shell.run(parts, cwd)
+        if result is not None:
+            return result
+        shell.close()
+        _OVERRIDES_SHELL = None
+
+    # The shell exited (e.g. the overrides file calls `exit`): run one-shot
+    return subprocess.run(
+        ["bash", "-c", f"source {shlex.quote(str(overrides))} && {_shell_command(parts)}"],
+        capture_output=True,
+        text=True,
+        cwd=str(cwd) if cwd else None,
     )
-    return result.returncode == 0
 
 
-def _run_gh(
+def _exec_gh(
     args: Iterable[str],
     *,
     cwd: str | Path | None = None,
+    capture_output: bool = True,
 ) -> subprocess.CompletedProcess:
-    if not _gh_available():
-        raise RuntimeError("gh CLI not available or not authenticated")
+    args = list(args)
     overrides = _resolve_overrides()
     if overrides is not None:
+        if capture_output:
+            return _run_in_overrides_shell(overrides, ["gh", *args], cwd)
+        # Streaming output (e.g. `pr checks --watch`) needs the caller's stdout
         cmd = _shell_command(["gh", *args])
-        result = subprocess.run(
+        return subprocess.run(
             ["bash", "-c", f"source {shlex.quote(str(overrides))} && {cmd}"],
-            capture_output=True,
-            text=True,
-            cwd=str(cwd) if cwd else None,
-        )
-    else:
-        result = subprocess.run(
-            ["gh", *args],
-            capture_output=True,
+            capture_output=False,
             text=True,
             cwd=str(cwd) if cwd else None,
         )
+    return subprocess.run(
+        ["gh", *args],
+        capture_output=capture_output,
+        text=True,
+        cwd=str(cwd) if cwd else None,
+    )
+
+
+def _gh_available() -> bool:
+    overrides = _resolve_overrides()
+    if overrides is None and shutil.which("gh") is None:
+        return False
+    key = str(overrides) if overrides is not None else None
+    with _GH_AUTH_LOCK:
+        checked_at = _GH_AUTH_CACHE.get(key)
+    if checked_at is not None and time.monotonic() - checked_at < _GH_AUTH_TTL_SEC:
+        return True
+
+    result = _exec_gh(["auth", "status"])
+    if result.returncode != 0:
+        return False
+    # Only success is cached, so a later `gh auth login` takes effect immediately
+    with _GH_AUTH_LOCK:
+        _GH_AUTH_CACHE[key] = time.monotonic()
+    return True
+
+
+def _note_exit_code(result: subprocess.CompletedProcess) -> None:
+    if result.returncode == _GH_AUTH_EXIT_CODE:
+        _clear_gh_auth_cache()
+
+
+def _run_gh(
+    args: Iterable[str],
+    *,
+    cwd: str | Path | None = None,
+) -> subprocess.CompletedProcess:
+    if not _gh_available():
+        raise RuntimeError("gh CLI not available or not authenticated")
+    args = list(args)
+    result = _exec_gh(args, cwd=cwd)
+    _note_exit_code(result)
     if result.returncode != 0:
         detail = result.stderr.strip() or result.stdout.strip()
         hint = detail if detail else f"exit code {result.returncode}"
@@ -95,25 +244,38 @@ def _run_gh_with_status(
 ) -> subprocess.CompletedProcess:
     if not _gh_available():
         raise RuntimeError("gh CLI not available or not authenticated")
-    overrides = _resolve_overrides()
-    if overrides is not None:
-        cmd = _shell_command(["gh", *args])
-        result = subprocess.run(
-            ["bash", "-c", f"source {shlex.quote(str(overrides))} && {cmd}"],
-            capture_output=capture_output,
-            text=True,
-            cwd=str(cwd) if cwd else None,
-        )
-    else:
-        result = subprocess.run(
-            ["gh", *args],
-            capture_output=capture_output,
-            text=True,
-            cwd=str(cwd) if cwd else None,
-        )
+    result = _exec_gh(args, cwd=cwd, capture_output=capture_output)
+    _note_exit_code(result)
     return result
 
 
+# Returned by _via_api() when the call should go through the gh CLI
+_USE_CLI = object()
+
+
+def _api_backend():
+    """The native API backend module when `AGENTIZE_GH_BACKEND=api`, else None.
+
+    Shell overrides stub the CLI, so they always keep the CLI backend.
+    """
+    if os.environ.get("AGENTIZE_GH_BACKEND", "cli").strip().lower() != "api":
+        return None
+    if _resolve_overrides() is not None:
+        return None
+    return gh_api
+
+
+def _via_api(operation: str, *args: Any, **kwargs: Any) -> Any:
+    """Run `operation` on the API backend, or return _USE_CLI to fall back."""
+    api = _api_backend()
+    if api is None:
+        return _USE_CLI
+    try:
+        return getattr(api, operation)(*args, **kwargs)
+    except api.Unsupported:
+        return _USE_CLI
+
+
 def _parse_issue_number(issue_url: str) -> str | None:
     match = re.search(r"([0-9]+)$", issue_url.strip())
     if not match:
@@ -138,6 +300,9 @@ def issue_create(
     *,
     cwd: str | Path | None = None,
 ) -> tuple[str | None, str]:
+    created = _via_api("issue_create", title, body, labels, cwd=cwd)
+    if created is not _USE_CLI:
+        return created
     body_args, temp_body = _body_args(body)
     args = ["issue", "create", "--title", title, *body_args]
     if labels:
@@ -154,6 +319,9 @@ def issue_create(
 
 
 def issue_view(issue_number: str | int, query: str, *, cwd: str | Path | None = None) -> str:
+    output = _via_api("issue_view", issue_number, query, cwd=cwd)
+    if output is not _USE_CLI:
+        return output
     result = _run_gh(
         [
             "issue",
@@ -170,6 +338,9 @@ def issue_view(issue_number: str | int, query: str, *, cwd: str | Path | None =
 
 
 def issue_body(issue_number: str | int, *, cwd: str | Path | None = None) -> str:
+    body = _via_api("issue_body", issue_number, cwd=cwd)
+    if body is not _USE_CLI:
+        return body
     result = _run_gh(
         ["issue", "view", str(issue_number), "--json", "body", "-q", ".body"],
         cwd=cwd,
@@ -178,6 +349,9 @@ def issue_body(issue_number: str | int, *, cwd: str | Path | None = None) -> str
 
 
 def issue_url(issue_number: str | int, *, cwd: str | Path | None = None) -> str | None:
+    url = _via_api("issue_url", issue_number, cwd=cwd)
+    if url is not _USE_CLI:
+        return url
     result = _run_gh(
         ["issue", "view", str(issue_number), "--json", "url", "-q", ".url"],
         cwd=cwd,
@@ -195,6 +369,12 @@ def issue_edit(
     add_labels: list[str] | None = None,
     cwd: str | Path | None = None,
 ) -> None:
+    edited = _via_api(
+        "issue_edit", issue_number, title=title, body=body, body_file=body_file,
+        add_labels=add_labels, cwd=cwd,
+    )
+    if edited is not _USE_CLI:
+        return
     args = ["issue", "edit", str(issue_number)]
     if title:
         args.extend(["--title", title])
@@ -214,6 +394,8 @@ def label_create(
     *,
     cwd: str | Path | None = None,
 ) -> None:
+    if _via_api("label_create", name, color, description, cwd=cwd) is not _USE_CLI:
+        return
     args = ["label", "create", name, "--color", color, "--force"]
     if description:
         args.extend(["--description", description])
@@ -228,6 +410,8 @@ def label_add(
 ) -> None:
     if not labels:
         return
+    if _via_api("label_add", issue_number, labels, cwd=cwd) is not _USE_CLI:
+        return
     _run_gh(
         ["issue", "edit", str(issue_number), "--add-label", ",".join(labels)],
         cwd=cwd,
@@ -243,6 +427,9 @@ def pr_create(
     head: str | None = None,
     cwd: str | Path | None = None,
 ) -> tuple[str | None, str]:
+    created = _via_api("pr_create", title, body, draft=draft, base=base, head=head, cwd=cwd)
+    if created is not _USE_CLI:
+        return created
     body_args, temp_body = _body_args(body)
     args = ["pr", "create", "--title", title, *body_args]
     if draft:
@@ -268,6 +455,9 @@ def pr_view(
     *,
     cwd: str | Path | None = None,
 ) -> dict[str, Any]:
+    pr_data = _via_api("pr_view", pr_number, fields, cwd=cwd)
+    if pr_data is not _USE_CLI:
+        return pr_data
     result = _run_gh(
         ["pr", "view", str(pr_number), "--json", fields],
         cwd=cwd,
@@ -286,6 +476,10 @@ def pr_checks(
 ) -> tuple[int, list[dict]]:
     if watch and interval <= 0:
         raise ValueError("interval must be positive")
+    if not watch:
+        status = _via_api("pr_checks", pr_number, cwd=cwd)
+        if status is not _USE_CLI:
+            return status
     args = ["pr", "checks", str(pr_number)]
     if watch:
         args.extend(["--watch", "--interval", str(interval)])
@@ -302,6 +496,9 @@ def pr_checks(
 
     checks: list[dict] = []
     try:
+        listed = _via_api("pr_check_list", pr_number, cwd=cwd)
+        if listed is not _USE_CLI:
+            return exit_code, listed
         checks_result = _run_gh(
             [
                 "pr",
@@ -319,6 +516,142 @@ def pr_checks(
     return exit_code, checks
 
 
+def _pr_check_snapshot(pr_number: str | int, cwd: str | Path | None) -> list[dict]:
+    """Current checks as `{name, state, link}` dicts, without waiting."""
+    checks = _via_api("pr_check_snapshot", pr_number, cwd=cwd)
+    if checks is not _USE_CLI:
+        return checks
+    args = ["pr", "checks", str(pr_number), "--json", "name,state,link"]
+    result = _run_gh_with_status(args, cwd=cwd)
+    output = (result.stdout or "").strip()
+    if result.returncode not in (0, 1, 8) or not output.startswith("["):
+        detail = (result.stderr or "").strip() or output
+        if "no checks reported" in detail:
+            return []
+        hint = detail if detail else f"exit code {result.returncode}"
+        raise RuntimeError(f"gh {' '.join(args)} failed ({hint})")
+    return json.loads(output)
+
+
+def _required_check_names(pr_number: str | int, cwd: str | Path | None) -> set[str]:
+    """Names of the PR's checks required by its base branch (empty when none are)."""
+    names = _via_api("pr_required_checks", pr_number, cwd=cwd)
+    if names is not _USE_CLI:
+        return names
+    args = ["pr", "checks", str(pr_number), "--required", "--json", "name"]
+    result = _run_gh_with_status(args, cwd=cwd)
+    output = (result.stdout or "").strip()
+    if result.returncode not in (0, 1, 8) or not output.startswith("["):
+        detail = (result.stderr or "").strip() or output
+        if "no required checks reported" in detail or "no checks reported" in detail:
+            return set()
+        hint = detail if detail else f"exit code {result.returncode}"
+        raise RuntimeError(f"gh {' '.join(args)} failed ({hint})")
+    return {check.get("name") for check in json.loads(output)}
+
+
+# pr_checks_wait() exit code when no check appeared within `no_checks_timeout`;
+# outside the `gh pr checks` codes so callers cannot read it as pass or fail
+NO_CHECKS_EXIT_CODE = 3
+
+
+def pr_checks_wait(
+    pr_number: str | int,
+    *,
+    initial_interval: float = 5.0,
+    max_interval: float = 60.0,
+    timeout: float | None = None,
+    no_checks_timeout: float = 120.0,
+    cwd: str | Path | None = None,
+) -> tuple[int, list[dict]]:
+    """Wait for PR checks, returning as soon as a required one fails.
+
+    Polls after `initial_interval` seconds, growing 1.5x per poll up to
+    `max_interval`: quick checks are seen quickly, long runs cost few polls.
+    A failed check that the base branch does not require ends the wait only
+    once no check is pending, like `gh pr checks --watch`. Without any
+    required checks every failure counts.
+
+    Returns:
+        `(exit_code, checks)` with `gh pr checks` exit codes: `1` as soon as
+        a required check fails (others may still run) or once all finished
+        with a failure, `0` once all passed, `8` if `timeout` expired first.
+        `NO_CHECKS_EXIT_CODE` if no check appeared within
+        `no_checks_timeout`. `checks` is the last snapshot.
+    """
+    if initial_interval <= 0 or max_interval <= 0:
+        raise ValueError("interval must be positive")
+    start = time.monotonic()
+    interval = initial_interval
+    required: set[str] = set()
+    # Failed checks already looked up in the required set
+    seen_failed: set[str] = set()
+    while True:
+        checks = _pr_check_snapshot(pr_number, cwd)
+        buckets = {check_bucket(check.get("state")) for check in checks}
+        failed = {check.get("name") for check in checks if check_bucket(check.get("state")) == "fail"}
+        if failed and "pending" not in buckets:
+            return 1, checks
+        if failed:
+            if failed - seen_failed:
+                # Only a new failure costs a lookup; isRequired is known once a check exists
+                required = _required_check_names(pr_number, cwd)
+                seen_failed |= failed
+            if not required or failed & required:
+                return 1, checks
+        if checks and buckets == {"pass"}:
+            return 0, checks
+        elapsed = time.monotonic() - start
+        if not checks and elapsed >= no_checks_timeout:
+            return NO_CHECKS_EXIT_CODE, []
+        if timeout is not None and elapsed >= timeout:
+            return 8, checks
+        time.sleep(interval)
+        interval = min(interval * 1.5, max_interval)
+
+
+def job_log_lines(job_id: str | int, *, cwd: str | Path | None = None) -> Iterator[str]:
+    """Stream a GitHub Actions job log line by line.
+
+    The CLI backend reads `gh api .../actions/jobs/<id>/logs` from a pipe, so
+    the log is never loaded whole.
+    """
+    api = _api_backend()
+    if api is not None:
+        try:
+            yield from api.job_log_lines(job_id, cwd=cwd)
+            return
+        except api.Unsupported:
+            pass
+    if not _gh_available():
+        raise RuntimeError("gh CLI not available or not authenticated")
+    args = ["api", f"repos/{{owner}}/{{repo}}/actions/jobs/{job_id}/logs"]
+    overrides = _resolve_overrides()
+    if overrides is not None:
+        command = ["bash", "-c", f"source {shlex.quote(str(overrides))} && {_shell_command(['gh', *args])}"]
+    else:
+        command = ["gh", *args]
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors="replace",
+        cwd=str(cwd) if cwd else None,
+    )
+    try:
+        assert proc.stdout is not None
+        yield from proc.stdout
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        if proc.stdout is not None:
+            proc.stdout.close()
+    if proc.returncode != 0:
+        raise RuntimeError(f"gh {' '.join(args)} failed (exit code {proc.returncode})")
+
+
 __all__ = [
     "issue_create",
     "issue_view",
@@ -330,4 +663,7 @@ __all__ = [
     "pr_create",
     "pr_view",
     "pr_checks",
+    "pr_checks_wait",
+    "NO_CHECKS_EXIT_CODE",
+    "job_log_lines",
 ]
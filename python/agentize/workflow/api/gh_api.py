@@ -0,0 +1,574 @@
+"""Native GitHub API backend for workflow.api.gh.
+
+Selected with `AGENTIZE_GH_BACKEND=api`. Each `gh` CLI call costs a Go binary
+start, a config load and a fresh TLS handshake; this backend sends the same
+requests over pooled keep-alive HTTPS connections instead. Functions mirror
+the public helpers in gh.py and return the same shapes. Anything this backend
+cannot answer exactly the way the CLI would raises `Unsupported`, and gh.py
+falls back to the CLI.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import quote, urlsplit
+
+DEFAULT_API_URL = "https://api.github.com"
+_TIMEOUT_SEC = 30
+# Idle keep-alive connections kept per pool
+_MAX_IDLE = 4
+
+# `gh pr view --json` fields that map 1:1 onto GraphQL scalars
+_PR_SCALAR_FIELDS = frozenset({
+    "additions", "baseRefName", "body", "changedFiles", "closed", "createdAt",
+    "deletions", "headRefName", "headRefOid", "id", "isDraft", "mergeStateStatus",
+    "mergeable", "merged", "mergedAt", "number", "state", "title", "updatedAt", "url",
+})
+
+# `gh pr checks` buckets (exit code 1 for fail, 8 for pending)
+_CHECK_PASS = frozenset({"SUCCESS", "SKIPPED", "NEUTRAL"})
+_CHECK_FAIL = frozenset({
+    "ERROR", "FAILURE", "CANCELLED", "TIMED_OUT", "ACTION_REQUIRED", "STARTUP_FAILURE",
+})
+
+_PR_CHECKS_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      commits(last: 1) { nodes { commit { statusCheckRollup { contexts(first: 100) { nodes {
+        __typename
+        ... on CheckRun { name status conclusion detailsUrl }
+        ... on StatusContext { context state targetUrl }
+      } } } } } }
+    }
+  }
+}
+"""
+
+# isRequired needs the PR number: a check is required by the PR's base branch
+_PR_REQUIRED_CHECKS_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      commits(last: 1) { nodes { commit { statusCheckRollup { contexts(first: 100) { nodes {
+        __typename
+        ... on CheckRun { name isRequired(pullRequestNumber: $number) }
+        ... on StatusContext { context isRequired(pullRequestNumber: $number) }
+      } } } } } }
+    }
+  }
+}
+"""
+
+
+def check_bucket(state: str | None) -> str:
+    """Classify a check state like `gh pr checks`: "pass", "fail" or "pending"."""
+    state = str(state or "").upper()
+    if state in _CHECK_FAIL:
+        return "fail"
+    if state in _CHECK_PASS:
+        return "pass"
+    return "pending"
+
+
+class Unsupported(Exception):
+    """The call needs the CLI backend (no token, unknown field, no jq, ...)."""
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections to one API host."""
+
+    def __init__(self, api_url: str) -> None:
+        parts = urlsplit(api_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise Unsupported(f"unsupported API URL: {api_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.api_url = api_url
+        self.prefix = parts.path.rstrip("/")
+        # GitHub Enterprise serves GraphQL at /api/graphql next to /api/v3
+        if self.prefix.endswith("/api/v3"):
+            self.graphql_path = self.prefix[:-len("/v3")] + "/graphql"
+        else:
+            self.graphql_path = self.prefix + "/graphql"
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=_TIMEOUT_SEC)
+        return http.client.HTTPConnection(self.host, self.port, timeout=_TIMEOUT_SEC)
+
+    def request(
+        self, method: str, path: str, body: bytes | None, headers: dict[str, str]
+    ) -> tuple[int, bytes, http.client.HTTPMessage]:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+        if conn is None:
+            conn = self._connect()
+        while True:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError) as exc:
+                conn.close()
+                # An idle connection the server already closed fails before any
+                # response; retry once on a fresh one
+                if not reused:
+                    raise RuntimeError(f"GitHub API {method} {path} failed ({exc})") from exc
+                reused = False
+                conn = self._connect()
+            except OSError as exc:
+                conn.close()
+                raise RuntimeError(f"GitHub API {method} {path} failed ({exc})") from exc
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < _MAX_IDLE:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status, data, response.headers
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_POOL: _ConnectionPool | None = None
+_POOL_LOCK = threading.Lock()
+_GH_TOKEN: str | None = None
+_REPO_CACHE: dict[str, tuple[str, str]] = {}
+# path -> (ETag, parsed body) of the last 200 response to a conditional GET
+_ETAG_CACHE: dict[str, tuple[str, Any]] = {}
+
+
+def _api_url() -> str:
+    return os.environ.get("AGENTIZE_GH_API_URL") or DEFAULT_API_URL
+
+
+def _pool() -> _ConnectionPool:
+    global _POOL
+    url = _api_url()
+    with _POOL_LOCK:
+        if _POOL is None or _POOL.api_url != url:
+            if _POOL is not None:
+                _POOL.close()
+            _POOL = _ConnectionPool(url)
+        return _POOL
+
+
+def reset() -> None:
+    """Close pooled connections and forget the cached token and repositories."""
+    global _POOL, _GH_TOKEN
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+        _POOL = None
+    _GH_TOKEN = None
+    _REPO_CACHE.clear()
+    _ETAG_CACHE.clear()
+
+
+def _token() -> str:
+    global _GH_TOKEN
+    for var in ("GH_TOKEN", "GITHUB_TOKEN"):
+        if os.environ.get(var):
+            return os.environ[var]
+    if _GH_TOKEN is None:
+        if shutil.which("gh") is None:
+            raise Unsupported("no GitHub token")
+        result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True)
+        if result.returncode != 0 or not result.stdout.strip():
+            raise Unsupported("no GitHub token")
+        _GH_TOKEN = result.stdout.strip()
+    return _GH_TOKEN
+
+
+def _parse_remote(url: str) -> tuple[str, str] | None:
+    match = re.search(r"github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$", url.strip())
+    return (match.group(1), match.group(2)) if match else None
+
+
+def _repo(cwd: str | Path | None) -> tuple[str, str]:
+    """Resolve owner/repo like gh: `GH_REPO`, else the `origin` remote of `cwd`."""
+    gh_repo = os.environ.get("GH_REPO")
+    if gh_repo:
+        parts = gh_repo.strip("/").split("/")
+        if len(parts) >= 2:
+            return parts[-2], parts[-1]
+    key = str(Path(cwd or os.getcwd()).resolve())
+    if key not in _REPO_CACHE:
+        result = subprocess.run(
+            ["git", "remote", "get-url", "origin"],
+            capture_output=True, text=True, cwd=key,
+        )
+        repo = _parse_remote(result.stdout) if result.returncode == 0 else None
+        if repo is None:
+            raise Unsupported("cannot resolve repository from git remote")
+        _REPO_CACHE[key] = repo
+    return _REPO_CACHE[key]
+
+
+def _request(
+    method: str,
+    path: str,
+    payload: Any = None,
+    *,
+    graphql: bool = False,
+    extra_headers: dict[str, str] | None = None,
+) -> tuple[int, Any, http.client.HTTPMessage]:
+    global _GH_TOKEN
+    pool = _pool()
+    url_path = pool.graphql_path if graphql else pool.prefix + path
+    body = json.dumps(payload).encode("utf-8") if payload is not None else None
+    headers = {
+        "Authorization": f"Bearer {_token()}",
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "agentize",
+    }
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    if extra_headers:
+        headers.update(extra_headers)
+    status, data, response_headers = pool.request(method, url_path, body, headers)
+    if status == 401:
+        _GH_TOKEN = None
+    try:
+        parsed = json.loads(data) if data else None
+    except json.JSONDecodeError:
+        parsed = None
+    return status, parsed, response_headers
+
+
+def _check(method: str, path: str, status: int, data: Any) -> Any:
+    if 200 <= status < 300:
+        return data
+    message = data.get("message") if isinstance(data, dict) else None
+    raise RuntimeError(f"GitHub API {method} {path} failed ({status}: {message or 'no message'})")
+
+
+def _rest(method: str, path: str, payload: Any = None) -> Any:
+    status, data, _ = _request(method, path, payload)
+    return _check(method, path, status, data)
+
+
+def _conditional_get(path: str) -> tuple[Any, bool]:
+    """GET with `If-None-Match`; a 304 (not counted against the rate limit) reuses the cached body.
+
+    Returns:
+        (body, changed) where changed is False for a 304
+    """
+    cached = _ETAG_CACHE.get(path)
+    extra = {"If-None-Match": cached[0]} if cached else None
+    status, data, headers = _request("GET", path, extra_headers=extra)
+    if status == 304 and cached:
+        return cached[1], False
+    data = _check("GET", path, status, data)
+    etag = headers.get("ETag")
+    if etag:
+        _ETAG_CACHE[path] = (etag, data)
+    return data, True
+
+
+def _graphql(query: str, variables: dict[str, Any]) -> dict:
+    status, data, _ = _request("POST", "/graphql", {"query": query, "variables": variables}, graphql=True)
+    data = _check("POST", "/graphql", status, data) or {}
+    if data.get("errors"):
+        messages = "; ".join(str(err.get("message")) for err in data["errors"])
+        raise RuntimeError(f"GitHub GraphQL query failed ({messages})")
+    return data.get("data") or {}
+
+
+def _issue_path(cwd: str | Path | None, *rest: str) -> str:
+    owner, repo = _repo(cwd)
+    return "/".join([f"/repos/{quote(owner)}/{quote(repo)}", *rest])
+
+
+# ============================================================
+# Operations (signatures mirror gh.py)
+# ============================================================
+
+
+def issue_create(
+    title: str,
+    body: str,
+    labels: list[str] | None = None,
+    *,
+    cwd: str | Path | None = None,
+) -> tuple[str | None, str]:
+    payload: dict[str, Any] = {"title": title, "body": body}
+    if labels:
+        payload["labels"] = labels
+    issue = _rest("POST", _issue_path(cwd, "issues"), payload)
+    return str(issue["number"]), issue["html_url"]
+
+
+def _issue_fields(issue_number: str | int, cwd: str | Path | None) -> dict[str, Any]:
+    """The issue shaped like `gh issue view --json title,body,labels,url`."""
+    issue = _rest("GET", _issue_path(cwd, "issues", str(issue_number)))
+    return {
+        "title": issue.get("title") or "",
+        "body": issue.get("body") or "",
+        "labels": [
+            {"name": label.get("name"), "description": label.get("description") or "",
+             "color": label.get("color")}
+            for label in issue.get("labels") or []
+        ],
+        "url": issue.get("html_url"),
+    }
+
+
+def _format_query_value(value: Any) -> str:
+    """Print a `-q` result the way gh does (raw strings, JSON otherwise)."""
+    if isinstance(value, str):
+        return value + "\n"
+    return json.dumps(value) + "\n"
+
+
+def issue_view(issue_number: str | int, query: str, *, cwd: str | Path | None = None) -> str:
+    fields = _issue_fields(issue_number, cwd)
+    match = re.fullmatch(r"\s*\.(\w+)\s*", query)
+    if match and match.group(1) in fields:
+        return _format_query_value(fields[match.group(1)])
+    if shutil.which("jq") is None:
+        raise Unsupported("jq query without jq")
+    result = subprocess.run(
+        ["jq", "-r", query], input=json.dumps(fields), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise Unsupported(f"jq failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def issue_body(issue_number: str | int, *, cwd: str | Path | None = None) -> str:
+    return _format_query_value(_issue_fields(issue_number, cwd)["body"])
+
+
+def issue_url(issue_number: str | int, *, cwd: str | Path | None = None) -> str | None:
+    return _issue_fields(issue_number, cwd)["url"] or None
+
+
+def issue_edit(
+    issue_number: str | int,
+    *,
+    title: str | None = None,
+    body: str | None = None,
+    body_file: str | Path | None = None,
+    add_labels: list[str] | None = None,
+    cwd: str | Path | None = None,
+) -> None:
+    payload: dict[str, Any] = {}
+    if title:
+        payload["title"] = title
+    if body is not None:
+        payload["body"] = body
+    if body_file is not None:
+        payload["body"] = Path(body_file).read_text(encoding="utf-8")
+    if payload:
+        _rest("PATCH", _issue_path(cwd, "issues", str(issue_number)), payload)
+    if add_labels:
+        label_add(issue_number, add_labels, cwd=cwd)
+
+
+def label_create(
+    name: str,
+    color: str,
+    description: str = "",
+    *,
+    cwd: str | Path | None = None,
+) -> None:
+    payload = {"name": name, "color": color.lstrip("#")}
+    if description:
+        payload["description"] = description
+    path = _issue_path(cwd, "labels")
+    status, data, _ = _request("POST", path, payload)
+    if status == 422:
+        # Already exists: update it, like `gh label create --force`
+        update = {key: value for key, value in payload.items() if key != "name"}
+        _rest("PATCH", _issue_path(cwd, "labels", quote(name, safe="")), update)
+        return
+    _check("POST", path, status, data)
+
+
+def label_add(
+    issue_number: str | int,
+    labels: list[str],
+    *,
+    cwd: str | Path | None = None,
+) -> None:
+    if labels:
+        _rest("POST", _issue_path(cwd, "issues", str(issue_number), "labels"), {"labels": labels})
+
+
+def _current_branch(cwd: str | Path | None) -> str:
+    result = subprocess.run(
+        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+        capture_output=True, text=True, cwd=str(cwd) if cwd else None,
+    )
+    branch = result.stdout.strip()
+    if result.returncode != 0 or not branch or branch == "HEAD":
+        raise Unsupported("cannot determine current branch")
+    return branch
+
+
+def pr_create(
+    title: str,
+    body: str,
+    *,
+    draft: bool = False,
+    base: str | None = None,
+    head: str | None = None,
+    cwd: str | Path | None = None,
+) -> tuple[str | None, str]:
+    if not base:
+        base = _rest("GET", _issue_path(cwd))["default_branch"]
+    payload = {
+        "title": title,
+        "body": body,
+        "head": head or _current_branch(cwd),
+        "base": base,
+        "draft": draft,
+    }
+    pr = _rest("POST", _issue_path(cwd, "pulls"), payload)
+    return str(pr["number"]), pr["html_url"]
+
+
+def pr_view(
+    pr_number: str | int,
+    fields: str = "mergeStateStatus,mergeable,url",
+    *,
+    cwd: str | Path | None = None,
+) -> dict[str, Any]:
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names or any(name not in _PR_SCALAR_FIELDS for name in names):
+        raise Unsupported(f"pr view fields: {fields}")
+    owner, repo = _repo(cwd)
+    query = (
+        "query($owner: String!, $repo: String!, $number: Int!) {"
+        " repository(owner: $owner, name: $repo) {"
+        f" pullRequest(number: $number) {{ {' '.join(names)} }} }} }}"
+    )
+    data = _graphql(query, {"owner": owner, "repo": repo, "number": int(pr_number)})
+    pr = (data.get("repository") or {}).get("pullRequest")
+    if pr is None:
+        raise RuntimeError(f"GitHub API: pull request #{pr_number} not found")
+    return {name: pr.get(name) for name in names}
+
+
+def _rollup_nodes(query: str, pr_number: str | int, cwd: str | Path | None) -> list[dict]:
+    """`statusCheckRollup` context nodes of the PR head commit."""
+    owner, repo = _repo(cwd)
+    data = _graphql(query, {"owner": owner, "repo": repo, "number": int(pr_number)})
+    try:
+        commits = data["repository"]["pullRequest"]["commits"]["nodes"]
+        rollup = commits[0]["commit"]["statusCheckRollup"] if commits else None
+    except (KeyError, TypeError):
+        raise RuntimeError(f"GitHub API: pull request #{pr_number} not found")
+    return ((rollup or {}).get("contexts") or {}).get("nodes") or []
+
+
+def pr_check_list(pr_number: str | int, *, cwd: str | Path | None = None) -> list[dict]:
+    """Checks on the PR head shaped like `gh pr checks --json name,state,link`."""
+    checks = []
+    for node in _rollup_nodes(_PR_CHECKS_QUERY, pr_number, cwd):
+        if node.get("__typename") == "CheckRun":
+            status = node.get("status")
+            state = node.get("conclusion") if status == "COMPLETED" else status
+            checks.append({"name": node.get("name"), "state": state, "link": node.get("detailsUrl") or ""})
+        elif node.get("__typename") == "StatusContext":
+            checks.append({"name": node.get("context"), "state": node.get("state"),
+                           "link": node.get("targetUrl") or ""})
+    return checks
+
+
+def pr_required_checks(pr_number: str | int, *, cwd: str | Path | None = None) -> set[str]:
+    """Names of the PR head's checks that the base branch requires, like `gh pr checks --required`."""
+    names = set()
+    for node in _rollup_nodes(_PR_REQUIRED_CHECKS_QUERY, pr_number, cwd):
+        if node.get("isRequired"):
+            names.add(node.get("name") if node.get("__typename") == "CheckRun" else node.get("context"))
+    return names
+
+
+def pr_checks(pr_number: str | int, *, cwd: str | Path | None = None) -> tuple[int, list[dict]]:
+    """Non-watch `gh pr checks`: exit code 0 (pass), 1 (fail) or 8 (pending)."""
+    checks = pr_check_list(pr_number, cwd=cwd)
+    if not checks:
+        # gh reports "no checks" as an error; let it word that
+        raise Unsupported("no checks reported")
+    buckets = {check_bucket(check["state"]) for check in checks}
+    if "fail" in buckets:
+        return 1, checks
+    if "pending" in buckets:
+        return 8, checks
+    return 0, checks
+
+
+def pr_check_snapshot(pr_number: str | int, *, cwd: str | Path | None = None) -> list[dict]:
+    """Checks on the PR head from the check-runs and combined-status REST APIs.
+
+    All three requests (PR head, check runs, statuses) are ETag-conditional,
+    so polling an unchanged PR costs three 304 responses, none of which count
+    against the rate limit.
+    """
+    base = _issue_path(cwd)
+    pr, _ = _conditional_get(f"{base}/pulls/{pr_number}")
+    sha = pr["head"]["sha"]
+    runs, _ = _conditional_get(f"{base}/commits/{sha}/check-runs?per_page=100")
+    status, _ = _conditional_get(f"{base}/commits/{sha}/status?per_page=100")
+    checks = []
+    for run in (runs or {}).get("check_runs") or []:
+        state = run.get("conclusion") if run.get("status") == "completed" else run.get("status")
+        checks.append({"name": run.get("name"), "state": str(state or "").upper(),
+                       "link": run.get("details_url") or run.get("html_url") or ""})
+    for context in (status or {}).get("statuses") or []:
+        checks.append({"name": context.get("context"), "state": str(context.get("state") or "").upper(),
+                       "link": context.get("target_url") or ""})
+    return checks
+
+
+def job_log_lines(job_id: str | int, *, cwd: str | Path | None = None) -> Iterator[str]:
+    """Stream a GitHub Actions job log line by line.
+
+    The logs endpoint redirects to a short-lived blob URL on another host; the
+    blob is read from its own connection, one line at a time, so a large log
+    is never held in memory.
+    """
+    path = _issue_path(cwd, "actions", "jobs", str(job_id), "logs")
+    status, data, headers = _request("GET", path)
+    location = headers.get("Location")
+    if status not in (301, 302, 307) or not location:
+        _check("GET", path, status, data)
+        raise RuntimeError(f"GitHub API GET {path} returned no log location")
+    parts = urlsplit(location)
+    conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = conn_class(parts.hostname, parts.port, timeout=_TIMEOUT_SEC)
+    try:
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        conn.request("GET", target, headers={"User-Agent": "agentize"})
+        response = conn.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"GitHub job log download failed ({response.status})")
+        for raw in response:
+            yield raw.decode("utf-8", errors="replace")
+    except (OSError, http.client.HTTPException) as exc:
+        raise RuntimeError(f"GitHub job log download failed ({exc})") from exc
+    finally:
+        conn.close()
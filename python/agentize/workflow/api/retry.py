@@ -0,0 +1,140 @@
+"""Failure classification and retry policy for Session stages."""
+
+from __future__ import annotations
+
+import random
+import re
+import subprocess
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+RATE_LIMITED = "rate_limited"
+OVERLOADED = "overloaded"
+AUTH = "auth"
+INVALID_ARGS = "invalid_args"
+TIMEOUT = "timeout"
+NO_OUTPUT = "no_output"
+UNKNOWN = "unknown"
+
+# An HTTP status as the providers' CLIs print it ("API Error: 401",
+# "unexpected status 403", "HTTP 401"), not any 401 in the output
+_HTTP_STATUS = r"(?:status(?: code)?|http(?:/[\d.]+)?|api error)[:\s]+"
+
+# Checked in order: an auth or usage error is not worth retrying even when
+# the same output also mentions a transient condition.
+_PATTERNS = [
+    (AUTH, re.compile(
+        _HTTP_STATUS + r"40[13]\b|\b403 forbidden\b|unauthori[sz]ed|invalid api key|api key not"
+        r"|not logged in|authentication (failed|error|required)|please run /login|login required",
+        re.IGNORECASE,
+    )),
+    (INVALID_ARGS, re.compile(
+        r"unknown (option|flag|argument)|unrecognized (option|argument)|invalid (option|argument|value)"
+        r"|unexpected argument|^usage:|model .{0,40}not (found|supported|exist)",
+        re.IGNORECASE | re.MULTILINE,
+    )),
+    (RATE_LIMITED, re.compile(r"\b429\b|rate.?limit|too many requests|quota", re.IGNORECASE)),
+    (OVERLOADED, re.compile(
+        r"\b5(00|02|03|29)\b|overloaded|server error|temporarily unavailable|capacity|try again later"
+        r"|connection (reset|refused|error)|timed? ?out",
+        re.IGNORECASE,
+    )),
+]
+
+# acw exit codes for a missing input file (3) and a missing provider CLI (4)
+_ACW_USAGE_EXIT_CODES = frozenset({3, 4})
+
+DEFAULT_BUDGETS = {
+    RATE_LIMITED: 5,
+    OVERLOADED: 4,
+    TIMEOUT: 1,
+    NO_OUTPUT: 2,
+    UNKNOWN: 1,
+    AUTH: 0,
+    INVALID_ARGS: 0,
+}
+
+
+def classify_failure(
+    error: BaseException | str,
+    *,
+    returncode: int | None = None,
+    stderr: str = "",
+) -> str:
+    """Map a failed stage run to one of the failure classes above."""
+    if isinstance(error, subprocess.TimeoutExpired):
+        return TIMEOUT
+    text = f"{stderr}\n{error}"
+    for failure, pattern in _PATTERNS:
+        if pattern.search(text):
+            return failure
+    if returncode in _ACW_USAGE_EXIT_CODES:
+        return INVALID_ARGS
+    if returncode == 0:
+        return NO_OUTPUT
+    return UNKNOWN
+
+
+@dataclass
+class RetryPolicy:
+    """Per-class retry budgets, jittered exponential backoff and optional hedging.
+
+    `budgets[cls]` is how many retries a failure class gets. The n-th retry of a
+    class waits a uniformly random time in `[0, min(max_delay, base_delay * 2**(n-1))]`
+    ("full jitter"). With `hedge_percentile` set, a stage that has a fallback
+    backend and runs longer than that percentile of its backend's recent
+    successful latencies gets the fallback launched alongside it.
+    """
+
+    budgets: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_BUDGETS))
+    base_delay: float = 2.0
+    max_delay: float = 120.0
+    hedge_percentile: float | None = None
+    hedge_min_samples: int = 5
+    latency_window: int = 50
+    rand: Callable[[], float] = random.random
+    _latencies: dict[tuple[str, str], deque[float]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def classify(self, error: BaseException | str, *, returncode: int | None = None, stderr: str = "") -> str:
+        return classify_failure(error, returncode=returncode, stderr=stderr)
+
+    def should_retry(self, failure: str, count: int) -> bool:
+        """Whether the `count`-th failure of class `failure` may be retried."""
+        return count <= self.budgets.get(failure, 0)
+
+    def backoff(self, count: int) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** max(0, count - 1))
+        return cap * self.rand()
+
+    def record_latency(self, backend: tuple[str, str], seconds: float) -> None:
+        with self._lock:
+            samples = self._latencies.setdefault(backend, deque(maxlen=self.latency_window))
+            samples.append(seconds)
+
+    def hedge_delay(self, backend: tuple[str, str]) -> float | None:
+        """Seconds after which to hedge `backend`, or None when hedging is off or unprimed."""
+        if self.hedge_percentile is None:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(backend, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = min(len(samples) - 1, int(self.hedge_percentile * len(samples)))
+        return samples[index]
+
+
+__all__ = [
+    "AUTH",
+    "DEFAULT_BUDGETS",
+    "INVALID_ARGS",
+    "NO_OUTPUT",
+    "OVERLOADED",
+    "RATE_LIMITED",
+    "RetryPolicy",
+    "TIMEOUT",
+    "UNKNOWN",
+    "classify_failure",
+]
@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
 import sys
 import threading
 import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable, Iterable
 
 from agentize.workflow.api.acw import ACW, run_acw
+from agentize.workflow.api.retry import RetryPolicy
+from agentize.workflow.api.stage_cache import StageCache
 
 PromptWriter = Callable[[Path], str]
 PromptInput = str | PromptWriter
@@ -31,12 +36,26 @@ class StageResult:
 
 @dataclass(frozen=True)
 class StageCall:
-    """Call specification for a stage executed in run_parallel."""
+    """Call specification for a stage executed in run_parallel or run_dag.
+
+    When `after` names upstream stages, `prompt` is a callable that receives
+    their results (`{stage: StageResult}`) and returns the prompt input.
+    """
 
     stage: str
-    prompt: PromptInput
+    prompt: PromptInput | Callable[[dict[str, StageResult]], PromptInput]
     backend: tuple[str, str]
     options: dict[str, Any]
+    after: tuple[str, ...] = ()
+
+
+class StageFailure(RuntimeError):
+    """A stage run that exited non-zero or produced no output."""
+
+    def __init__(self, message: str, returncode: int | None, stderr: str) -> None:
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
 
 
 class PipelineError(RuntimeError):
@@ -63,6 +82,8 @@ class Session:
         output_suffix: str = "-output.md",
         log_acw_command: bool = False,
         log_output_dump: bool = False,
+        cache: StageCache | None = None,
+        retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._output_dir = Path(output_dir)
         self._output_dir.mkdir(parents=True, exist_ok=True)
@@ -73,6 +94,8 @@ class Session:
         self._log_acw_command = log_acw_command
         self._log_output_dump = log_output_dump
         self._log_lock = threading.Lock()
+        self._cache = cache
+        self._retry_policy = retry_policy
 
     def _log(self, message: str) -> None:
         with self._log_lock:
@@ -128,6 +151,7 @@ class Session:
         timeout: int,
         extra_flags: list[str] | None,
         cwd: str | Path | None = None,
+        cancel: threading.Event | None = None,
     ) -> subprocess.CompletedProcess:
         provider, model = backend
         acw_runner = ACW(
@@ -142,16 +166,193 @@ class Session:
             log_writer=self._log,
             log_command=self._log_acw_command,
             runner=self._runner,
+            cancel=cancel,
         )
         return acw_runner.run(input_path, output_path)
 
+    def _cache_key(
+        self,
+        backend: tuple[str, str],
+        input_path: Path,
+        *,
+        tools: str | None,
+        permission_mode: str | None,
+        extra_flags: list[str] | None,
+        cwd: str | Path | None,
+    ) -> str | None:
+        if self._cache is None:
+            return None
+        if not StageCache.cacheable(tools=tools, permission_mode=permission_mode, extra_flags=extra_flags):
+            return None
+        # Read-only stages still read the repository; outside git its state is unknown
+        worktree = StageCache.worktree_state(cwd, ignore=self._output_dir)
+        if worktree is None:
+            return None
+        return self._cache.key(
+            input_path.read_text(),
+            backend,
+            tools=tools,
+            permission_mode=permission_mode,
+            extra_flags=extra_flags,
+            cwd=cwd,
+            worktree=worktree,
+        )
+
+    def _cached_result(
+        self,
+        name: str,
+        key: str | None,
+        input_path: Path,
+        output_path: Path,
+    ) -> StageResult | None:
+        if key is None:
+            return None
+        text = self._cache.get(key)
+        if not text:
+            self._log(f"{name} cache miss ({key[:12]})")
+            return None
+        self._log(f"{name} cache hit ({key[:12]})")
+        output_path.write_text(text)
+        return StageResult(
+            stage=name,
+            input_path=input_path,
+            output_path=output_path,
+            process=subprocess.CompletedProcess(args=["stage-cache", key], returncode=0),
+        )
+
+    def _store_result(self, key: str | None, output_path: Path) -> None:
+        if key is None:
+            return
+        try:
+            self._cache.put(key, output_path.read_text())
+        except OSError as exc:
+            self._log(f"Stage cache write failed: {exc}")
+
     def _validate_output(self, stage: str, output_path: Path, process: subprocess.CompletedProcess) -> None:
         if process.returncode != 0:
-            raise RuntimeError(
-                f"Stage '{stage}' failed with exit code {process.returncode}"
+            raise StageFailure(
+                f"Stage '{stage}' failed with exit code {process.returncode}",
+                process.returncode,
+                _stderr_tail(process, output_path),
             )
         if not output_path.exists() or output_path.stat().st_size == 0:
-            raise RuntimeError(f"Stage '{stage}' produced no output")
+            raise StageFailure(
+                f"Stage '{stage}' produced no output",
+                process.returncode,
+                _stderr_tail(process, output_path),
+            )
+
+    def _run_validated(
+        self,
+        name: str,
+        backend: tuple[str, str],
+        input_path: Path,
+        output_path: Path,
+        **stage_options: Any,
+    ) -> tuple[subprocess.CompletedProcess, float]:
+        start = time.monotonic()
+        process = self._run_stage(name, backend, input_path, output_path, **stage_options)
+        self._validate_output(name, output_path, process)
+        return process, time.monotonic() - start
+
+    def _run_hedged(
+        self,
+        name: str,
+        policy: RetryPolicy,
+        hedge_after: float,
+        backend: tuple[str, str],
+        fallback_backend: tuple[str, str],
+        input_path: Path,
+        output_path: Path,
+        *,
+        extra_flags: list[str] | None,
+        **stage_options: Any,
+    ) -> tuple[subprocess.CompletedProcess, tuple[str, str]]:
+        """Run `backend`; past `hedge_after` seconds, race `fallback_backend` against it."""
+        hedge_output = output_path.with_name(f"{output_path.name}.hedge")
+        runs = {
+            "primary": (backend, output_path, extra_flags),
+            "hedge": (fallback_backend, hedge_output, None),  # drop provider-specific flags
+        }
+        cancels = {label: threading.Event() for label in runs}
+        winner: tuple[str, subprocess.CompletedProcess] | None = None
+        errors: dict[str, Exception] = {}
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            def submit(label: str) -> Future:
+                run_backend, run_output, flags = runs[label]
+                return executor.submit(
+                    self._run_validated,
+                    name,
+                    run_backend,
+                    input_path,
+                    run_output,
+                    extra_flags=flags,
+                    cancel=cancels[label],
+                    **stage_options,
+                )
+
+            futures = {submit("primary"): "primary"}
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                self._log(
+                    f"Stage '{name}' exceeded {hedge_after:.0f}s on {backend[0]}:{backend[1]}, "
+                    f"hedging with {fallback_backend[0]}:{fallback_backend[1]}"
+                )
+                futures[submit("hedge")] = "hedge"
+            pending = set(futures)
+            while pending and winner is None:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    label = futures[future]
+                    try:
+                        process, elapsed = future.result()
+                    except Exception as exc:
+                        errors[label] = exc
+                        continue
+                    if winner is None:
+                        winner = (label, process)
+                        policy.record_latency(runs[label][0], elapsed)
+            for label, event in cancels.items():
+                if winner is None or label != winner[0]:
+                    event.set()
+
+        if winner is None:
+            raise errors.get("primary") or errors["hedge"]
+        label, process = winner
+        if label == "hedge":
+            self._log(f"Stage '{name}' hedge on {fallback_backend[0]}:{fallback_backend[1]} finished first")
+            os.replace(hedge_output, output_path)
+        else:
+            hedge_output.unlink(missing_ok=True)
+        return process, runs[label][0]
+
+    def _attempt(
+        self,
+        name: str,
+        policy: RetryPolicy,
+        backend: tuple[str, str],
+        fallback_backend: tuple[str, str] | None,
+        input_path: Path,
+        output_path: Path,
+        **stage_options: Any,
+    ) -> tuple[subprocess.CompletedProcess, tuple[str, str]]:
+        hedge_after = None
+        # A hedge runs a second agent in the same cwd, so only read-only stages race
+        read_only = StageCache.cacheable(
+            tools=stage_options.get("tools"),
+            permission_mode=stage_options.get("permission_mode"),
+            extra_flags=stage_options.get("extra_flags"),
+        )
+        if fallback_backend and fallback_backend != backend and read_only:
+            hedge_after = policy.hedge_delay(backend)
+        if hedge_after is not None:
+            return self._run_hedged(
+                name, policy, hedge_after, backend, fallback_backend, input_path, output_path, **stage_options
+            )
+        process, elapsed = self._run_validated(name, backend, input_path, output_path, **stage_options)
+        policy.record_latency(backend, elapsed)
+        return process, backend
 
     def run_prompt(
         self,
@@ -169,30 +370,60 @@ class Session:
         input_path: str | Path | None = None,
         output_path: str | Path | None = None,
         fallback_backend: tuple[str, str] | None = None,
+        retry_policy: RetryPolicy | None = None,
     ) -> StageResult:
         input_path_resolved, output_path_resolved = self._resolve_paths(
             name, input_path, output_path
         )
+        policy = retry_policy or self._retry_policy
 
         attempts = 0
         last_error: Exception | str = ""
+        failures: Counter[str] = Counter()
 
-        for attempt in range(1, retry + 2):
-            attempts = attempt
+        while True:
+            attempts += 1
+            attempt = attempts
             try:
                 self._write_prompt(prompt, input_path_resolved)
-                process = self._run_stage(
-                    name,
+                key = self._cache_key(
                     backend,
                     input_path_resolved,
-                    output_path_resolved,
                     tools=tools,
                     permission_mode=permission_mode,
-                    timeout=timeout,
                     extra_flags=extra_flags,
                     cwd=cwd,
                 )
-                self._validate_output(name, output_path_resolved, process)
+                if attempt == 1:
+                    cached = self._cached_result(name, key, input_path_resolved, output_path_resolved)
+                    if cached is not None:
+                        return cached
+                stage_options = dict(tools=tools, permission_mode=permission_mode, timeout=timeout, cwd=cwd)
+                if policy is None:
+                    process = self._run_stage(
+                        name,
+                        backend,
+                        input_path_resolved,
+                        output_path_resolved,
+                        extra_flags=extra_flags,
+                        **stage_options,
+                    )
+                    self._validate_output(name, output_path_resolved, process)
+                else:
+                    process, used_backend = self._attempt(
+                        name,
+                        policy,
+                        backend,
+                        fallback_backend,
+                        input_path_resolved,
+                        output_path_resolved,
+                        extra_flags=extra_flags,
+                        **stage_options,
+                    )
+                    if used_backend != backend:
+                        key = self._cache_key(used_backend, input_path_resolved, tools=tools,
+                                              permission_mode=permission_mode, extra_flags=None, cwd=cwd)
+                self._store_result(key, output_path_resolved)
                 if self._log_output_dump:
                     self._log(f"{name} dumped to {output_path_resolved}")
                 return StageResult(
@@ -203,8 +434,27 @@ class Session:
                 )
             except Exception as exc:
                 last_error = exc
-                if attempt <= retry and retry_delay > 0:
-                    time.sleep(retry_delay)
+                if policy is None:
+                    if attempt > retry:
+                        break
+                    if retry_delay > 0:
+                        time.sleep(retry_delay)
+                    continue
+                failure = policy.classify(
+                    exc,
+                    returncode=getattr(exc, "returncode", None),
+                    stderr=str(getattr(exc, "stderr", "") or ""),
+                )
+                failures[failure] += 1
+                if not policy.should_retry(failure, failures[failure]):
+                    self._log(f"Stage '{name}' failed ({failure}), not retrying")
+                    break
+                delay = policy.backoff(failures[failure])
+                self._log(
+                    f"Stage '{name}' failed ({failure}), retry {failures[failure]}/"
+                    f"{policy.budgets.get(failure, 0)} in {delay:.1f}s"
+                )
+                time.sleep(delay)
 
         # If primary backend exhausted retries and a fallback is configured, try it
         if fallback_backend and fallback_backend != backend:
@@ -214,6 +464,17 @@ class Session:
             )
             try:
                 self._write_prompt(prompt, input_path_resolved)
+                key = self._cache_key(
+                    fallback_backend,
+                    input_path_resolved,
+                    tools=tools,
+                    permission_mode=permission_mode,
+                    extra_flags=None,
+                    cwd=cwd,
+                )
+                cached = self._cached_result(name, key, input_path_resolved, output_path_resolved)
+                if cached is not None:
+                    return cached
                 process = self._run_stage(
                     name,
                     fallback_backend,
@@ -226,6 +487,7 @@ class Session:
                     cwd=cwd,
                 )
                 self._validate_output(name, output_path_resolved, process)
+                self._store_result(key, output_path_resolved)
                 if self._log_output_dump:
                     self._log(f"{name} dumped to {output_path_resolved}")
                 return StageResult(
@@ -244,11 +506,13 @@ class Session:
         name: str,
         prompt: PromptInput,
         backend: tuple[str, str],
+        *,
+        after: Iterable[str] = (),
         **opts: Any,
     ) -> StageCall:
         if "retry" in opts or "retry_delay" in opts:
-            raise ValueError("retry and retry_delay are configured on run_parallel")
-        return StageCall(stage=name, prompt=prompt, backend=backend, options=opts)
+            raise ValueError("retry and retry_delay are configured on run_parallel/run_dag")
+        return StageCall(stage=name, prompt=prompt, backend=backend, options=opts, after=tuple(after))
 
     def run_parallel(
         self,
@@ -258,32 +522,144 @@ class Session:
         retry: int = 0,
         retry_delay: float = 0,
     ) -> dict[str, StageResult]:
-        results: dict[str, StageResult] = {}
-        futures = {}
-        stage_names: set[str] = set()
+        return self.run_dag(calls, max_workers=max_workers, retry=retry, retry_delay=retry_delay)
 
-        from concurrent.futures import ThreadPoolExecutor
+    def _run_call(
+        self,
+        call: StageCall,
+        upstream: dict[str, StageResult],
+        retry: int,
+        retry_delay: float,
+    ) -> StageResult:
+        prompt = call.prompt(upstream) if call.after else call.prompt
+        return self.run_prompt(
+            call.stage,
+            prompt,
+            call.backend,
+            retry=retry,
+            retry_delay=retry_delay,
+            **call.options,
+        )
+
+    def run_dag(
+        self,
+        calls: Iterable[StageCall],
+        *,
+        max_workers: int = 4,
+        provider_limits: dict[str, int] | None = None,
+        retry: int = 0,
+        retry_delay: float = 0,
+        on_start: Callable[[StageCall], None] | None = None,
+    ) -> dict[str, StageResult]:
+        """Run stages as soon as the stages they run `after` have finished.
+
+        At most `max_workers` stages run at once, and at most
+        `provider_limits[provider]` per provider. When a stage fails, stages
+        that depend on it are cancelled; independent stages still run. The
+        first failure is raised once nothing is left running.
+        """
+        ordered = list(calls)
+        by_name: dict[str, StageCall] = {}
+        for call in ordered:
+            if call.stage in by_name:
+                raise ValueError(f"Duplicate stage name '{call.stage}'")
+            by_name[call.stage] = call
+        _check_dag(by_name)
+
+        limits = provider_limits or {}
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        for provider, limit in limits.items():
+            if limit < 1:
+                raise ValueError(f"provider_limits['{provider}'] must be at least 1, got {limit}")
+        results: dict[str, StageResult] = {}
+        failures: dict[str, BaseException] = {}
+        cancelled: set[str] = set()
+        pending = list(ordered)
+        running: dict[Future, StageCall] = {}
+        provider_running: Counter[str] = Counter()
 
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            for call in calls:
-                if call.stage in stage_names:
-                    raise ValueError(f"Duplicate stage name '{call.stage}'")
-                stage_names.add(call.stage)
-                futures[executor.submit(
-                    self.run_prompt,
-                    call.stage,
-                    call.prompt,
-                    call.backend,
-                    retry=retry,
-                    retry_delay=retry_delay,
-                    **call.options,
-                )] = call.stage
-
-            for future, stage in list(futures.items()):
-                result = future.result()
-                results[stage] = result
-
-        return results
-
-
-__all__ = ["Session", "StageCall", "StageResult", "PipelineError"]
+            while pending or running:
+                changed = True
+                while changed:
+                    changed = False
+                    for call in list(pending):
+                        blocked = next((dep for dep in call.after if dep in failures or dep in cancelled), None)
+                        if blocked is not None:
+                            pending.remove(call)
+                            cancelled.add(call.stage)
+                            self._log(f"Stage '{call.stage}' cancelled: upstream stage '{blocked}' did not complete")
+                            changed = True
+
+                for call in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if any(dep not in results for dep in call.after):
+                        continue
+                    provider = call.backend[0]
+                    if provider in limits and provider_running[provider] >= limits[provider]:
+                        continue
+                    pending.remove(call)
+                    if on_start is not None:
+                        on_start(call)
+                    upstream = {dep: results[dep] for dep in call.after}
+                    running[executor.submit(self._run_call, call, upstream, retry, retry_delay)] = call
+                    provider_running[provider] += 1
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    call = running.pop(future)
+                    provider_running[call.backend[0]] -= 1
+                    try:
+                        results[call.stage] = future.result()
+                    except Exception as exc:
+                        failures[call.stage] = exc
+
+        if failures:
+            raise next(iter(failures.values()))
+        if pending:
+            names = ", ".join(f"'{call.stage}'" for call in pending)
+            raise ValueError(f"Stages could not be scheduled: {names}")
+        return {call.stage: results[call.stage] for call in ordered}
+
+
+def _stderr_tail(process: subprocess.CompletedProcess, output_path: Path, limit: int = 4096) -> str:
+    """Recent stderr of a stage run: the process's own and acw's `<output>.stderr`."""
+    parts = [str(process.stderr or "")[-limit:]]
+    try:
+        with open(f"{output_path}.stderr", "rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            handle.seek(max(0, handle.tell() - limit))
+            parts.append(handle.read().decode("utf-8", errors="replace"))
+    except OSError:
+        pass
+    return "\n".join(part for part in parts if part)
+
+
+def _check_dag(calls: dict[str, StageCall]) -> None:
+    """Reject unknown dependencies and dependency cycles."""
+    for call in calls.values():
+        for dep in call.after:
+            if dep not in calls:
+                raise ValueError(f"Stage '{call.stage}' depends on unknown stage '{dep}'")
+    state: dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(name: str, path: list[str]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            cycle = path[path.index(name):] + [name]
+            raise ValueError(f"Stage dependency cycle: {' -> '.join(cycle)}")
+        state[name] = 1
+        for dep in calls[name].after:
+            visit(dep, path + [name])
+        state[name] = 2
+
+    for name in calls:
+        visit(name, [])
+
+
+__all__ = ["Session", "StageCall", "StageResult", "StageFailure", "PipelineError"]
@@ -0,0 +1,190 @@
+"""Content-addressed cache of Session stage outputs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_SEC = 7 * 24 * 3600.0
+_ENV_DIR = "AGENTIZE_STAGE_CACHE_DIR"
+
+# Tools that cannot change the worktree. A stage that can write must run again:
+# replaying its text would skip its file changes.
+READ_ONLY_TOOLS = frozenset({"Read", "Grep", "Glob", "LS", "WebSearch", "WebFetch", "TodoWrite"})
+_WRITE_PERMISSION_MODES = frozenset({"acceptEdits", "bypassPermissions"})
+_WRITE_FLAGS = frozenset({"--yolo", "--dangerously-skip-permissions", "--full-auto"})
+
+
+class StageCache:
+    """Stage outputs on disk, keyed by a hash of everything that shapes them.
+
+    Entries live at `<directory>/<key[:2]>/<key>.md`. An entry's mtime is
+    when it was stored and its atime when it was last returned: entries older
+    than `max_age` are never returned, and size-based eviction drops the least
+    recently used entries first.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE_SEC,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> StageCache | None:
+        """The cache named by `AGENTIZE_STAGE_CACHE_DIR`, or None when unset."""
+        directory = os.getenv(_ENV_DIR, "").strip()
+        return cls(directory) if directory else None
+
+    @staticmethod
+    def cacheable(
+        *,
+        tools: str | None,
+        permission_mode: str | None,
+        extra_flags: list[str] | None,
+    ) -> bool:
+        """Whether a stage is read-only: an explicit read-only tool list and no write mode or flag."""
+        if not tools or any(tool.strip() not in READ_ONLY_TOOLS for tool in tools.split(",")):
+            return False
+        if permission_mode in _WRITE_PERMISSION_MODES:
+            return False
+        return not any(flag in _WRITE_FLAGS for flag in extra_flags or [])
+
+    @staticmethod
+    def worktree_state(cwd: str | Path | None = None, *, ignore: str | Path | None = None) -> str | None:
+        """`HEAD` plus a hash of uncommitted and untracked changes, or None outside a git worktree.
+
+        Read-only stages still read the repository, so their output is only
+        reusable while the checked-out content is the same. `ignore` is left
+        out of the hash: a session's own output directory changes every run.
+        """
+        def git(*args: str, where: str | Path | None, input: bytes | None = None) -> bytes | None:
+            try:
+                result = subprocess.run(
+                    ["git", *args], cwd=where, input=input, capture_output=True, check=False
+                )
+            except OSError:
+                return None
+            return result.stdout if result.returncode == 0 else None
+
+        top = git("rev-parse", "--show-toplevel", where=cwd)
+        if top is None:
+            return None
+        top = Path(top.decode().strip())
+        pathspec = ["--", "."]
+        if ignore is not None:
+            try:
+                relative = Path(cwd or ".").joinpath(ignore).resolve().relative_to(top.resolve())
+            except ValueError:
+                relative = None
+            if relative is not None and relative.parts:
+                pathspec.append(f":(exclude){relative.as_posix()}")
+
+        head = git("rev-parse", "HEAD", where=top)
+        diff = git("diff", "HEAD", "--binary", *pathspec, where=top)
+        untracked = git("ls-files", "--others", "--exclude-standard", "-z", *pathspec, where=top)
+        if head is None or diff is None or untracked is None:
+            return None
+        digest = hashlib.sha256(diff)
+        paths = [path for path in untracked.split(b"\0") if path]
+        if paths:
+            blobs = git("hash-object", "--stdin-paths", where=top, input=b"\n".join(paths))
+            if blobs is None:
+                return None
+            digest.update(b"\0".join(paths))
+            digest.update(blobs)
+        return f"{head.decode().strip()}:{digest.hexdigest()}"
+
+    @staticmethod
+    def key(
+        prompt: str,
+        backend: tuple[str, str],
+        *,
+        tools: str | None = None,
+        permission_mode: str | None = None,
+        extra_flags: list[str] | None = None,
+        cwd: str | Path | None = None,
+        worktree: str | None = None,
+    ) -> str:
+        material = json.dumps(
+            {
+                "prompt": prompt,
+                "backend": f"{backend[0]}:{backend[1]}",
+                "tools": tools,
+                "permission_mode": permission_mode,
+                "extra_flags": list(extra_flags or []),
+                "cwd": str(Path(cwd).resolve()) if cwd else None,
+                "worktree": worktree,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.md"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            stored = path.stat().st_mtime
+            if time.time() - stored > self.max_age:
+                return None
+            text = path.read_text()
+            # Mark the use in atime, keeping mtime as the creation time
+            os.utime(path, (time.time(), stored))
+        except OSError:
+            return None
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as handle:
+                handle.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        now = time.time()
+        os.utime(path, (now, now))
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then the least recently used beyond `max_bytes`."""
+        with self._lock:
+            now = time.time()
+            entries: list[tuple[float, int, Path]] = []
+            for path in self.directory.glob("*/*.md"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age:
+                    path.unlink(missing_ok=True)
+                else:
+                    last_used = max(stat.st_atime, stat.st_mtime)
+                    entries.append((last_used, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+
+__all__ = ["READ_ONLY_TOOLS", "StageCache"]
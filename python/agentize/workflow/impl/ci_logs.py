@@ -0,0 +1,144 @@
+"""Failing CI job logs, excerpted for the impl retry prompt."""
+
+from __future__ import annotations
+
+import http.client
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from agentize.workflow.api import gh as gh_utils
+
+_JOB_LINK = re.compile(r"/actions/runs/\d+/job/(\d+)")
+_TIMESTAMP = re.compile(r"^\ufeff?\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z ")
+_FAILURE_LINE = re.compile(
+    r"##\[error\]|\berror\b|\bERROR\b|\bFAILED\b|\bFAIL\b|Traceback \(most recent call last\)"
+    r"|\b\w+Error:|\b\w+Exception\b|panicked at|exit code [1-9]|exit status [1-9]",
+    re.IGNORECASE,
+)
+
+CONTEXT_LINES = 3
+MAX_EXCERPT_LINES = 60
+MAX_LINE_CHARS = 300
+MAX_PARALLEL = 4
+
+
+def job_id_from_link(link: str | None) -> str | None:
+    """Return the Actions job id from a check's details link, if it has one."""
+    match = _JOB_LINK.search(link or "")
+    return match.group(1) if match else None
+
+
+def _clean(raw: str) -> str:
+    line = _TIMESTAMP.sub("", raw.rstrip("\r\n"))
+    if len(line) > MAX_LINE_CHARS:
+        line = line[:MAX_LINE_CHARS] + "..."
+    return line
+
+
+def excerpt_log(
+    lines: Iterable[str],
+    *,
+    context: int = CONTEXT_LINES,
+    max_lines: int = MAX_EXCERPT_LINES,
+) -> str:
+    """Reduce a log stream to the windows around its failure lines.
+
+    Each line matching a failure pattern opens (or extends) a window of
+    `context` lines before and after it. The first window and the latest
+    ones are kept within `max_lines`; the middle is dropped. A log with no
+    failure line yields its last lines instead. Memory stays bounded by
+    `max_lines` however long the stream is.
+    """
+    window_cap = max(1, max_lines // 2)
+    before: deque[str] = deque(maxlen=context)
+    tail: deque[str] = deque(maxlen=max_lines // 3 or 1)
+    first: list[str] | None = None
+    latest: deque[list[str]] = deque()
+    latest_size = 0
+    current: list[str] | None = None
+    truncated = 0
+    after = 0
+    dropped = 0
+
+    def close() -> None:
+        nonlocal first, current, latest_size, truncated, dropped
+        assert current is not None
+        if truncated:
+            current.append(f"... ({truncated} more lines)")
+        if first is None:
+            first = current
+        else:
+            latest.append(current)
+            latest_size += len(current)
+            while latest and len(first) + latest_size > max_lines:
+                latest_size -= len(latest.popleft())
+                dropped += 1
+        current = None
+        truncated = 0
+
+    for raw in lines:
+        line = _clean(raw)
+        tail.append(line)
+        if _FAILURE_LINE.search(line):
+            if current is None:
+                current = list(before)
+                before.clear()
+            after = context
+        elif current is None:
+            before.append(line)
+            continue
+        elif after == 0:
+            close()
+            before.append(line)
+            continue
+        else:
+            after -= 1
+        if len(current) < window_cap:
+            current.append(line)
+        else:
+            truncated += 1
+    if current is not None:
+        close()
+
+    if first is None:
+        return "\n".join(tail)
+    parts = ["\n".join(first)]
+    if dropped:
+        parts.append(f"... ({dropped} more failure windows omitted)")
+    parts.extend("\n".join(window) for window in latest)
+    return "\n...\n".join(parts)
+
+
+def _fetch_excerpt(job_id: str, cwd: str | Path | None) -> str:
+    # The excerpt is optional context: a network error must not fail the impl loop
+    try:
+        return excerpt_log(gh_utils.job_log_lines(job_id, cwd=cwd))
+    except (RuntimeError, OSError, http.client.HTTPException):
+        return ""
+
+
+def fetch_failure_excerpts(
+    checks: list[dict],
+    *,
+    cwd: str | Path | None = None,
+    max_parallel: int = MAX_PARALLEL,
+) -> dict[str, str]:
+    """Download and excerpt the logs of failing Actions checks in parallel.
+
+    Returns excerpts keyed by check name. Checks without an Actions job link,
+    and logs that cannot be fetched, are left out.
+    """
+    jobs: dict[str, str] = {}
+    for check in checks:
+        job_id = job_id_from_link(check.get("link") or check.get("detailsUrl"))
+        if job_id:
+            jobs.setdefault(str(check.get("name") or job_id), job_id)
+    if not jobs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(jobs))) as pool:
+        futures = {name: pool.submit(_fetch_excerpt, job_id, cwd) for name, job_id in jobs.items()}
+        excerpts = {name: future.result() for name, future in futures.items()}
+    return {name: text for name, text in excerpts.items() if text.strip()}
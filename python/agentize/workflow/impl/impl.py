@@ -15,6 +15,7 @@ from agentize.workflow.api import gh as gh_utils
 from agentize.workflow.api import path as path_utils
 from agentize.workflow.api import prompt as prompt_utils
 from agentize.workflow.api.session import PipelineError
+from agentize.workflow.impl import ci_logs
 
 
 class ImplError(RuntimeError):
@@ -99,7 +100,11 @@ def _section(title: str, content: str | None) -> str:
     return f"\n\n---\n{title}\n{content.rstrip()}\n"
 
 
-def _format_ci_failure_context(pr_url: str | None, checks: list[dict]) -> str | None:
+def _format_ci_failure_context(
+    pr_url: str | None,
+    checks: list[dict],
+    excerpts: dict[str, str] | None = None,
+) -> str | None:
     if not pr_url and not checks:
         return None
     lines: list[str] = []
@@ -117,6 +122,8 @@ def _format_ci_failure_context(pr_url: str | None, checks: list[dict]) -> str |
             lines.append(line)
     else:
         lines.append("CI checks failed. Review PR checks for details.")
+    for name, excerpt in (excerpts or {}).items():
+        lines.extend(["", f"Log excerpt ({name}):", "```", excerpt, "```"])
     return "\n".join(lines)
 
 
@@ -683,24 +690,27 @@ def run_impl_workflow(
             )
 
             print("Waiting for PR CI...")
-            exit_code, checks = gh_utils.pr_checks(
-                pr_number,
-                watch=True,
-                interval=30,
-                cwd=worktree,
-            )
+            exit_code, checks = gh_utils.pr_checks_wait(pr_number, cwd=worktree)
 
             if exit_code == 0:
                 print("All CI checks passed!")
                 break
 
+            if exit_code == gh_utils.NO_CHECKS_EXIT_CODE:
+                raise ImplError(
+                    f"Error: No CI checks reported for PR #{pr_number}\n"
+                    "CI may be slow to queue or not configured for this branch"
+                )
+
             if next_iteration > max_iterations:
                 raise ImplError(
                     f"Error: Max iteration limit ({max_iterations}) reached while fixing CI\n"
                     f"Last PR status: failing checks"
                 )
 
-            ci_failure = _format_ci_failure_context(pr_url, checks)
+            failed = [check for check in checks if gh_utils.check_bucket(check.get("state")) == "fail"]
+            excerpts = ci_logs.fetch_failure_excerpts(failed, cwd=worktree)
+            ci_failure = _format_ci_failure_context(pr_url, failed or checks, excerpts)
             print("CI checks failed. Running fix iteration...")
 
             score, feedback, result = impl_kernel(
@@ -10,7 +10,8 @@ from typing import Callable
 from agentize.shell import get_agentize_home
 from agentize.workflow.api import run_acw
 from agentize.workflow.api import prompt as prompt_utils
-from agentize.workflow.api.session import Session, StageResult
+from agentize.workflow.api.session import Session, StageCall, StageResult
+from agentize.workflow.api.stage_cache import StageCache
 
 
 # ============================================================
@@ -169,6 +170,8 @@ def run_planner_pipeline(
         output_suffix=output_suffix,
         log_acw_command=True,
         log_output_dump=True,
+        # Planner stages are read-only, so AGENTIZE_STAGE_CACHE_DIR may replay them
+        cache=StageCache.from_env(),
     )
 
     def _log_stage(message: str) -> None:
@@ -178,8 +181,6 @@ def run_planner_pipeline(
         provider, model = stage_backends[stage]
         return f"{provider}:{model}"
 
-    results: dict[str, StageResult] = {}
-
     # Build a helper that merges base extra_flags with --no-project-config for
     # claude provider stages (prevents CLAUDE.md contamination in foreign repos).
     _no_project_flag = ["--no-project-config"] if no_project_config else []
@@ -190,107 +191,95 @@ def run_planner_pipeline(
         combined = (base or []) + additions
         return combined if combined else None
 
-    understander_prompt = _render_stage_prompt(
-        "understander", feature_desc, agentize_home
-    )
-    _log_stage(f"Stage 1/5: Running understander ({_backend_label('understander')})")
-    results["understander"] = session.run_prompt(
-        "understander",
-        understander_prompt,
-        stage_backends["understander"],
-        tools=STAGE_TOOLS.get("understander"),
-        permission_mode=STAGE_PERMISSION_MODE.get("understander"),
-        extra_flags=_extra_flags("understander"),
-        cwd=cwd,
-    )
-    understander_output = results["understander"].text()
-
-    bold_prompt = _render_stage_prompt(
-        "bold", feature_desc, agentize_home, understander_output
-    )
-    _log_stage(f"Stage 2/5: Running bold-proposer ({_backend_label('bold')})")
-    results["bold"] = session.run_prompt(
-        "bold",
-        bold_prompt,
-        stage_backends["bold"],
-        tools=STAGE_TOOLS.get("bold"),
-        permission_mode=STAGE_PERMISSION_MODE.get("bold"),
-        extra_flags=_extra_flags("bold"),
-        cwd=cwd,
-    )
-    bold_output = results["bold"].text()
-
-    critique_prompt = _render_stage_prompt(
-        "critique", feature_desc, agentize_home, bold_output
-    )
-    reducer_prompt = _render_stage_prompt(
-        "reducer", feature_desc, agentize_home, bold_output
-    )
-
-    _log_stage(
-        "Stage 3-4/5: Running critique and reducer in parallel "
-        f"({_backend_label('critique')}, {_backend_label('reducer')})"
-    )
-
-    parallel_results = session.run_parallel(
-        [
-            session.stage(
-                "critique",
-                critique_prompt,
-                stage_backends["critique"],
-                tools=STAGE_TOOLS.get("critique"),
-                permission_mode=STAGE_PERMISSION_MODE.get("critique"),
-                extra_flags=_extra_flags("critique"),
-                cwd=cwd,
-            ),
-            session.stage(
-                "reducer",
-                reducer_prompt,
-                stage_backends["reducer"],
-                tools=STAGE_TOOLS.get("reducer"),
-                permission_mode=STAGE_PERMISSION_MODE.get("reducer"),
-                extra_flags=_extra_flags("reducer"),
-                cwd=cwd,
-            ),
-        ]
-    )
-    results.update(parallel_results)
-
-    critique_output = results["critique"].text()
-    reducer_output = results["reducer"].text()
-
-    if skip_consensus:
-        return results
-
-    combined_report = _build_combined_report(
-        bold_output, critique_output, reducer_output
-    )
+    def _options(stage: str, base_flags: list[str] | None = None, **extra) -> dict:
+        return {
+            "tools": STAGE_TOOLS.get(stage),
+            "permission_mode": STAGE_PERMISSION_MODE.get(stage),
+            "extra_flags": _extra_flags(stage, base_flags),
+            "cwd": cwd,
+            **extra,
+        }
+
+    start_messages = {
+        "understander": f"Stage 1/5: Running understander ({_backend_label('understander')})",
+        "bold": f"Stage 2/5: Running bold-proposer ({_backend_label('bold')})",
+        "critique": (
+            "Stage 3-4/5: Running critique and reducer in parallel "
+            f"({_backend_label('critique')}, {_backend_label('reducer')})"
+        ),
+        "consensus": f"Stage 5/5: Running consensus ({_backend_label('consensus')})",
+    }
+
+    def _on_start(call: StageCall) -> None:
+        message = start_messages.get(call.stage)
+        if message:
+            _log_stage(message)
+
+    def _chained_prompt(stage: str, upstream: str) -> Callable[[dict[str, StageResult]], str]:
+        def _render(done: dict[str, StageResult]) -> str:
+            return _render_stage_prompt(stage, feature_desc, agentize_home, done[upstream].text())
+        return _render
+
+    def _consensus_prompt(done: dict[str, StageResult]) -> Callable[[Path], str]:
+        combined_report = _build_combined_report(
+            done["bold"].text(), done["critique"].text(), done["reducer"].text()
+        )
 
-    def _write_consensus_prompt(path: Path) -> str:
-        return _render_consensus_prompt(
-            feature_desc,
-            combined_report,
-            agentize_home,
-            path,
+        def _write_consensus_prompt(path: Path) -> str:
+            return _render_consensus_prompt(
+                feature_desc,
+                combined_report,
+                agentize_home,
+                path,
+            )
+        return _write_consensus_prompt
+
+    calls = [
+        session.stage(
+            "understander",
+            _render_stage_prompt("understander", feature_desc, agentize_home),
+            stage_backends["understander"],
+            **_options("understander"),
+        ),
+        session.stage(
+            "bold",
+            _chained_prompt("bold", "understander"),
+            stage_backends["bold"],
+            after=["understander"],
+            **_options("bold"),
+        ),
+        session.stage(
+            "critique",
+            _chained_prompt("critique", "bold"),
+            stage_backends["critique"],
+            after=["bold"],
+            **_options("critique"),
+        ),
+        session.stage(
+            "reducer",
+            _chained_prompt("reducer", "bold"),
+            stage_backends["reducer"],
+            after=["bold"],
+            **_options("reducer"),
+        ),
+    ]
+
+    if not skip_consensus:
+        consensus_provider = stage_backends["consensus"][0]
+        codex_flags = (
+            ["-s", "read-only", "--enable", "web_search_request",
+             "-c", "model_reasoning_effort=xhigh"]
+            if consensus_provider == "codex" else None
         )
+        calls.append(session.stage(
+            "consensus",
+            _consensus_prompt,
+            stage_backends["consensus"],
+            after=["bold", "critique", "reducer"],
+            **_options("consensus", codex_flags, fallback_backend=("claude", "opus")),
+        ))
 
-    _log_stage(f"Stage 5/5: Running consensus ({_backend_label('consensus')})")
-    consensus_provider = stage_backends["consensus"][0]
-    codex_flags = (
-        ["-s", "read-only", "--enable", "web_search_request",
-         "-c", "model_reasoning_effort=xhigh"]
-        if consensus_provider == "codex" else None
-    )
-    results["consensus"] = session.run_prompt(
-        "consensus",
-        _write_consensus_prompt,
-        stage_backends["consensus"],
-        tools=STAGE_TOOLS.get("consensus"),
-        permission_mode=STAGE_PERMISSION_MODE.get("consensus"),
-        extra_flags=_extra_flags("consensus", codex_flags),
-        fallback_backend=("claude", "opus"),
-        cwd=cwd,
-    )
+    results = session.run_dag(calls, on_start=_on_start)
 
     return results
 
@@ -336,6 +325,7 @@ def run_consensus_stage(
         runner=runner,
         log_acw_command=True,
         log_output_dump=log_output_dump,
+        cache=StageCache.from_env(),
     )
     consensus_provider = stage_backends["consensus"][0]
     codex_flags = (
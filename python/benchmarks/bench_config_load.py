@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Benchmark .agentize.local.yaml loading: parsers, parse snapshots and hook startup.
+
+In-process rows time one parse of a representative config with the fallback
+parser, PyYAML's pure-Python SafeLoader, the libyaml CSafeLoader, and a
+snapshot hit in lib.local_config_io.parse_yaml_file(). Cold-process rows run a
+fresh interpreter that loads the config, and the real PreToolUse hook, with the
+snapshot removed before every run (cold) or left in place (warm). All parsers
+are cross-checked for identical results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_PLUGIN_DIR = _REPO_ROOT / ".claude-plugin"
+sys.path.insert(0, str(_PLUGIN_DIR))
+
+from lib import local_config_io  # noqa: E402
+
+HOOK = _PLUGIN_DIR / "hooks" / "pre-tool-use.py"
+
+CONFIG = """\
+handsoff:
+  enabled: true
+  max_continuations: 20
+  auto_permission: true
+  haiku_cache:
+    enabled: true
+    ttl_sec: 3600
+    max_entries: 500
+  debug: false
+  supervisor:
+    provider: claude
+    model: opus
+    flags: ""
+
+telegram:
+  enabled: false
+  token: "123456:ABC-DEF"
+  chat_id: "-1001234567890"
+  timeout_sec: 60
+  poll_interval_sec: 5
+  allowed_user_ids: "123,456"
+
+server:
+  period: 5m
+  num_workers: 5
+
+workflows:
+  impl:
+    model: opus
+  refine:
+    model: sonnet
+
+permissions:
+  allow:
+{allow}
+  deny:
+{deny}
+"""
+
+
+def _config_text() -> str:
+    allow = "\n".join(f"    - '^tool{i}\\s+run(\\s|$)'  # rule {i}" for i in range(40))
+    deny = "\n".join(f"    - pattern: '^danger{i}'\n      tool: Bash" for i in range(10))
+    return CONFIG.format(allow=allow, deny=deny)
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "mean": sum(ordered) / len(ordered)}
+
+
+def _time(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _print_row(label: str, samples: list[float]) -> None:
+    stats = _percentiles(samples)
+    print(f"{label:<34} {stats['p50'] * 1e3:>9.3f} {stats['p95'] * 1e3:>9.3f} {stats['mean'] * 1e3:>9.3f}")
+
+
+def _run_cold(args: list[str], runs: int, env: dict[str, str], cwd: str, snapshot_dir: str,
+              keep_snapshot: bool, stdin: str = "") -> list[float]:
+    samples = []
+    for _ in range(runs):
+        if not keep_snapshot:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+        start = time.perf_counter()
+        subprocess.run(args, input=stdin, capture_output=True, text=True, env=env, cwd=cwd, check=False)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200, help="In-process parses per method")
+    parser.add_argument("--runs", type=int, default=30, help="Subprocess runs per cold-process row")
+    args = parser.parse_args()
+
+    try:
+        import yaml
+    except ModuleNotFoundError:
+        yaml = None
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as home:
+        config_path = Path(home) / ".agentize.local.yaml"
+        config_path.write_text(_config_text())
+        content = config_path.read_text()
+        os.environ["AGENTIZE_HOME"] = home
+        snapshot_dir = local_config_io._snapshot_dir()
+
+        methods = {"fallback parser": lambda: local_config_io._parse_yaml_fallback(content)}
+        if yaml is not None:
+            methods["yaml SafeLoader"] = lambda: yaml.load(content, Loader=yaml.SafeLoader)
+            if hasattr(yaml, "CSafeLoader"):
+                methods["yaml CSafeLoader"] = lambda: yaml.load(content, Loader=yaml.CSafeLoader)
+        local_config_io.parse_yaml_file(config_path)
+        methods["snapshot hit"] = lambda: local_config_io.parse_yaml_file(config_path)
+
+        expected = methods["fallback parser"]()
+        print(f"{'In-process (ms)':<34} {'p50':>9} {'p95':>9} {'mean':>9}")
+        for label, fn in methods.items():
+            if fn() != expected:
+                mismatches += 1
+                print(f"MISMATCH: {label} result differs from the fallback parser")
+            _print_row(label, _time(fn, args.iterations))
+
+        env = dict(os.environ, AGENTIZE_HOME=home)
+        load = [sys.executable, "-c",
+                f"import sys; sys.path.insert(0, {str(_PLUGIN_DIR)!r}); "
+                "from lib.local_config import load_local_config; load_local_config()"]
+        hook_input = json.dumps({"tool_name": "Bash", "session_id": "bench-config",
+                                 "tool_input": {"command": "git status"}})
+
+        print(f"\n{'Cold process (ms)':<34} {'p50':>9} {'p95':>9} {'mean':>9}")
+        for label, cmd, stdin in (("load_local_config", load, ""),
+                                  ("pre-tool-use hook", [sys.executable, str(HOOK)], hook_input)):
+            _print_row(f"{label}, no snapshot",
+                       _run_cold(cmd, args.runs, env, home, snapshot_dir, False, stdin))
+            _print_row(f"{label}, snapshot",
+                       _run_cold(cmd, args.runs, env, home, snapshot_dir, True, stdin))
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark workflow.api.gh per-call latency: gh CLI backend vs. native API backend.
+
+Offline rows run the API backend against a local stub server: pooled
+keep-alive connection vs. a new connection per call, and the CLI path through
+a stub `gh` (process spawn cost only). With --repo and --issue, live rows time
+issue_view/issue_body/pr_view against GitHub with each backend. Times are per
+call in milliseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(_REPO_ROOT / "python"))
+
+from agentize.workflow.api import gh as gh_utils  # noqa: E402
+from agentize.workflow.api import gh_api  # noqa: E402
+
+_ISSUE = {"title": "Bench", "body": "Body", "labels": [], "html_url": "https://github.com/org/repo/issues/1"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        data = json.dumps(_ISSUE).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def _set_backend(backend: str) -> None:
+    os.environ["AGENTIZE_GH_BACKEND"] = backend
+    gh_api.reset()
+    gh_utils._clear_gh_auth_cache()
+
+
+def _offline_rows(repeat: int, tmp: str) -> list[tuple[str, float]]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.update({
+        "AGENTIZE_GH_API_URL": f"http://127.0.0.1:{server.server_address[1]}",
+        "GH_TOKEN": "bench", "GH_REPO": "org/repo",
+    })
+
+    # Stub `gh` on PATH: the CLI backend's process cost without the network
+    bin_dir = Path(tmp) / "bin"
+    bin_dir.mkdir()
+    stub = bin_dir / "gh"
+    stub.write_text("#!/bin/sh\necho Body\n")
+    stub.chmod(stub.stat().st_mode | stat.S_IEXEC)
+    path = os.environ["PATH"]
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{path}"
+
+    def fresh_connection():
+        gh_api.reset()
+        gh_utils.issue_body(1)
+
+    rows = []
+    try:
+        _set_backend("cli")
+        rows.append(("issue_body, CLI stub (spawn only)", _ms(lambda: gh_utils.issue_body(1), repeat)))
+        _set_backend("api")
+        if gh_utils.issue_body(1) != "Body\n":
+            raise RuntimeError("stub server returned unexpected body")
+        rows.append(("issue_body, API new connection", _ms(fresh_connection, repeat)))
+        rows.append(("issue_body, API pooled", _ms(lambda: gh_utils.issue_body(1), repeat)))
+    finally:
+        os.environ["PATH"] = path
+        for var in ("AGENTIZE_GH_API_URL", "GH_TOKEN", "GH_REPO"):
+            os.environ.pop(var, None)
+        server.shutdown()
+    return rows
+
+
+def _live_rows(repo: str, issue: int, pr: int | None, repeat: int) -> list[tuple[str, float]]:
+    os.environ["GH_REPO"] = repo
+    calls = [("issue_view", lambda: gh_utils.issue_view(issue, ".title")),
+             ("issue_body", lambda: gh_utils.issue_body(issue))]
+    if pr is not None:
+        calls.append(("pr_view", lambda: gh_utils.pr_view(pr)))
+    rows = []
+    for backend in ("cli", "api"):
+        _set_backend(backend)
+        for name, fn in calls:
+            fn()  # warm the auth/token/connection caches
+            rows.append((f"{name}, {backend} (live)", _ms(fn, repeat)))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per row")
+    parser.add_argument("--repo", help="owner/repo for live rows (needs gh auth)")
+    parser.add_argument("--issue", type=int, help="Issue number for live rows")
+    parser.add_argument("--pr", type=int, help="PR number for the live pr_view row")
+    args = parser.parse_args()
+
+    os.environ.pop("AGENTIZE_SHELL_OVERRIDES", None)
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as tmp:
+        try:
+            rows = _offline_rows(args.repeat, tmp)
+        except RuntimeError as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            return 1
+    if args.repo and args.issue:
+        rows += _live_rows(args.repo, args.issue, args.pr, args.repeat)
+
+    print(f"{'Row':<40} {'ms/call':>10}")
+    for label, value in rows:
+        print(f"{label:<40} {value:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Benchmark hook entry-point startup: wall time per hook and -X importtime breakdowns.
+
+Runs each Claude Code hook as Claude Code does (a fresh interpreter reading one
+JSON payload on stdin) N times and reports p50/p95/mean wall time. With
+--importtime, each hook is also run once under `python -X importtime` and the
+modules with the largest cumulative import cost are listed, which is where
+startup regressions usually come from.
+
+Payloads are built in; --payload-dir replays recorded payloads instead
+(`<hook>.json`, e.g. `pre-tool-use.json`, captured from a real session). The
+hooks run against a temporary AGENTIZE_HOME with handsoff enabled and the
+supervisor disabled, so no model is ever invoked.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_HOOKS_DIR = _REPO_ROOT / ".claude-plugin" / "hooks"
+
+HOOKS = ("pre-tool-use", "stop", "user-prompt-submit", "post-bash-issue-create")
+
+CONFIG = """\
+handsoff:
+  enabled: true
+  max_continuations: 10
+  auto_permission: false
+  supervisor:
+    provider: none
+"""
+
+
+def _default_payloads(transcript_path: str) -> dict[str, dict]:
+    session_id = "bench-hooks"
+    return {
+        "pre-tool-use": {
+            "hook_event_name": "PreToolUse",
+            "session_id": session_id,
+            "transcript_path": transcript_path,
+            "tool_name": "Bash",
+            "tool_input": {"command": "git status"},
+        },
+        "stop": {
+            "hook_event_name": "Stop",
+            "session_id": session_id,
+            "transcript_path": transcript_path,
+        },
+        "user-prompt-submit": {
+            "hook_event_name": "UserPromptSubmit",
+            "session_id": session_id,
+            "transcript_path": transcript_path,
+            "prompt": "Explain the permission rules in this repository",
+        },
+        "post-bash-issue-create": {
+            "hook_event_name": "PostToolUse",
+            "session_id": session_id,
+            "transcript_path": transcript_path,
+            "tool_name": "Bash",
+            "tool_input": {"command": "gh issue create --title 'x' --body 'y'"},
+            "tool_response": {"stdout": "https://github.com/Synthesys-Lab/agentize/issues/544\n"},
+        },
+    }
+
+
+def _load_payloads(payload_dir: str | None, transcript_path: str) -> dict[str, str]:
+    payloads = {hook: json.dumps(p) for hook, p in _default_payloads(transcript_path).items()}
+    if payload_dir:
+        for hook in HOOKS:
+            recorded = Path(payload_dir) / f"{hook}.json"
+            if recorded.is_file():
+                payloads[hook] = recorded.read_text()
+    return payloads
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "mean": sum(ordered) / len(ordered)}
+
+
+def _run_hook(hook: str, stdin: str, env: dict[str, str], cwd: str,
+              extra_args: tuple[str, ...] = ()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra_args, str(_HOOKS_DIR / f"{hook}.py")],
+        input=stdin, capture_output=True, text=True, env=env, cwd=cwd, check=False,
+    )
+
+
+def _importtime(hook: str, stdin: str, env: dict[str, str], cwd: str, top: int) -> list[tuple[int, int, str]]:
+    """Return (self_us, cumulative_us, module) rows with the largest cumulative time."""
+    result = _run_hook(hook, stdin, env, cwd, ("-X", "importtime"))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if self_us.isdigit():
+            rows.append((int(self_us), int(cumulative_us), name))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30, help="Runs per hook")
+    parser.add_argument("--hooks", nargs="+", choices=HOOKS, default=list(HOOKS), help="Hooks to run")
+    parser.add_argument("--payload-dir", help="Directory of recorded <hook>.json payloads")
+    parser.add_argument("--importtime", action="store_true", help="Print -X importtime breakdowns")
+    parser.add_argument("--top", type=int, default=12, help="Modules listed per importtime breakdown")
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as home:
+        Path(home, ".agentize.local.yaml").write_text(CONFIG)
+        transcript_path = os.path.join(home, "transcript.jsonl")
+        Path(transcript_path).write_text(json.dumps({
+            "type": "assistant",
+            "message": {"role": "assistant", "content": [{"type": "text", "text": "done"}]},
+        }) + "\n")
+        payloads = _load_payloads(args.payload_dir, transcript_path)
+        env = dict(os.environ, AGENTIZE_HOME=home)
+
+        print(f"{'Hook (ms)':<26} {'p50':>9} {'p95':>9} {'mean':>9}")
+        for hook in args.hooks:
+            samples = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                result = _run_hook(hook, payloads[hook], env, home)
+                samples.append(time.perf_counter() - start)
+                if "Traceback" in result.stderr:
+                    failures += 1
+                    print(f"{hook}: hook raised\n{result.stderr}", file=sys.stderr)
+                    break
+            stats = _percentiles(samples)
+            print(f"{hook:<26} {stats['p50'] * 1e3:>9.2f} {stats['p95'] * 1e3:>9.2f} {stats['mean'] * 1e3:>9.2f}")
+
+        if args.importtime:
+            for hook in args.hooks:
+                print(f"\n{hook}: top imports by cumulative time (ms)")
+                print(f"  {'self':>7} {'cumul.':>7}  module")
+                for self_us, cumulative_us, name in _importtime(hook, payloads[hook], env, home, args.top):
+                    print(f"  {self_us / 1e3:>7.2f} {cumulative_us / 1e3:>7.2f}  {name}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
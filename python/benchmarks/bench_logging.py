@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark debug logging cost per message: open-per-line vs. shared log sinks.
+
+Rows compare the former lib.logger behavior (resolve handsoff.debug, open,
+append, close for every message) with lib.logger on shared LogSink handles, a
+threaded LogSink as used by the server's JSON-lines log file, and the server's
+_log() console path. Per-message cost is reported in microseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_PLUGIN_DIR = _REPO_ROOT / ".claude-plugin"
+sys.path.insert(0, str(_PLUGIN_DIR))
+sys.path.insert(0, str(_REPO_ROOT / "python"))
+
+from lib import local_config, log_sink, logger  # noqa: E402
+
+
+def _former_logger(sid: str, msg: str) -> None:
+    """Pre-sink lib.logger.logger(): config lookup and open/close per message."""
+    if not local_config.get_local_value("handsoff.debug", False, local_config.coerce_bool):
+        return
+    tmp_dir = os.path.join(os.environ["AGENTIZE_HOME"], ".tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    with open(os.path.join(tmp_dir, "hook-debug-former.log"), "a") as log_file:
+        log_file.write(f"[{datetime.datetime.now().isoformat()}] [{sid}] {msg}\n")
+
+
+def _former_server_log(msg: str, level: str = "INFO") -> None:
+    """Pre-sink agentize.server.log._log(): strftime per message."""
+    frame = sys._getframe(1)
+    filename = os.path.basename(frame.f_code.co_filename)
+    timestamp = datetime.datetime.now().strftime("%y-%m-%d-%H:%M:%S")
+    output = f"[{timestamp}] [{level}] [{filename}:{frame.f_lineno}:{frame.f_code.co_name}] {msg}"
+    print(output, file=sys.stderr if level == "ERROR" else sys.stdout)
+
+
+def _per_message_us(fn, messages: int) -> float:
+    start = time.perf_counter()
+    for i in range(messages):
+        fn(i)
+    return (time.perf_counter() - start) / messages * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000, help="Messages per row")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as home:
+        os.environ["AGENTIZE_HOME"] = home
+        os.chdir(home)
+        Path(home, ".agentize.local.yaml").write_text("handsoff:\n  debug: true\n")
+        local_config.clear_cache()
+        logger.clear_debug_cache()
+
+        from agentize.server import log as server_log
+
+        threaded = log_sink.LogSink(os.path.join(home, "server.jsonl"), threaded=True)
+
+        def threaded_row(i):
+            threaded.write_record({"level": "INFO", "msg": f"poll {i}", "issues": i})
+
+        def server_row(i):
+            server_log._log(f"poll {i}")
+
+        rows = [
+            ("logger, open per line (former)", lambda i: _former_logger("bench", f"message {i}")),
+            ("logger, shared sink", lambda i: logger.logger("bench", f"message {i}")),
+            ("LogSink threaded, submit", threaded_row),
+        ]
+        print(f"{'Row':<34} {'us/msg':>9}")
+        for label, fn in rows:
+            print(f"{label:<34} {_per_message_us(fn, args.messages):>9.2f}")
+
+        start = time.perf_counter()
+        threaded.close()
+        print(f"{'LogSink threaded, drain at close':<34} {(time.perf_counter() - start) * 1e3:>8.2f}ms")
+
+        with redirect_stdout(io.StringIO()):
+            former = _per_message_us(lambda i: _former_server_log(f"poll {i}"), args.messages)
+            console = _per_message_us(server_row, args.messages)
+            server_log.configure_log_file(os.path.join(home, "server-file.jsonl"))
+            with_file = _per_message_us(server_row, args.messages)
+            server_log.configure_log_file(None)
+        print(f"{'server _log, console (former)':<34} {former:>9.2f}")
+        print(f"{'server _log, console':<34} {console:>9.2f}")
+        print(f"{'server _log, console + log_file':<34} {with_file:>9.2f}")
+        log_sink.close_sinks()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark PreToolUse hook latency with and without the permission daemon.
+
+Runs the real hook script (.claude-plugin/hooks/pre-tool-use.py) as a
+subprocess, as Claude Code does, once with no daemon (in-process evaluation)
+and once with a daemon listening on a private socket. Also measures the raw
+client round trip from an already-running interpreter. Hook outputs of the two
+modes are cross-checked for every command.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_PLUGIN_DIR = _REPO_ROOT / ".claude-plugin"
+sys.path.insert(0, str(_PLUGIN_DIR))
+
+from lib import permission_daemon  # noqa: E402
+
+HOOK = _PLUGIN_DIR / "hooks" / "pre-tool-use.py"
+DAEMON = _PLUGIN_DIR / "lib" / "permission_daemon.py"
+
+# Commands decided by rules, so both modes answer without Haiku or Telegram
+DEFAULT_COMMANDS = [
+    "git status",
+    "git diff --stat HEAD~1",
+    "git log --oneline -20",
+    "ls -la .tmp/hooked-sessions",
+    "grep -rn \"match_rule\" .claude-plugin/lib",
+    "rm -rf /",
+    "sudo apt-get install zsh",
+    "cat README.md",
+]
+
+
+def _hook_input(command: str) -> str:
+    return json.dumps({
+        "tool_name": "Bash",
+        "session_id": "bench-daemon",
+        "tool_input": {"command": command},
+    })
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": sum(ordered) / len(ordered),
+    }
+
+
+def _run_hooks(commands: list[str], runs: int, env: dict[str, str]) -> tuple[list[float], dict[str, str]]:
+    samples = []
+    outputs = {}
+    for i in range(runs):
+        command = commands[i % len(commands)]
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, str(HOOK)],
+            input=_hook_input(command),
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=_REPO_ROOT,
+        )
+        samples.append(time.perf_counter() - start)
+        outputs[command] = proc.stdout.strip()
+    return samples, outputs
+
+
+def _wait_for_daemon(path: str, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if permission_daemon.ping(path, timeout=0.5) is not None:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _print_row(label: str, samples: list[float]) -> None:
+    stats = _percentiles(samples)
+    print(
+        f"{label:<28} {stats['p50'] * 1e3:>9.2f} {stats['p95'] * 1e3:>9.2f} "
+        f"{stats['p99'] * 1e3:>9.2f} {stats['mean'] * 1e3:>9.2f}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=60, help="Hook subprocess runs per mode")
+    parser.add_argument("--iterations", type=int, default=2000, help="Client round trips")
+    args = parser.parse_args()
+
+    commands = DEFAULT_COMMANDS
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as home:
+        env = dict(os.environ, AGENTIZE_HOME=home)
+        socket = os.path.join(home, ".tmp", permission_daemon.SOCKET_NAME)
+
+        no_daemon, expected = _run_hooks(commands, args.runs, env)
+
+        daemon = subprocess.Popen([sys.executable, str(DAEMON), "serve"], env=env, cwd=_REPO_ROOT)
+        try:
+            if not _wait_for_daemon(socket):
+                print("daemon did not start", file=sys.stderr)
+                return 1
+            with_daemon, actual = _run_hooks(commands, args.runs, env)
+
+            os.chdir(_REPO_ROOT)
+            client = []
+            for i in range(args.iterations):
+                data = _hook_input(commands[i % len(commands)])
+                start = time.perf_counter()
+                permission_daemon.request_decision(data, "PreToolUse", path=socket)
+                client.append(time.perf_counter() - start)
+            served = permission_daemon.ping(socket)["served"]
+        finally:
+            daemon.terminate()
+            daemon.wait(timeout=10)
+
+    print(f"{'Mode (ms)':<28} {'p50':>9} {'p95':>9} {'p99':>9} {'mean':>9}")
+    _print_row("hook, in-process", no_daemon)
+    _print_row("hook, daemon", with_daemon)
+    _print_row("client round trip", client)
+    print(f"\ndaemon answered {served} of {args.runs + args.iterations} requests")
+
+    mismatches = 0
+    for command in commands:
+        if expected.get(command) != actual.get(command):
+            mismatches += 1
+            print(f"MISMATCH {command!r}: in-process={expected.get(command)} daemon={actual.get(command)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Benchmark permission rule matching over realistic Bash command corpora.
+
+Compares the compiled rule set behind lib.permission.rules.match_rule() with a
+reference linear loop (one re.search() per rule, filtered by tool), which is
+how rules were evaluated before compilation. Both matchers are cross-checked
+on every command in the corpus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(_REPO_ROOT / ".claude-plugin"))
+
+from lib.permission import rules  # noqa: E402
+from lib.permission.strips import normalize_bash_command  # noqa: E402
+
+# Representative commands from handsoff sessions: hardcoded allows, denies,
+# force pushes, and commands that fall through to Haiku (no rule matches).
+DEFAULT_CORPUS = [
+    "git status",
+    "git diff --stat HEAD~1",
+    "git log --oneline -20",
+    "git add python/agentize/server/github.py",
+    "git commit -m \"[feat] Add batched label queries\"",
+    "git push origin issue-42-batched-labels",
+    "git fetch origin",
+    "git rebase origin main",
+    "git reset --hard HEAD~1",
+    "git restore --staged .",
+    "git checkout -b issue-43",
+    "git stash pop",
+    "ls -la .tmp/hooked-sessions",
+    "cat python/agentize/workflow/api/session.py",
+    "head -50 docs/feat/server.md",
+    "tail -n 100 .tmp/hook-debug.log",
+    "grep -rn \"match_rule\" .claude-plugin/lib",
+    "rg -n \"_run_gh\" python/agentize",
+    "find . -name '*.py' -newer Makefile",
+    "wc -l python/agentize/server/*.py",
+    "mkdir -p .tmp/plans",
+    "echo done",
+    "date +%s",
+    "awk '{print $1}' .tmp/permission.txt",
+    "tree -L 2 python",
+    "cd /tmp && ls",
+    "rm -rf build/",
+    "rm -f .tmp/stale.json",
+    "sudo apt-get install zsh",
+    "make test",
+    "make lint",
+    "make deploy",
+    "cmake -S . -B build",
+    "ninja -C build",
+    "./tests/cli/test-lol-plan-issue-mode.sh",
+    "tests/e2e/test-sandbox-run.sh",
+    "bash tests/test-all.sh cli",
+    "pytest python/tests/test_permission_rules.py -k compiled",
+    "python -m pytest -q python/tests",
+    "python3 -c 'import yaml; print(yaml.__version__)'",
+    "pip install -r python/requirements-dev.txt",
+    "npm run build",
+    "npm test",
+    "gh pr view 123 --json mergeable",
+    "gh pr checks 123",
+    "gh pr create --title \"[feat] x\" --body-file /tmp/body.md",
+    "gh issue view 42 --json labels",
+    "gh issue edit 42 --add-label agentize:plan",
+    "gh api graphql -f query=@/tmp/q.graphql",
+    "gh run view 987654 --log-failed",
+    "gh label list",
+    "gh project item-list 3 --owner Synthesys-Lab",
+    "jq '.state = \"done\"' .tmp/hooked-sessions/abc.json",
+    "curl -s https://api.github.com/rate_limit",
+    "docker ps",
+    "chmod +x scripts/gh-graphql.sh",
+    "test -f .agentize.yaml",
+    "xargs ls < files.txt",
+    "module load gcc/12",
+    "HANDSOFF_DEBUG=1 python3 .claude-plugin/hooks/pre-tool-use.py",
+    "set -e && make check",
+]
+
+
+def _load_corpus(path: str | None) -> list[str]:
+    """Load commands from a file, or fall back to the built-in corpus.
+
+    Accepts either one command per line or a permission.txt log, in which case
+    the target of each Bash entry (`... Bash | <command>`) is used.
+    """
+    if path is None:
+        return list(DEFAULT_CORPUS)
+
+    commands = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("[") and "] Bash | " in line:
+            commands.append(line.split("] Bash | ", 1)[1])
+        elif not line.startswith("["):
+            commands.append(line)
+    return commands
+
+
+def _linear_match(tool: str, target: str, yaml_rules: dict) -> tuple[str, str] | None:
+    """Reference matcher: one re.search() per rule, filtered by tool."""
+    tiers = [
+        ("deny", [(t, p, "hardcoded") for t, p in rules.PERMISSION_RULES.get("deny", [])]),
+        ("deny", yaml_rules.get("deny", [])),
+        ("ask", [(t, p, "hardcoded") for t, p in rules.PERMISSION_RULES.get("ask", [])]),
+        ("allow", [(t, p, "hardcoded") for t, p in rules.PERMISSION_RULES.get("allow", [])]),
+        ("allow", yaml_rules.get("allow", [])),
+    ]
+    for decision, tier_rules in tiers:
+        for rule_tool, pattern, source in tier_rules:
+            if rule_tool != tool:
+                continue
+            try:
+                if re.search(pattern, target):
+                    return (decision, f"rules:{source}")
+            except re.error:
+                continue
+    return None
+
+
+def _compiled_match(tool: str, target: str) -> tuple[str, str] | None:
+    """Compiled matcher without the force-push git subprocess check."""
+    result = rules.match_rule_detail(tool, target)
+    return (result[0], result[1]) if result else None
+
+
+def _time_per_call(fn, commands: list[str], iterations: int) -> float:
+    """Return mean microseconds per fn(command) call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for command in commands:
+            fn(command)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(commands)) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="Command file or permission.txt log (default: built-in corpus)")
+    parser.add_argument("--iterations", type=int, default=500, help="Passes over the corpus (default: 500)")
+    args = parser.parse_args()
+
+    commands = [normalize_bash_command(c) for c in _load_corpus(args.corpus)]
+    if not commands:
+        print("Corpus is empty", file=sys.stderr)
+        return 1
+
+    rules.clear_yaml_cache()
+    start = time.perf_counter()
+    rules._get_compiled_rules()
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    yaml_rules = rules._get_merged_rules()
+    compiled = rules._get_compiled_rules()
+
+    def linear_only(command: str):
+        return _linear_match("Bash", command, yaml_rules)
+
+    def compiled_only(command: str):
+        for decision, source, matchers in compiled.get("Bash", ()):
+            for find, _ in matchers:
+                if find(command):
+                    return (decision, source)
+        return None
+
+    def linear_e2e(command: str):
+        return _linear_match("Bash", command, rules._get_merged_rules())
+
+    def compiled_e2e(command: str):
+        return _compiled_match("Bash", command)
+
+    mismatches = [c for c in commands if linear_only(c) != compiled_e2e(c)]
+    for command in mismatches:
+        print(f"MISMATCH: {command!r}: linear={linear_only(command)} "
+              f"compiled={compiled_e2e(command)}", file=sys.stderr)
+
+    matched = sum(1 for c in commands if compiled_only(c) is not None)
+    rows = [
+        ("match only", _time_per_call(linear_only, commands, args.iterations),
+         _time_per_call(compiled_only, commands, args.iterations)),
+        ("end-to-end", _time_per_call(linear_e2e, commands, args.iterations),
+         _time_per_call(compiled_e2e, commands, args.iterations)),
+    ]
+
+    print(f"corpus: {len(commands)} commands ({matched} matched a rule), {args.iterations} iterations")
+    print(f"compiled rule set build (cold, incl. YAML load): {build_ms:.2f} ms")
+    print(f"{'path':<12} {'linear us':>10} {'compiled us':>12} {'speedup':>8}")
+    for label, linear_us, compiled_us in rows:
+        print(f"{label:<12} {linear_us:>10.2f} {compiled_us:>12.2f} {linear_us / compiled_us:>7.1f}x")
+    print("end-to-end includes the per-call config mtime check in _get_merged_rules()")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
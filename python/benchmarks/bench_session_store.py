@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark handsoff session lookups: per-issue JSON files vs. the SQLite session store.
+
+Rows compare the former server lookup (open by-issue/<N>.json, then open
+<session_id>.json, once per dead worker) with lib.session_store single and
+batched lookups, and the Stop hook's continuation increment (JSON rewrite vs.
+update_session()). Times are per operation in microseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(_REPO_ROOT / ".claude-plugin"))
+
+from lib import session_store  # noqa: E402
+
+
+def _former_lookup(issue_no: int, sess_dir: str) -> Optional[dict]:
+    """Pre-store _get_session_state_for_issue(): two file opens per issue."""
+    try:
+        with open(os.path.join(sess_dir, "by-issue", f"{issue_no}.json")) as f:
+            session_id = json.load(f).get("session_id")
+        with open(os.path.join(sess_dir, f"{session_id}.json")) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _former_increment(session_id: str, sess_dir: str) -> None:
+    """Pre-store stop.py: read, increment, rewrite in place."""
+    path = os.path.join(sess_dir, f"{session_id}.json")
+    with open(path) as f:
+        state = json.load(f)
+    state["continuation_count"] = state.get("continuation_count", 0) + 1
+    with open(path, "w") as f:
+        json.dump(state, f)
+
+
+def _us(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500, help="Sessions in the directory")
+    parser.add_argument("--batch", type=int, default=20, help="Issues looked up per cleanup pass")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetitions per row")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as tmp:
+        sess_dir = os.path.join(tmp, "hooked-sessions")
+        os.makedirs(sess_dir)
+        for i in range(args.sessions):
+            state = {"workflow": "issue-to-impl", "state": "done" if i % 3 else "initial",
+                     "continuation_count": i % 10, "issue_no": i}
+            session_store.put_session(f"s{i}", state, sess_dir)
+            session_store.set_issue_index(f"s{i}", i, "issue-to-impl", sess_dir)
+
+        batch = list(range(0, args.sessions, max(1, args.sessions // args.batch)))[:args.batch]
+        expected = {n: _former_lookup(n, sess_dir) for n in batch}
+        if session_store.find_by_issues(batch, sess_dir) != expected:
+            print("ERROR: store lookup disagrees with JSON files", file=sys.stderr)
+            return 1
+
+        rows = [
+            ("lookup 1 issue, JSON files (former)", lambda: _former_lookup(batch[0], sess_dir)),
+            ("lookup 1 issue, store", lambda: session_store.find_by_issue(batch[0], sess_dir)),
+            (f"lookup {len(batch)} issues, JSON files (former)",
+             lambda: [_former_lookup(n, sess_dir) for n in batch]),
+            (f"lookup {len(batch)} issues, store batch", lambda: session_store.find_by_issues(batch, sess_dir)),
+            ("find_sessions(state='initial')", lambda: session_store.find_sessions(state="initial", sess_dir=sess_dir)),
+            ("continuation increment, rewrite (former)", lambda: _former_increment("s1", sess_dir)),
+            ("continuation increment, update_session",
+             lambda: session_store.update_session(
+                 "s1", lambda s: {**s, "continuation_count": s["continuation_count"] + 1}, sess_dir)),
+        ]
+        print(f"{'Row':<44} {'us/op':>10}")
+        for label, fn in rows:
+            print(f"{label:<44} {_us(fn, args.repeat):>10.1f}")
+        session_store.clear_connections()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark supervisor context building: full transcript re-parse vs. incremental digest.
+
+Simulates a long handsoff session: between continuations the transcript grows
+by a batch of turns, and at each continuation the supervisor context is built
+two ways. The baseline re-parses the whole JSONL and joins every message (the
+former `FULL CONVERSATION CONTEXT`). The digest path folds only the new lines
+into lib.transcript_digest and renders within a token budget. Reports build
+time and context size at several points of the session.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_PLUGIN_DIR = _REPO_ROOT / ".claude-plugin"
+sys.path.insert(0, str(_PLUGIN_DIR))
+
+from lib import transcript_digest  # noqa: E402
+
+
+def _append_turns(path: str, start: int, count: int, rng: random.Random) -> None:
+    with open(path, "a") as f:
+        for i in range(start, start + count):
+            role = "user" if i % 2 else "assistant"
+            text = f"turn {i} " + "w " * rng.randint(50, 1500)
+            f.write(json.dumps({
+                "type": role,
+                "message": {"role": role, "content": [{"type": "text", "text": text}]},
+            }) + "\n")
+            # Tool results carry no text blocks but still cost parsing time
+            f.write(json.dumps({
+                "type": "user",
+                "message": {"role": "user", "content": [{"type": "tool_result", "content": "r" * rng.randint(100, 5000)}]},
+            }) + "\n")
+
+
+def _full_context(path: str) -> str:
+    """Former behavior: parse every entry and join every message."""
+    lines = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                extracted = transcript_digest.entry_text(json.loads(line))
+                if extracted:
+                    lines.append(f"{extracted[0]}: {extracted[1]}")
+    return "\n".join(lines)
+
+
+def _digest_context(session_id: str, path: str, budget: int) -> str:
+    digest = transcript_digest.update_digest(session_id, path)
+    return transcript_digest.render_digest(digest, budget)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--continuations", type=int, default=100, help="Simulated Stop-hook continuations")
+    parser.add_argument("--turns", type=int, default=20, help="Turns appended between continuations")
+    parser.add_argument("--budget", type=int, default=transcript_digest.DEFAULT_CONTEXT_TOKENS,
+                        help="Digest token budget")
+    args = parser.parse_args()
+
+    checkpoints = {1, args.continuations}
+    checkpoints.update(max(1, args.continuations * k // 4) for k in (1, 2, 3))
+
+    rng = random.Random(0)
+    print(f"{'Cont.':>6} {'Transcript':>11} {'full ms':>9} {'full tok':>9} {'digest ms':>10} {'digest tok':>11}")
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as home:
+        os.environ["AGENTIZE_HOME"] = home
+        path = os.path.join(home, "transcript.jsonl")
+        for n in range(1, args.continuations + 1):
+            _append_turns(path, (n - 1) * args.turns, args.turns, rng)
+
+            start = time.perf_counter()
+            digest_context = _digest_context("bench", path, args.budget)
+            digest_ms = (time.perf_counter() - start) * 1e3
+
+            if n not in checkpoints:
+                continue
+            start = time.perf_counter()
+            full_context = _full_context(path)
+            full_ms = (time.perf_counter() - start) * 1e3
+
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(
+                f"{n:>6} {size_mb:>9.1f}MB {full_ms:>9.2f} {len(full_context) // transcript_digest.CHARS_PER_TOKEN:>9} "
+                f"{digest_ms:>10.2f} {len(digest_context) // transcript_digest.CHARS_PER_TOKEN:>11}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
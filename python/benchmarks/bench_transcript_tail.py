@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark last-entry transcript reads: readlines() vs lib.transcript.tail_lines().
+
+Generates synthetic Claude Code JSONL transcripts of increasing size and reads
+the last entry the way the Stop and permission hooks used to
+(`open(path).readlines()[-1]`) and with the shared tail reader. Reports latency
+percentiles and peak Python heap allocation (tracemalloc) per method, and
+cross-checks that both return the same entry.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_PLUGIN_DIR = _REPO_ROOT / ".claude-plugin"
+sys.path.insert(0, str(_PLUGIN_DIR))
+
+from lib import transcript  # noqa: E402
+
+DEFAULT_SIZES_MB = [1, 10, 50]
+
+
+def _write_transcript(path: str, size_mb: int, seed: int = 0) -> None:
+    """Write a JSONL transcript of roughly size_mb with mixed entry sizes."""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    i = 0
+    with open(path, "w") as f:
+        while written < target:
+            # Mostly short turns, occasionally a large tool result
+            body = "x" * (rng.randint(100, 2000) if rng.random() < 0.95 else rng.randint(20_000, 200_000))
+            role = "user" if i % 2 else "assistant"
+            line = json.dumps({
+                "type": role,
+                "uuid": f"entry-{i}",
+                "message": {"role": role, "content": [{"type": "text", "text": body}]},
+            }) + "\n"
+            f.write(line)
+            written += len(line)
+            i += 1
+
+
+def _readlines_last(path: str) -> str:
+    with open(path, "r") as f:
+        return f.readlines()[-1]
+
+
+def _tail_last(path: str) -> str:
+    return transcript.tail_lines(path, 1)[-1]
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "mean": sum(ordered) / len(ordered)}
+
+
+def _measure(fn, path: str, iterations: int) -> tuple[dict[str, float], int]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(path)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _percentiles(samples), peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES_MB, help="Transcript sizes in MiB")
+    parser.add_argument("--iterations", type=int, default=20, help="Reads per method and size")
+    args = parser.parse_args()
+
+    mismatches = 0
+    print(f"{'Size':>6} {'Method':<12} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} {'peak KiB':>10}")
+    with tempfile.TemporaryDirectory(prefix="agz-bench-") as tmp:
+        for size_mb in args.sizes:
+            path = os.path.join(tmp, f"transcript-{size_mb}.jsonl")
+            _write_transcript(path, size_mb)
+            for label, fn in (("readlines", _readlines_last), ("tail_lines", _tail_last)):
+                stats, peak = _measure(fn, path, args.iterations)
+                print(
+                    f"{size_mb:>4}MB {label:<12} {stats['p50'] * 1e3:>9.3f} {stats['p95'] * 1e3:>9.3f} "
+                    f"{stats['mean'] * 1e3:>9.3f} {peak / 1024:>10.1f}"
+                )
+            if _readlines_last(path).rstrip("\n") != _tail_last(path):
+                mismatches += 1
+                print(f"MISMATCH: last entry differs for {size_mb}MB transcript")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -45,6 +45,36 @@ def set_agentize_home(tmp_path, monkeypatch):
 def clear_local_config_cache():
     """Clear local_config cache before and after test to ensure fresh YAML loading."""
     from lib.local_config import clear_cache
+    from lib.logger import clear_debug_cache
     clear_cache()
+    clear_debug_cache()
     yield
     clear_cache()
+    clear_debug_cache()
+
+
+@pytest.fixture(autouse=True)
+def isolate_config_snapshots(tmp_path_factory, monkeypatch):
+    """Keep YAML parse snapshots out of the repository's .tmp directory."""
+    from lib import local_config_io
+    snapshot_dir = tmp_path_factory.mktemp("config-snapshots")
+    monkeypatch.setattr(local_config_io, "_snapshot_dir", lambda: str(snapshot_dir))
+    return snapshot_dir
+
+
+@pytest.fixture(autouse=True)
+def clear_server_label_cache():
+    """Start every test without issue labels cached by an earlier poll."""
+    from agentize.server.labels import clear_label_cache
+    clear_label_cache()
+    yield
+    clear_label_cache()
+
+
+@pytest.fixture(autouse=True)
+def clear_review_thread_cache():
+    """Start every test without review-thread scans cached by an earlier test."""
+    from agentize.server.review_threads import clear_thread_cache
+    clear_thread_cache()
+    yield
+    clear_thread_cache()
@@ -0,0 +1,104 @@
+"""Tests for agentize.server.conflicts local conflict prediction."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from agentize.server.conflicts import ConflictPredictor
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def _commit(repo, files, message):
+    for name, content in files.items():
+        (repo / name).write_text(content)
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", message)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def origin(tmp_path):
+    """Origin repo whose PR heads are published as refs/pull/N/head."""
+    repo = tmp_path / "origin"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "test@test.com")
+    _git(repo, "config", "user.name", "Test")
+    _commit(repo, {"a.txt": "one\ntwo\nthree\nfour\nfive\n", "b.txt": "b\n", "c.txt": "c\n"}, "init")
+    return repo
+
+
+def _open_pr(repo, number, files):
+    _git(repo, "checkout", "-q", "-b", f"pr{number}", "main")
+    head = _commit(repo, files, f"pr {number}")
+    _git(repo, "checkout", "-q", "main")
+    _git(repo, "update-ref", f"refs/pull/{number}/head", head)
+    return {"number": number, "headRefOid": head, "baseRefName": "main", "mergeable": "MERGEABLE"}
+
+
+class TestConflictPredictor:
+    """Tests for ConflictPredictor.predict()."""
+
+    def test_predicts_only_overlapping_conflicts(self, origin, tmp_path):
+        """Only PRs sharing paths with the new base commits are merged, and only real conflicts are reported."""
+        prs = [
+            _open_pr(origin, 1, {"a.txt": "ONE\ntwo\nthree\nfour\nfive\n"}),
+            _open_pr(origin, 2, {"b.txt": "b2\n"}),
+            _open_pr(origin, 3, {"a.txt": "one\ntwo\nthree\nfour\nFIVE\n"}),
+        ]
+        predictor = ConflictPredictor(str(origin), mirror_dir=str(tmp_path / "mirror.git"))
+        assert predictor.predict(prs) == []
+
+        _commit(origin, {"a.txt": "uno\ntwo\nthree\nfour\nfive\n", "c.txt": "c2\n"}, "base moves")
+        with patch.object(predictor, "merge_conflicts", wraps=predictor.merge_conflicts) as merge:
+            predicted = predictor.predict(prs)
+
+        assert [p["number"] for p in predicted] == [1]
+        assert predicted[0]["mergeable"] == "CONFLICTING"
+        assert sorted(call.args[1] for call in merge.call_args_list) == sorted([prs[0]["headRefOid"], prs[2]["headRefOid"]])
+
+    def test_unchanged_base_is_not_rechecked(self, origin, tmp_path):
+        """No merge-tree runs while the base tip stays put."""
+        prs = [_open_pr(origin, 1, {"a.txt": "ONE\n"})]
+        predictor = ConflictPredictor(str(origin), mirror_dir=str(tmp_path / "mirror.git"))
+        predictor.predict(prs)
+        with patch.object(predictor, "merge_conflicts") as merge:
+            assert predictor.predict(prs) == []
+        merge.assert_not_called()
+
+    def test_pr_heads_fetched_once(self, origin, tmp_path):
+        """PR refs are only fetched while their head commit is missing from the mirror."""
+        prs = [_open_pr(origin, 1, {"b.txt": "b2\n"})]
+        predictor = ConflictPredictor(str(origin), mirror_dir=str(tmp_path / "mirror.git"))
+        predictor.predict(prs)
+
+        with patch.object(predictor, "_git", wraps=predictor._git) as git:
+            predictor.predict(prs)
+        fetch = next(call.args for call in git.call_args_list if call.args[0] == "fetch")
+        assert not any("refs/pull/" in arg for arg in fetch)
+
+    def test_github_conflicts_left_to_regular_path(self, origin, tmp_path):
+        """PRs GitHub already reports as CONFLICTING are not predicted again."""
+        pr = _open_pr(origin, 1, {"a.txt": "ONE\ntwo\nthree\nfour\nfive\n"})
+        predictor = ConflictPredictor(str(origin), mirror_dir=str(tmp_path / "mirror.git"))
+        predictor.predict([pr])
+        _commit(origin, {"a.txt": "uno\ntwo\nthree\nfour\nfive\n"}, "base moves")
+
+        assert predictor.predict([{**pr, "mergeable": "CONFLICTING"}]) == []
+
+    def test_fetch_failure_predicts_nothing(self, tmp_path):
+        """An unreachable remote is logged and yields no predictions."""
+        predictor = ConflictPredictor(str(tmp_path / "missing"), mirror_dir=str(tmp_path / "mirror.git"))
+        pr = {"number": 1, "headRefOid": "0" * 40, "baseRefName": "main", "mergeable": "UNKNOWN"}
+        assert predictor.predict([pr]) == []
+
+    def test_default_mirror_lives_under_agentize_home(self, tmp_path, monkeypatch):
+        """Without mirror_dir the mirror is placed under $AGENTIZE_HOME/.tmp, not the working directory."""
+        monkeypatch.setenv("AGENTIZE_HOME", str(tmp_path))
+        predictor = ConflictPredictor("unused")
+        assert predictor.mirror_dir == tmp_path / ".tmp" / "mirror.git"
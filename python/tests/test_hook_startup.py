@@ -0,0 +1,49 @@
+"""Tests for hook startup imports.
+
+Hooks start a fresh interpreter on every Claude Code interaction, so backends
+that only some calls need (Haiku via subprocess, Telegram via urllib, the
+supervisor) must be imported lazily. These tests import the hook-facing lib
+modules in a clean interpreter and check which heavy modules got loaded.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PLUGIN_DIR = Path(__file__).resolve().parents[2] / '.claude-plugin'
+
+HEAVY_MODULES = ['urllib.request', 'http.client', 'ssl', 'subprocess', 'tempfile', 'lib.transcript_digest']
+
+
+def _loaded_after(code: str, env_home: Path) -> set:
+    script = (
+        f'import sys, json; sys.path.insert(0, {str(PLUGIN_DIR)!r}); {code}; '
+        f'print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True, check=True,
+        env={'AGENTIZE_HOME': str(env_home), 'PATH': '/usr/bin:/bin'}, cwd=str(env_home),
+    )
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+@pytest.mark.parametrize('code', [
+    'import lib.permission',
+    'import lib.workflow',
+    'import lib.logger',
+    'import lib.telegram_utils',
+])
+def test_import_does_not_load_backends(tmp_path, code):
+    assert _loaded_after(code, tmp_path) == set()
+
+
+def test_rule_decision_does_not_load_backends(tmp_path):
+    code = (
+        'from lib.permission import determine; '
+        'determine(json.dumps({"tool_name": "Bash", "session_id": "s", '
+        '"tool_input": {"command": "git status"}}), "PreToolUse")'
+    )
+    assert _loaded_after(code, tmp_path) == set()
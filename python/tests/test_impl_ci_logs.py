@@ -0,0 +1,120 @@
+"""Tests for CI failure log excerpts in the impl retry context."""
+
+from __future__ import annotations
+
+import http.client
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from agentize.workflow.api import gh_api
+from agentize.workflow.api import gh as gh_utils
+from agentize.workflow.impl import ci_logs
+from agentize.workflow.impl.impl import _format_ci_failure_context
+
+
+def _log(*lines: str) -> list[str]:
+    return [f"2026-01-02T03:04:05.1234567Z {line}\n" for line in lines]
+
+
+class TestExcerptLog:
+    def test_window_around_failure_without_timestamps(self):
+        lines = _log(*[f"step {i}" for i in range(20)], "FAILED tests/test_x.py::test_y", *[f"after {i}" for i in range(20)])
+        excerpt = ci_logs.excerpt_log(lines, context=2)
+        assert excerpt.splitlines() == ["step 18", "step 19", "FAILED tests/test_x.py::test_y", "after 0", "after 1"]
+
+    def test_keeps_first_and_latest_windows_within_budget(self):
+        lines = []
+        for block in range(50):
+            lines += [f"noise {block}-{i}" for i in range(10)] + [f"##[error]failure {block}"]
+        excerpt = ci_logs.excerpt_log(iter(lines), context=1, max_lines=12)
+        assert "##[error]failure 0" in excerpt
+        assert "##[error]failure 49" in excerpt
+        assert "##[error]failure 25" not in excerpt
+        assert "failure windows omitted" in excerpt
+        assert sum(1 for line in excerpt.splitlines() if line.startswith(("noise", "##"))) <= 12
+
+    def test_long_failure_run_is_truncated(self):
+        excerpt = ci_logs.excerpt_log([f"error {i}" for i in range(1000)], max_lines=10)
+        assert excerpt.splitlines()[-1] == "... (995 more lines)"
+
+    def test_no_failure_line_yields_tail(self):
+        excerpt = ci_logs.excerpt_log([f"line {i}" for i in range(100)], max_lines=9)
+        assert excerpt.splitlines() == ["line 97", "line 98", "line 99"]
+
+
+def test_job_id_from_link():
+    assert ci_logs.job_id_from_link("https://github.com/o/r/actions/runs/11/job/22") == "22"
+    assert ci_logs.job_id_from_link("https://ci.example.com/build/1") is None
+    assert ci_logs.job_id_from_link(None) is None
+
+
+def test_fetch_failure_excerpts_skips_non_actions_and_failed_downloads():
+    checks = [
+        {"name": "test", "state": "FAILURE", "link": "https://github.com/o/r/actions/runs/1/job/10"},
+        {"name": "lint", "state": "FAILURE", "link": "https://github.com/o/r/actions/runs/1/job/20"},
+        {"name": "external", "state": "FAILURE", "link": "https://ci.example.com/1"},
+        {"name": "flaky-net", "state": "FAILURE", "link": "https://github.com/o/r/actions/runs/1/job/30"},
+        {"name": "reset", "state": "FAILURE", "link": "https://github.com/o/r/actions/runs/1/job/40"},
+    ]
+
+    def job_log_lines(job_id, *, cwd=None):
+        if job_id == "20":
+            raise RuntimeError("gone")
+        if job_id == "30":
+            yield "partial"
+            raise http.client.IncompleteRead(b"")
+        if job_id == "40":
+            raise ConnectionResetError("reset")
+        yield from _log("collecting", "E   AssertionError: boom")
+
+    with patch.object(gh_utils, "job_log_lines", side_effect=job_log_lines) as fetch:
+        excerpts = ci_logs.fetch_failure_excerpts(checks, cwd="/tmp")
+    assert excerpts == {"test": "collecting\nE   AssertionError: boom"}
+    assert sorted(call.args[0] for call in fetch.call_args_list) == ["10", "20", "30", "40"]
+
+    context = _format_ci_failure_context("https://github.com/o/r/pull/1", checks, excerpts)
+    assert "Log excerpt (test):\n```\ncollecting\nE   AssertionError: boom\n```" in context
+
+
+class TestApiJobLog:
+    """The API backend follows the log redirect and streams the blob."""
+
+    @pytest.fixture
+    def server(self, monkeypatch):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path == "/repos/org/repo/actions/jobs/5/logs":
+                    self.send_response(302)
+                    self.send_header("Location", f"http://127.0.0.1:{self.server.server_address[1]}/blob?sig=1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = b"".join(line.encode() for line in _log("ok", "##[error]Process completed with exit code 1."))
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setenv("AGENTIZE_GH_BACKEND", "api")
+        monkeypatch.setenv("AGENTIZE_GH_API_URL", f"http://127.0.0.1:{server.server_address[1]}")
+        monkeypatch.setenv("GH_TOKEN", "t")
+        monkeypatch.setenv("GH_REPO", "org/repo")
+        gh_api.reset()
+        yield server
+        gh_api.reset()
+        server.shutdown()
+        server.server_close()
+
+    def test_streams_redirected_log(self, server):
+        lines = list(gh_utils.job_log_lines(5))
+        assert ci_logs.excerpt_log(lines) == "ok\n##[error]Process completed with exit code 1."
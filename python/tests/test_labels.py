@@ -0,0 +1,110 @@
+"""Tests for agentize.server.labels batched label lookups."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from agentize.server.labels import LABEL_BATCH_SIZE, _build_labels_query, fetch_issue_labels
+
+
+def _gh_result(repository, returncode=0, stderr=""):
+    result = MagicMock()
+    result.returncode = returncode
+    result.stdout = json.dumps({"data": {"repository": repository}})
+    result.stderr = stderr
+    return result
+
+
+def _labels(*names):
+    return {"labels": {"nodes": [{"name": name} for name in names]}}
+
+
+class TestFetchIssueLabels:
+    """Tests for fetch_issue_labels()."""
+
+    def test_one_query_for_many_issues(self):
+        """Labels for several issues come from one aliased GraphQL request."""
+        repository = {"i1": _labels("agentize:refine"), "i2": _labels("bug", "agentize:dev-req"), "i3": _labels()}
+        with patch("subprocess.run", return_value=_gh_result(repository)) as run:
+            labels = fetch_issue_labels("org", "repo", [1, 2, 3, 2])
+
+        assert labels == {1: ["agentize:refine"], 2: ["bug", "agentize:dev-req"], 3: []}
+        assert run.call_count == 1
+        args = run.call_args[0][0]
+        assert args[:3] == ["gh", "api", "graphql"]
+        assert "owner=org" in args and "repo=repo" in args
+
+    def test_cached_for_poll_cycle(self):
+        """Issues already fetched this poll are not queried again."""
+        with patch("subprocess.run", return_value=_gh_result({"i1": _labels("a")})):
+            fetch_issue_labels("org", "repo", [1])
+        with patch("subprocess.run", return_value=_gh_result({"i2": _labels("b")})) as run:
+            labels = fetch_issue_labels("org", "repo", [1, 2])
+
+        assert labels == {1: ["a"], 2: ["b"]}
+        assert "i1:" not in run.call_args[0][0][4]
+
+    def test_missing_issue_in_partial_response(self):
+        """gh exits non-zero for a missing issue but the other issues still resolve."""
+        repository = {"i1": _labels("a"), "i404": None}
+        with patch("subprocess.run", return_value=_gh_result(repository, returncode=1, stderr="NOT_FOUND")):
+            labels = fetch_issue_labels("org", "repo", [1, 404])
+
+        assert labels == {1: ["a"], 404: []}
+
+    def test_failed_request_is_omitted_and_not_cached(self):
+        """A failed request leaves issues out so callers can fall back."""
+        failure = MagicMock(returncode=1, stdout="", stderr="HTTP 502")
+        with patch("subprocess.run", return_value=failure):
+            assert fetch_issue_labels("org", "repo", [1]) == {}
+        with patch("subprocess.run", return_value=_gh_result({"i1": _labels("a")})) as run:
+            assert fetch_issue_labels("org", "repo", [1]) == {1: ["a"]}
+        assert run.call_count == 1
+
+    def test_large_sets_are_chunked(self):
+        """More than LABEL_BATCH_SIZE issues are split across requests."""
+        issues = list(range(1, LABEL_BATCH_SIZE + 6))
+
+        def fake_run(args, **kwargs):
+            query = args[4]
+            numbers = [n for n in issues if f"i{n}: issue(number: {n})" in query]
+            return _gh_result({f"i{n}": _labels(f"l{n}") for n in numbers})
+
+        with patch("subprocess.run", side_effect=fake_run) as run:
+            labels = fetch_issue_labels("org", "repo", issues)
+
+        assert run.call_count == 2
+        assert labels[LABEL_BATCH_SIZE + 5] == [f"l{LABEL_BATCH_SIZE + 5}"]
+
+    def test_query_aliases(self):
+        """Each issue is an aliased issue(number:) field."""
+        query = _build_labels_query([7, 42])
+        assert "i7: issue(number: 7)" in query
+        assert "i42: issue(number: 42)" in query
+
+
+class TestCleanupDeadWorkersLabels:
+    """cleanup_dead_workers() resolves every finished issue's labels in one request."""
+
+    def test_single_label_query_for_finished_workers(self, tmp_path):
+        import agentize.server.workers as workers_module
+        from agentize.server.workers import init_worker_status_files, write_worker_status, cleanup_dead_workers
+
+        workers_dir = tmp_path / "workers"
+        init_worker_status_files(2, str(workers_dir))
+        write_worker_status(0, "BUSY", 11, 999999998, str(workers_dir))
+        write_worker_status(1, "BUSY", 12, 999999999, str(workers_dir))
+
+        states = {11: {"state": "done"}, 12: {"state": "done"}}
+        repository = {"i11": _labels("agentize:refine"), "i12": _labels("agentize:dev-req")}
+        with patch("agentize.server.session._get_session_states_for_issues", return_value=states), \
+                patch("subprocess.run", return_value=_gh_result(repository)) as run, \
+                patch.object(workers_module, "_cleanup_refinement") as refine, \
+                patch.object(workers_module, "_cleanup_feat_request") as feat, \
+                patch.object(workers_module, "_cleanup_review_resolution"), \
+                patch("agentize.server.notify.send_telegram_message", return_value=False):
+            cleanup_dead_workers(2, str(workers_dir), tg_token="t", tg_chat_id="c",
+                                 repo_slug="org/repo", session_dir=tmp_path)
+
+        assert run.call_count == 1
+        refine.assert_called_once_with(11)
+        feat.assert_called_once_with(12)
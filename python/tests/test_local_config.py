@@ -428,3 +428,60 @@ telegram:
 
         result = get_local_value("telegram.token", "default")
         assert result == "home-token"
+
+
+class TestParseSnapshot:
+    """Tests for the on-disk parse snapshot in local_config_io."""
+
+    def test_unchanged_file_skips_parsing(self, tmp_path, monkeypatch, isolate_config_snapshots):
+        """Test a second parse of an unchanged file is served from the snapshot."""
+        from lib import local_config_io
+
+        config = tmp_path / ".agentize.local.yaml"
+        config.write_text("handsoff:\n  enabled: true\n")
+        assert local_config_io.parse_yaml_file(config) == {"handsoff": {"enabled": True}}
+
+        snapshots = list(isolate_config_snapshots.iterdir())
+        assert len(snapshots) == 1
+        assert snapshots[0].stat().st_mode & 0o777 == 0o600
+
+        def fail(content):
+            raise AssertionError("parsed despite a fresh snapshot")
+
+        monkeypatch.setattr(local_config_io, "_parse_yaml_content", fail)
+        assert local_config_io.parse_yaml_file(config) == {"handsoff": {"enabled": True}}
+
+    def test_changed_file_is_reparsed(self, tmp_path):
+        """Test a modified file never returns the stale snapshot."""
+        from lib import local_config_io
+
+        config = tmp_path / ".agentize.local.yaml"
+        config.write_text("handsoff:\n  enabled: true\n")
+        local_config_io.parse_yaml_file(config)
+
+        config.write_text("handsoff:\n  enabled: false\n  max_continuations: 3\n")
+        os.utime(config, ns=(1, 1))
+        assert local_config_io.parse_yaml_file(config) == {
+            "handsoff": {"enabled": False, "max_continuations": 3}
+        }
+
+    def test_corrupt_snapshot_ignored(self, tmp_path, isolate_config_snapshots):
+        """Test an unreadable snapshot falls back to parsing."""
+        from lib import local_config_io
+
+        config = tmp_path / ".agentize.local.yaml"
+        config.write_text("server:\n  num_workers: 2\n")
+        local_config_io.parse_yaml_file(config)
+        for snapshot in isolate_config_snapshots.iterdir():
+            snapshot.write_bytes(b"garbage")
+        assert local_config_io.parse_yaml_file(config) == {"server": {"num_workers": 2}}
+
+    def test_unmarshalable_values_not_snapshotted(self, tmp_path, isolate_config_snapshots):
+        """Test YAML timestamps parse correctly but skip the snapshot."""
+        pytest.importorskip("yaml")
+        from lib import local_config_io
+
+        config = tmp_path / ".agentize.local.yaml"
+        config.write_text("release: 2026-01-01T00:00:00Z\n")
+        assert "release" in local_config_io.parse_yaml_file(config)
+        assert list(isolate_config_snapshots.iterdir()) == []
@@ -0,0 +1,136 @@
+"""Tests for lib.log_sink and the loggers built on it.
+
+These tests cover:
+- LogSink: inline and threaded writes, JSON records, size-based rotation
+- get_sink: one shared sink per path
+- lib.logger: cached debug flag, lines written through the shared sink
+- agentize.server.log: optional JSON-lines log file
+"""
+
+import json
+
+import pytest
+
+from lib import log_sink
+from lib.log_sink import LogSink, get_sink
+
+
+@pytest.fixture(autouse=True)
+def close_shared_sinks():
+    yield
+    log_sink.close_sinks()
+
+
+class TestLogSink:
+    def test_inline_lines_and_records(self, tmp_path):
+        path = tmp_path / 'logs' / 'a.log'
+        sink = LogSink(path)
+        sink.write('plain line')
+        sink.write_record({'event': 'x', 'n': 1})
+        # Line buffered: visible before close
+        assert path.read_text().splitlines() == ['plain line', '{"event": "x", "n": 1}']
+        sink.close()
+
+    def test_threaded_flush_and_order(self, tmp_path):
+        path = tmp_path / 'a.jsonl'
+        sink = LogSink(path, threaded=True)
+        for i in range(1000):
+            sink.write_record({'i': i})
+        sink.flush()
+        assert [json.loads(line)['i'] for line in path.read_text().splitlines()] == list(range(1000))
+        sink.write('after flush')
+        sink.close()
+        assert path.read_text().splitlines()[-1] == 'after flush'
+
+    def test_rotation_keeps_backups(self, tmp_path):
+        path = tmp_path / 'a.log'
+        sink = LogSink(path, max_bytes=100, backup_count=2)
+        for i in range(12):
+            sink.write(f'{i:02d}' + 'x' * 38)
+        sink.close()
+
+        assert path.stat().st_size <= 100
+        assert (tmp_path / 'a.log.1').exists()
+        assert (tmp_path / 'a.log.2').exists()
+        assert not (tmp_path / 'a.log.3').exists()
+        assert path.read_text().splitlines()[-1].startswith('11')
+
+    def test_rotation_counts_existing_size(self, tmp_path):
+        path = tmp_path / 'a.log'
+        path.write_text('y' * 90 + '\n')
+        sink = LogSink(path, max_bytes=100, backup_count=1)
+        sink.write('z' * 20)
+        sink.close()
+        assert path.read_text() == 'z' * 20 + '\n'
+        assert (tmp_path / 'a.log.1').read_text() == 'y' * 90 + '\n'
+
+    def test_get_sink_is_shared(self, tmp_path):
+        assert get_sink(tmp_path / 'a.log') is get_sink(str(tmp_path / 'a.log'))
+
+
+class TestHookLogger:
+    def test_debug_flag_cached(self, set_agentize_home, clear_local_config_cache, monkeypatch):
+        from lib import logger as logger_module
+
+        monkeypatch.chdir(set_agentize_home)
+        config = set_agentize_home / '.agentize.local.yaml'
+        config.write_text('handsoff:\n  debug: true\n')
+        logger_module.logger('s1', 'first')
+        logger_module.log_tool_decision('s1', '', 'Bash', 'ls', 'allow', 'wf', 'rules')
+
+        calls = []
+        monkeypatch.setattr('lib.local_config.get_local_value', lambda *a: calls.append(a))
+        logger_module.logger('s1', 'second')
+        assert calls == []
+
+        log_sink.close_sinks()
+        debug_log = (set_agentize_home / '.tmp' / 'hook-debug.log').read_text().splitlines()
+        assert [line.split('] ', 2)[2] for line in debug_log] == ['first', 'second']
+        permission = (set_agentize_home / '.tmp' / 'hooked-sessions' / 'permission.txt').read_text()
+        assert permission.rstrip().endswith('[s1] [wf] [rules] [allow] Bash | ls')
+
+    def test_disabled_writes_nothing(self, set_agentize_home, clear_local_config_cache, monkeypatch):
+        from lib import logger as logger_module
+
+        monkeypatch.chdir(set_agentize_home)
+        logger_module.logger('s1', 'hidden')
+        assert not (set_agentize_home / '.tmp' / 'hook-debug.log').exists()
+
+
+class TestServerLogFile:
+    def test_json_lines_file(self, tmp_path, capsys):
+        from agentize.server import log
+
+        path = tmp_path / 'server.jsonl'
+        log.configure_log_file(str(path))
+        try:
+            log._log('poll started', issues=3)
+            log._log('boom', level='ERROR')
+        finally:
+            log.configure_log_file(None)
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [(r['level'], r['msg']) for r in records] == [('INFO', 'poll started'), ('ERROR', 'boom')]
+        assert records[0]['issues'] == 3
+        assert 'func' not in records[0]
+
+        captured = capsys.readouterr()
+        assert '[INFO] poll started' in captured.out
+        assert 'boom' in captured.err
+
+    def test_source_location_on_request(self, tmp_path, capsys):
+        from agentize.server import log
+
+        path = tmp_path / 'server.jsonl'
+        log.configure_log_file(str(path))
+        log.configure_log_source(True)
+        try:
+            log._log('poll started')
+        finally:
+            log.configure_log_source(False)
+            log.configure_log_file(None)
+
+        record = json.loads(path.read_text())
+        assert record['func'] == 'test_source_location_on_request'
+        assert record['src'].startswith('test_log_sink.py:')
+        assert '[INFO] [test_log_sink.py:' in capsys.readouterr().out
@@ -0,0 +1,142 @@
+"""Tests for agentize.server.mergeability background resolution of UNKNOWN PRs."""
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+from agentize.server.mergeability import MergeabilityResolver, query_mergeable
+from agentize.server.__main__ import _wait_for_next_poll
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class TestQueryMergeable:
+    def test_one_aliased_query(self):
+        result = MagicMock(returncode=0, stderr="")
+        result.stdout = json.dumps({"data": {"repository": {
+            "p1": {"mergeable": "CONFLICTING"}, "p2": {"mergeable": "UNKNOWN"}, "p3": None}}})
+        with patch("subprocess.run", return_value=result) as mock_run:
+            states = query_mergeable("owner", "repo", [1, 2, 3])
+
+        assert states == {1: "CONFLICTING", 2: "UNKNOWN"}
+        assert mock_run.call_count == 1
+        assert "p2: pullRequest(number: 2) { mergeable }" in mock_run.call_args[0][0][4]
+
+    def test_failure_returns_empty(self):
+        with patch("subprocess.run", return_value=MagicMock(returncode=1, stdout="", stderr="boom")):
+            assert query_mergeable("owner", "repo", [1]) == {}
+
+
+class TestMergeabilityResolver:
+    def test_conflicting_prs_are_handed_back(self):
+        """UNKNOWN PRs are re-queried until settled; only CONFLICTING ones come back."""
+        answers = iter([
+            {1: "UNKNOWN", 2: "MERGEABLE"},
+            {1: "CONFLICTING"},
+        ])
+        calls = []
+
+        def fake_query(owner, repo, pr_nos):
+            calls.append(sorted(pr_nos))
+            return next(answers, {})
+
+        resolver = MergeabilityResolver(initial_delay=0.01, max_delay=0.02, window=5)
+        with patch("agentize.server.mergeability.query_mergeable", side_effect=fake_query):
+            resolver.submit("owner", "repo", [{"number": 1, "headRefName": "issue-1"}, {"number": 2}])
+            assert resolver.wait(2.0)
+            resolved = resolver.drain()
+
+        assert resolved == [{"number": 1, "headRefName": "issue-1", "mergeable": "CONFLICTING"}]
+        assert calls == [[1, 2], [1]]
+        assert _wait_until(lambda: resolver._thread is None)
+        resolver.stop()
+
+    def test_window_bounds_requeries(self):
+        """PRs still UNKNOWN after the window are dropped and the thread exits."""
+        calls = []
+        resolver = MergeabilityResolver(initial_delay=0.01, max_delay=0.01, window=0.05)
+        with patch("agentize.server.mergeability.query_mergeable",
+                   side_effect=lambda o, r, prs: calls.append(prs) or {n: "UNKNOWN" for n in prs}):
+            resolver.submit("owner", "repo", [{"number": 7}])
+            assert _wait_until(lambda: resolver._thread is None)
+
+        assert resolver.pending() == []
+        assert 1 <= len(calls) <= 6
+        assert not resolver.wait(0)
+
+    def test_backoff_doubles_up_to_max(self):
+        """Delays between re-queries grow exponentially and are capped."""
+        times = []
+        resolver = MergeabilityResolver(initial_delay=0.02, max_delay=0.08, window=0.4)
+        with patch("agentize.server.mergeability.query_mergeable",
+                   side_effect=lambda o, r, prs: times.append(time.monotonic()) or {}):
+            start = time.monotonic()
+            resolver.submit("owner", "repo", [{"number": 7}])
+            assert _wait_until(lambda: resolver._thread is None)
+
+        gaps = [b - a for a, b in zip([start] + times, times)]
+        assert gaps[0] < gaps[2]
+        assert max(gaps) < 0.08 + 0.05
+
+    def test_new_prs_skip_older_backoff(self):
+        """A PR submitted while others back off is first re-queried after initial_delay."""
+        calls = []
+        resolver = MergeabilityResolver(initial_delay=0.02, max_delay=5, window=10)
+        with patch("agentize.server.mergeability.query_mergeable",
+                   side_effect=lambda o, r, prs: calls.append((time.monotonic(), sorted(prs))) or {}):
+            resolver.submit("owner", "repo", [{"number": 7}])
+            # 7 is re-queried at 0.02s, 0.06s and 0.14s, then waits 0.16s
+            assert _wait_until(lambda: len(calls) >= 3)
+            submitted = time.monotonic()
+            resolver.submit("owner", "repo", [{"number": 8}])
+            assert _wait_until(lambda: any(prs == [8] for _, prs in calls))
+            resolver.stop()
+
+        first_8 = next(t for t, prs in calls if prs == [8])
+        assert first_8 - submitted < 0.1
+
+    def test_same_number_in_two_repos(self):
+        """PRs are tracked per repository, so equal numbers do not collide."""
+        calls = []
+
+        def fake_query(owner, repo, pr_nos):
+            calls.append((repo, sorted(pr_nos)))
+            return {n: "CONFLICTING" for n in pr_nos}
+
+        resolver = MergeabilityResolver(initial_delay=0.01, max_delay=0.02, window=5)
+        with patch("agentize.server.mergeability.query_mergeable", side_effect=fake_query):
+            resolver.submit("owner", "a", [{"number": 5, "repo": "a"}])
+            resolver.submit("owner", "b", [{"number": 5, "repo": "b"}])
+            assert resolver.pending() == [5, 5]
+            assert _wait_until(lambda: resolver._thread is None)
+
+        assert sorted(pr["repo"] for pr in resolver.drain()) == ["a", "b"]
+        assert sorted(calls) == [("a", [5]), ("b", [5])]
+
+
+class TestWaitForNextPoll:
+    def test_dispatches_resolved_prs_before_period_ends(self):
+        resolver = MergeabilityResolver()
+        resolver._resolved.append({"number": 3, "mergeable": "CONFLICTING"})
+        resolver._event.set()
+        dispatched = []
+
+        start = time.monotonic()
+        _wait_for_next_poll(0.05, resolver, [True], dispatched.append)
+
+        assert dispatched == [[{"number": 3, "mergeable": "CONFLICTING"}]]
+        assert time.monotonic() - start >= 0.05
+
+    def test_returns_on_shutdown(self):
+        resolver = MergeabilityResolver()
+        running = [False]
+        start = time.monotonic()
+        _wait_for_next_poll(10, resolver, running, lambda prs: None)
+        assert time.monotonic() - start < 1
@@ -0,0 +1,127 @@
+"""Tests for lib.permission_daemon (optional permission decision daemon).
+
+These tests cover:
+- request_decision: None when no daemon is listening
+- Daemon fast path: rules decisions match in-process determine()
+- Deferral of requests that need Haiku, and answering them when Haiku/Telegram are off
+- Local config reload when .agentize.local.yaml changes
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+
+def _hook_input(command: str, session_id: str = 'daemon-test') -> str:
+    return json.dumps({
+        'tool_name': 'Bash',
+        'session_id': session_id,
+        'tool_input': {'command': command},
+    })
+
+
+@pytest.fixture
+def daemon(set_agentize_home, clear_local_config_cache, monkeypatch):
+    """Run a daemon on a temporary socket in a background thread."""
+    from lib.permission_daemon import _make_server, _send
+    from lib.permission.rules import clear_yaml_cache
+
+    # The daemon chdirs to each request's cwd; keep the test cwd restorable
+    monkeypatch.chdir(set_agentize_home)
+    clear_yaml_cache()
+    path = str(set_agentize_home / 'd.sock')
+    server = _make_server(path)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    yield path
+    _send({'op': 'shutdown'}, path, 2.0)
+    thread.join(timeout=5)
+    server.server_close()
+    clear_yaml_cache()
+
+
+class TestRequestDecisionClient:
+    """Tests for the hook-side client."""
+
+    def test_returns_none_without_socket(self, tmp_path):
+        """Test request_decision falls back when no daemon socket exists."""
+        from lib.permission_daemon import request_decision
+
+        result = request_decision(_hook_input('git status'), 'PreToolUse', path=str(tmp_path / 'missing.sock'))
+        assert result is None
+
+    def test_returns_none_for_stale_socket(self, tmp_path):
+        """Test request_decision falls back when the socket file has no listener."""
+        from lib.permission_daemon import request_decision
+
+        stale = tmp_path / 'stale.sock'
+        stale.write_text('')
+        assert request_decision(_hook_input('git status'), 'PreToolUse', path=str(stale)) is None
+
+    def test_socket_path_under_agentize_home(self, set_agentize_home):
+        """Test the default socket lives under $AGENTIZE_HOME/.tmp."""
+        from lib.permission_daemon import socket_path, SOCKET_NAME
+
+        assert socket_path() == str(set_agentize_home / '.tmp' / SOCKET_NAME)
+
+
+class TestDaemonDecisions:
+    """Tests for decisions served by a running daemon."""
+
+    def test_ping(self, daemon):
+        """Test ping reports the daemon pid."""
+        from lib.permission_daemon import ping
+
+        status = ping(daemon)
+        assert status['ok'] is True
+        assert status['pid'] == os.getpid()
+
+    @pytest.mark.parametrize('command,caller', [
+        ('git status', 'PreToolUse'),
+        ('rm -rf /', 'PreToolUse'),
+        ('git status', 'PermissionRequest'),
+    ])
+    def test_matches_in_process_determine(self, daemon, command, caller):
+        """Test daemon answers for rule-decided commands equal determine()."""
+        from lib.permission import determine
+        from lib.permission_daemon import request_decision
+
+        result = request_decision(_hook_input(command), caller, path=daemon)
+        assert result is not None
+        assert result == determine(_hook_input(command), caller)
+
+    def test_defers_when_haiku_needed(self, daemon):
+        """Test commands without a rule are left to the hook when Haiku is enabled."""
+        from lib.permission_daemon import request_decision
+
+        assert request_decision(_hook_input('some-unknown-tool --flag'), 'PreToolUse', path=daemon) is None
+
+    def test_answers_ask_when_slow_stages_disabled(self, daemon, set_agentize_home):
+        """Test the daemon resolves 'ask' itself when Haiku and Telegram are off."""
+        from lib.permission_daemon import request_decision
+
+        (set_agentize_home / '.agentize.local.yaml').write_text(
+            'handsoff:\n  auto_permission: false\n'
+        )
+        result = request_decision(_hook_input('some-unknown-tool --flag'), 'PreToolUse', path=daemon)
+        assert result == {'hookSpecificOutput': {'hookEventName': 'PreToolUse', 'permissionDecision': 'ask'}}
+
+    def test_reloads_local_rules(self, daemon, set_agentize_home):
+        """Test edits to .agentize.local.yaml take effect without restarting."""
+        from lib.permission_daemon import request_decision
+
+        assert request_decision(_hook_input('mytool run'), 'PreToolUse', path=daemon) is None
+
+        (set_agentize_home / '.agentize.local.yaml').write_text(
+            'permissions:\n  allow:\n    - "^mytool run"\n'
+        )
+        result = request_decision(_hook_input('mytool run'), 'PreToolUse', path=daemon)
+        assert result['hookSpecificOutput']['permissionDecision'] == 'allow'
+
+    def test_bad_request(self, daemon):
+        """Test malformed hook input is deferred rather than answered."""
+        from lib.permission_daemon import request_decision
+
+        assert request_decision('not json', 'PreToolUse', path=daemon) is None
@@ -1,5 +1,8 @@
 """Tests for .claude-plugin/lib/permission/rules.py YAML rule loading and merging."""
 
+import os
+import re
+
 import pytest
 from pathlib import Path
 
@@ -15,7 +18,9 @@ from lib.permission.rules import (
     _find_config_paths,
     _extract_yaml_rules,
     _get_merged_rules,
+    _get_compiled_rules,
     clear_yaml_cache,
+    match_rule_detail,
 )
 
 
@@ -333,3 +338,104 @@ permissions:
         result = match_rule('Bash', 'local-specific-cmd')
         assert result is not None
         assert 'local' in result[1]
+
+
+class TestCompiledRules:
+    """Tests for the compiled, per-tool rule set behind match_rule."""
+
+    @staticmethod
+    def _linear_match(tool, target):
+        """Reference linear matcher mirroring the rule priority order."""
+        yaml_rules = _get_merged_rules()
+        tiers = [
+            [(t, p, 'hardcoded') for t, p in PERMISSION_RULES.get('deny', [])],
+            yaml_rules.get('deny', []),
+            [(t, p, 'hardcoded') for t, p in PERMISSION_RULES.get('ask', [])],
+            [(t, p, 'hardcoded') for t, p in PERMISSION_RULES.get('allow', [])],
+            yaml_rules.get('allow', []),
+        ]
+        decisions = ['deny', 'deny', 'ask', 'allow', 'allow']
+        for decision, rules in zip(decisions, tiers):
+            for rule_tool, pattern, source in rules:
+                if rule_tool != tool:
+                    continue
+                try:
+                    if re.search(pattern, target):
+                        return (decision, f'rules:{source}')
+                except re.error:
+                    continue
+        return None
+
+    def test_compiled_matches_linear_reference(self, tmp_path, monkeypatch):
+        """Test compiled buckets give the same answer as the linear loop."""
+        (tmp_path / ".agentize.yaml").write_text("""
+permissions:
+  allow:
+    - "^npm run (build|test)"
+    - "^shared-cmd"
+  deny:
+    - "^npm run deploy"
+""")
+        (tmp_path / ".agentize.local.yaml").write_text("""
+permissions:
+  allow:
+    - "^shared-cmd"
+    - "^uv run pytest"
+    - "^only-start|anywhere-tool"
+    - pattern: "^/tmp/notes"
+      tool: Read
+  deny:
+    - "^npm run deploy"
+""")
+        monkeypatch.chdir(tmp_path)
+        clear_yaml_cache()
+
+        corpus = [
+            ('Bash', 'git status'), ('Bash', 'git reset --hard'), ('Bash', 'cd /tmp'),
+            ('Bash', 'npm run build'), ('Bash', 'npm run deploy:prod'), ('Bash', 'shared-cmd x'),
+            ('Bash', 'uv run pytest -q'), ('Bash', 'python script.py'), ('Bash', 'make test'),
+            ('Bash', 'run anywhere-tool'), ('Bash', 'x only-start'),
+            ('Read', '/tmp/notes.md'), ('Read', '.env'), ('Read', '/home/u/a.pem'),
+            ('Skill', 'agentize:open-pr'), ('Unknown', 'anything'),
+        ]
+        for tool, target in corpus:
+            assert match_rule(tool, target) == self._linear_match(tool, target), (tool, target)
+
+    def test_match_rule_detail_reports_pattern(self):
+        """Test match_rule_detail recovers the matched pattern from named groups."""
+        result = match_rule_detail('Bash', 'git status')
+        assert result == ('allow', 'rules:hardcoded', r'^git (status|diff|log|show|rev-parse)')
+
+    def test_backreference_pattern_compiled_standalone(self, tmp_path, monkeypatch):
+        """Test backreference patterns still match after bucket compilation."""
+        (tmp_path / ".agentize.local.yaml").write_text("""
+permissions:
+  allow:
+    - "^(\\\\w+) \\\\1$"
+    - "^other-cmd"
+""")
+        monkeypatch.chdir(tmp_path)
+        clear_yaml_cache()
+
+        assert match_rule('Bash', 'twice twice') == ('allow', 'rules:local')
+        assert match_rule('Bash', 'other-cmd') == ('allow', 'rules:local')
+        assert match_rule('Bash', 'twice once') is None
+
+    def test_compiled_rules_rebuilt_on_mtime_change(self, tmp_path, monkeypatch):
+        """Test the compiled rule set is invalidated by the YAML mtime check."""
+        config = tmp_path / ".agentize.local.yaml"
+        config.write_text("permissions:\n  allow:\n    - \"^first-cmd\"\n")
+        monkeypatch.chdir(tmp_path)
+        clear_yaml_cache()
+
+        assert match_rule('Bash', 'first-cmd') == ('allow', 'rules:local')
+        first = _get_compiled_rules()
+        assert _get_compiled_rules() is first  # Reused while config is unchanged
+
+        config.write_text("permissions:\n  allow:\n    - \"^second-cmd\"\n")
+        stat = config.stat()
+        os.utime(config, (stat.st_atime, stat.st_mtime + 10))
+
+        assert match_rule('Bash', 'second-cmd') == ('allow', 'rules:local')
+        assert match_rule('Bash', 'first-cmd') is None
+        assert _get_compiled_rules() is not first
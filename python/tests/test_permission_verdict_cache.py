@@ -0,0 +1,209 @@
+"""Tests for lib.permission.verdict_cache (Haiku verdict cache).
+
+These tests cover:
+- command_template: paths, numbers and quoted literals become placeholders
+- cache_key: never-cache shapes (compound, outside paths, risky/deny heads)
+- lookup/store: TTL expiry, LRU eviction, hit/miss counters, disable switch
+- _ask_haiku_first: cached shapes skip the claude subprocess
+"""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def verdict_env(set_agentize_home, clear_local_config_cache, monkeypatch):
+    """Isolate config discovery and the cache file under a temp AGENTIZE_HOME."""
+    from lib.permission.rules import clear_yaml_cache
+
+    monkeypatch.chdir(set_agentize_home)
+    clear_yaml_cache()
+    yield set_agentize_home
+    clear_yaml_cache()
+
+
+def _write_config(home, text: str) -> None:
+    from lib.local_config import clear_cache
+
+    (home / '.agentize.local.yaml').write_text(text)
+    clear_cache()
+
+
+class TestCommandTemplate:
+    """Tests for strips.command_template."""
+
+    @pytest.mark.parametrize('command,expected', [
+        ('pytest tests/test_x.py -k "slow and db" -n 4', 'pytest <path> -k <str> -n <n>'),
+        ("pytest tests/test_y.py -k 'fast' -n 8", 'pytest <path> -k <str> -n <n>'),
+        ('FOO=1 set -x && make docs', 'make docs'),
+        ('python -m pytest --rootdir=python/tests', 'python -m pytest --rootdir=<path>'),
+        ('cat /etc/passwd', 'cat <abspath>'),
+        ('ls ../sibling', 'ls <abspath>'),
+        ('ls ~/.ssh', 'ls <abspath>'),
+        ('python setup.py build', 'python <path> build'),
+    ])
+    def test_templates(self, command, expected):
+        """Test command shapes normalize to the expected template."""
+        from lib.permission.strips import command_template
+
+        assert command_template(command) == expected
+
+
+class TestCacheKey:
+    """Tests for never-cache shapes."""
+
+    @pytest.mark.parametrize('command', [
+        'pytest tests/a.py | tee out.log',
+        'make docs && make test',
+        'echo hi > out.txt',
+        'python $(which tool)',
+        'cat /etc/shadow',
+        'cp src/a.py src/b.py',
+        'git push origin HEAD',
+        'gh api repos/x/y -X DELETE',
+        'cd python',
+        'echo "$(rm -rf src)"',
+        "git commit -m 'a; b'",
+        "find src -exec rm {} +",
+        "sed -i s/a/b/ src/a.py",
+        "awk 'BEGIN{system(\"rm -rf src\")}' f",
+        'python setup.py build',
+        './x.sh',
+        './scripts/wipe_db.sh --force',
+        'python3 a.py',
+        'node build.js',
+        'uv run foo.py',
+        'npx eslint src/a.ts',
+    ])
+    def test_never_cached(self, verdict_env, command):
+        """Test deny-adjacent and open-ended shapes have no cache key."""
+        from lib.permission.verdict_cache import cache_key
+
+        assert cache_key('Bash', command) is None
+
+    def test_interpreter_programs_do_not_share_a_key(self, verdict_env):
+        """Test quoted interpreter arguments are hashed into the key."""
+        from lib.permission.verdict_cache import cache_key
+
+        harmless = cache_key('Bash', "python3 -c 'print(1)'")
+        assert harmless is not None
+        assert harmless == cache_key('Bash', "python3 -c 'print(1)'")
+        assert harmless != cache_key('Bash', "python3 -c 'import shutil; shutil.rmtree(\"src\")'")
+        assert cache_key('Bash', "node -e 'a'") != cache_key('Bash', "node -e 'b'")
+        assert cache_key('Bash', 'pytest tests/a.py -k "x"') == 'Bash\tpytest <path> -k <str>'
+
+    def test_scripts_do_not_share_a_key(self, verdict_env):
+        """Test different scripts never answer for each other."""
+        from lib.permission.verdict_cache import cache_key
+
+        assert cache_key('Bash', 'python3 a.py') is None
+        assert cache_key('Bash', 'python3 b.py') is None
+        assert cache_key('Bash', './x.sh') is None
+
+    def test_non_bash_not_cached(self, verdict_env):
+        """Test only Bash commands are cached."""
+        from lib.permission.verdict_cache import cache_key
+
+        assert cache_key('Read', 'src/a.py') is None
+
+    def test_yaml_deny_head_not_cached(self, verdict_env):
+        """Test commands sharing a head with a YAML deny rule are never cached."""
+        from lib.permission.verdict_cache import cache_key
+
+        assert cache_key('Bash', 'npm run build') is not None
+        _write_config(verdict_env, 'permissions:\n  deny:\n    - "^npm publish"\n    - "^npm run"\n')
+        assert cache_key('Bash', 'npm run build') is None
+
+
+class TestLookupStore:
+    """Tests for the persistent cache file."""
+
+    def test_roundtrip_shares_shape(self, verdict_env):
+        """Test a verdict applies to other commands with the same shape."""
+        from lib.permission import verdict_cache
+
+        assert verdict_cache.lookup('Bash', 'pytest tests/a.py -k one') is None
+        verdict_cache.store('Bash', 'pytest tests/a.py -k one', 'allow')
+        assert verdict_cache.lookup('Bash', 'pytest tests/b.py -k one') == 'allow'
+        assert verdict_cache.lookup('Bash', 'pytest tests/b.py -k two') is None
+
+        data = json.loads((verdict_env / '.tmp' / verdict_cache.CACHE_FILENAME).read_text())
+        assert data['hits'] == 1
+        assert data['misses'] == 2
+
+    def test_ttl_expiry(self, verdict_env, monkeypatch):
+        """Test entries older than ttl_sec are ignored."""
+        from lib.permission import verdict_cache
+
+        _write_config(verdict_env, 'handsoff:\n  haiku_cache:\n    ttl_sec: 60\n')
+        now = [1000.0]
+        monkeypatch.setattr(verdict_cache.time, 'time', lambda: now[0])
+        verdict_cache.store('Bash', 'make docs', 'allow')
+        now[0] += 30
+        assert verdict_cache.lookup('Bash', 'make docs') == 'allow'
+        now[0] += 60
+        assert verdict_cache.lookup('Bash', 'make docs') is None
+
+    def test_lru_eviction(self, verdict_env, monkeypatch):
+        """Test the least recently used entry is evicted at max_entries."""
+        from lib.permission import verdict_cache
+
+        _write_config(verdict_env, 'handsoff:\n  haiku_cache:\n    max_entries: 2\n')
+        now = [1000.0]
+        monkeypatch.setattr(verdict_cache.time, 'time', lambda: now[0])
+        for command in ('make a', 'make b'):
+            now[0] += 1
+            verdict_cache.store('Bash', command, 'allow')
+        now[0] += 1
+        assert verdict_cache.lookup('Bash', 'make a') == 'allow'
+        now[0] += 1
+        verdict_cache.store('Bash', 'make c', 'deny')
+
+        assert verdict_cache.lookup('Bash', 'make a') == 'allow'
+        assert verdict_cache.lookup('Bash', 'make b') is None
+        assert verdict_cache.lookup('Bash', 'make c') == 'deny'
+
+    def test_disabled(self, verdict_env):
+        """Test handsoff.haiku_cache.enabled: false bypasses the cache."""
+        from lib.permission import verdict_cache
+
+        _write_config(verdict_env, 'handsoff:\n  haiku_cache:\n    enabled: false\n')
+        verdict_cache.store('Bash', 'make docs', 'allow')
+        assert verdict_cache.lookup('Bash', 'make docs') is None
+        assert not (verdict_env / '.tmp' / verdict_cache.CACHE_FILENAME).exists()
+
+    def test_errors_not_stored(self, verdict_env):
+        """Test only allow/deny/ask verdicts are stored."""
+        from lib.permission import verdict_cache
+
+        verdict_cache.store('Bash', 'make docs', 'ERROR:timeout')
+        assert verdict_cache.lookup('Bash', 'make docs') is None
+
+
+class TestAskHaikuUsesCache:
+    """Tests for the cache in front of the claude subprocess."""
+
+    def test_second_call_skips_subprocess(self, verdict_env, monkeypatch):
+        """Test a repeated command shape is answered from the cache."""
+        import subprocess
+        import sys
+        import lib.permission.determine  # noqa: F401
+        # lib.permission re-exports determine(), which shadows the submodule attribute
+        determine_module = sys.modules['lib.permission.determine']
+
+        transcript = verdict_env / 'transcript.jsonl'
+        transcript.write_text('{"type": "user"}\n')
+        determine_module._hook_input = {'transcript_path': str(transcript)}
+
+        calls = []
+
+        def fake_check_output(*args, **kwargs):
+            calls.append(args)
+            return 'allow - runs the test suite'
+
+        monkeypatch.setattr(subprocess, 'check_output', fake_check_output)
+
+        assert determine_module._ask_haiku_first('Bash', 'pytest tests/a.py -n 2') == 'allow'
+        assert determine_module._ask_haiku_first('Bash', 'pytest tests/b.py -n 4') == 'allow'
+        assert len(calls) == 1
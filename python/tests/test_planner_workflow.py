@@ -170,25 +170,18 @@ class TestPlannerPipelineExecutionOrder:
 
     @pytest.mark.skipif(run_planner_pipeline is None, reason="Implementation not yet available")
     def test_critique_reducer_run_parallel(self, tmp_output_dir: Path, stub_runner: Callable, monkeypatch):
-        """Critique and reducer are dispatched through the parallel runner."""
+        """Critique and reducer both depend only on bold, so the DAG runs them in parallel."""
         from agentize.workflow.planner import pipeline as planner_pipeline
 
         recorded = {}
+        original_run_dag = planner_pipeline.Session.run_dag
 
-        def _run_parallel(self, calls, *, max_workers: int = 2, retry: int = 0, retry_delay: float = 0):
+        def _run_dag(self, calls, **kwargs):
             call_list = list(calls)
-            recorded["stages"] = [call.stage for call in call_list]
-            results = {}
-            for call in call_list:
-                results[call.stage] = self.run_prompt(
-                    call.stage,
-                    call.prompt,
-                    call.backend,
-                    **call.options,
-                )
-            return results
-
-        monkeypatch.setattr(planner_pipeline.Session, "run_parallel", _run_parallel)
+            recorded["after"] = {call.stage: call.after for call in call_list}
+            return original_run_dag(self, call_list, **kwargs)
+
+        monkeypatch.setattr(planner_pipeline.Session, "run_dag", _run_dag)
 
         run_planner_pipeline(
             "Add feature X",
@@ -197,7 +190,9 @@ class TestPlannerPipelineExecutionOrder:
             prefix="test",
         )
 
-        assert recorded.get("stages") == ["critique", "reducer"]
+        assert recorded["after"]["critique"] == ("bold",)
+        assert recorded["after"]["reducer"] == ("bold",)
+        assert set(recorded["after"]["consensus"]) == {"bold", "critique", "reducer"}
 
     @pytest.mark.skipif(run_planner_pipeline is None, reason="Implementation not yet available")
     def test_understander_runs_before_bold(self, tmp_output_dir: Path, stub_runner: Callable):
@@ -92,6 +92,103 @@ class TestHasUnresolvedReviewThreads:
         assert result is False
 
 
+    def test_follows_pagination_cursor(self):
+        """Test threads beyond the first page are checked."""
+        pages = [
+            {"nodes": [{"isResolved": True, "isOutdated": False}],
+             "pageInfo": {"hasNextPage": True, "endCursor": "CUR1"}},
+            {"nodes": [{"isResolved": False, "isOutdated": False}],
+             "pageInfo": {"hasNextPage": False, "endCursor": None}},
+        ]
+        calls = []
+
+        def fake_run(args, **kwargs):
+            calls.append(args)
+            page = pages[len(calls) - 1]
+            result = MagicMock(returncode=0, stderr="")
+            result.stdout = json.dumps({"data": {"repository": {"pullRequest": {"reviewThreads": page}}}})
+            return result
+
+        with patch("subprocess.run", side_effect=fake_run):
+            result = has_unresolved_review_threads("owner", "repo", 123)
+
+        assert result is True
+        assert len(calls) == 2
+        assert "after=CUR1" in calls[1]
+
+
+def _threads(*unresolved_flags, next_cursor=None):
+    return {
+        "reviewThreads": {
+            "nodes": [{"isResolved": not flag, "isOutdated": False} for flag in unresolved_flags],
+            "pageInfo": {"hasNextPage": next_cursor is not None, "endCursor": next_cursor},
+        }
+    }
+
+
+def _versioned_pr(number, head="sha1", updated="2026-01-01T00:00:00Z"):
+    return {"number": number, "headRefOid": head, "updatedAt": updated}
+
+
+class TestFetchReviewThreadStates:
+    """Tests for batched, cached review-thread scans."""
+
+    def _run_returning(self, repository):
+        result = MagicMock(returncode=0, stderr="")
+        result.stdout = json.dumps({"data": {"repository": repository}})
+        return result
+
+    def test_one_query_for_many_prs(self):
+        """Test all PRs are scanned by one aliased query."""
+        from agentize.server.review_threads import fetch_review_thread_states
+
+        repository = {"p1": _threads(True), "p2": _threads(False), "p3": _threads()}
+        with patch("subprocess.run", return_value=self._run_returning(repository)) as mock_run:
+            states = fetch_review_thread_states("owner", "repo", [_versioned_pr(1), _versioned_pr(2), _versioned_pr(3)])
+
+        assert states == {1: True, 2: False, 3: False}
+        assert mock_run.call_count == 1
+
+    def test_unchanged_clean_prs_are_not_rescanned(self):
+        """Test PRs without threads are cached by head SHA and updatedAt."""
+        from agentize.server.review_threads import fetch_review_thread_states
+
+        with patch("subprocess.run", return_value=self._run_returning({"p1": _threads(), "p2": _threads(True)})):
+            fetch_review_thread_states("owner", "repo", [_versioned_pr(1), _versioned_pr(2)])
+
+        with patch("subprocess.run", return_value=self._run_returning({"p2": _threads(True)})) as mock_run:
+            states = fetch_review_thread_states("owner", "repo", [_versioned_pr(1), _versioned_pr(2)])
+        assert states == {1: False, 2: True}
+        assert "p1:" not in mock_run.call_args[0][0][4]
+
+        with patch("subprocess.run", return_value=self._run_returning({"p1": _threads(True)})) as mock_run:
+            states = fetch_review_thread_states("owner", "repo", [_versioned_pr(1, head="sha2")])
+        assert states == {1: True}
+        assert mock_run.call_count == 1
+
+    def test_continues_paginated_pr(self):
+        """Test a PR with more pages is resumed from its cursor."""
+        from agentize.server.review_threads import fetch_review_thread_states
+
+        responses = [
+            self._run_returning({"p1": _threads(False, next_cursor="C1")}),
+            self._run_returning({"pullRequest": _threads(True)}),
+        ]
+        with patch("subprocess.run", side_effect=responses) as mock_run:
+            states = fetch_review_thread_states("owner", "repo", [_versioned_pr(1)])
+
+        assert states == {1: True}
+        assert "after=C1" in mock_run.call_args_list[1][0][0]
+
+    def test_prs_without_version_fields_are_left_to_fallback(self):
+        """Test PRs lacking headRefOid/updatedAt are not batched."""
+        from agentize.server.review_threads import fetch_review_thread_states
+
+        with patch("subprocess.run") as mock_run:
+            assert fetch_review_thread_states("owner", "repo", [{"number": 5}]) == {}
+        mock_run.assert_not_called()
+
+
 class TestFilterReadyReviewPRs:
     """Tests for filter_ready_review_prs function."""
 
@@ -0,0 +1,125 @@
+"""Tests for agentize.rule_suggest (permission rule suggestions)."""
+
+import re
+
+import pytest
+
+from agentize.rule_suggest import (
+    command_prefix,
+    format_yaml,
+    main,
+    parse_permission_log,
+    suggest_rules,
+)
+
+
+def _line(second: int, source: str, decision: str, target: str, session: str = "s1") -> str:
+    return f"[2026-01-01T00:00:{second:02d}] [{session}] [impl] [{source}] [{decision}] Bash | {target}\n"
+
+
+@pytest.fixture
+def permission_log(tmp_path):
+    lines = [
+        _line(0, "haiku", "allow", "make docs"),
+        _line(0, "haiku", "allow", "make docs"),  # final determine() log of the same decision
+        _line(10, "haiku", "allow", "make docs"),
+        _line(20, "haiku-cache", "allow", "make docs"),
+        _line(21, "haiku", "allow", "make html"),
+        _line(22, "haiku", "allow", "pytest tests/a.py -k x"),
+        _line(23, "haiku", "allow", "pytest tests/b.py"),
+        _line(24, "telegram", "allow", "pytest tests/c.py -n 4"),
+        _line(25, "haiku", "deny", "python scripts/drop_db.py"),
+        _line(26, "haiku", "deny", "npm publish"),
+        _line(27, "telegram", "deny", "npm publish --tag next"),
+        _line(28, "haiku", "deny", "npm unpublish pkg"),
+        _line(29, "haiku", "allow", "rm build/a.o"),
+        _line(30, "haiku", "allow", "rm build/b.o"),
+        _line(31, "haiku", "allow", "rm build/c.o"),
+        _line(32, "rules:hardcoded", "allow", "git status"),
+        "not a log line\n",
+    ]
+    path = tmp_path / "permission.txt"
+    path.write_text("".join(lines))
+    return path
+
+
+class TestParsePermissionLog:
+    def test_skips_malformed_and_collapses_double_logging(self, permission_log):
+        records = parse_permission_log(permission_log)
+        make_docs = [r for r in records if r.target == "make docs"]
+        assert len(make_docs) == 3
+        assert len(records) == 15
+
+
+class TestCommandPrefix:
+    @pytest.mark.parametrize("command,expected", [
+        ("make docs", ("make", "docs")),
+        ("python -m pytest tests/a.py -k x", ("python", "-m", "pytest")),
+        ("git log --oneline -20 src/", ("git", "log", "--oneline")),
+        ('FOO=1 npm run "build prod"', ("npm", "run")),
+        ("ls | wc -l", ("ls",)),
+    ])
+    def test_prefix(self, command, expected):
+        assert command_prefix(command) == expected
+
+
+class TestSuggestRules:
+    def test_suggestions(self, permission_log):
+        suggestions = suggest_rules(parse_permission_log(permission_log))
+        by_pattern = {s.pattern: s for s in suggestions}
+
+        assert set(by_pattern) == {
+            r"^make\s+docs(\s|$)",
+            r"^pytest(\s|$)",
+            r"^npm(\s|$)",
+        }
+        assert by_pattern[r"^make\s+docs(\s|$)"].count == 3
+        assert by_pattern[r"^npm(\s|$)"].decision == "deny"
+        assert by_pattern[r"^pytest(\s|$)"].sources == {"haiku": 2, "telegram": 1}
+
+    def test_allow_does_not_widen_over_literal_words(self, permission_log):
+        """make docs and make html are both allowed, but ^make is not proposed."""
+        suggestions = suggest_rules(parse_permission_log(permission_log), min_count=1)
+        patterns = {s.pattern for s in suggestions}
+        assert r"^make(\s|$)" not in patterns
+        assert r"^make\s+html(\s|$)" in patterns
+
+    def test_risky_heads_never_allowed(self, permission_log):
+        suggestions = suggest_rules(parse_permission_log(permission_log), min_count=1)
+        assert not any(s.prefix[0] == "rm" for s in suggestions)
+
+    def test_interpreters_and_quoted_arguments_never_allowed(self, tmp_path):
+        path = tmp_path / "permission.txt"
+        path.write_text("".join(
+            [_line(i, "haiku", "allow", f"python3 -c 'print({i})'") for i in range(3)]
+            + [_line(10 + i, "haiku", "allow", f"jq '.items[{i}]' out.json") for i in range(3)]
+        ))
+        assert suggest_rules(parse_permission_log(path), min_count=1) == []
+
+    def test_patterns_match_their_commands(self, permission_log):
+        records = parse_permission_log(permission_log)
+        for suggestion in suggest_rules(records):
+            for example in suggestion.examples:
+                assert re.search(suggestion.pattern, example)
+
+
+class TestFormatYaml:
+    def test_yaml_round_trips(self, permission_log):
+        yaml = pytest.importorskip("yaml")
+        suggestions = suggest_rules(parse_permission_log(permission_log))
+        config = yaml.safe_load(format_yaml(suggestions))
+        assert r"^make\s+docs(\s|$)" in config["permissions"]["allow"]
+        assert config["permissions"]["deny"] == [r"^npm(\s|$)"]
+
+    def test_empty(self):
+        yaml = pytest.importorskip("yaml")
+        assert yaml.safe_load(format_yaml([])) == {"permissions": {"allow": []}}
+
+
+class TestMain:
+    def test_missing_log(self, tmp_path, capsys):
+        assert main(["--log", str(tmp_path / "missing.txt")]) == 1
+
+    def test_yaml_output(self, permission_log, capsys):
+        assert main(["--log", str(permission_log), "--yaml"]) == 0
+        assert capsys.readouterr().out.startswith("permissions:")
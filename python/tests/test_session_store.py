@@ -0,0 +1,182 @@
+"""Tests for lib.session_store.
+
+These tests cover:
+- put/get/update/delete with the write-through JSON export
+- Reconciliation of direct edits and deletes of exported files
+- Import of sessions written before the store existed
+- Issue index, batch lookup, field queries, TTL cleanup and export
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from lib import session_store
+from lib.session_store import (
+    cleanup_sessions,
+    delete_session,
+    export_json,
+    find_by_issue,
+    find_by_issues,
+    find_sessions,
+    get_issue_session_id,
+    get_session,
+    put_session,
+    remove_issue_index,
+    set_issue_index,
+    update_session,
+)
+
+
+@pytest.fixture
+def sess_dir(tmp_path):
+    path = tmp_path / 'hooked-sessions'
+    path.mkdir()
+    yield path
+    session_store.clear_connections()
+
+
+def _touch_later(path):
+    """Give an externally edited file a distinct mtime (coarse filesystem clocks)."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestSessions:
+    def test_put_get_exports_json(self, sess_dir):
+        state = {'workflow': 'issue-to-impl', 'state': 'initial', 'continuation_count': 0, 'issue_no': 42}
+        put_session('s1', state, str(sess_dir))
+
+        assert get_session('s1', str(sess_dir)) == state
+        assert json.loads((sess_dir / 's1.json').read_text()) == state
+        assert (sess_dir / 'sessions.db').exists()
+        assert get_session('missing', str(sess_dir)) is None
+
+    def test_update_session_read_modify_write(self, sess_dir):
+        put_session('s1', {'state': 'initial', 'continuation_count': 0}, str(sess_dir))
+
+        def bump(state):
+            return {**state, 'continuation_count': state['continuation_count'] + 1}
+
+        for _ in range(3):
+            update_session('s1', bump, str(sess_dir))
+        assert get_session('s1', str(sess_dir))['continuation_count'] == 3
+        assert json.loads((sess_dir / 's1.json').read_text())['continuation_count'] == 3
+
+    def test_update_session_declined_leaves_state(self, sess_dir):
+        put_session('s1', {'state': 'initial'}, str(sess_dir))
+        assert update_session('s1', lambda state: None, str(sess_dir)) is None
+        assert update_session('missing', lambda state: state, str(sess_dir)) is None
+        assert get_session('s1', str(sess_dir)) == {'state': 'initial'}
+        assert not (sess_dir / 'missing.json').exists()
+
+    def test_delete_session_removes_export_and_index(self, sess_dir):
+        put_session('s1', {'state': 'initial', 'issue_no': 7}, str(sess_dir))
+        set_issue_index('s1', 7, 'issue-to-impl', str(sess_dir))
+        delete_session('s1', str(sess_dir))
+
+        assert get_session('s1', str(sess_dir)) is None
+        assert not (sess_dir / 's1.json').exists()
+        assert not (sess_dir / 'by-issue' / '7.json').exists()
+        assert get_issue_session_id(7, str(sess_dir)) is None
+
+
+class TestExportReconciliation:
+    def test_direct_edit_is_picked_up(self, sess_dir):
+        put_session('s1', {'workflow': 'issue-to-impl', 'state': 'initial', 'issue_no': 5}, str(sess_dir))
+        path = sess_dir / 's1.json'
+        # What the agent's `jq '.state = "done"' ... && mv` completion command does
+        edited = dict(json.loads(path.read_text()), state='done')
+        path.write_text(json.dumps(edited))
+        _touch_later(path)
+
+        assert get_session('s1', str(sess_dir))['state'] == 'done'
+        assert [sid for sid, _ in find_sessions(state='done', sess_dir=str(sess_dir))] == ['s1']
+
+    def test_deleted_export_resets_session(self, sess_dir):
+        put_session('s1', {'state': 'initial'}, str(sess_dir))
+        (sess_dir / 's1.json').unlink()
+
+        assert get_session('s1', str(sess_dir)) is None
+        assert find_sessions(sess_dir=str(sess_dir)) == []
+
+    def test_deleted_index_export_drops_entry(self, sess_dir):
+        put_session('s1', {'state': 'done'}, str(sess_dir))
+        set_issue_index('s1', 9, 'issue-to-impl', str(sess_dir))
+        (sess_dir / 'by-issue' / '9.json').unlink()
+
+        assert get_issue_session_id(9, str(sess_dir)) is None
+        assert find_by_issue(9, str(sess_dir)) is None
+
+    def test_legacy_files_imported(self, sess_dir):
+        (sess_dir / 'old.json').write_text(json.dumps({'workflow': 'ultra-planner', 'state': 'done', 'issue_no': 3}))
+        (sess_dir / 'by-issue').mkdir()
+        (sess_dir / 'by-issue' / '3.json').write_text(json.dumps({'session_id': 'old', 'workflow': 'ultra-planner'}))
+
+        assert find_by_issue(3, str(sess_dir))['state'] == 'done'
+        assert [sid for sid, _ in find_sessions(workflow='ultra-planner', sess_dir=str(sess_dir))] == ['old']
+
+    def test_json_written_after_store_created(self, sess_dir):
+        put_session('s1', {'state': 'initial'}, str(sess_dir))
+        (sess_dir / 'late.json').write_text(json.dumps({'state': 'initial', 'continuation_count': 2}))
+        (sess_dir / 'by-issue').mkdir(exist_ok=True)
+        (sess_dir / 'by-issue' / '11.json').write_text(json.dumps({'session_id': 'late'}))
+
+        assert get_session('late', str(sess_dir))['continuation_count'] == 2
+        assert get_issue_session_id(11, str(sess_dir)) == 'late'
+
+
+class TestQueries:
+    def test_issue_index_and_batch_lookup(self, sess_dir):
+        for sid, issue_no, state in (('a', 1, 'done'), ('b', 2, 'initial')):
+            put_session(sid, {'state': state, 'issue_no': issue_no}, str(sess_dir))
+            path = set_issue_index(sid, issue_no, 'issue-to-impl', str(sess_dir))
+            assert path == os.path.join(str(sess_dir), 'by-issue', f'{issue_no}.json')
+
+        states = find_by_issues([1, 2, 3], str(sess_dir))
+        assert {n: s['state'] for n, s in states.items()} == {1: 'done', 2: 'initial'}
+
+        remove_issue_index(1, str(sess_dir))
+        assert find_by_issue(1, str(sess_dir)) is None
+        assert not (sess_dir / 'by-issue' / '1.json').exists()
+
+    def test_find_sessions_filters(self, sess_dir):
+        put_session('a', {'workflow': 'issue-to-impl', 'state': 'done', 'issue_no': 1, 'pr_number': 10}, str(sess_dir))
+        put_session('b', {'workflow': 'issue-to-impl', 'state': 'initial', 'issue_no': '2'}, str(sess_dir))
+        put_session('c', {'workflow': 'ultra-planner', 'state': 'done'}, str(sess_dir))
+
+        def ids(**filters):
+            return sorted(sid for sid, _ in find_sessions(sess_dir=str(sess_dir), **filters))
+
+        assert ids(workflow='issue-to-impl') == ['a', 'b']
+        assert ids(state='done') == ['a', 'c']
+        assert ids(issue_no=2) == ['b']
+        assert ids(pr_no=10) == ['a']
+        assert ids(workflow='issue-to-impl', state='done') == ['a']
+
+    def test_cleanup_sessions_ttl(self, sess_dir):
+        put_session('old-done', {'state': 'done', 'issue_no': 1}, str(sess_dir))
+        set_issue_index('old-done', 1, 'issue-to-impl', str(sess_dir))
+        put_session('old-running', {'state': 'initial'}, str(sess_dir))
+        conn = session_store._connect(str(sess_dir))
+        conn.execute('UPDATE sessions SET updated_at = ?', (time.time() - 10 * 86400,))
+        put_session('new-done', {'state': 'done'}, str(sess_dir))
+
+        assert cleanup_sessions(7 * 86400, sess_dir=str(sess_dir)) == 1
+        assert get_session('old-done', str(sess_dir)) is None
+        assert not (sess_dir / 'old-done.json').exists()
+        assert not (sess_dir / 'by-issue' / '1.json').exists()
+        assert get_session('old-running', str(sess_dir)) is not None
+        assert get_session('new-done', str(sess_dir)) is not None
+
+    def test_export_json(self, sess_dir, tmp_path):
+        put_session('a', {'state': 'done', 'issue_no': 4}, str(sess_dir))
+        set_issue_index('a', 4, 'issue-to-impl', str(sess_dir))
+        dest = tmp_path / 'export'
+
+        assert export_json(str(dest), str(sess_dir)) == 1
+        assert json.loads((dest / 'a.json').read_text()) == {'state': 'done', 'issue_no': 4}
+        assert json.loads((dest / 'by-issue' / '4.json').read_text()) == {
+            'session_id': 'a', 'workflow': 'issue-to-impl'}
@@ -0,0 +1,244 @@
+"""Tests for lib.telegram_broker (shared Telegram approval broker).
+
+These tests cover:
+- parse_callback_data: single and batched callback formats
+- Batching: concurrent prompts share one message with a button row each
+- Routing: callbacks reach the request they belong to; stale/foreign ones are ignored
+- Text commands, allowed_user_ids filtering, timeouts and send failures
+- request_approval over the socket, and determine() falling back without a broker
+"""
+
+import queue
+import threading
+import time
+
+import pytest
+
+from lib import telegram_broker
+from lib.telegram_broker import TelegramBroker, parse_callback_data
+
+
+class FakeTelegram:
+    """In-memory Bot API: records calls and serves queued updates."""
+
+    def __init__(self, fail_send: bool = False):
+        self.calls = []
+        self.updates = queue.Queue()
+        self.fail_send = fail_send
+        self._next_message_id = 100
+        self._next_update_id = 1
+        self._lock = threading.Lock()
+
+    def __call__(self, method, payload, timeout):
+        with self._lock:
+            self.calls.append((method, payload))
+        if method == 'sendMessage':
+            if self.fail_send:
+                return None
+            with self._lock:
+                self._next_message_id += 1
+                return {'ok': True, 'result': {'message_id': self._next_message_id}}
+        if method == 'getUpdates':
+            if payload.get('offset') == -1:
+                return {'ok': True, 'result': []}
+            try:
+                return {'ok': True, 'result': [self.updates.get(timeout=0.05)]}
+            except queue.Empty:
+                return {'ok': True, 'result': []}
+        return {'ok': True, 'result': True}
+
+    def push(self, **update):
+        with self._lock:
+            update['update_id'] = self._next_update_id
+            self._next_update_id += 1
+        self.updates.put(update)
+
+    def press(self, data, user_id=1):
+        self.push(callback_query={'id': f'cb-{data}', 'data': data, 'from': {'id': user_id}})
+
+    def sent(self, method='sendMessage'):
+        with self._lock:
+            return [payload for m, payload in self.calls if m == method]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def broker_factory():
+    brokers = []
+
+    def make(api, **kwargs):
+        kwargs.setdefault('batch_window', 0.1)
+        broker = TelegramBroker(api, '42', long_poll=0, **kwargs)
+        broker.start()
+        brokers.append(broker)
+        return broker
+
+    yield make
+    for broker in brokers:
+        broker.stop()
+
+
+def _submit_async(broker, tool, target, session_id='session-1', timeout=5.0):
+    result = {}
+
+    def run():
+        result.update(broker.submit(tool, target, session_id, timeout))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+class TestParseCallbackData:
+    @pytest.mark.parametrize('data,expected', [
+        ('allow:123', ('allow', 123, 0)),
+        ('deny:123:2', ('deny', 123, 2)),
+        ('allow:abc', ('allow', 0, 0)),
+        ('allow', ('allow', 0, 0)),
+    ])
+    def test_parse(self, data, expected):
+        assert parse_callback_data(data) == expected
+
+
+class TestBrokerRouting:
+    def test_single_request_allowed(self, broker_factory):
+        api = FakeTelegram()
+        broker = broker_factory(api)
+        thread, result = _submit_async(broker, 'Bash', 'make deploy')
+        assert _wait_for(lambda: api.sent('editMessageReplyMarkup'))
+
+        message_id = api.sent('editMessageReplyMarkup')[0]['message_id']
+        keyboard = api.sent('editMessageReplyMarkup')[0]['reply_markup']['inline_keyboard']
+        assert keyboard[0][0]['callback_data'] == f'allow:{message_id}'
+
+        api.press(f'allow:{message_id}')
+        thread.join(timeout=5)
+        assert result == {'decision': 'allow', 'message_id': message_id}
+        assert api.sent('answerCallbackQuery')
+        assert api.sent('editMessageText')[-1]['text'].startswith('✅ Allowed')
+
+    def test_concurrent_prompts_are_batched_and_routed(self, broker_factory):
+        api = FakeTelegram()
+        broker = broker_factory(api, batch_window=0.3)
+        first, first_result = _submit_async(broker, 'Bash', 'make a', 'session-a')
+        second, second_result = _submit_async(broker, 'Bash', 'make b', 'session-b')
+        assert _wait_for(lambda: api.sent('editMessageReplyMarkup'))
+
+        assert len(api.sent()) == 1
+        assert 'Tool Approval Requests (2)' in api.sent()[0]['text']
+        message_id = api.sent('editMessageReplyMarkup')[0]['message_id']
+
+        # Unknown message and a stale slot are ignored
+        api.press('allow:999')
+        api.press(f'allow:{message_id}:7')
+        api.press(f'deny:{message_id}:2')
+        second.join(timeout=5)
+        assert second_result['decision'] == 'deny'
+        assert first.is_alive()
+
+        # The remaining request keeps its buttons
+        edit = api.sent('editMessageText')[-1]
+        assert [row[0]['callback_data'] for row in edit['reply_markup']['inline_keyboard']] == [f'allow:{message_id}:1']
+
+        api.press(f'allow:{message_id}:1')
+        first.join(timeout=5)
+        assert first_result['decision'] == 'allow'
+        assert broker.served == 2
+        assert broker.pending() == 0
+
+    def test_disallowed_user_ignored(self, broker_factory):
+        api = FakeTelegram()
+        broker = broker_factory(api, allowed_user_ids=[7])
+        thread, result = _submit_async(broker, 'Bash', 'make a', timeout=5)
+        assert _wait_for(lambda: api.sent('editMessageReplyMarkup'))
+        message_id = api.sent('editMessageReplyMarkup')[0]['message_id']
+
+        api.press(f'allow:{message_id}', user_id=8)
+        time.sleep(0.2)
+        assert thread.is_alive()
+        api.press(f'deny:{message_id}', user_id=7)
+        thread.join(timeout=5)
+        assert result['decision'] == 'deny'
+
+    def test_text_command_reply_and_oldest(self, broker_factory):
+        api = FakeTelegram()
+        broker = broker_factory(api)
+        first, first_result = _submit_async(broker, 'Bash', 'make a')
+        assert _wait_for(lambda: api.sent('editMessageReplyMarkup'))
+        second, second_result = _submit_async(broker, 'Read', 'secrets.txt')
+        assert _wait_for(lambda: len(api.sent('editMessageReplyMarkup')) == 2)
+        second_id = api.sent('editMessageReplyMarkup')[1]['message_id']
+
+        api.push(message={'message_id': 1, 'text': '/deny', 'from': {'id': 1},
+                          'reply_to_message': {'message_id': second_id}})
+        second.join(timeout=5)
+        assert second_result['decision'] == 'deny'
+
+        api.push(message={'message_id': 2, 'text': '/allow', 'from': {'id': 1}})
+        first.join(timeout=5)
+        assert first_result['decision'] == 'allow'
+
+    def test_timeout(self, broker_factory):
+        api = FakeTelegram()
+        broker = broker_factory(api)
+        assert broker.submit('Bash', 'make a', 's', timeout=0.5)['decision'] == 'timeout'
+        assert api.sent('editMessageText')[-1]['text'].startswith('⏰ Timed Out')
+
+    def test_send_failure(self, broker_factory):
+        api = FakeTelegram(fail_send=True)
+        broker = broker_factory(api)
+        assert broker.submit('Bash', 'make a', 's', timeout=5)['decision'] == 'error'
+
+
+class TestSocketClient:
+    def test_no_broker_returns_none(self, set_agentize_home):
+        assert telegram_broker.request_approval('Bash', 'ls', 's', 1, path=str(set_agentize_home / 'none.sock')) is None
+
+    def test_request_over_socket(self, tmp_path, broker_factory):
+        api = FakeTelegram()
+        broker = broker_factory(api)
+        path = str(tmp_path / 'b.sock')
+        server = telegram_broker._make_server(path, broker)
+        threading.Thread(target=server.serve, daemon=True).start()
+        try:
+            result = {}
+            client = threading.Thread(target=lambda: result.update(
+                telegram_broker.request_approval('Bash', 'make a', 's', 5, path=path)
+            ))
+            client.start()
+            assert _wait_for(lambda: api.sent('editMessageReplyMarkup'))
+            api.press(f"allow:{api.sent('editMessageReplyMarkup')[0]['message_id']}")
+            client.join(timeout=5)
+            assert result['decision'] == 'allow'
+            assert telegram_broker.ping(path)['served'] == 1
+        finally:
+            broker.stop()
+            server.server_close()
+
+
+class TestDetermineUsesBroker:
+    def test_brokered_decision(self, set_agentize_home, clear_local_config_cache, monkeypatch):
+        import sys
+        import lib.permission.determine  # noqa: F401
+        determine_module = sys.modules['lib.permission.determine']
+
+        monkeypatch.chdir(set_agentize_home)
+        (set_agentize_home / '.agentize.local.yaml').write_text(
+            'telegram:\n  enabled: true\n  token: "t"\n  chat_id: "1"\n'
+        )
+        calls = []
+        monkeypatch.setattr(telegram_broker, 'request_approval',
+                            lambda *args: calls.append(args) or {'decision': 'deny', 'message_id': 5})
+        monkeypatch.setattr(determine_module, 'telegram_request',
+                            lambda *a, **k: pytest.fail('hook must not poll Telegram when a broker answers'))
+
+        assert determine_module._telegram_approval_decision('Bash', 'make a', 's', 'make a') == 'deny'
+        assert calls[0][:3] == ('Bash', 'make a', 's')
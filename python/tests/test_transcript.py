@@ -0,0 +1,133 @@
+"""Tests for lib.transcript (tail access to JSONL transcripts).
+
+These tests cover:
+- tail_lines: last N lines, blank/trailing newlines, missing final newline
+- Both backends (windowed seek and mmap) agree with readlines()
+- Per-session offset cache: appends, rewrites and truncation
+- tail_entries: JSON parsing and skipping partial lines
+"""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def transcript_module():
+    from lib import transcript
+
+    transcript.clear_offset_cache()
+    yield transcript
+    transcript.clear_offset_cache()
+
+
+def _write_entries(path, count: int, pad: int = 0) -> list[str]:
+    lines = [json.dumps({'type': 'user', 'i': i, 'text': 'x' * pad}) for i in range(count)]
+    path.write_text(''.join(line + '\n' for line in lines))
+    return lines
+
+
+class TestTailLines:
+    """Tests for tail_lines()."""
+
+    def test_last_line_matches_readlines(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        lines = _write_entries(path, 50)
+        assert transcript_module.tail_lines(str(path)) == [lines[-1]]
+        assert transcript_module.tail_lines(str(path), 3) == lines[-3:]
+
+    def test_more_lines_than_file(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        lines = _write_entries(path, 2)
+        assert transcript_module.tail_lines(str(path), 10) == lines
+
+    def test_blank_lines_and_missing_newline(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        path.write_text('first\n\nsecond\r\n\n\nthird')
+        assert transcript_module.tail_lines(str(path), 2) == ['second', 'third']
+
+    def test_empty_file(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        path.write_text('')
+        assert transcript_module.tail_lines(str(path)) == []
+
+    def test_missing_file_raises(self, tmp_path, transcript_module):
+        with pytest.raises(OSError):
+            transcript_module.tail_lines(str(tmp_path / 'missing.jsonl'))
+
+    def test_long_last_line_spans_windows(self, tmp_path, transcript_module):
+        """A last line longer than the first window is returned whole."""
+        path = tmp_path / 't.jsonl'
+        lines = _write_entries(path, 3, pad=200 * 1024)
+        assert transcript_module.tail_lines(str(path), 2) == lines[-2:]
+
+    @pytest.mark.parametrize('threshold', [0, 1 << 30])
+    def test_backends_agree(self, tmp_path, transcript_module, monkeypatch, threshold):
+        """Test the mmap and windowed-read paths return the same lines."""
+        monkeypatch.setattr(transcript_module, 'MMAP_THRESHOLD', threshold)
+        path = tmp_path / 't.jsonl'
+        lines = _write_entries(path, 2000, pad=100)
+        assert transcript_module.tail_lines(str(path), 5) == lines[-5:]
+
+
+class TestOffsetCache:
+    """Tests for the per-session offset cache."""
+
+    def test_append_reads_new_tail(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        lines = _write_entries(path, 10)
+        assert transcript_module.tail_lines(str(path), 1, 's1') == [lines[-1]]
+        with open(path, 'a') as f:
+            f.write('{"type": "assistant"}\n')
+        assert transcript_module.tail_lines(str(path), 1, 's1') == ['{"type": "assistant"}']
+        assert transcript_module._offset_cache['s1'][1] == path.stat().st_size
+
+    def test_cached_floor_skips_earlier_bytes(self, tmp_path, transcript_module, monkeypatch):
+        """Test the backward scan stops at the cached offset."""
+        path = tmp_path / 't.jsonl'
+        _write_entries(path, 10)
+        transcript_module.tail_lines(str(path), 1, 's1')
+        floor = transcript_module._offset_cache['s1'][2]
+
+        floors = []
+        real_read_tail = transcript_module._read_tail
+
+        def spy(f, size, n, scan_floor):
+            floors.append(scan_floor)
+            return real_read_tail(f, size, n, scan_floor)
+
+        monkeypatch.setattr(transcript_module, '_read_tail', spy)
+        with open(path, 'a') as f:
+            f.write('{"type": "assistant"}\n')
+        transcript_module.tail_lines(str(path), 1, 's1')
+        assert floors == [floor]
+
+    def test_more_lines_than_cached_rescans(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        lines = _write_entries(path, 10)
+        transcript_module.tail_lines(str(path), 1, 's1')
+        assert transcript_module.tail_lines(str(path), 4, 's1') == lines[-4:]
+
+    def test_truncated_file_rescans(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        _write_entries(path, 10)
+        transcript_module.tail_lines(str(path), 1, 's1')
+        lines = _write_entries(path, 3)
+        assert transcript_module.tail_lines(str(path), 1, 's1') == [lines[-1]]
+
+    def test_rewritten_file_rescans(self, tmp_path, transcript_module):
+        """Test a rewrite that moves line boundaries does not reuse the offset."""
+        path = tmp_path / 't.jsonl'
+        _write_entries(path, 10)
+        transcript_module.tail_lines(str(path), 1, 's1')
+        path.write_text('a' * (path.stat().st_size + 10) + '\n')
+        assert transcript_module.tail_lines(str(path), 1, 's1') == ['a' * (path.stat().st_size - 1)]
+
+
+class TestTailEntries:
+    """Tests for tail_entries()."""
+
+    def test_skips_partial_line(self, tmp_path, transcript_module):
+        path = tmp_path / 't.jsonl'
+        path.write_text('{"type": "user"}\n{"type": "assistant"}\n{"type": "us')
+        assert transcript_module.tail_entries(str(path), 3) == [{'type': 'user'}, {'type': 'assistant'}]
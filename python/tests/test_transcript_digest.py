@@ -0,0 +1,182 @@
+"""Tests for lib.transcript_digest (bounded supervisor transcript context).
+
+These tests cover:
+- entry_text: Claude Code message blocks and plain role/content entries
+- update_digest: incremental offsets, partial lines, recent window and summary
+- render_digest: token budget, original request, omitted-turn accounting
+- _ask_supervisor_for_guidance: prompt uses the digest instead of the full transcript
+"""
+
+import json
+
+import pytest
+
+
+def _turn(role: str, text: str) -> str:
+    return json.dumps({'type': role, 'message': {'role': role, 'content': [{'type': 'text', 'text': text}]}}) + '\n'
+
+
+@pytest.fixture
+def digest_env(set_agentize_home):
+    return set_agentize_home
+
+
+class TestEntryText:
+    """Tests for entry_text()."""
+
+    def test_message_blocks(self):
+        from lib.transcript_digest import entry_text
+
+        entry = {'message': {'role': 'assistant', 'content': [
+            {'type': 'text', 'text': 'hello'},
+            {'type': 'tool_use', 'name': 'Bash'},
+            'world',
+        ]}}
+        assert entry_text(entry) == ('assistant', 'hello world')
+
+    def test_plain_role_content(self):
+        from lib.transcript_digest import entry_text
+
+        assert entry_text({'role': 'user', 'content': 'do it'}) == ('user', 'do it')
+
+    def test_tool_result_only_has_no_text(self):
+        from lib.transcript_digest import entry_text
+
+        entry = {'message': {'role': 'user', 'content': [{'type': 'tool_result', 'content': 'ok'}]}}
+        assert entry_text(entry) is None
+
+
+class TestUpdateDigest:
+    """Tests for update_digest()."""
+
+    def test_incremental_offset(self, digest_env, tmp_path):
+        from lib.transcript_digest import update_digest
+
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text(_turn('user', 'implement issue 42') + _turn('assistant', 'reading code'))
+        digest = update_digest('s1', str(transcript), recent_turns=4)
+        assert digest['entries'] == 2
+        assert digest['offset'] == transcript.stat().st_size
+
+        with open(transcript, 'a') as f:
+            f.write(_turn('assistant', 'tests pass'))
+        digest = update_digest('s1', str(transcript), recent_turns=4)
+        assert digest['entries'] == 3
+        assert digest['recent'] == ['user: implement issue 42', 'assistant: reading code', 'assistant: tests pass']
+
+    def test_partial_line_waits(self, digest_env, tmp_path):
+        from lib.transcript_digest import update_digest
+
+        transcript = tmp_path / 't.jsonl'
+        full = _turn('user', 'start')
+        transcript.write_text(full + '{"type": "assis')
+        digest = update_digest('s1', str(transcript))
+        assert digest['offset'] == len(full)
+        with open(transcript, 'a') as f:
+            f.write('tant"}\n')
+        assert update_digest('s1', str(transcript))['entries'] == 2
+
+    def test_overflow_rolls_into_summary(self, digest_env, tmp_path):
+        from lib.transcript_digest import update_digest, SUMMARY_LINE_CHARS
+
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text(''.join(_turn('assistant', f'step {i} ' + 'x' * 400) for i in range(6)))
+        digest = update_digest('s1', str(transcript), recent_turns=2)
+        assert len(digest['recent']) == 2
+        assert digest['recent'][-1].startswith('assistant: step 5')
+        assert len(digest['summary']) == 4
+        assert all(len(line) <= SUMMARY_LINE_CHARS for line in digest['summary'])
+
+    def test_summary_cap_counts_omitted(self, digest_env, tmp_path, monkeypatch):
+        from lib import transcript_digest
+
+        monkeypatch.setattr(transcript_digest, 'SUMMARY_MAX_LINES', 3)
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text(''.join(_turn('user', f'turn {i}') for i in range(10)))
+        digest = transcript_digest.update_digest('s1', str(transcript), recent_turns=2)
+        assert digest['summary'] == ['user: turn 5', 'user: turn 6', 'user: turn 7']
+        assert digest['omitted'] == 5
+        assert digest['first_request'] == 'turn 0'
+
+    def test_truncated_transcript_resets(self, digest_env, tmp_path):
+        from lib.transcript_digest import update_digest
+
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text(_turn('user', 'a' * 200) + _turn('user', 'b'))
+        update_digest('s1', str(transcript))
+        transcript.write_text(_turn('user', 'fresh'))
+        digest = update_digest('s1', str(transcript))
+        assert digest['recent'] == ['user: fresh']
+
+
+class TestRenderDigest:
+    """Tests for render_digest()."""
+
+    def test_short_session_has_only_recent(self, digest_env, tmp_path):
+        from lib.transcript_digest import update_digest, render_digest
+
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text(_turn('user', 'plan it') + _turn('assistant', 'planned'))
+        context = render_digest(update_digest('s1', str(transcript)))
+        assert context == 'RECENT TURNS:\nuser: plan it\nassistant: planned'
+
+    def test_budget_bounds_long_session(self, digest_env, tmp_path):
+        from lib.transcript_digest import update_digest, render_digest, CHARS_PER_TOKEN
+
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text(
+            _turn('user', '/issue-to-impl 42')
+            + ''.join(_turn('assistant', f'step {i} ' + 'y' * 3000) for i in range(200))
+        )
+        digest = update_digest('s1', str(transcript), recent_turns=8)
+        context = render_digest(digest, token_budget=1000)
+
+        # Section headers add a little on top of the content budget
+        assert len(context) <= 1000 * CHARS_PER_TOKEN + 200
+        assert context.startswith('ORIGINAL REQUEST:\n/issue-to-impl 42')
+        assert 'older turns omitted' in context
+        assert 'step 199' in context
+
+    def test_empty_digest(self, digest_env, tmp_path):
+        from lib.transcript_digest import update_digest, render_digest
+
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text('{"type": "summary"}\n')
+        assert render_digest(update_digest('s1', str(transcript))) == ''
+
+
+class TestSupervisorUsesDigest:
+    """Tests for the supervisor prompt context."""
+
+    def test_prompt_context_is_bounded(self, digest_env, tmp_path, monkeypatch, clear_local_config_cache):
+        from lib import workflow
+
+        (digest_env / '.agentize.local.yaml').write_text(
+            'handsoff:\n  supervisor:\n    provider: claude\n    context_tokens: 500\n    recent_turns: 3\n'
+        )
+        monkeypatch.chdir(digest_env)
+        transcript = tmp_path / 't.jsonl'
+        transcript.write_text(''.join(_turn('assistant', f'turn {i} ' + 'z' * 1000) for i in range(100)))
+
+        prompts = []
+
+        def fake_run_acw(provider, model, input_file, output_file, flags):
+            with open(input_file) as f:
+                prompts.append(f.read())
+            with open(output_file, 'w') as f:
+                f.write('keep going')
+
+            class Result:
+                returncode = 0
+                stdout = stderr = ''
+            return Result()
+
+        monkeypatch.setattr(workflow, '_run_acw', fake_run_acw)
+        guidance = workflow._ask_supervisor_for_guidance(
+            's1', str(tmp_path / 's1.json'), workflow.ISSUE_TO_IMPL, 1, 10, str(transcript)
+        )
+        assert guidance == 'keep going'
+        assert 'CONVERSATION CONTEXT:' in prompts[0]
+        assert 'FULL CONVERSATION CONTEXT' not in prompts[0]
+        assert 'turn 99' in prompts[0]
+        assert 'turn 50' not in prompts[0]
@@ -0,0 +1,131 @@
+"""Tests for the on-disk provider cache and direct provider exec in run_acw."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from agentize.workflow.api import acw as acw_module
+from agentize.workflow.api.acw import list_acw_providers, run_acw
+
+_COUNTING_ACW = """
+acw() {
+    echo run >> "$ACW_CALLS"
+    printf 'claude\\ncodex\\n'
+}
+"""
+
+_FAKE_CLAUDE = """#!/usr/bin/env bash
+echo "progress" >&2
+printf '%s\\n' "$@"
+"""
+
+_FAKE_CODEX = """#!/usr/bin/env bash
+while [ $# -gt 0 ]; do
+    if [ "$1" = "-o" ]; then out="$2"; shift; fi
+    shift
+done
+cat > "$out"
+"""
+
+
+@pytest.fixture
+def clean_env(monkeypatch, tmp_path: Path):
+    for name in ("AGENTIZE_SHELL_OVERRIDES", "PLANNER_ACW_SCRIPT", "AGENTIZE_ACW_DIRECT",
+                 "AGENTIZE_ACW_MAX_CONCURRENT", "AGENTIZE_ACW_RPM"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("AGENTIZE_HOME", str(tmp_path))
+
+
+def _providers_calls(tmp_path: Path) -> int:
+    calls = tmp_path / "calls"
+    return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+
+def test_provider_list_is_cached_across_processes(tmp_path: Path, monkeypatch, clean_env):
+    script = tmp_path / "acw.sh"
+    script.write_text(_COUNTING_ACW)
+    monkeypatch.setenv("PLANNER_ACW_SCRIPT", str(script))
+    monkeypatch.setenv("ACW_CALLS", str(tmp_path / "calls"))
+
+    for _ in range(2):
+        # A fresh process starts with an empty in-memory cache
+        monkeypatch.setattr(acw_module, "_ACW_PROVIDERS_CACHE", None)
+        assert list_acw_providers() == ["claude", "codex"]
+    assert _providers_calls(tmp_path) == 1
+    assert (tmp_path / ".tmp" / "acw-providers.json").exists()
+
+    later = time.time() + 5
+    os.utime(script, (later, later))
+    monkeypatch.setattr(acw_module, "_ACW_PROVIDERS_CACHE", None)
+    assert list_acw_providers() == ["claude", "codex"]
+    assert _providers_calls(tmp_path) == 2
+
+
+def _bin(tmp_path: Path, monkeypatch, name: str, body: str) -> None:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir(exist_ok=True)
+    binary = bin_dir / name
+    binary.write_text(body)
+    binary.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_claude_runs_without_bash_wrapper(tmp_path: Path, monkeypatch, clean_env):
+    # AGENTIZE_HOME has no acw.sh, so the bash path could not succeed
+    _bin(tmp_path, monkeypatch, "claude", _FAKE_CLAUDE)
+    prompt = tmp_path / "in.md"
+    prompt.write_text("prompt")
+    output = tmp_path / "out" / "out.md"
+
+    result = run_acw("claude", "sonnet", prompt, output, tools="Read", extra_flags=["--yolo"])
+
+    assert result.returncode == 0
+    assert output.read_text().splitlines() == [
+        "--model", "sonnet", "-p", f"@{prompt}", "--tools", "Read", "--dangerously-skip-permissions",
+    ]
+    assert Path(f"{output}.stderr").read_text() == "progress\n"
+
+
+def test_codex_reads_prompt_from_stdin(tmp_path: Path, monkeypatch, clean_env):
+    _bin(tmp_path, monkeypatch, "codex", _FAKE_CODEX)
+    prompt = tmp_path / "in.md"
+    prompt.write_text("hello codex")
+    output = tmp_path / "out.md"
+
+    chunks: list[str] = []
+    result = run_acw("codex", "gpt", prompt, output, on_output=lambda stream, chunk: chunks.append(chunk))
+
+    assert result.returncode == 0
+    assert output.read_text() == "hello codex"
+    assert "".join(chunks) == "hello codex"
+    assert not Path(f"{output}.stderr").exists()
+
+
+def test_direct_exec_keeps_acw_exit_codes(tmp_path: Path, monkeypatch, clean_env):
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+    prompt = tmp_path / "in.md"
+
+    assert run_acw("claude", "sonnet", prompt, tmp_path / "out.md").returncode == 3
+    prompt.write_text("prompt")
+    result = run_acw("claude", "sonnet", prompt, tmp_path / "out.md")
+    assert result.returncode == 4
+    assert "CLI binary 'claude' not found" in result.stderr
+
+
+def test_direct_exec_can_be_disabled(tmp_path: Path, monkeypatch, clean_env):
+    # The default acw.sh location under AGENTIZE_HOME
+    script = tmp_path / "src" / "cli" / "acw.sh"
+    script.parent.mkdir(parents=True)
+    script.write_text('acw() { echo wrapped > "$4"; }\n')
+    monkeypatch.setenv("AGENTIZE_ACW_DIRECT", "0")
+    prompt = tmp_path / "in.md"
+    prompt.write_text("prompt")
+
+    result = run_acw("claude", "sonnet", prompt, tmp_path / "out.md")
+
+    assert result.returncode == 0
+    assert (tmp_path / "out.md").read_text() == "wrapped\n"
@@ -0,0 +1,65 @@
+"""Tests for streaming mode of run_acw."""
+
+from __future__ import annotations
+
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from agentize.workflow.api.acw import run_acw
+
+_FAKE_ACW = """
+acw() {
+    local out="$4"
+    printf 'thinking\\n' > "$out.stderr"
+    printf 'part one\\n' > "$out"
+    sleep 0.3
+    printf 'DONE\\n' >> "$out"
+    sleep "${FAKE_ACW_LINGER:-0}"
+    return "${FAKE_ACW_EXIT:-0}"
+}
+"""
+
+
+@pytest.fixture
+def acw_env(tmp_path: Path, monkeypatch) -> dict[str, str]:
+    script = tmp_path / "acw.sh"
+    script.write_text(_FAKE_ACW)
+    monkeypatch.delenv("AGENTIZE_SHELL_OVERRIDES", raising=False)
+    monkeypatch.delenv("AGENTIZE_ACW_MAX_CONCURRENT", raising=False)
+    monkeypatch.delenv("AGENTIZE_ACW_RPM", raising=False)
+    return {"PLANNER_ACW_SCRIPT": str(script), "AGENTIZE_HOME": str(tmp_path)}
+
+
+def _run(tmp_path: Path, env: dict[str, str], **kwargs) -> subprocess.CompletedProcess:
+    prompt = tmp_path / "in.md"
+    prompt.write_text("prompt")
+    return run_acw("claude", "sonnet", prompt, tmp_path / "out.md", env=env, **kwargs)
+
+
+def test_streams_output_and_stderr_chunks(tmp_path: Path, acw_env):
+    chunks: list[tuple[str, str]] = []
+    result = _run(tmp_path, {**acw_env, "FAKE_ACW_EXIT": "3"}, on_output=lambda stream, chunk: chunks.append((stream, chunk)))
+
+    assert result.returncode == 3
+    assert "".join(chunk for stream, chunk in chunks if stream == "output") == "part one\nDONE\n"
+    assert ("stderr", "thinking\n") in chunks
+    assert sum(1 for stream, _ in chunks if stream == "output") >= 2  # arrived while running
+
+
+def test_stop_when_ends_the_run_early(tmp_path: Path, acw_env):
+    start = time.monotonic()
+    result = _run(tmp_path, {**acw_env, "FAKE_ACW_LINGER": "30"}, stop_when=lambda tail: "DONE" in tail)
+
+    assert time.monotonic() - start < 10
+    assert result.returncode == 0
+    assert (tmp_path / "out.md").read_text() == "part one\nDONE\n"
+
+
+def test_idle_timeout_is_separate_from_total_timeout(tmp_path: Path, acw_env):
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        _run(tmp_path, {**acw_env, "FAKE_ACW_LINGER": "30"}, idle_timeout=0.8, timeout=600)
+    assert time.monotonic() - start < 10
@@ -0,0 +1,81 @@
+"""Tests for host-wide ACW admission control."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from agentize.workflow.api import admission
+
+
+def _env(tmp_path: Path, **limits: str) -> dict[str, str]:
+    return {"AGENTIZE_ACW_ADMISSION_DIR": str(tmp_path), **limits}
+
+
+def test_resolve_limits_prefers_provider_model_entries():
+    env = {"AGENTIZE_ACW_MAX_CONCURRENT": "claude=4, claude:opus=2, bad, codex=x", "AGENTIZE_ACW_RPM": "codex=30"}
+    assert admission.resolve_limits("claude", "opus", env) == (("claude:opus", 2), None)
+    assert admission.resolve_limits("claude", "sonnet", env) == (("claude", 4), None)
+    assert admission.resolve_limits("codex", "gpt", env) == (None, ("codex", 30.0))
+    assert admission.resolve_limits("kimi", "k2", env) == (None, None)
+
+
+def test_no_limits_admits_immediately(tmp_path: Path):
+    with admission.admit("claude", "opus", env=_env(tmp_path)) as admitted:
+        assert admitted == admission.Admission(None, 0.0)
+    assert not any(tmp_path.iterdir())
+
+
+def test_concurrency_limit_serializes_callers_in_arrival_order(tmp_path: Path):
+    env = _env(tmp_path, AGENTIZE_ACW_MAX_CONCURRENT="claude=1")
+    events: list[tuple[str, int]] = []
+    lock = threading.Lock()
+
+    def call(index: int) -> None:
+        with admission.admit("claude", "opus", env=env):
+            with lock:
+                events.append(("start", index))
+            time.sleep(0.15)
+            with lock:
+                events.append(("end", index))
+
+    first = threading.Thread(target=call, args=(0,))
+    first.start()
+    time.sleep(0.05)
+    rest = []
+    for index in (1, 2):
+        thread = threading.Thread(target=call, args=(index,))
+        thread.start()
+        rest.append(thread)
+        time.sleep(0.03)
+    for thread in [first, *rest]:
+        thread.join()
+
+    assert events == [("start", 0), ("end", 0), ("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    assert not any((tmp_path / "claude" / "queue").iterdir())
+
+
+def test_rate_limit_waits_for_a_token(tmp_path: Path):
+    env = _env(tmp_path, AGENTIZE_ACW_RPM="codex:gpt=600")
+    bucket = tmp_path / "codex_gpt"
+    bucket.mkdir()
+    (bucket / "state.json").write_text(json.dumps({"tokens": 0.0, "updated": time.time()}))
+
+    with admission.admit("codex", "gpt", env=env) as admitted:
+        assert admitted.key == "codex:gpt"
+        assert 0.05 <= admitted.wait < 1.0
+
+
+def test_dead_ticket_does_not_block_the_queue(tmp_path: Path):
+    env = _env(tmp_path, AGENTIZE_ACW_MAX_CONCURRENT="claude=1")
+    queue = tmp_path / "claude" / "queue"
+    queue.mkdir(parents=True)
+    stale = queue / "000000000000-99999"
+    stale.write_text("")
+    (tmp_path / "claude" / "state.json").write_text(json.dumps({"next_ticket": 1}))
+
+    with admission.admit("claude", "opus", env=env) as admitted:
+        assert admitted.wait < 1.0
+    assert not stale.exists()
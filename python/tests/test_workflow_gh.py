@@ -0,0 +1,339 @@
+"""Tests for agentize.workflow.api.gh: auth caching, overrides shell and API backend."""
+
+import json
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from agentize.workflow.api import gh as gh_utils
+from agentize.workflow.api import gh_api
+
+
+@pytest.fixture(autouse=True)
+def reset_gh_state(monkeypatch):
+    monkeypatch.delenv("AGENTIZE_SHELL_OVERRIDES", raising=False)
+    gh_utils._clear_gh_auth_cache()
+    gh_utils._close_overrides_shell()
+    yield
+    gh_utils._clear_gh_auth_cache()
+    gh_utils._close_overrides_shell()
+
+
+def _completed(args, returncode=0, stdout=""):
+    return subprocess.CompletedProcess(args, returncode, stdout, "")
+
+
+class TestAuthCache:
+    """`gh auth status` runs once per TTL instead of once per call."""
+
+    def test_auth_checked_once_for_many_calls(self):
+        def fake_run(args, **kwargs):
+            return _completed(args, stdout='{"mergeable": "MERGEABLE"}')
+
+        with patch("shutil.which", return_value="/usr/bin/gh"), \
+                patch("subprocess.run", side_effect=fake_run) as run:
+            gh_utils.pr_view(1)
+            gh_utils.pr_view(2)
+            gh_utils.issue_view(3, ".title")
+
+        calls = [call.args[0] for call in run.call_args_list]
+        assert calls.count(["gh", "auth", "status"]) == 1
+        assert len(calls) == 4
+
+    def test_ttl_expiry_rechecks(self, monkeypatch):
+        monkeypatch.setattr(gh_utils, "_GH_AUTH_TTL_SEC", 0.0)
+        with patch("shutil.which", return_value="/usr/bin/gh"), \
+                patch("subprocess.run", side_effect=lambda args, **kw: _completed(args, stdout="{}")) as run:
+            gh_utils.pr_view(1)
+            gh_utils.pr_view(2)
+
+        calls = [call.args[0] for call in run.call_args_list]
+        assert calls.count(["gh", "auth", "status"]) == 2
+
+    def test_auth_failure_exit_code_invalidates(self):
+        results = iter([
+            _completed(["gh", "auth", "status"]),
+            _completed(["gh", "pr", "view"], returncode=4),
+            _completed(["gh", "auth", "status"], returncode=1),
+        ])
+        with patch("shutil.which", return_value="/usr/bin/gh"), \
+                patch("subprocess.run", side_effect=lambda args, **kw: next(results)):
+            with pytest.raises(RuntimeError, match="pr view"):
+                gh_utils.pr_view(1)
+            with pytest.raises(RuntimeError, match="not authenticated"):
+                gh_utils.pr_view(1)
+
+    def test_unauthenticated_is_not_cached(self):
+        results = iter([
+            _completed(["gh", "auth", "status"], returncode=1),
+            _completed(["gh", "auth", "status"]),
+            _completed(["gh", "pr", "view"], stdout="{}"),
+        ])
+        with patch("shutil.which", return_value="/usr/bin/gh"), \
+                patch("subprocess.run", side_effect=lambda args, **kw: next(results)):
+            with pytest.raises(RuntimeError):
+                gh_utils.pr_view(1)
+            assert gh_utils.pr_view(1) == {}
+
+
+class TestOverridesShell:
+    """With AGENTIZE_SHELL_OVERRIDES, the overrides file is sourced once."""
+
+    @pytest.fixture
+    def overrides(self, tmp_path, monkeypatch):
+        sourced = tmp_path / "sourced.log"
+        script = tmp_path / "overrides.sh"
+        script.write_text(
+            f'echo sourced >> "{sourced}"\n'
+            'gh() {\n'
+            '  case "$1" in\n'
+            '    auth) return 0 ;;\n'
+            '    pr) echo "{\\"url\\": \\"$PWD/$3\\"}" ;;\n'
+            '    issue) echo "not found" >&2; return 1 ;;\n'
+            '  esac\n'
+            '}\n'
+        )
+        monkeypatch.setenv("AGENTIZE_SHELL_OVERRIDES", str(script))
+        return sourced
+
+    def test_sourced_once_across_calls(self, overrides, tmp_path):
+        assert gh_utils.pr_view(7, cwd=tmp_path) == {"url": f"{tmp_path}/7"}
+        assert gh_utils.pr_view(8, cwd=tmp_path) == {"url": f"{tmp_path}/8"}
+        assert overrides.read_text().count("sourced") == 1
+
+    def test_failure_carries_stderr(self, overrides):
+        with pytest.raises(RuntimeError, match="not found"):
+            gh_utils.issue_view(1, ".title")
+
+    def test_environment_change_respawns_shell(self, overrides, monkeypatch):
+        gh_utils.pr_view(1)
+        monkeypatch.setenv("AGENTIZE_GH_TEST_MARKER", "1")
+        gh_utils.pr_view(2)
+        assert overrides.read_text().count("sourced") == 2
+
+
+class _StubGitHub:
+    """Local stand-in for api.github.com: canned responses, recorded requests."""
+
+    def __init__(self):
+        self.requests = []
+        self.client_ports = set()
+        self.responses = {}
+        self.etags = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                stub.requests.append((self.command, self.path, body, self.headers.get("Authorization")))
+                stub.client_ports.add(self.client_address[1])
+                etag = stub.etags.get(self.path)
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status, payload = stub.responses.get((self.command, self.path), (404, {"message": "Not Found"}))
+                if callable(payload):
+                    payload = payload(body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = _serve
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestApiBackend:
+    """AGENTIZE_GH_BACKEND=api talks to the API over one pooled connection."""
+
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = _StubGitHub()
+        monkeypatch.setenv("AGENTIZE_GH_BACKEND", "api")
+        monkeypatch.setenv("AGENTIZE_GH_API_URL", stub.url)
+        monkeypatch.setenv("GH_TOKEN", "test-token")
+        monkeypatch.setenv("GH_REPO", "org/repo")
+        gh_api.reset()
+        yield stub
+        gh_api.reset()
+        stub.close()
+
+    def test_issue_calls_share_one_connection(self, stub):
+        issue = {"title": "T", "body": "B", "labels": [{"name": "bug"}], "html_url": "https://github.com/org/repo/issues/5"}
+        stub.responses[("GET", "/repos/org/repo/issues/5")] = (200, issue)
+        with patch("subprocess.run") as run:
+            assert gh_utils.issue_body(5) == "B\n"
+            assert gh_utils.issue_url(5) == "https://github.com/org/repo/issues/5"
+            assert gh_utils.issue_view(5, ".title") == "T\n"
+        run.assert_not_called()
+        assert len(stub.requests) == 3
+        assert all(auth == "Bearer test-token" for *_, auth in stub.requests)
+        assert len(stub.client_ports) == 1
+
+    def test_issue_create_and_labels(self, stub):
+        stub.responses[("POST", "/repos/org/repo/issues")] = (
+            201, {"number": 9, "html_url": "https://github.com/org/repo/issues/9"})
+        stub.responses[("POST", "/repos/org/repo/labels")] = (422, {"message": "Validation Failed"})
+        stub.responses[("PATCH", "/repos/org/repo/labels/agentize%3Aplan")] = (200, {})
+        stub.responses[("POST", "/repos/org/repo/issues/9/labels")] = (200, [])
+
+        assert gh_utils.issue_create("Title", "line1\nline2", ["a"]) == ("9", "https://github.com/org/repo/issues/9")
+        gh_utils.label_create("agentize:plan", "#ededed", "Plan")
+        gh_utils.label_add(9, ["agentize:plan"])
+
+        methods = [(method, path) for method, path, _, _ in stub.requests]
+        assert ("PATCH", "/repos/org/repo/labels/agentize%3Aplan") in methods
+        assert stub.requests[0][2] == {"title": "Title", "body": "line1\nline2", "labels": ["a"]}
+        assert stub.requests[-1][2] == {"labels": ["agentize:plan"]}
+
+    def test_pr_view_and_checks_via_graphql(self, stub):
+        def graphql(body):
+            if "statusCheckRollup" in body["query"]:
+                nodes = [
+                    {"__typename": "CheckRun", "name": "lint", "status": "COMPLETED", "conclusion": "SUCCESS", "detailsUrl": "u1"},
+                    {"__typename": "CheckRun", "name": "test", "status": "IN_PROGRESS", "conclusion": None, "detailsUrl": "u2"},
+                ]
+                commit = {"statusCheckRollup": {"contexts": {"nodes": nodes}}}
+                return {"data": {"repository": {"pullRequest": {"commits": {"nodes": [{"commit": commit}]}}}}}
+            return {"data": {"repository": {"pullRequest": {"mergeable": "MERGEABLE", "url": "https://x/pull/3"}}}}
+
+        stub.responses[("POST", "/graphql")] = (200, graphql)
+        assert gh_utils.pr_view(3, fields="mergeable,url") == {"mergeable": "MERGEABLE", "url": "https://x/pull/3"}
+        exit_code, checks = gh_utils.pr_checks(3)
+        assert exit_code == 8
+        assert checks[1] == {"name": "test", "state": "IN_PROGRESS", "link": "u2"}
+
+    def test_required_checks_via_graphql(self, stub):
+        def graphql(body):
+            assert "isRequired(pullRequestNumber: $number)" in body["query"]
+            nodes = [
+                {"__typename": "CheckRun", "name": "test", "isRequired": True},
+                {"__typename": "CheckRun", "name": "docs", "isRequired": False},
+                {"__typename": "StatusContext", "context": "ci/legacy", "isRequired": True},
+            ]
+            commit = {"statusCheckRollup": {"contexts": {"nodes": nodes}}}
+            return {"data": {"repository": {"pullRequest": {"commits": {"nodes": [{"commit": commit}]}}}}}
+
+        stub.responses[("POST", "/graphql")] = (200, graphql)
+        assert gh_utils._required_check_names(3, None) == {"test", "ci/legacy"}
+
+    def test_http_error_raises(self, stub):
+        with pytest.raises(RuntimeError, match="404"):
+            gh_utils.issue_body(1)
+
+    def test_unsupported_fields_fall_back_to_cli(self, stub):
+        with patch("shutil.which", return_value="/usr/bin/gh"), \
+                patch("subprocess.run", side_effect=lambda args, **kw: _completed(args, stdout='{"labels": []}')) as run:
+            assert gh_utils.pr_view(3, fields="labels") == {"labels": []}
+        assert run.call_args_list[-1].args[0][:3] == ["gh", "pr", "view"]
+        assert stub.requests == []
+
+    def test_check_snapshot_uses_etags(self, stub):
+        base = "/repos/org/repo"
+        stub.responses[("GET", f"{base}/pulls/3")] = (200, {"head": {"sha": "abc"}})
+        stub.responses[("GET", f"{base}/commits/abc/check-runs?per_page=100")] = (200, {"check_runs": [
+            {"name": "lint", "status": "completed", "conclusion": "failure", "details_url": "u1"},
+            {"name": "test", "status": "in_progress", "conclusion": None, "details_url": "u2"},
+        ]})
+        stub.responses[("GET", f"{base}/commits/abc/status?per_page=100")] = (200, {"statuses": [
+            {"context": "ci/legacy", "state": "success", "target_url": "u3"},
+        ]})
+        stub.etags = {path: f'"{n}"' for n, (_, path) in enumerate(stub.responses)}
+
+        first = gh_api.pr_check_snapshot(3)
+        second = gh_api.pr_check_snapshot(3)
+
+        assert first == second == [
+            {"name": "lint", "state": "FAILURE", "link": "u1"},
+            {"name": "test", "state": "IN_PROGRESS", "link": "u2"},
+            {"name": "ci/legacy", "state": "SUCCESS", "link": "u3"},
+        ]
+        assert len(stub.requests) == 6
+
+
+class TestPrChecksWait:
+    """pr_checks_wait() polls adaptively and returns on the first failure."""
+
+    def _run(self, snapshots, required=(), **kwargs):
+        snapshots = iter(snapshots)
+        with patch.object(gh_utils, "_pr_check_snapshot", side_effect=lambda *a: next(snapshots)) as snap, \
+                patch.object(gh_utils, "_required_check_names", return_value=set(required)) as lookup, \
+                patch("time.sleep") as sleep:
+            result = gh_utils.pr_checks_wait(7, **kwargs)
+        self.lookups = lookup.call_count
+        return result, snap.call_count, [call.args[0] for call in sleep.call_args_list]
+
+    def test_fails_fast_while_other_checks_run(self):
+        pending = [{"name": "a", "state": "IN_PROGRESS"}, {"name": "b", "state": "QUEUED"}]
+        failing = [{"name": "a", "state": "FAILURE"}, {"name": "b", "state": "IN_PROGRESS"}]
+        (exit_code, checks), polls, _ = self._run([pending, failing], required={"a"})
+        assert exit_code == 1
+        assert checks == failing
+        assert polls == 2
+
+    def test_optional_failure_waits_for_the_rest(self):
+        failing = [{"name": "docs", "state": "FAILURE"}, {"name": "test", "state": "IN_PROGRESS"}]
+        done = [{"name": "docs", "state": "FAILURE"}, {"name": "test", "state": "SUCCESS"}]
+        (exit_code, checks), polls, _ = self._run([failing, failing, done], required={"test"})
+        assert (exit_code, checks, polls) == (1, done, 3)
+        assert self.lookups == 1  # the same failure is looked up once
+
+    def test_without_required_checks_every_failure_counts(self):
+        failing = [{"name": "a", "state": "FAILURE"}, {"name": "b", "state": "IN_PROGRESS"}]
+        (exit_code, _), polls, _ = self._run([failing])
+        assert (exit_code, polls) == (1, 1)
+
+    def test_intervals_grow_to_max(self):
+        pending = [{"name": "a", "state": "PENDING"}]
+        done = [{"name": "a", "state": "SUCCESS"}, {"name": "b", "state": "SKIPPED"}]
+        (exit_code, _), _, sleeps = self._run([pending] * 5 + [done], initial_interval=4, max_interval=10)
+        assert exit_code == 0
+        assert sleeps == [4, 6, 9, 10, 10]
+
+    def test_no_checks_after_grace_is_neither_pass_nor_fail(self, monkeypatch):
+        clock = iter([0.0, 0.0, 200.0])
+        monkeypatch.setattr(gh_utils.time, "monotonic", lambda: next(clock))
+        (exit_code, checks), polls, _ = self._run([[], []])
+        assert (exit_code, checks, polls) == (gh_utils.NO_CHECKS_EXIT_CODE, [], 2)
+        assert exit_code not in (0, 1, 8)
+
+    def test_cli_required_checks(self):
+        def run(args, **kw):
+            if "auth" in args:
+                return _completed(args)
+            assert "--required" in args
+            return _completed(args, returncode=1, stdout='[{"name":"test"}]')
+
+        with patch("shutil.which", return_value="/usr/bin/gh"), patch("subprocess.run", side_effect=run):
+            assert gh_utils._required_check_names(7, None) == {"test"}
+
+    def test_cli_snapshot_parses_pending_exit_code(self):
+        output = '[{"name":"a","state":"IN_PROGRESS","link":""}]'
+        with patch("shutil.which", return_value="/usr/bin/gh"), \
+                patch("subprocess.run", side_effect=lambda args, **kw: _completed(
+                    args, returncode=0 if "auth" in args else 8, stdout=output)):
+            assert gh_utils._pr_check_snapshot(7, None) == [{"name": "a", "state": "IN_PROGRESS", "link": ""}]
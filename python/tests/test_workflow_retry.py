@@ -0,0 +1,132 @@
+"""Tests for Session retry policies: failure classes, backoff budgets and hedging."""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from agentize.workflow.api import PipelineError, Session
+from agentize.workflow.api import retry
+
+
+@pytest.mark.parametrize(
+    ("stderr", "returncode", "expected"),
+    [
+        ("API Error: 429 Too Many Requests", 1, retry.RATE_LIMITED),
+        ('{"type":"overloaded_error"}', 1, retry.OVERLOADED),
+        ("Invalid API key. Please run /login", 1, retry.AUTH),
+        ("API Error: 401 {\"type\":\"authentication_error\"}", 1, retry.AUTH),
+        ("unexpected status 403 Forbidden", 1, retry.AUTH),
+        ("SyntaxError at line 401 of parser.py", 1, retry.UNKNOWN),
+        ("please log in to the dashboard to view item 403", 1, retry.UNKNOWN),
+        ("error: unknown option '--bogus'", 2, retry.INVALID_ARGS),
+        ("", 4, retry.INVALID_ARGS),
+        ("", 0, retry.NO_OUTPUT),
+        ("segfault", 139, retry.UNKNOWN),
+    ],
+)
+def test_classify_failure(stderr: str, returncode: int, expected: str):
+    assert retry.classify_failure(RuntimeError("failed"), returncode=returncode, stderr=stderr) == expected
+
+
+def test_classify_timeout():
+    assert retry.classify_failure(subprocess.TimeoutExpired(["acw"], 5)) == retry.TIMEOUT
+
+
+def test_backoff_is_jittered_exponential_and_capped():
+    policy = retry.RetryPolicy(base_delay=1.0, max_delay=5.0, rand=lambda: 1.0)
+    assert [policy.backoff(n) for n in (1, 2, 3, 4)] == [1.0, 2.0, 4.0, 5.0]
+    assert retry.RetryPolicy(rand=lambda: 0.5).backoff(1) == 1.0
+
+
+def _failing_runner(failures: list[tuple[int, str]], calls: list[str]):
+    def _runner(provider, model, input_file, output_file, **kwargs):
+        calls.append(provider)
+        if failures:
+            code, stderr = failures.pop(0)
+            Path(f"{output_file}.stderr").write_text(stderr)
+            return subprocess.CompletedProcess(args=["stub"], returncode=code)
+        Path(output_file).write_text("ok")
+        return subprocess.CompletedProcess(args=["stub"], returncode=0)
+    return _runner
+
+
+def test_policy_retries_transient_failures(tmp_path: Path, capsys):
+    calls: list[str] = []
+    runner = _failing_runner([(1, "429 rate limit"), (1, "overloaded")], calls)
+    session = Session(tmp_path, "p", runner=runner, retry_policy=retry.RetryPolicy(rand=lambda: 0.0))
+
+    result = session.run_prompt("stage", "hello", ("claude", "sonnet"))
+
+    assert result.text() == "ok"
+    assert len(calls) == 3
+    stderr = capsys.readouterr().err
+    assert "failed (rate_limited), retry 1/5" in stderr
+    assert "failed (overloaded), retry 1/4" in stderr
+
+
+def test_policy_does_not_retry_invalid_args(tmp_path: Path):
+    calls: list[str] = []
+    runner = _failing_runner([(2, "error: unknown option '--bogus'")] * 3, calls)
+    session = Session(tmp_path, "p", runner=runner)
+
+    with pytest.raises(PipelineError) as excinfo:
+        session.run_prompt("stage", "hello", ("claude", "sonnet"), retry=5,
+                           retry_policy=retry.RetryPolicy(rand=lambda: 0.0))
+    assert calls == ["claude"]
+    assert excinfo.value.attempts == 1
+
+
+def test_hedge_races_fallback_and_cancels_the_loser(tmp_path: Path, capsys):
+    cancelled = threading.Event()
+
+    def runner(provider, model, input_file, output_file, *, cancel=None, **kwargs):
+        if provider == "claude":
+            assert cancel is not None
+            if not cancel.wait(5):
+                Path(output_file).write_text("slow")
+                return subprocess.CompletedProcess(args=["stub"], returncode=0)
+            cancelled.set()
+            return subprocess.CompletedProcess(args=["stub"], returncode=-15)
+        Path(output_file).write_text("fast")
+        return subprocess.CompletedProcess(args=["stub"], returncode=0)
+
+    policy = retry.RetryPolicy(hedge_percentile=0.9, hedge_min_samples=1)
+    policy.record_latency(("claude", "opus"), 0.1)
+    session = Session(tmp_path, "p", runner=runner, retry_policy=policy)
+
+    start = time.monotonic()
+    result = session.run_prompt("stage", "hello", ("claude", "opus"), fallback_backend=("codex", "gpt"),
+                                tools="Read,Grep")
+
+    assert time.monotonic() - start < 4
+    assert result.text() == "fast"
+    assert result.output_path == tmp_path / "p-stage-output.md"
+    assert cancelled.is_set()
+    assert not (tmp_path / "p-stage-output.md.hedge").exists()
+    assert "hedging with codex:gpt" in capsys.readouterr().err
+
+
+def test_write_capable_stages_are_never_hedged(tmp_path: Path):
+    calls: list[str] = []
+
+    def runner(provider, model, input_file, output_file, **kwargs):
+        calls.append(provider)
+        time.sleep(0.2)
+        Path(output_file).write_text("done")
+        return subprocess.CompletedProcess(args=["stub"], returncode=0)
+
+    policy = retry.RetryPolicy(hedge_percentile=0.9, hedge_min_samples=1)
+    policy.record_latency(("claude", "opus"), 0.01)
+    session = Session(tmp_path, "p", runner=runner, retry_policy=policy)
+
+    session.run_prompt("write", "hello", ("claude", "opus"), fallback_backend=("codex", "gpt"),
+                       tools="Read,Edit")
+    session.run_prompt("yolo", "hello", ("claude", "opus"), fallback_backend=("codex", "gpt"),
+                       tools="Read", extra_flags=["--yolo"])
+
+    assert calls == ["claude", "claude"]
@@ -2,6 +2,7 @@
 
 import subprocess
 import threading
+import time
 from pathlib import Path
 
 import pytest
@@ -202,3 +203,233 @@ def test_log_output_dump_disabled(tmp_path: Path, capsys):
 
     stderr = capsys.readouterr().err
     assert "dumped to" not in stderr
+
+
+def _git_worktree(path: Path) -> Path:
+    """A committed git repository at `path` with one tracked file."""
+    path.mkdir(parents=True, exist_ok=True)
+    for args in (["init", "-q"], ["config", "user.email", "t@example.com"], ["config", "user.name", "t"]):
+        subprocess.run(["git", *args], cwd=path, check=True)
+    (path / "a.py").write_text("one\n")
+    subprocess.run(["git", "add", "a.py"], cwd=path, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "init"], cwd=path, check=True)
+    return path
+
+
+@pytest.mark.skipif(Session is None, reason="Implementation not yet available")
+def test_stage_cache_hit_skips_runner(tmp_path: Path, monkeypatch, capsys):
+    """A cached stage returns without calling the runner; any key change misses."""
+    from agentize.workflow.api import StageCache
+
+    monkeypatch.chdir(_git_worktree(tmp_path / "repo"))
+
+    calls: list[list[str] | None] = []
+
+    def _runner(provider, model, input_file, output_file, *, extra_flags=None, **kwargs):
+        calls.append(extra_flags)
+        Path(output_file).write_text(f"answer {len(calls)}")
+        return subprocess.CompletedProcess(args=["stub"], returncode=0)
+
+    cache = StageCache(tmp_path / "cache")
+    first = Session(output_dir=tmp_path / "a", prefix="p", runner=_runner, cache=cache)
+    second = Session(output_dir=tmp_path / "b", prefix="p", runner=_runner, cache=cache)
+
+    assert first.run_prompt("stage", "hello", ("claude", "sonnet"), tools="Read").text() == "answer 1"
+    result = second.run_prompt("stage", "hello", ("claude", "sonnet"), tools="Read")
+    assert result.text() == "answer 1"
+    assert result.process.returncode == 0
+    assert len(calls) == 1
+
+    second.run_prompt("stage", "hello", ("claude", "sonnet"), tools="Read", extra_flags=["--x"])
+    second.run_prompt("stage", "hello", ("claude", "opus"), tools="Read")
+    second.run_prompt("stage", "hello", ("claude", "sonnet"), tools="Read", cwd=_git_worktree(tmp_path / "other"))
+    assert len(calls) == 4
+
+    stderr = capsys.readouterr().err
+    assert stderr.count("stage cache miss") == 4
+    assert stderr.count("stage cache hit") == 1
+
+
+@pytest.mark.skipif(Session is None, reason="Implementation not yet available")
+def test_stage_cache_keys_on_worktree_content(tmp_path: Path, capsys):
+    """Edits, new files and commits miss; the session's own outputs and non-git dirs do not cache."""
+    from agentize.workflow.api import StageCache
+
+    calls: list[str] = []
+
+    def _runner(provider, model, input_file, output_file, **kwargs):
+        calls.append(provider)
+        Path(output_file).write_text(f"answer {len(calls)}")
+        return subprocess.CompletedProcess(args=["stub"], returncode=0)
+
+    repo = _git_worktree(tmp_path / "repo")
+    session = Session(output_dir=repo / ".tmp", prefix="p", runner=_runner, cache=StageCache(tmp_path / "cache"))
+
+    def run(cwd: Path = repo) -> str:
+        return session.run_prompt("stage", "hello", ("claude", "sonnet"), tools="Read", cwd=cwd).text()
+
+    assert run() == "answer 1"
+    assert run() == "answer 1"  # the untracked .tmp outputs are not part of the state
+    (repo / "a.py").write_text("two\n")
+    assert run() == "answer 2"
+    (repo / "b.py").write_text("new\n")
+    assert run() == "answer 3"
+    (repo / "b.py").write_text("newer\n")
+    assert run() == "answer 4"
+    subprocess.run(["git", "add", "-A", "--", ".", ":(exclude).tmp"], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "more"], cwd=repo, check=True)
+    assert run() == "answer 5"
+    assert run() == "answer 5"
+
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    run(plain)
+    run(plain)
+    assert len(calls) == 7
+
+
+@pytest.mark.skipif(Session is None, reason="Implementation not yet available")
+def test_stage_cache_skips_write_capable_stages(tmp_path: Path, monkeypatch, capsys):
+    """Stages that can edit the worktree always run; the env var alone enables nothing."""
+    from agentize.workflow.api import StageCache
+
+    calls: list[str] = []
+
+    def _runner(provider, model, input_file, output_file, **kwargs):
+        calls.append(provider)
+        Path(output_file).write_text("done")
+        return subprocess.CompletedProcess(args=["stub"], returncode=0)
+
+    cache = StageCache(tmp_path / "cache")
+    session = Session(output_dir=tmp_path / "out", prefix="p", runner=_runner, cache=cache)
+    for options in (
+        {},
+        {"tools": "Read,Edit"},
+        {"tools": "Read", "permission_mode": "bypassPermissions"},
+        {"tools": "Read", "extra_flags": ["--yolo"]},
+    ):
+        session.run_prompt("stage", "hello", ("claude", "sonnet"), **options)
+        session.run_prompt("stage", "hello", ("claude", "sonnet"), **options)
+    assert len(calls) == 8
+    assert not (tmp_path / "cache").exists()
+
+    monkeypatch.setenv("AGENTIZE_STAGE_CACHE_DIR", str(tmp_path / "env-cache"))
+    plain = Session(output_dir=tmp_path / "out", prefix="q", runner=_runner)
+    plain.run_prompt("stage", "hello", ("claude", "sonnet"), tools="Read")
+    assert not (tmp_path / "env-cache").exists()
+    assert "cache" not in capsys.readouterr().err
+
+
+@pytest.mark.skipif(Session is None, reason="Implementation not yet available")
+def test_stage_cache_evicts_by_age_and_size(tmp_path: Path):
+    """Expired entries are never returned; the least recently used go first."""
+    import os
+    import time
+
+    from agentize.workflow.api import StageCache
+
+    cache = StageCache(tmp_path, max_bytes=10, max_age=3600)
+    keys = [StageCache.key(f"prompt {i}", ("claude", "sonnet")) for i in range(3)]
+    cache.put(keys[0], "aaaa")
+    cache.put(keys[1], "bbbb")
+    old = time.time() - 100
+    os.utime(cache._path(keys[0]), (old, old))
+    os.utime(cache._path(keys[1]), (old + 1, old + 1))
+    assert cache.get(keys[0]) == "aaaa"  # marks keys[0] as recently used
+    assert cache._path(keys[0]).stat().st_mtime == pytest.approx(old)  # age is unchanged
+    cache.put(keys[2], "cccc")
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "aaaa"
+
+    stale = time.time() - 7200
+    os.utime(cache._path(keys[2]), (time.time(), stale))
+    assert cache.get(keys[2]) is None  # recent use does not extend max_age
+    cache.evict()
+    assert not cache._path(keys[2]).exists()
+
+
+def _sleepy_runner(log: list[tuple[str, str]], lock: threading.Lock, fail: set[str] = frozenset()):
+    def _runner(provider, model, input_file, output_file, **kwargs):
+        stage = Path(output_file).name.split("-")[1]
+        with lock:
+            log.append(("start", stage))
+        time.sleep(0.05)
+        with lock:
+            log.append(("end", stage))
+        if stage in fail:
+            return subprocess.CompletedProcess(args=["stub"], returncode=1)
+        Path(output_file).write_text(f"{stage} <- {Path(input_file).read_text()}")
+        return subprocess.CompletedProcess(args=["stub"], returncode=0)
+    return _runner
+
+
+@pytest.mark.skipif(Session is None, reason="Implementation not yet available")
+def test_run_dag_starts_stages_when_dependencies_finish(tmp_path: Path):
+    """Each stage starts once its own upstream stages finish and sees their results."""
+    log: list[tuple[str, str]] = []
+    session = Session(output_dir=tmp_path, prefix="dag", runner=_sleepy_runner(log, threading.Lock()))
+    claude = ("claude", "sonnet")
+    results = session.run_dag([
+        session.stage("a", "root", claude),
+        session.stage("b", lambda up: f"b({up['a'].text()})", claude, after=["a"]),
+        session.stage("c", lambda up: "c", claude, after=["a"]),
+        session.stage("d", lambda up: up["b"].text() + up["c"].text(), claude, after=["b", "c"]),
+    ])
+
+    assert list(results) == ["a", "b", "c", "d"]
+    assert results["b"].text() == "b <- b(a <- root)"
+    assert log.index(("end", "a")) < log.index(("start", "b"))
+    assert log.index(("start", "c")) < log.index(("end", "b"))  # b and c overlap
+    assert log.index(("end", "b")) < log.index(("start", "d"))
+
+
+@pytest.mark.skipif(Session is None, reason="Implementation not yet available")
+def test_run_dag_provider_limit(tmp_path: Path):
+    """provider_limits caps concurrent stages per provider."""
+    log: list[tuple[str, str]] = []
+    session = Session(output_dir=tmp_path, prefix="dag", runner=_sleepy_runner(log, threading.Lock()))
+    session.run_dag(
+        [session.stage(name, name, ("codex", "gpt")) for name in ("x", "y", "z")],
+        max_workers=3,
+        provider_limits={"codex": 1},
+    )
+    assert [event for event, _ in log] == ["start", "end"] * 3
+
+
+@pytest.mark.skipif(PipelineError is None or Session is None, reason="Implementation not yet available")
+def test_run_dag_cancels_dependents_of_failed_stage(tmp_path: Path, capsys):
+    """A failure cancels dependents only and is raised after independent stages finish."""
+    log: list[tuple[str, str]] = []
+    session = Session(output_dir=tmp_path, prefix="dag", runner=_sleepy_runner(log, threading.Lock(), {"a"}))
+    claude = ("claude", "sonnet")
+    with pytest.raises(PipelineError) as excinfo:
+        session.run_dag([
+            session.stage("a", "root", claude),
+            session.stage("b", lambda up: "b", claude, after=["a"]),
+            session.stage("c", lambda up: "c", claude, after=["b"]),
+            session.stage("e", "independent", claude),
+        ])
+
+    assert excinfo.value.stage == "a"
+    started = {stage for event, stage in log if event == "start"}
+    assert started == {"a", "e"}
+    stderr = capsys.readouterr().err
+    assert "Stage 'b' cancelled" in stderr
+    assert "Stage 'c' cancelled" in stderr
+
+
+@pytest.mark.skipif(Session is None, reason="Implementation not yet available")
+def test_run_dag_rejects_cycles_and_unknown_stages(tmp_path: Path):
+    session = Session(output_dir=tmp_path, prefix="dag", runner=_sleepy_runner([], threading.Lock()))
+    claude = ("claude", "sonnet")
+    with pytest.raises(ValueError, match="cycle: a -> b -> a"):
+        session.run_dag([
+            session.stage("a", lambda up: "a", claude, after=["b"]),
+            session.stage("b", lambda up: "b", claude, after=["a"]),
+        ])
+    with pytest.raises(ValueError, match="unknown stage 'missing'"):
+        session.run_dag([session.stage("a", lambda up: "a", claude, after=["missing"])])
+    with pytest.raises(ValueError, match=r"provider_limits\['claude'\] must be at least 1"):
+        session.run_dag([session.stage("a", lambda up: "a", claude)], provider_limits={"claude": 0})
+    with pytest.raises(ValueError, match="max_workers must be at least 1"):
+        session.run_dag([session.stage("a", lambda up: "a", claude)], max_workers=0)
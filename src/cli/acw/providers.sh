@@ -6,6 +6,9 @@
 #   - All functions write model output to the specified output file
 #   - stderr is passed through to the caller (for progress messages, diagnostics)
 #   - This allows callers to display real-time progress while capturing results
+#
+# The claude and codex invocations are mirrored by _direct_invocation() in
+# python/agentize/workflow/api/acw.py; keep both in sync.
 
 # Invoke Claude CLI
 # Usage: _acw_invoke_claude <model> <input> <output> [options...]
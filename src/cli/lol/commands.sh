@@ -21,6 +21,7 @@ source "$_LOL_COMMANDS_DIR/commands/project.sh"
 source "$_LOL_COMMANDS_DIR/commands/serve.sh"
 source "$_LOL_COMMANDS_DIR/commands/claude-clean.sh"
 source "$_LOL_COMMANDS_DIR/commands/usage.sh"
+source "$_LOL_COMMANDS_DIR/commands/suggest-rules.sh"
 source "$_LOL_COMMANDS_DIR/commands/plan.sh"
 source "$_LOL_COMMANDS_DIR/commands/impl.sh"
 source "$_LOL_COMMANDS_DIR/commands/simp.sh"
@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+# lol suggest-rules command implementation
+# Shell wrapper that invokes Python rule_suggest module
+
+# Suggest permission rules mined from the permission decision log
+# Usage: _lol_cmd_suggest_rules [log] [min_count] [yaml]
+#   log: Path to permission.txt ("" for $AGENTIZE_HOME/.tmp/hooked-sessions/permission.txt)
+#   min_count: Minimum verdicts a rule must cover ("" for default)
+#   yaml: "1" to print a permissions: YAML block, "0" for the coverage report (default)
+_lol_cmd_suggest_rules() {
+    local log="${1:-}"
+    local min_count="${2:-}"
+    local yaml="${3:-0}"
+
+    # Build command arguments
+    local args=()
+    if [ -n "$log" ]; then
+        args+=(--log "$log")
+    fi
+    if [ -n "$min_count" ]; then
+        args+=(--min-count "$min_count")
+    fi
+    if [ "$yaml" = "1" ]; then
+        args+=(--yaml)
+    fi
+
+    # Invoke Python rule_suggest module
+    python3 -m agentize.rule_suggest "${args[@]}"
+}
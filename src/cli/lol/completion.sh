@@ -14,6 +14,7 @@ _lol_complete() {
             echo "version"
             echo "project"
             echo "usage"
+            echo "suggest-rules"
             echo "serve"
             echo "claude-clean"
             echo "plan"
@@ -47,6 +48,11 @@ _lol_complete() {
             echo "--cache"
             echo "--cost"
             ;;
+        suggest-rules-flags)
+            echo "--log"
+            echo "--min-count"
+            echo "--yaml"
+            ;;
         plan-flags)
             echo "--dry-run"
             echo "--verbose"
@@ -91,6 +91,9 @@ lol() {
         usage)
             _lol_parse_usage "$@"
             ;;
+        suggest-rules)
+            _lol_parse_suggest_rules "$@"
+            ;;
         version)
             _lol_log_version
             _lol_cmd_version
@@ -114,6 +117,7 @@ lol() {
             echo "  lol simp [file] --editor"
             echo "  lol impl <issue-no> [--backend <provider:model>] [--max-iterations <N>] [--yolo] [--wait-for-ci]"
             echo "  lol usage [--today | --week] [--cache] [--cost]"
+            echo "  lol suggest-rules [--log <path>] [--min-count <N>] [--yaml]"
             echo "  lol claude-clean [--dry-run]"
             echo ""
             echo "Flags:"
@@ -228,6 +228,46 @@ _lol_parse_usage() {
     _lol_cmd_usage "$mode" "$cache" "$cost"
 }
 
+# Parse suggest-rules command arguments and call _lol_cmd_suggest_rules
+_lol_parse_suggest_rules() {
+    local log=""
+    local min_count=""
+    local yaml="0"
+
+    # Parse arguments
+    while [ $# -gt 0 ]; do
+        case "$1" in
+            --log)
+                if [ -z "$2" ]; then
+                    echo "Error: --log requires a path"
+                    return 1
+                fi
+                log="$2"
+                shift 2
+                ;;
+            --min-count)
+                if [ -z "$2" ]; then
+                    echo "Error: --min-count requires a number"
+                    return 1
+                fi
+                min_count="$2"
+                shift 2
+                ;;
+            --yaml)
+                yaml="1"
+                shift
+                ;;
+            *)
+                echo "Error: Unknown option '$1'"
+                echo "Usage: lol suggest-rules [--log <path>] [--min-count <N>] [--yaml]"
+                return 1
+                ;;
+        esac
+    done
+
+    _lol_cmd_suggest_rules "$log" "$min_count" "$yaml"
+}
+
 # Parse plan command arguments and call _lol_cmd_plan
 _lol_parse_plan() {
     local dry_run="false"
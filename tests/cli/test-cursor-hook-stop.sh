@@ -0,0 +1,57 @@
+#!/usr/bin/env bash
+# Test: Cursor stop hook leaves continuation_count alone when it allows the stop
+
+source "$(dirname "$0")/../common.sh"
+
+HOOK_SCRIPT="$PROJECT_ROOT/.cursor/hooks/stop.py"
+
+test_info "Cursor stop hook tests"
+
+TMP_DIR=$(make_temp_dir "cursor-stop-hook-test")
+SESS_DIR="$TMP_DIR/.tmp/hooked-sessions"
+
+# Helper: Seed a session with the given workflow and continuation_count
+put_session() {
+    local session_id="$1"
+    local workflow="$2"
+    local count="$3"
+    AGENTIZE_HOME="$TMP_DIR" PYTHONPATH="$PROJECT_ROOT/.claude-plugin" python -c "
+import sys
+from lib.session_store import put_session
+put_session(sys.argv[1], {'workflow': sys.argv[2], 'state': 'initial', 'continuation_count': int(sys.argv[3])})
+" "$session_id" "$workflow" "$count"
+}
+
+# Helper: Print continuation_count of a session
+get_count() {
+    AGENTIZE_HOME="$TMP_DIR" PYTHONPATH="$PROJECT_ROOT/.claude-plugin" python -c "
+import sys
+from lib.session_store import get_session
+print(get_session(sys.argv[1])['continuation_count'])
+" "$1"
+}
+
+# Helper: Run the stop hook for a session
+run_hook() {
+    echo "{\"conversation_id\": \"$1\"}" | AGENTIZE_HOME="$TMP_DIR" HANDSOFF_MODE=1 python "$HOOK_SCRIPT"
+}
+
+# Test 1: No continuation prompt → stop allowed, continuation_count unchanged
+test_info "Test 1: empty prompt leaves continuation_count unchanged"
+put_session "stop-unknown-1" "not-a-workflow" 2
+OUTPUT_1=$(run_hook "stop-unknown-1")
+[ "$(echo "$OUTPUT_1" | jq -r '.decision')" = "allow" ] || test_fail "Expected allow, got: $OUTPUT_1"
+COUNT_1=$(get_count "stop-unknown-1")
+[ "$COUNT_1" = "2" ] || test_fail "Expected continuation_count=2, got '$COUNT_1'"
+
+# Test 2: Max continuations reached → stop allowed, continuation_count unchanged
+test_info "Test 2: max continuations allows the stop"
+put_session "stop-max-2" "ultra-planner" 10
+OUTPUT_2=$(run_hook "stop-max-2")
+[ "$(echo "$OUTPUT_2" | jq -r '.decision')" = "allow" ] || test_fail "Expected allow, got: $OUTPUT_2"
+COUNT_2=$(get_count "stop-max-2")
+[ "$COUNT_2" = "10" ] || test_fail "Expected continuation_count=10, got '$COUNT_2'"
+
+cleanup_dir "$TMP_DIR"
+
+test_pass "Cursor stop hook does not spend continuations when allowing the stop"